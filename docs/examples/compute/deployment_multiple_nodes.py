@@ -0,0 +1,39 @@
+from __future__ import with_statement
+
+import os
+
+from libcloud.compute.types import Provider
+from libcloud.compute.providers import get_driver
+from libcloud.compute.base import FailedNode
+from libcloud.compute.deployment import SSHKeyDeployment
+
+# Path to the public key you would like to install
+KEY_PATH = os.path.expanduser('~/.ssh/id_rsa.pub')
+
+RACKSPACE_USER = 'your username'
+RACKSPACE_KEY = 'your key'
+
+Driver = get_driver(Provider.RACKSPACE)
+conn = Driver(RACKSPACE_USER, RACKSPACE_KEY)
+
+with open(KEY_PATH) as fp:
+    content = fp.read()
+
+step = SSHKeyDeployment(content)
+
+images = conn.list_images()
+sizes = conn.list_sizes()
+
+# Per node arguments, shared arguments are passed as keyword arguments
+nodes = [{'name': 'worker-%03d' % (index)} for index in range(20)]
+
+result = conn.deploy_nodes(nodes, image=images[0], size=sizes[0],
+                           deploy=step, max_workers=5)
+
+for node in result:
+    if isinstance(node, FailedNode):
+        print('Failed to deploy %s: %s' % (node.name, node.error))
+
+        # Node has been created, but the deployment failed
+        if node.node:
+            node.node.destroy()
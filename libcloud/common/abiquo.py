@@ -135,12 +135,13 @@ class AbiquoResponse(XmlResponse):
         Determine if the request was successful.
 
         Any of the 2XX HTTP response codes are accepted as successfull requests
+        as well as '304 Not Modified' responses to conditional requests.
 
         :rtype:  ``bool``
         :return: successful request or not.
         """
         return self.status in [httplib.OK, httplib.CREATED, httplib.NO_CONTENT,
-                               httplib.ACCEPTED]
+                               httplib.ACCEPTED, httplib.NOT_MODIFIED]
 
     def async_success(self):
         """
@@ -0,0 +1,562 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+asyncio transport which lets coroutines make requests through the existing
+connection classes.
+
+Requests are prepared by the wrapped :class:`Connection` (so default
+parameters and headers and request signing in ``add_default_params`` and
+``pre_connect_hook`` are reused unchanged) and responses are parsed by its
+response class. Only the network I/O runs on the event loop, so thousands of
+requests can be in flight without a thread for each of them.
+
+Usage:
+    from libcloud.common.aio import AsyncConnection
+
+    conn = AsyncConnection(driver.connection)
+    response = await conn.request('/servers/detail')
+
+This module requires Python 3.5 or later.
+"""
+
+import asyncio
+import os
+import ssl
+import time
+import warnings
+
+import libcloud.security
+from libcloud.common.pool import ConnectionPool
+from libcloud.common.types import LibcloudError
+from libcloud.utils.py3 import b
+
+__all__ = [
+    'AsyncConnection',
+    'AsyncHTTPConnection',
+    'AsyncHTTPResponse',
+
+    'DEFAULT_ASYNC_CONNECTION_POOL'
+]
+
+# Size of the chunks in which response bodies are read
+READ_CHUNK_SIZE = 64 * 1024
+
+# Statuses of responses which never have a body
+NO_BODY_STATUSES = [204, 304]
+
+# Pool of idle keep-alive connections which is shared by all the
+# AsyncConnection instances. Connections are bound to the event loop which
+# opened them, so they are pooled per event loop.
+DEFAULT_ASYNC_CONNECTION_POOL = ConnectionPool(max_size=100)
+
+_ssl_contexts = {}
+
+
+class AsyncHTTPResponse(object):
+    """
+    Fully read HTTP response which provides the subset of the
+    :class:`httplib.HTTPResponse` interface used by :class:`Response`
+    classes.
+    """
+
+    def __init__(self, method, status, reason, headers, body, will_close):
+        self._method = method
+        self.status = status
+        self.reason = reason
+        self.will_close = will_close
+        self._headers = headers
+        self._body = body
+
+    def getheaders(self):
+        return list(self._headers)
+
+    def getheader(self, name, default=None):
+        name = name.lower()
+
+        for key, value in self._headers:
+            if key.lower() == name:
+                return value
+
+        return default
+
+    def read(self, amt=None):
+        if amt is None:
+            body, self._body = self._body, b''
+        else:
+            body, self._body = self._body[:amt], self._body[amt:]
+
+        return body
+
+    def isclosed(self):
+        return not self._body
+
+
+class AsyncHTTPConnection(object):
+    """
+    HTTP/1.1 client connection on top of asyncio streams.
+
+    The connection is opened on the first request and kept open (unless the
+    server closes it) so it can be reused for subsequent requests on the same
+    event loop.
+    """
+
+    def __init__(self, host, port, secure=True, timeout=None, key_file=None,
+                 cert_file=None):
+        self.host = host
+        self.port = int(port)
+        self.secure = secure
+        self.timeout = timeout
+        self.key_file = key_file
+        self.cert_file = cert_file
+        self._reader = None
+        self._writer = None
+        self._loop = None
+
+    async def request(self, method, url, body=None, headers=None):
+        """
+        Send a request and return the fully read response.
+
+        :param body: Request body or an (async) iterator which yields chunks
+                     of the body. If the body is an iterator and there is no
+                     Content-Length header, it's sent using chunked transfer
+                     encoding.
+
+        :rtype: :class:`AsyncHTTPResponse`
+        """
+        headers = dict(headers or {})
+        chunked = False
+
+        if body is not None and not isinstance(body, (bytes, str)):
+            if 'Content-Length' not in headers:
+                headers['Transfer-Encoding'] = 'chunked'
+                chunked = True
+        elif body is not None:
+            body = b(body)
+
+        if self._writer is None:
+            await self._wait(self._connect())
+
+        lines = ['%s %s HTTP/1.1' % (method, url)]
+
+        for key, value in headers.items():
+            lines.append('%s: %s' % (key, value))
+
+        self._writer.write(b('\r\n'.join(lines) + '\r\n\r\n'))
+
+        if isinstance(body, bytes):
+            self._writer.write(body)
+        elif body is not None:
+            await self._write_body(body, chunked=chunked)
+
+        await self._wait(self._writer.drain())
+        return await self._wait(self._read_response(method=method))
+
+    def close(self):
+        # Transports of a closed event loop can't be closed anymore, their
+        # sockets have already been closed with the loop
+        if self._writer is not None and not self._loop.is_closed():
+            self._writer.close()
+
+        self._reader = self._writer = None
+
+    def is_stale(self):
+        """
+        Return True if the connection has been opened by an event loop which
+        is closed or isn't the current one so it can't be used anymore.
+
+        :rtype: ``bool``
+        """
+        if self._loop is None:
+            return False
+
+        return self._loop.is_closed() or \
+            self._loop is not asyncio.get_event_loop()
+
+    async def _connect(self):
+        ssl_context = None
+
+        if self.secure:
+            ssl_context = _get_ssl_context(key_file=self.key_file,
+                                           cert_file=self.cert_file)
+
+        self._loop = asyncio.get_event_loop()
+        self._reader, self._writer = await asyncio.open_connection(
+            host=self.host, port=self.port, ssl=ssl_context)
+
+    async def _write_body(self, body, chunked):
+        if hasattr(body, '__aiter__'):
+            async for chunk in body:
+                await self._write_chunk(chunk, chunked=chunked)
+        else:
+            for chunk in body:
+                await self._write_chunk(chunk, chunked=chunked)
+
+        if chunked:
+            self._writer.write(b'0\r\n\r\n')
+
+    async def _write_chunk(self, chunk, chunked):
+        chunk = b(chunk)
+
+        if not chunk:
+            return
+
+        if chunked:
+            self._writer.write(b('%x\r\n' % (len(chunk))) + chunk + b'\r\n')
+        else:
+            self._writer.write(chunk)
+
+        # Don't buffer more than the transport's limit in memory
+        await self._wait(self._writer.drain())
+
+    async def _read_response(self, method):
+        while True:
+            status_line = await self._reader.readline()
+
+            if not status_line:
+                raise ConnectionResetError('Server closed the connection')
+
+            version, status, reason = _parse_status_line(status_line)
+            headers = await self._read_headers()
+
+            # Skip informational (e.g. 100 Continue) responses
+            if status >= 200:
+                break
+
+        lowercase_headers = dict([(key.lower(), value.lower()) for key, value
+                                  in headers])
+        connection_header = lowercase_headers.get('connection', '')
+        will_close = connection_header == 'close' or \
+            (version == 'HTTP/1.0' and connection_header != 'keep-alive')
+
+        if method == 'HEAD' or status in NO_BODY_STATUSES:
+            body = b''
+        elif lowercase_headers.get('transfer-encoding') == 'chunked':
+            body = await self._read_chunked_body()
+        elif 'content-length' in lowercase_headers:
+            length = int(lowercase_headers['content-length'])
+            body = await self._reader.readexactly(length)
+        else:
+            # Body is delimited by the server closing the connection
+            body = await self._reader.read()
+            will_close = True
+
+        if will_close:
+            self.close()
+
+        return AsyncHTTPResponse(method=method, status=status, reason=reason,
+                                 headers=headers, body=body,
+                                 will_close=will_close)
+
+    async def _read_headers(self):
+        headers = []
+
+        while True:
+            line = await self._reader.readline()
+
+            if not line:
+                raise ConnectionResetError('Server closed the connection')
+
+            line = line.decode('latin-1').rstrip('\r\n')
+
+            if not line:
+                return headers
+
+            if line[0] in ' \t' and headers:
+                # Continuation of the previous header
+                key, value = headers.pop()
+                headers.append((key, value + ' ' + line.strip()))
+                continue
+
+            key, value = line.split(':', 1)
+            headers.append((key.strip(), value.strip()))
+
+    async def _read_chunked_body(self):
+        chunks = []
+
+        while True:
+            line = await self._reader.readline()
+            size = int(line.split(b';', 1)[0].strip(), 16)
+
+            if size == 0:
+                break
+
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)
+
+        # Skip trailers
+        await self._read_headers()
+        return b''.join(chunks)
+
+    async def _wait(self, coroutine):
+        if not self.timeout:
+            return await coroutine
+
+        return await asyncio.wait_for(coroutine, self.timeout)
+
+
+class AsyncConnection(object):
+    """
+    Make requests through an existing :class:`Connection` from coroutines.
+
+    State of the request which is in progress (``action``, ``method`` and
+    ``context``) is only set on the wrapped connection while the request is
+    prepared and while its response is parsed. Neither step awaits, so many
+    requests can be in flight on the same event loop at the same time.
+    """
+
+    # Pool of idle keep-alive connections. Set to None to open a new
+    # connection for each request.
+    connection_pool = DEFAULT_ASYNC_CONNECTION_POOL
+
+    def __init__(self, connection, max_concurrency=None):
+        """
+        :param connection: Connection which prepares requests and parses
+                           responses.
+        :type connection: :class:`Connection`
+
+        :param max_concurrency: Maximum number of requests which are in
+                                flight at the same time (defaults to
+                                unlimited).
+        :type max_concurrency: ``int``
+        """
+        self.connection = connection
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._auth_lock = None
+
+    async def request(self, action, params=None, data=None, headers=None,
+                      method='GET', iterator=None, context=None):
+        """
+        Coroutine version of :meth:`Connection.request`.
+
+        :param iterator: (Async) iterator which yields chunks of the request
+                         body. Use it instead of ``data`` to stream big
+                         bodies.
+
+        :param context: Context which is available to the response class
+                        while the response is parsed.
+        :type context: ``dict``
+
+        :return: An :class:`Response` instance.
+        :rtype: :class:`Response` instance
+        """
+        connection = self.connection
+
+        if connection.needs_authentication():
+            await self._refresh_authentication()
+
+        url, data, headers = connection._prepare_request(
+            action=action, params=params, data=data, headers=headers,
+            method=method, raw=iterator is not None)
+        prepared_action = connection.action
+        endpoint = self._get_endpoint()
+        body = iterator if iterator is not None else data
+
+        if self.max_concurrency:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async with self._semaphore:
+                http_response = await self._send_request(
+                    endpoint=endpoint, method=method, url=url, body=body,
+                    headers=headers)
+        else:
+            http_response = await self._send_request(
+                endpoint=endpoint, method=method, url=url, body=body,
+                headers=headers)
+
+        connection.action = prepared_action
+        connection.method = method
+        connection.context = context or {}
+
+        try:
+            return connection.responseCls(response=http_response,
+                                          connection=connection)
+        finally:
+            connection.reset_context()
+
+    async def async_request(self, action, params=None, data=None,
+                            headers=None, method='GET', context=None):
+        """
+        Coroutine version of :meth:`PollingConnection.async_request`. The job
+        status is polled without blocking the event loop.
+
+        :return: An :class:`Response` instance.
+        :rtype: :class:`Response` instance
+        """
+        connection = self.connection
+
+        if connection.request_method != 'request':
+            raise NotImplementedError('%s requests are not supported' %
+                                      (connection.request_method))
+
+        kwargs = connection.get_request_kwargs(action=action, params=params,
+                                               data=data, headers=headers,
+                                               method=method,
+                                               context=context)
+        response = await self.request(context=context, **kwargs)
+        kwargs = connection.get_poll_request_kwargs(response=response,
+                                                    context=context,
+                                                    request_kwargs=kwargs)
+
+        end = time.time() + connection.timeout
+        completed = False
+        while time.time() < end and not completed:
+            response = await self.request(context=context, **kwargs)
+            completed = connection.has_completed(response=response)
+            if not completed:
+                await asyncio.sleep(connection.poll_interval)
+
+        if not completed:
+            raise LibcloudError('Job did not complete in %s seconds' %
+                                (connection.timeout))
+
+        return response
+
+    async def _refresh_authentication(self):
+        """
+        Authenticate in the default executor so the event loop isn't blocked.
+        Concurrent requests wait for a single authentication.
+        """
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+
+        async with self._auth_lock:
+            if not self.connection.needs_authentication():
+                return
+
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(
+                None, self.connection.refresh_authentication)
+
+    async def _send_request(self, endpoint, method, url, body, headers):
+        # Connections can only be used by the event loop which opened them
+        key = (id(asyncio.get_event_loop()), endpoint)
+
+        while True:
+            if self.connection_pool is not None:
+                http_connection, reused = self.connection_pool.acquire(
+                    key=key, factory=lambda: AsyncHTTPConnection(*endpoint))
+            else:
+                http_connection = AsyncHTTPConnection(*endpoint)
+                reused = False
+
+            if reused and http_connection.is_stale():
+                # Pooled by a loop which has been closed and whose id has
+                # been reused
+                self.connection_pool.discard(http_connection)
+                continue
+
+            try:
+                response = await http_connection.request(
+                    method=method, url=url, body=body, headers=headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                http_connection.close()
+
+                # Server has closed an idle keep-alive connection, retry
+                # idempotent requests using a new connection
+                if reused and self._can_retry(method=method, body=body):
+                    continue
+
+                raise
+            except BaseException:
+                http_connection.close()
+                raise
+
+            break
+
+        if response.will_close or self.connection_pool is None:
+            http_connection.close()
+        else:
+            self.connection_pool.release(key=key, connection=http_connection)
+
+        return response
+
+    def _can_retry(self, method, body):
+        """
+        Return True if a request which failed on a stale connection can
+        safely be sent again.
+        """
+        if method.upper() not in self.connection.idempotent_methods:
+            return False
+
+        # Streamed bodies have already been (partially) consumed
+        return body is None or isinstance(body, (bytes, str))
+
+    def _get_endpoint(self):
+        """
+        Return arguments of :class:`AsyncHTTPConnection` for the endpoint the
+        wrapped connection would connect to.
+        """
+        connection = self.connection
+
+        if getattr(connection, 'base_url', None):
+            host, port, secure, _ = connection._tuple_from_url(
+                connection.base_url)
+        else:
+            host, port, secure = connection.host, connection.port, \
+                connection.secure
+
+        return (host, int(port), bool(secure), connection.timeout,
+                getattr(connection, 'key_file', None),
+                getattr(connection, 'cert_file', None))
+
+
+def _parse_status_line(line):
+    line = line.decode('latin-1').rstrip('\r\n')
+    parts = line.split(None, 2)
+
+    if len(parts) < 2 or not parts[0].startswith('HTTP/'):
+        raise LibcloudError('Invalid status line: %s' % (line))
+
+    reason = parts[2] if len(parts) == 3 else ''
+    return parts[0], int(parts[1]), reason
+
+
+def _get_ssl_context(key_file=None, cert_file=None):
+    """
+    Return (cached) SSL context which follows the settings in
+    :mod:`libcloud.security`.
+    """
+    verify = libcloud.security.VERIFY_SSL_CERT
+    key = (verify, key_file, cert_file)
+    context = _ssl_contexts.get(key, None)
+
+    if context is not None:
+        return context
+
+    if verify:
+        ca_certs_available = [cert
+                              for cert in libcloud.security.CA_CERTS_PATH
+                              if os.path.exists(cert) and
+                              os.path.isfile(cert)]
+
+        if not ca_certs_available:
+            raise RuntimeError(
+                libcloud.security.CA_CERTS_UNAVAILABLE_ERROR_MSG)
+
+        context = ssl.create_default_context(cafile=ca_certs_available[0])
+    else:
+        warnings.warn(libcloud.security.VERIFY_SSL_DISABLED_MSG)
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+    if cert_file:
+        context.load_cert_chain(cert_file, key_file)
+
+    _ssl_contexts[key] = context
+    return context
@@ -17,8 +17,10 @@ import os
 import sys
 import ssl
 import copy
+import socket
 import binascii
 import time
+import threading
 
 try:
     from lxml import etree as ET
@@ -39,17 +41,23 @@ from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import urlparse
 from libcloud.utils.py3 import urlencode
 from libcloud.utils.py3 import StringIO
+from libcloud.utils.py3 import BytesIO
 from libcloud.utils.py3 import u
 from libcloud.utils.py3 import b
 
 from libcloud.utils.misc import lowercase_keys
 from libcloud.utils.compression import decompress_data
+from libcloud.utils.compression import DecompressingReader
+from libcloud.utils.xml import iterparse, iterfindall_events
 from libcloud.common.types import LibcloudError, MalformedResponseError
+from libcloud.common.pool import DEFAULT_CONNECTION_POOL
 
 from libcloud.httplib_ssl import LibcloudHTTPSConnection
 
 LibcloudHTTPConnection = httplib.HTTPConnection
 
+_thread_state_lock = threading.Lock()
+
 
 class HTTPResponse(httplib.HTTPResponse):
     # On python 2.6 some calls can hang because HEAD isn't quite properly
@@ -217,6 +225,84 @@ class XmlResponse(Response):
     parse_error = parse_body
 
 
+class StreamingXmlResponse(Response):
+    """
+    XML response which body isn't read into memory upfront, but is parsed
+    incrementally using :meth:`iterfindall`.
+
+    This class is used for requests which are issued with ``stream=True``.
+
+    Once :meth:`iterfindall` has been exhausted, ``object`` contains the root
+    element with the remaining (not yielded) elements such as pagination
+    tokens.
+    """
+
+    object = None
+
+    def __init__(self, response, connection):
+        """
+        :param response: HTTP response object.
+        :type response: :class:`httplib.HTTPResponse`
+
+        :param connection: Parent connection object.
+        :type connection: :class:`.Connection`
+        """
+        self.connection = connection
+        self.headers = lowercase_keys(dict(response.getheaders()))
+        self.error = response.reason
+        self.status = response.status
+
+        self._response = response
+        self._http_connection = connection.connection
+        self._pool_key = connection._pool_key
+
+        if not self.success():
+            # Error responses are small so they are parsed (and raised) by
+            # the connection's regular response class
+            connection.responseCls(response=response, connection=connection)
+
+    def iterfindall(self, xpath, namespace=None):
+        """
+        Return a generator which yields elements matching the provided xpath
+        (relative to the root element) as soon as they have been parsed.
+
+        :param xpath: Simple path (e.g. ``reservationSet/item``).
+        :type xpath: ``str``
+
+        :param namespace: Optional XML namespace.
+        :type namespace: ``str``
+        """
+        parser = iterparse(self._get_body_stream())
+
+        for element in iterfindall_events(events=parser, xpath=xpath,
+                                          namespace=namespace):
+            yield element
+
+        self.object = parser.root
+
+        # Whole body has been read, connection can be reused
+        self.connection._release_connection(connection=self._http_connection,
+                                            response=self._response,
+                                            key=self._pool_key)
+
+    def _get_body_stream(self):
+        # This attribute is set when using LoggingConnection which has
+        # already read (and decompressed) the body
+        original_data = getattr(self._response, '_original_data', None)
+
+        if original_data:
+            return BytesIO(b(original_data))
+
+        encoding = self.headers.get('content-encoding', None)
+
+        if encoding in ['zlib', 'deflate']:
+            return DecompressingReader(self._response, 'zlib')
+        elif encoding in ['gzip', 'x-gzip']:
+            return DecompressingReader(self._response, 'gzip')
+
+        return self._response
+
+
 class RawResponse(Response):
 
     def __init__(self, connection):
@@ -398,6 +484,55 @@ class LoggingHTTPConnection(LoggingConnection, LibcloudHTTPConnection):
                                               body, headers)
 
 
+class ThreadLocalAttribute(object):
+    """
+    Descriptor for a connection attribute which holds state of the request
+    which is currently in progress (underlying connection, signed action,
+    context, ...).
+
+    Values are stored per thread which means the same connection object can
+    be used to perform multiple requests concurrently from different
+    threads.
+    """
+
+    def __init__(self, name, default=None, default_factory=None):
+        self.name = name
+        self.default = default
+        self.default_factory = default_factory
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self.default
+
+        state = _get_thread_state(obj)
+
+        try:
+            return getattr(state, self.name)
+        except AttributeError:
+            if self.default_factory is None:
+                return self.default
+
+            value = self.default_factory()
+            setattr(state, self.name, value)
+            return value
+
+    def __set__(self, obj, value):
+        setattr(_get_thread_state(obj), self.name, value)
+
+
+def _get_thread_state(obj):
+    state = obj.__dict__.get('_thread_state', None)
+
+    if state is None:
+        _thread_state_lock.acquire()
+        try:
+            state = obj.__dict__.setdefault('_thread_state', threading.local())
+        finally:
+            _thread_state_lock.release()
+
+    return state
+
+
 class Connection(object):
     """
     A Base Connection class to derive from.
@@ -407,17 +542,40 @@ class Connection(object):
 
     responseCls = Response
     rawResponseCls = RawResponse
-    connection = None
+    streamingResponseCls = StreamingXmlResponse
     host = '127.0.0.1'
     port = 443
     timeout = None
     secure = 1
     driver = None
-    action = None
     cache_busting = False
 
+    # State of the request which is in progress. It's kept per thread so
+    # a single connection (and driver) instance can be shared by multiple
+    # threads.
+    connection = ThreadLocalAttribute('connection')
+    action = ThreadLocalAttribute('action')
+    method = ThreadLocalAttribute('method')
+    context = ThreadLocalAttribute('context', default_factory=dict)
+
     allow_insecure = True
 
+    # Pool of persistent (keep-alive) connections which are reused between
+    # requests to the same endpoint. Set to None to open a new connection for
+    # each request.
+    connection_pool = DEFAULT_CONNECTION_POOL
+
+    # Requests which fail on a stale pooled connection are only retried for
+    # methods which can safely be repeated, because the server might have
+    # already received (and acted upon) the request.
+    idempotent_methods = ['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE']
+
+    # True if the current connection has been taken from the pool and has
+    # already been used for a previous request.
+    connection_reused = ThreadLocalAttribute('connection_reused',
+                                             default=False)
+    _pool_key = ThreadLocalAttribute('pool_key')
+
     def __init__(self, secure=True, host=None, port=None, url=None,
                  timeout=None):
         self.secure = secure and 1 or 0
@@ -530,7 +688,20 @@ class Connection(object):
         if self.timeout and not PY25:
             kwargs.update({'timeout': self.timeout})
 
-        connection = self.conn_classes[secure](**kwargs)
+        connection_cls = self.conn_classes[secure]
+
+        def factory():
+            return connection_cls(**kwargs)
+
+        reused = False
+
+        if self.connection_pool is not None:
+            self._pool_key = self._get_pool_key(connection_cls=connection_cls,
+                                                kwargs=kwargs)
+            connection, reused = self.connection_pool.acquire(
+                key=self._pool_key, factory=factory)
+        else:
+            connection = factory()
         # You can uncoment this line, if you setup a reverse proxy server
         # which proxies to your endpoint, and lets you easily capture
         # connections in cleartext when you setup the proxy to do SSL
@@ -538,6 +709,52 @@ class Connection(object):
         #connection = self.conn_classes[False]("127.0.0.1", 8080)
 
         self.connection = connection
+        self.connection_reused = reused
+
+    def _get_pool_key(self, connection_cls, kwargs):
+        """
+        Return a key which identifies an endpoint in the connection pool.
+
+        Connections are only shared between requests which would otherwise
+        use identically configured connection objects.
+        """
+        return (connection_cls, kwargs['host'], int(kwargs['port']),
+                kwargs.get('key_file', None), kwargs.get('cert_file', None),
+                kwargs.get('timeout', None))
+
+    def _release_connection(self, connection, response, key=None):
+        """
+        Return a connection to the pool if the response has been fully
+        consumed and the server allows the connection to be kept alive.
+        """
+        key = key or self._pool_key
+
+        if self.connection_pool is None or key is None:
+            return
+
+        will_close = getattr(response, 'will_close', True)
+        is_closed = getattr(response, 'isclosed', None)
+
+        if will_close or not is_closed or not is_closed():
+            return
+
+        self.connection_pool.release(key=key, connection=connection)
+
+    def _is_stale_connection_error(self, e, method):
+        """
+        Return True if the provided exception indicates that a reused
+        connection has been closed by the server while it was idle and the
+        request can safely be retried on a new connection.
+        """
+        if not self.connection_reused:
+            return False
+
+        if method.upper() not in self.idempotent_methods:
+            return False
+
+        return isinstance(e, (httplib.BadStatusLine,
+                              httplib.ImproperConnectionState,
+                              socket.error))
 
     def _user_agent(self):
         user_agent_suffix = ' '.join(['(%s)' % x for x in self.ua])
@@ -565,7 +782,7 @@ class Connection(object):
         self.ua.append(token)
 
     def request(self, action, params=None, data=None, headers=None,
-                method='GET', raw=False):
+                method='GET', raw=False, stream=False):
         """
         Request a given `action`.
 
@@ -595,9 +812,90 @@ class Connection(object):
                      and use the rawResponseCls class. This is used with
                      storage API when uploading a file.
 
+        :type stream: ``bool``
+        :param stream: True to return a response (``streamingResponseCls``)
+                       which body is parsed incrementally instead of being
+                       read into memory upfront.
+
         :return: An :class:`Response` instance.
         :rtype: :class:`Response` instance
 
+        """
+        url, data, headers = self._prepare_request(action=action,
+                                                   params=params, data=data,
+                                                   headers=headers,
+                                                   method=method, raw=raw)
+
+        # Removed terrible hack...this a less-bad hack that doesn't execute a
+        # request twice, but it's still a hack.
+        while True:
+            self.connect()
+
+            try:
+                http_response = self._send_request(method=method, url=url,
+                                                   data=data, headers=headers,
+                                                   raw=raw)
+            except ssl.SSLError:
+                e = sys.exc_info()[1]
+
+                if self._is_stale_connection_error(e, method=method):
+                    self.connection_pool.discard(self.connection)
+                    continue
+
+                self.reset_context()
+                raise ssl.SSLError(str(e))
+            except (httplib.HTTPException, socket.error):
+                e = sys.exc_info()[1]
+
+                if not self._is_stale_connection_error(e, method=method):
+                    raise
+
+                # Server has closed an idle keep-alive connection, retry the
+                # request using a new connection
+                self.connection_pool.discard(self.connection)
+                continue
+
+            break
+
+        if raw:
+            responseCls = self.rawResponseCls
+            kwargs = {'connection': self}
+        elif stream:
+            responseCls = self.streamingResponseCls
+            kwargs = {'connection': self,
+                      'response': http_response}
+        else:
+            responseCls = self.responseCls
+            kwargs = {'connection': self,
+                      'response': http_response}
+
+        connection = self.connection
+
+        try:
+            response = responseCls(**kwargs)
+        finally:
+            # Always reset the context after the request has completed
+            self.reset_context()
+
+            if not raw:
+                self._release_connection(connection=connection,
+                                         response=http_response)
+
+        return response
+
+    def _prepare_request(self, action, params=None, data=None, headers=None,
+                         method='GET', raw=False):
+        """
+        Prepare a request for sending: apply default parameters and headers,
+        encode the body and call the hooks (e.g. request signing) of this
+        connection.
+
+        This part of :meth:`request` doesn't perform any I/O (unless a hook
+        needs to authenticate first, see :meth:`needs_authentication`) so it
+        can be shared with other (e.g. asynchronous) transports.
+
+        :return: (url, data, headers) tuple.
+        :rtype: ``tuple``
         """
         if params is None:
             params = {}
@@ -658,42 +956,50 @@ class Connection(object):
         else:
             url = action
 
-        # Removed terrible hack...this a less-bad hack that doesn't execute a
-        # request twice, but it's still a hack.
-        self.connect()
-        try:
-            # @TODO: Should we just pass File object as body to request method
-            # instead of dealing with splitting and sending the file ourselves?
-            if raw:
-                self.connection.putrequest(method, url)
+        return url, data, headers
 
-                for key, value in list(headers.items()):
-                    self.connection.putheader(key, str(value))
+    def needs_authentication(self):
+        """
+        Return True if the connection needs to (re-)authenticate (e.g.
+        retrieve a new auth token) before the next request.
 
-                self.connection.endheaders()
-            else:
-                self.connection.request(method=method, url=url, body=data,
-                                        headers=headers)
-        except ssl.SSLError:
-            e = sys.exc_info()[1]
-            self.reset_context()
-            raise ssl.SSLError(str(e))
+        Authentication is then performed by :meth:`refresh_authentication`.
+        Transports which can't block (such as the asyncio one) use these
+        methods to authenticate outside of the event loop.
+
+        :rtype: ``bool``
+        """
+        return False
+
+    def refresh_authentication(self):
+        """
+        Perform the (blocking) authentication which is needed according to
+        :meth:`needs_authentication`.
 
+        Override in a provider's subclass.
+        """
+        pass
+
+    def _send_request(self, method, url, data, headers, raw=False):
+        """
+        Send a request using the current connection.
+
+        :return: HTTP response object or ``None`` for raw requests.
+        """
+        # @TODO: Should we just pass File object as body to request method
+        # instead of dealing with splitting and sending the file ourselves?
         if raw:
-            responseCls = self.rawResponseCls
-            kwargs = {'connection': self}
-        else:
-            responseCls = self.responseCls
-            kwargs = {'connection': self,
-                      'response': self.connection.getresponse()}
+            self.connection.putrequest(method, url)
 
-        try:
-            response = responseCls(**kwargs)
-        finally:
-            # Always reset the context after the request has completed
-            self.reset_context()
+            for key, value in list(headers.items()):
+                self.connection.putheader(key, str(value))
 
-        return response
+            self.connection.endheaders()
+            return None
+
+        self.connection.request(method=method, url=url, body=data,
+                                headers=headers)
+        return self.connection.getresponse()
 
     def morph_action_hook(self, action):
         return self.request_path + action
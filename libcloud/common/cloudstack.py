@@ -54,6 +54,10 @@ class CloudStackConnection(ConnectionUserAndKey, PollingConnection):
     request_method = '_sync_request'
     timeout = 600
 
+    # Number of items which are requested per page by list commands which
+    # are retrieved using _paginated_request
+    list_page_size = 500
+
     ASYNC_PENDING = 0
     ASYNC_SUCCESS = 1
     ASYNC_FAILURE = 2
@@ -166,6 +170,53 @@ class CloudStackConnection(ConnectionUserAndKey, PollingConnection):
         result = result.object[command]
         return result
 
+    def _paginated_request(self, command, key, params=None, page_size=None):
+        """
+        Retrieve all the items returned by a list command, requesting them
+        page by page.
+
+        :param command: List command (e.g. ``listVirtualMachines``).
+        :type command: ``str``
+
+        :param key: Key under which the items are stored in the response
+                    (e.g. ``virtualmachine``).
+        :type key: ``str``
+
+        :param page_size: Number of items per page. Defaults to
+                          ``list_page_size``.
+        :type page_size: ``int``
+
+        :rtype: ``list``
+        """
+        page_size = page_size or self.list_page_size
+
+        if params:
+            params = copy.deepcopy(params)
+        else:
+            params = {}
+
+        params['pagesize'] = page_size
+        page = 1
+        items = []
+
+        while True:
+            params['page'] = page
+            result = self._sync_request(command=command, params=params)
+            page_items = result.get(key, [])
+            items.extend(page_items)
+
+            count = result.get('count', None)
+
+            if len(page_items) < page_size:
+                break
+
+            if count is not None and len(items) >= int(count):
+                break
+
+            page += 1
+
+        return items
+
 
 class CloudStackDriverMixIn(object):
     host = None
@@ -184,6 +235,11 @@ class CloudStackDriverMixIn(object):
                                              params=params, data=data,
                                              headers=headers, method=method)
 
+    def _paginated_request(self, command, key, params=None, page_size=None):
+        return self.connection._paginated_request(command=command, key=key,
+                                                  params=params,
+                                                  page_size=page_size)
+
     def _async_request(self, command, action=None, params=None, data=None,
                        headers=None, method='GET', context=None):
         return self.connection._async_request(command=command, action=action,
@@ -551,17 +551,30 @@ class GoogleBaseConnection(ConnectionUserAndKey, PollingConnection):
 
         @inherits: :class:`Connection.pre_connect_hook`
         """
-        now = self._now()
-        if self.token_expire_time < now:
-            self.token_info = self.auth_conn.refresh_token(self.token_info)
-            self.token_expire_time = datetime.datetime.strptime(
-                self.token_info['expire_time'], TIMESTAMP_FORMAT)
-            self._write_token_info_to_file()
+        if self.needs_authentication():
+            self.refresh_authentication()
         headers['Authorization'] = 'Bearer %s' % (
             self.token_info['access_token'])
 
         return params, headers
 
+    def needs_authentication(self):
+        """
+        @inherits: :class:`Connection.needs_authentication`
+        """
+        return self.token_expire_time < self._now()
+
+    def refresh_authentication(self):
+        """
+        Get an updated token.
+
+        @inherits: :class:`Connection.refresh_authentication`
+        """
+        self.token_info = self.auth_conn.refresh_token(self.token_info)
+        self.token_expire_time = datetime.datetime.strptime(
+            self.token_info['expire_time'], TIMESTAMP_FORMAT)
+        self._write_token_info_to_file()
+
     def encode_data(self, data):
         """Encode data to JSON"""
         return json.dumps(data)
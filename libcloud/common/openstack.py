@@ -16,10 +16,21 @@
 """
 Common utilities for OpenStack
 """
+import os
 import sys
+import errno
+import hashlib
 import datetime
+import tempfile
+import threading
 
-from libcloud.utils.py3 import httplib
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows
+    fcntl = None
+
+from libcloud.utils.py3 import httplib, b
 from libcloud.utils.iso8601 import parse_date
 
 from libcloud.common.base import ConnectionUserAndKey, Response
@@ -52,6 +63,8 @@ __all__ = [
     'OpenStackAuthConnection',
     'OpenStackServiceCatalog',
     'OpenStackDriverMixin',
+    'OpenStackAuthTokenCache',
+    'OpenStackFileAuthTokenCache',
 
     'AUTH_TOKEN_EXPIRES_GRACE_SECONDS'
 ]
@@ -93,12 +106,210 @@ class OpenStackAuthResponse(Response):
         return data
 
 
+class OpenStackAuthTokenCache(object):
+    """
+    Thread-safe in-process cache of auth tokens which is shared by all the
+    connections which authenticate with the same credentials.
+
+    Entries are dictionaries with ``auth_token``, ``auth_token_expires``,
+    ``urls`` (service catalog) and ``auth_user_info`` keys.
+
+    :meth:`lock` returns a lock for a key which is held while a token is
+    being retrieved so concurrent refreshes of the same token result in a
+    single auth request.
+
+    Usage:
+        from libcloud.common.openstack import OpenStackAuthConnection
+        from libcloud.common.openstack import OpenStackAuthTokenCache
+
+        OpenStackAuthConnection.token_cache = OpenStackAuthTokenCache()
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return a cached entry or ``None`` if there is no entry for this key.
+
+        :param key: Cache key.
+        :type key: ``tuple``
+
+        :rtype: ``dict``
+        """
+        return self._entries.get(key, None)
+
+    def set(self, key, entry):
+        """
+        :param key: Cache key.
+        :type key: ``tuple``
+
+        :param entry: Token and service catalog to cache.
+        :type entry: ``dict``
+        """
+        self._entries[key] = entry
+
+    def delete(self, key):
+        """
+        Remove an entry (e.g. a token which has been revoked) from the cache.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all the entries from the cache.
+        """
+        self._entries.clear()
+
+    def lock(self, key):
+        """
+        Return a lock which needs to be held while a token for the provided
+        key is being refreshed.
+        """
+        self._lock.acquire()
+        try:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+
+            return self._locks[key]
+        finally:
+            self._lock.release()
+
+
+class OpenStackFileAuthTokenCache(OpenStackAuthTokenCache):
+    """
+    Cache of auth tokens which is stored in a directory so it can be shared
+    by multiple processes (e.g. workers of a task queue) running on the same
+    machine.
+
+    Each entry is stored in a separate file which is only readable by the
+    current user. Where ``fcntl`` is available, refreshes are also collapsed
+    across processes using a lock file.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Directory where the tokens are stored. It's created if
+                     it doesn't exist.
+        :type path: ``str``
+        """
+        super(OpenStackFileAuthTokenCache, self).__init__()
+        self.path = path
+
+        try:
+            os.makedirs(path, int('700', 8))
+        except OSError:
+            e = sys.exc_info()[1]
+
+            if e.errno != errno.EEXIST:
+                raise
+
+    def get(self, key):
+        try:
+            fp = open(self._get_file_path(key), 'r')
+        except IOError:
+            return None
+
+        try:
+            try:
+                entry = json.loads(fp.read())
+                entry['auth_token_expires'] = \
+                    parse_date(entry['auth_token_expires'])
+            except Exception:
+                # Partial or corrupted entry, treat it as missing
+                return None
+        finally:
+            fp.close()
+
+        return entry
+
+    def set(self, key, entry):
+        entry = entry.copy()
+        entry['auth_token_expires'] = entry['auth_token_expires'].isoformat()
+
+        # Write to a temporary file first so other processes never see a
+        # partially written entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+
+        try:
+            os.write(fd, b(json.dumps(entry)))
+        finally:
+            os.close(fd)
+
+        os.rename(tmp_path, self._get_file_path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._get_file_path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.path):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.path, name))
+
+    def lock(self, key):
+        lock = super(OpenStackFileAuthTokenCache, self).lock(key)
+
+        if fcntl is None:
+            return lock
+
+        return _FileLock(lock=lock,
+                         path=self._get_file_path(key)[:-5] + '.lock')
+
+    def _get_file_path(self, key):
+        name = hashlib.sha256(b(repr(key))).hexdigest()
+        return os.path.join(self.path, name + '.json')
+
+
+class _FileLock(object):
+    """
+    Lock which is held by a single thread of a single process at a time.
+    """
+
+    def __init__(self, lock, path):
+        self.lock = lock
+        self.path = path
+        self._fd = None
+
+    def acquire(self):
+        self.lock.acquire()
+
+        try:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT,
+                               int('600', 8))
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except Exception:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+            self.lock.release()
+            raise
+
+    def release(self):
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        finally:
+            self._fd = None
+            self.lock.release()
+
+
 class OpenStackAuthConnection(ConnectionUserAndKey):
 
     responseCls = OpenStackAuthResponse
     name = 'OpenStack Auth'
     timeout = None
 
+    # Cache which is used to share tokens between connections (e.g.
+    # OpenStackAuthTokenCache() or OpenStackFileAuthTokenCache(path)). By
+    # default, each connection retrieves its own token.
+    token_cache = None
+
     def __init__(self, parent_conn, auth_url, auth_version, user_id, key,
                  tenant_name=None, timeout=None):
         self.parent_conn = parent_conn
@@ -147,6 +358,42 @@ class OpenStackAuthConnection(ConnectionUserAndKey):
             # If token is still valid, there is no need to re-authenticate
             return self
 
+        cache = self.token_cache
+
+        if cache is None or self.auth_version not in \
+                AUTH_VERSIONS_WITH_EXPIRES:
+            return self._authenticate()
+
+        key = self._get_token_cache_key()
+
+        # When a refresh is forced, only a token which is different from the
+        # current one (i.e. retrieved by someone else in the mean time) is
+        # good enough
+        stale_token = self.auth_token if force else None
+
+        if not force and self._load_cached_token(key=key):
+            return self
+
+        lock = cache.lock(key)
+        lock.acquire()
+        try:
+            # Another connection might have retrieved the token while we
+            # were waiting for the lock
+            if (not force or stale_token) and \
+                    self._load_cached_token(key=key, stale_token=stale_token):
+                return self
+
+            self._authenticate()
+            cache.set(key, {'auth_token': self.auth_token,
+                            'auth_token_expires': self.auth_token_expires,
+                            'urls': self.urls,
+                            'auth_user_info': self.auth_user_info})
+        finally:
+            lock.release()
+
+        return self
+
+    def _authenticate(self):
         if self.auth_version == "1.0":
             return self.authenticate_1_0()
         elif self.auth_version == "1.1":
@@ -292,23 +539,57 @@ class OpenStackAuthConnection(ConnectionUserAndKey):
         :return: ``True`` if the token is still valid, ``False`` otherwise.
         :rtype: ``bool``
         """
-        if not self.auth_token:
+        return _is_token_valid(auth_token=self.auth_token,
+                               auth_token_expires=self.auth_token_expires)
+
+    def _get_token_cache_key(self):
+        # Digest of the secret is part of the key so a token is never handed
+        # out to a connection with different (e.g. invalid) credentials
+        key_digest = hashlib.sha256(b(self.key or '')).hexdigest()
+        return (self.auth_url, self.user_id, self.tenant_name,
+                self.auth_version, key_digest)
+
+    def _load_cached_token(self, key, stale_token=None):
+        """
+        Use a token from the cache if it's still valid.
+
+        :return: ``True`` if a cached token has been used.
+        :rtype: ``bool``
+        """
+        entry = self.token_cache.get(key)
+
+        if not entry or entry['auth_token'] == stale_token:
             return False
 
-        if not self.auth_token_expires:
+        if not _is_token_valid(auth_token=entry['auth_token'],
+                               auth_token_expires=entry['auth_token_expires']):
             return False
 
-        expires = self.auth_token_expires - \
-            datetime.timedelta(seconds=AUTH_TOKEN_EXPIRES_GRACE_SECONDS)
+        self.auth_token = entry['auth_token']
+        self.auth_token_expires = entry['auth_token_expires']
+        self.urls = entry['urls']
+        self.auth_user_info = entry['auth_user_info']
+        return True
 
-        time_tuple_expires = expires.utctimetuple()
-        time_tuple_now = datetime.datetime.utcnow().utctimetuple()
 
-        if time_tuple_now < time_tuple_expires:
-            return True
+def _is_token_valid(auth_token, auth_token_expires):
+    if not auth_token:
+        return False
 
+    if not auth_token_expires:
         return False
 
+    expires = auth_token_expires - \
+        datetime.timedelta(seconds=AUTH_TOKEN_EXPIRES_GRACE_SECONDS)
+
+    time_tuple_expires = expires.utctimetuple()
+    time_tuple_now = datetime.datetime.utcnow().utctimetuple()
+
+    if time_tuple_now < time_tuple_expires:
+        return True
+
+    return False
+
 
 class OpenStackServiceCatalog(object):
     """
@@ -574,6 +855,22 @@ class OpenStackBaseConnection(ConnectionUserAndKey):
     def request(self, **kwargs):
         return super(OpenStackBaseConnection, self).request(**kwargs)
 
+    def needs_authentication(self):
+        """
+        @inherits: :class:`Connection.needs_authentication`
+        """
+        if self._ex_force_auth_token:
+            return False
+
+        return self.service_catalog is None or \
+            not self._osa.is_token_valid()
+
+    def refresh_authentication(self):
+        """
+        @inherits: :class:`Connection.refresh_authentication`
+        """
+        self._populate_hosts_and_request_paths()
+
     def _set_up_connection_info(self, url):
         result = self._tuple_from_url(url)
         (self.host, self.port, self.secure, self.request_path) = result
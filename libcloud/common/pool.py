@@ -0,0 +1,195 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pool of persistent (HTTP/1.1 keep-alive) connections.
+
+Usage:
+    from libcloud.common.pool import DEFAULT_CONNECTION_POOL
+
+    # Keep up to 20 idle connections per endpoint around for two minutes
+    DEFAULT_CONNECTION_POOL.max_size = 20
+    DEFAULT_CONNECTION_POOL.idle_timeout = 120
+
+    # Or disable connection reuse completely
+    from libcloud.common.base import Connection
+    Connection.connection_pool = None
+"""
+
+import time
+import threading
+
+__all__ = [
+    'ConnectionPool',
+
+    'DEFAULT_POOL_SIZE',
+    'DEFAULT_IDLE_TIMEOUT',
+    'DEFAULT_CONNECTION_POOL'
+]
+
+# Maximum number of idle connections which are kept per endpoint
+DEFAULT_POOL_SIZE = 10
+
+# Number of seconds after which an idle connection is discarded
+DEFAULT_IDLE_TIMEOUT = 60
+
+
+class ConnectionPool(object):
+    """
+    Thread-safe pool of idle HTTP connections.
+
+    Connections are grouped by a key which identifies an endpoint (connection
+    class, host, port, ...). Only connections which have completely consumed
+    their last response and which the server didn't ask to close should be
+    returned to the pool using :meth:`release`.
+    """
+
+    def __init__(self, max_size=None, idle_timeout=None):
+        """
+        :param max_size: Maximum number of idle connections which are kept
+                         per key. Defaults to ``DEFAULT_POOL_SIZE``.
+        :type max_size: ``int``
+
+        :param idle_timeout: Number of seconds after which an idle connection
+                             is closed instead of being reused. Defaults to
+                             ``DEFAULT_IDLE_TIMEOUT``.
+        :type idle_timeout: ``int``
+        """
+        if max_size is None:
+            max_size = DEFAULT_POOL_SIZE
+
+        if idle_timeout is None:
+            idle_timeout = DEFAULT_IDLE_TIMEOUT
+
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, factory):
+        """
+        Return an idle connection for the provided key or create a new one
+        using the provided factory if none is available.
+
+        :param key: Endpoint key.
+        :type key: ``tuple``
+
+        :param factory: Callable which returns a new connection.
+        :type factory: ``callable``
+
+        :return: (connection, reused) tuple. ``reused`` is ``True`` if the
+                 connection has already been used for a previous request.
+        :rtype: ``tuple``
+        """
+        expired = []
+        connection = None
+        now = time.time()
+
+        self._lock.acquire()
+        try:
+            idle = self._idle.get(key, [])
+
+            while idle:
+                item, released_at = idle.pop()
+
+                if (now - released_at) > self.idle_timeout:
+                    expired.append(item)
+                    continue
+
+                connection = item
+                break
+
+            if not idle:
+                self._idle.pop(key, None)
+        finally:
+            self._lock.release()
+
+        for item in expired:
+            self._close(item)
+
+        if connection is not None:
+            return connection, True
+
+        return factory(), False
+
+    def release(self, key, connection):
+        """
+        Return a connection to the pool so it can be reused.
+
+        If the pool for this key is already full, connection is closed.
+
+        :param key: Endpoint key.
+        :type key: ``tuple``
+
+        :param connection: Connection to return to the pool.
+        """
+        self._lock.acquire()
+        try:
+            idle = self._idle.setdefault(key, [])
+
+            if len(idle) < self.max_size:
+                idle.append((connection, time.time()))
+                connection = None
+        finally:
+            self._lock.release()
+
+        if connection is not None:
+            self._close(connection)
+
+    def discard(self, connection):
+        """
+        Close a connection which shouldn't be reused (e.g. the server has
+        closed it).
+        """
+        self._close(connection)
+
+    def clear(self):
+        """
+        Close all the idle connections in this pool.
+        """
+        self._lock.acquire()
+        try:
+            idle, self._idle = self._idle, {}
+        finally:
+            self._lock.release()
+
+        for items in idle.values():
+            for connection, _ in items:
+                self._close(connection)
+
+    def size(self, key=None):
+        """
+        Return number of idle connections for the provided key (or for all
+        the keys if key is not provided).
+
+        :rtype: ``int``
+        """
+        self._lock.acquire()
+        try:
+            if key is not None:
+                return len(self._idle.get(key, []))
+
+            return sum([len(items) for items in self._idle.values()])
+        finally:
+            self._lock.release()
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+DEFAULT_CONNECTION_POOL = ConnectionPool()
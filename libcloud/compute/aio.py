@@ -0,0 +1,334 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Coroutine versions of the core :class:`NodeDriver` methods.
+
+Usage:
+    from libcloud.compute.aio import get_async_driver
+
+    async_driver = get_async_driver(driver)
+    nodes = await async_driver.list_nodes()
+
+Requests are made through :class:`libcloud.common.aio.AsyncConnection`
+while parameters and responses are handled by the wrapped driver, so its
+configuration (region, credentials, ...) is used unchanged.
+
+This module requires Python 3.5 or later.
+"""
+
+from libcloud.common.aio import AsyncConnection
+from libcloud.compute.drivers.ec2 import BaseEC2NodeDriver, NAMESPACE
+from libcloud.compute.drivers.gce import GCENodeDriver
+from libcloud.compute.drivers.openstack import OpenStack_1_1_NodeDriver
+from libcloud.utils.py3 import httplib
+from libcloud.utils.xml import findall, findtext
+
+__all__ = [
+    'AsyncNodeDriver',
+    'AsyncEC2NodeDriver',
+    'AsyncOpenStackNodeDriver',
+    'AsyncGCENodeDriver',
+
+    'get_async_driver'
+]
+
+
+class AsyncNodeDriver(object):
+    """
+    Wrapper around a :class:`NodeDriver` instance which provides coroutine
+    versions of its methods.
+
+    Methods which are not supported by a driver raise
+    ``NotImplementedError``.
+    """
+
+    def __init__(self, driver, max_concurrency=None):
+        """
+        :param driver: Driver which builds requests and parses responses.
+        :type driver: :class:`NodeDriver`
+
+        :param max_concurrency: Maximum number of requests which are in
+                                flight at the same time (defaults to
+                                unlimited).
+        :type max_concurrency: ``int``
+        """
+        self.driver = driver
+        self.connection = AsyncConnection(driver.connection,
+                                          max_concurrency=max_concurrency)
+
+    async def list_nodes(self):
+        """
+        @inherits: :class:`NodeDriver.list_nodes`
+        """
+        raise NotImplementedError(
+            'list_nodes not implemented for this driver')
+
+    async def create_node(self, **kwargs):
+        """
+        @inherits: :class:`NodeDriver.create_node`
+        """
+        raise NotImplementedError(
+            'create_node not implemented for this driver')
+
+    async def reboot_node(self, node):
+        """
+        @inherits: :class:`NodeDriver.reboot_node`
+        """
+        raise NotImplementedError(
+            'reboot_node not implemented for this driver')
+
+    async def destroy_node(self, node):
+        """
+        @inherits: :class:`NodeDriver.destroy_node`
+        """
+        raise NotImplementedError(
+            'destroy_node not implemented for this driver')
+
+    def _is_overridden(self, name, base_cls):
+        """
+        Return True if a driver subclass overrides the provided method of the
+        base class the coroutine is modeled on.
+        """
+        return getattr(type(self.driver), name) is not getattr(base_cls, name)
+
+
+class AsyncEC2NodeDriver(AsyncNodeDriver):
+    """
+    Coroutine versions of :class:`BaseEC2NodeDriver` methods.
+    """
+
+    async def list_nodes(self, ex_node_ids=None):
+        """
+        @inherits: :class:`BaseEC2NodeDriver.list_nodes`
+        """
+        driver = self.driver
+        params = {'Action': 'DescribeInstances'}
+        if ex_node_ids:
+            params.update(driver._pathlist('InstanceId', ex_node_ids))
+
+        page_size = driver._get_page_size(ids=ex_node_ids)
+        if page_size:
+            params['MaxResults'] = page_size
+
+        nodes = []
+        while True:
+            response = await self.connection.request(driver.path,
+                                                     params=params)
+
+            for rs in findall(element=response.object,
+                              xpath='reservationSet/item',
+                              namespace=NAMESPACE):
+                nodes += driver._to_nodes(rs, 'instancesSet/item')
+
+            next_token = findtext(element=response.object,
+                                  xpath='nextToken', namespace=NAMESPACE)
+
+            if not next_token:
+                break
+
+            params['NextToken'] = next_token
+
+        mappings = await self._describe_addresses(nodes)
+        for node in nodes:
+            node.public_ips.extend(mappings[node.id])
+
+        return nodes
+
+    async def create_node(self, **kwargs):
+        """
+        ``auth`` argument is not supported, use ``ex_keyname`` instead.
+
+        @inherits: :class:`BaseEC2NodeDriver.create_node`
+        """
+        driver = self.driver
+
+        if 'auth' in kwargs:
+            raise NotImplementedError('auth argument is not supported, use '
+                                      'ex_keyname instead')
+
+        params = driver._get_create_node_params(**kwargs)
+        response = await self.connection.request(driver.path, params=params)
+        nodes = driver._to_nodes(response.object, 'instancesSet/item')
+
+        for node in nodes:
+            tags = {'Name': kwargs['name']}
+            if 'ex_metadata' in kwargs:
+                tags.update(kwargs['ex_metadata'])
+
+            try:
+                await self._create_tags(resource=node, tags=tags)
+            except Exception:
+                continue
+
+            node.name = kwargs['name']
+            node.extra.update({'tags': tags})
+
+        if len(nodes) == 1:
+            return nodes[0]
+        else:
+            return nodes
+
+    async def reboot_node(self, node):
+        """
+        @inherits: :class:`BaseEC2NodeDriver.reboot_node`
+        """
+        params = {'Action': 'RebootInstances'}
+        params.update(self.driver._pathlist('InstanceId', [node.id]))
+        response = await self.connection.request(self.driver.path,
+                                                 params=params)
+        return self.driver._get_boolean(response.object)
+
+    async def destroy_node(self, node):
+        """
+        @inherits: :class:`BaseEC2NodeDriver.destroy_node`
+        """
+        params = {'Action': 'TerminateInstances'}
+        params.update(self.driver._pathlist('InstanceId', [node.id]))
+        response = await self.connection.request(self.driver.path,
+                                                 params=params)
+        return self.driver._get_terminate_boolean(response.object)
+
+    async def _describe_addresses(self, nodes):
+        driver = self.driver
+
+        if self._is_overridden('ex_describe_addresses', BaseEC2NodeDriver):
+            # E.g. providers which don't support Elastic IPs don't make any
+            # request
+            return driver.ex_describe_addresses(nodes)
+
+        if not nodes:
+            return {}
+
+        params = driver._get_describe_addresses_params(nodes=nodes)
+        response = await self.connection.request(driver.path, params=params)
+        return driver._to_elastic_ip_mappings(nodes=nodes,
+                                              result=response.object)
+
+    async def _create_tags(self, resource, tags):
+        driver = self.driver
+
+        if self._is_overridden('ex_create_tags', BaseEC2NodeDriver):
+            return driver.ex_create_tags(resource=resource, tags=tags)
+
+        params = driver._get_create_tags_params(resource=resource, tags=tags)
+        response = await self.connection.request(driver.path, params=params)
+        element = findtext(element=response.object, xpath='return',
+                           namespace=NAMESPACE)
+        return element == 'true'
+
+
+class AsyncOpenStackNodeDriver(AsyncNodeDriver):
+    """
+    Coroutine versions of :class:`OpenStack_1_1_NodeDriver` methods.
+    """
+
+    async def list_nodes(self):
+        """
+        @inherits: :class:`OpenStack_1_1_NodeDriver.list_nodes`
+        """
+        response = await self.connection.request('/servers/detail')
+        return self.driver._to_nodes(response.object)
+
+    async def create_node(self, **kwargs):
+        """
+        @inherits: :class:`OpenStack_1_1_NodeDriver.create_node`
+        """
+        server_params = self.driver._create_args_to_params(None, **kwargs)
+        response = await self.connection.request(
+            '/servers', method='POST', data={'server': server_params})
+
+        create_response = response.object['server']
+        server_response = await self.connection.request(
+            '/servers/%s' % (create_response['id']))
+        server_object = server_response.object['server']
+
+        # adminPass is only present in the create response
+        server_object['adminPass'] = create_response.get('adminPass', None)
+
+        return self.driver._to_node(server_object)
+
+    async def reboot_node(self, node):
+        """
+        @inherits: :class:`OpenStack_1_1_NodeDriver.reboot_node`
+        """
+        response = await self.connection.request(
+            '/servers/%s/action' % (node.id), method='POST',
+            data={'reboot': {'type': 'HARD'}})
+        return response.status == httplib.ACCEPTED
+
+    async def destroy_node(self, node):
+        """
+        @inherits: :class:`OpenStack_1_1_NodeDriver.destroy_node`
+        """
+        response = await self.connection.request('/servers/%s' % (node.id),
+                                                 method='DELETE')
+        return response.status in (httplib.NO_CONTENT, httplib.ACCEPTED)
+
+
+class AsyncGCENodeDriver(AsyncNodeDriver):
+    """
+    Coroutine versions of :class:`GCENodeDriver` methods. Operations are
+    polled until they finish without blocking the event loop.
+    """
+
+    async def reboot_node(self, node):
+        """
+        @inherits: :class:`GCENodeDriver.reboot_node`
+        """
+        request = '/zones/%s/instances/%s/reset' % (node.extra['zone'].name,
+                                                    node.name)
+        await self.connection.async_request(request, method='POST',
+                                            data='ignored')
+        return True
+
+    async def destroy_node(self, node):
+        """
+        @inherits: :class:`GCENodeDriver.destroy_node`
+        """
+        request = '/zones/%s/instances/%s' % (node.extra['zone'].name,
+                                              node.name)
+        await self.connection.async_request(request, method='DELETE')
+        return True
+
+
+# Driver classes (and their subclasses) with a coroutine wrapper
+ASYNC_DRIVERS = [
+    (BaseEC2NodeDriver, AsyncEC2NodeDriver),
+    (OpenStack_1_1_NodeDriver, AsyncOpenStackNodeDriver),
+    (GCENodeDriver, AsyncGCENodeDriver)
+]
+
+
+def get_async_driver(driver, max_concurrency=None):
+    """
+    Return a wrapper with coroutine versions of the provided driver's
+    methods.
+
+    :param driver: Driver instance.
+    :type driver: :class:`NodeDriver`
+
+    :param max_concurrency: Maximum number of requests which are in flight
+                            at the same time (defaults to unlimited).
+    :type max_concurrency: ``int``
+
+    :rtype: :class:`AsyncNodeDriver`
+    """
+    for driver_cls, async_driver_cls in ASYNC_DRIVERS:
+        if isinstance(driver, driver_cls):
+            return async_driver_cls(driver, max_concurrency=max_concurrency)
+
+    raise NotImplementedError('%s driver doesn\'t support asyncio' %
+                              (driver.name))
@@ -21,6 +21,7 @@ from __future__ import with_statement
 
 import sys
 import time
+import random
 import hashlib
 import os
 import socket
@@ -36,6 +37,7 @@ from libcloud.common.base import ConnectionKey
 from libcloud.common.base import BaseDriver
 from libcloud.common.types import LibcloudError
 
+from libcloud.utils.concurrency import run_concurrently
 from libcloud.utils.networking import is_private_subnet
 from libcloud.utils.networking import is_valid_ip_address
 
@@ -57,6 +59,7 @@ __all__ = [
     'NodeAuthSSHKey',
     'NodeAuthPassword',
     'NodeDriver',
+    'FailedNode',
 
     'StorageVolume',
     'VolumeSnapshot',
@@ -599,6 +602,35 @@ class KeyPair(object):
                 (self.name, self.fingerprint, self.driver.name))
 
 
+class FailedNode(object):
+    """
+    Placeholder returned by :meth:`NodeDriver.create_nodes` and
+    :meth:`NodeDriver.deploy_nodes` for a node which couldn't be created or
+    deployed.
+    """
+
+    def __init__(self, name, error, node=None):
+        """
+        :param name: Name of the node (if known).
+        :type name: ``str``
+
+        :param error: Exception which has been thrown.
+        :type error: ``Exception``
+
+        :param node: Node instance if the node has been created, but a later
+                     step (e.g. deployment) has failed. You might want to
+                     destroy it.
+        :type node: :class:`.Node`
+        """
+        self.name = name
+        self.error = error
+        self.node = node
+
+    def __repr__(self):
+        return ('<FailedNode: name=%s, error=%s>' %
+                (self.name, str(self.error)))
+
+
 class NodeDriver(BaseDriver):
     """
     A base NodeDriver class to derive from
@@ -629,6 +661,11 @@ class NodeDriver(BaseDriver):
 
     NODE_STATE_MAP = {}
 
+    # Maximum number of nodes which are created or deployed at the same time
+    # by create_nodes and deploy_nodes. Drivers for providers with strict
+    # API rate limits should lower it.
+    batch_concurrency = 10
+
     def __init__(self, key, secret=None, secure=True, host=None, port=None,
                  api_version=None, **kwargs):
         super(NodeDriver, self).__init__(key=key, secret=secret, secure=secure,
@@ -850,39 +887,9 @@ class NodeDriver(BaseDriver):
                                    'public_ips', other option is 'private_ips'.
         :type ssh_interface: ``str``
         """
-        if not libcloud.compute.ssh.have_paramiko:
-            raise RuntimeError('paramiko is not installed. You can install ' +
-                               'it using pip: pip install paramiko')
-
-        if 'auth' in kwargs:
-            auth = kwargs['auth']
-            if not isinstance(auth, (NodeAuthSSHKey, NodeAuthPassword)):
-                raise NotImplementedError(
-                    'If providing auth, only NodeAuthSSHKey or'
-                    'NodeAuthPassword is supported')
-        elif 'ssh_key' in kwargs:
-            # If an ssh_key is provided we can try deploy_node
-            pass
-        elif 'create_node' in self.features:
-            f = self.features['create_node']
-            if not 'generates_password' in f and not "password" in f:
-                raise NotImplementedError(
-                    'deploy_node not implemented for this driver')
-        else:
-            raise NotImplementedError(
-                'deploy_node not implemented for this driver')
+        self._check_deploy_kwargs(kwargs)
 
         node = self.create_node(**kwargs)
-        max_tries = kwargs.get('max_tries', 3)
-
-        password = None
-        if 'auth' in kwargs:
-            if isinstance(kwargs['auth'], NodeAuthPassword):
-                password = kwargs['auth'].password
-        elif 'password' in node.extra:
-            password = node.extra['password']
-
-        ssh_interface = kwargs.get('ssh_interface', 'public_ips')
 
         # Wait until node is up and running and has IP assigned
         try:
@@ -890,44 +897,135 @@ class NodeDriver(BaseDriver):
                 nodes=[node],
                 wait_period=3,
                 timeout=kwargs.get('timeout', NODE_ONLINE_WAIT_TIMEOUT),
-                ssh_interface=ssh_interface)[0]
+                ssh_interface=kwargs.get('ssh_interface', 'public_ips'))[0]
         except Exception:
             e = sys.exc_info()[1]
             raise DeploymentError(node=node, original_exception=e, driver=self)
 
-        ssh_username = kwargs.get('ssh_username', 'root')
-        ssh_alternate_usernames = kwargs.get('ssh_alternate_usernames', [])
-        ssh_port = kwargs.get('ssh_port', 22)
-        ssh_timeout = kwargs.get('ssh_timeout', 10)
-        ssh_key_file = kwargs.get('ssh_key', None)
-        timeout = kwargs.get('timeout', SSH_CONNECT_TIMEOUT)
+        return self._deploy_running_node(node=node, ip_addresses=ip_addresses,
+                                         kwargs=kwargs)
 
-        deploy_error = None
+    def create_nodes(self, nodes, max_workers=None, **kwargs):
+        """
+        Create multiple nodes concurrently.
 
-        for username in ([ssh_username] + ssh_alternate_usernames):
-            try:
-                self._connect_and_run_deployment_script(
-                    task=kwargs['deploy'], node=node,
-                    ssh_hostname=ip_addresses[0], ssh_port=ssh_port,
-                    ssh_username=username, ssh_password=password,
-                    ssh_key_file=ssh_key_file, ssh_timeout=ssh_timeout,
-                    timeout=timeout, max_tries=max_tries)
-            except Exception:
-                # Try alternate username
-                # Todo: Need to fix paramiko so we can catch a more specific
-                # exception
-                e = sys.exc_info()[1]
-                deploy_error = e
-            else:
-                # Script sucesfully executed, don't try alternate username
-                deploy_error = None
-                break
+        >>> from libcloud.compute.drivers.dummy import DummyNodeDriver
+        >>> driver = DummyNodeDriver(0)
+        >>> nodes = driver.create_nodes([{}, {}])
+        >>> len(nodes)
+        2
 
-        if deploy_error is not None:
-            raise DeploymentError(node=node, original_exception=deploy_error,
-                                  driver=self)
+        :param nodes: List of dictionaries (one per node) with keyword
+                      arguments which are passed to :meth:`create_node`
+                      (e.g. ``[{'name': 'worker-1'}, {'name': 'worker-2'}]``).
+        :type nodes: ``list`` of ``dict``
 
-        return node
+        :param max_workers: Maximum number of nodes which are created at the
+                            same time (defaults to ``batch_concurrency``).
+        :type max_workers: ``int``
+
+        :param kwargs: Keyword arguments which are shared by all the nodes
+                       (e.g. ``size`` and ``image``).
+
+        :return: List with a :class:`.Node` for each created node and a
+                 :class:`FailedNode` for each node which couldn't be created,
+                 in the same order as ``nodes``.
+        :rtype: ``list``
+        """
+        nodes_kwargs = self._get_batch_kwargs(nodes=nodes, kwargs=kwargs)
+        return self._create_nodes(nodes_kwargs=nodes_kwargs,
+                                  max_workers=max_workers)
+
+    def deploy_nodes(self, nodes, max_workers=None, **kwargs):
+        """
+        Create multiple nodes concurrently and run deployment on them.
+
+        This is the batch version of :meth:`deploy_node`. Nodes are created in
+        parallel, all of them are waited for at once (see
+        :meth:`wait_until_running`) and the deployment scripts are run in
+        parallel. Nodes which don't come up in time are returned as
+        :class:`FailedNode`, the others are still deployed.
+
+        Note: :class:`.ScriptDeployment` stores output of the script on the
+        deployment instance. If you need to inspect it, pass a separate
+        ``deploy`` argument for each node.
+
+        :param nodes: List of dictionaries (one per node) with keyword
+                      arguments for :meth:`deploy_node`.
+        :type nodes: ``list`` of ``dict``
+
+        :param max_workers: Maximum number of nodes which are created and
+                            deployed at the same time (defaults to
+                            ``batch_concurrency``).
+        :type max_workers: ``int``
+
+        :param kwargs: Keyword arguments which are shared by all the nodes
+                       (see :meth:`deploy_node`). ``timeout`` and
+                       ``ssh_interface`` which are used when waiting for the
+                       nodes can only be provided here.
+
+        :return: List with a :class:`.Node` for each successfully deployed
+                 node and a :class:`FailedNode` for each node which couldn't
+                 be created or deployed, in the same order as ``nodes``.
+        :rtype: ``list``
+        """
+        nodes_kwargs = self._get_batch_kwargs(nodes=nodes, kwargs=kwargs)
+
+        for node_kwargs in nodes_kwargs:
+            self._check_deploy_kwargs(node_kwargs)
+
+        results = self._create_nodes(nodes_kwargs=nodes_kwargs,
+                                     max_workers=max_workers)
+        created = [index for index, node in enumerate(results)
+                   if not isinstance(node, FailedNode)]
+
+        if not created:
+            return results
+
+        # Nodes which came up are deployed even if waiting for some of the
+        # other nodes fails (e.g. times out)
+        running = {}
+
+        try:
+            self._wait_for_nodes(
+                nodes=[results[index] for index in created], running=running,
+                wait_period=3,
+                timeout=kwargs.get('timeout', NODE_ONLINE_WAIT_TIMEOUT),
+                ssh_interface=kwargs.get('ssh_interface', 'public_ips'))
+        except Exception:
+            e = sys.exc_info()[1]
+
+            for index in created:
+                node = results[index]
+
+                if node.uuid in running:
+                    continue
+
+                error = DeploymentError(node=node, original_exception=e,
+                                        driver=self)
+                results[index] = FailedNode(name=node.name, error=error,
+                                            node=node)
+
+            created = [index for index in created
+                       if not isinstance(results[index], FailedNode)]
+
+        def deploy(index):
+            node, ip_addresses = running[results[index].uuid]
+            return self._deploy_running_node(node=node,
+                                             ip_addresses=ip_addresses,
+                                             kwargs=nodes_kwargs[index])
+
+        for index, result, error in self._run_batch(deploy, created,
+                                                    max_workers):
+            node = results[index]
+
+            if error is not None:
+                result = FailedNode(name=node.name, error=error,
+                                    node=getattr(error, 'node', node))
+
+            results[index] = result
+
+        return results
 
     def reboot_node(self, node):
         """
@@ -1146,18 +1244,25 @@ class NodeDriver(BaseDriver):
             'delete_key_pair not implemented for this driver')
 
     def wait_until_running(self, nodes, wait_period=3, timeout=600,
-                           ssh_interface='public_ips', force_ipv4=True):
+                           ssh_interface='public_ips', force_ipv4=True,
+                           max_wait_period=30, ssh_port=None):
         """
         Block until the provided nodes are considered running.
 
         Node is considered running when it's state is "running" and when it has
-        at least one IP address assigned.
+        at least one IP address assigned. If ``ssh_port`` is provided, a TCP
+        connection to that port on the node's first IP address also needs to
+        succeed.
+
+        Only nodes which are not running yet are polled and the delay between
+        polls grows exponentially (with random jitter) from ``wait_period``
+        up to ``max_wait_period``.
 
         :param nodes: List of nodes to wait for.
         :type nodes: ``list`` of :class:`.Node`
 
-        :param wait_period: How many seconds to wait between each loop
-                            iteration. (default is 3)
+        :param wait_period: How many seconds to wait between the first loop
+                            iterations. (default is 3)
         :type wait_period: ``int``
 
         :param timeout: How many seconds to wait before giving up.
@@ -1172,10 +1277,40 @@ class NodeDriver(BaseDriver):
         :param force_ipv4: Ignore IPv6 addresses (default is True).
         :type force_ipv4: ``bool``
 
+        :param max_wait_period: Maximum number of seconds to wait between loop
+                                iterations. (default is 30)
+        :type max_wait_period: ``int``
+
+        :param ssh_port: Optional port (e.g. 22) which needs to accept
+                         connections before a node is considered running.
+        :type ssh_port: ``int``
+
         :return: ``[(Node, ip_addresses)]`` list of tuple of Node instance and
-                 list of ip_address on success.
+                 list of ip_address on success (in the same order as
+                 ``nodes``).
         :rtype: ``list`` of ``tuple``
         """
+        running = {}
+        self._wait_for_nodes(nodes=nodes, running=running,
+                             wait_period=wait_period, timeout=timeout,
+                             ssh_interface=ssh_interface,
+                             force_ipv4=force_ipv4,
+                             max_wait_period=max_wait_period,
+                             ssh_port=ssh_port)
+        return [running[node.uuid] for node in nodes]
+
+    def _wait_for_nodes(self, nodes, running, wait_period=3, timeout=600,
+                        ssh_interface='public_ips', force_ipv4=True,
+                        max_wait_period=30, ssh_port=None):
+        """
+        Block until the provided nodes are considered running (see
+        :meth:`wait_until_running`).
+
+        ``running`` dictionary is populated with a ``(Node, ip_addresses)``
+        tuple (keyed by node uuid) as soon as a node comes up, so the nodes
+        which are running are also known if the method raises (e.g. on
+        timeout).
+        """
         def is_supported(address):
             """
             Return True for supported address.
@@ -1197,35 +1332,210 @@ class NodeDriver(BaseDriver):
 
         start = time.time()
         end = start + timeout
+        delay = wait_period
 
         uuids = set([node.uuid for node in nodes])
 
         while time.time() < end:
-            all_nodes = self.list_nodes()
+            pending = [node for node in nodes if node.uuid not in running]
+            pending_uuids = set([node.uuid for node in pending])
+
+            all_nodes = self._list_nodes_for_wait(nodes=pending)
             matching_nodes = list([node for node in all_nodes
-                                   if node.uuid in uuids])
+                                   if node.uuid in pending_uuids])
 
-            if len(matching_nodes) > len(uuids):
+            if len(matching_nodes) > len(pending_uuids):
                 found_uuids = [node.uuid for node in matching_nodes]
                 msg = ('Unable to match specified uuids ' +
-                       '(%s) with existing nodes. Found ' % (uuids) +
+                       '(%s) with existing nodes. Found ' % (pending_uuids) +
                        'multiple nodes with same uuid: (%s)' % (found_uuids))
                 raise LibcloudError(value=msg, driver=self)
 
-            running_nodes = [node for node in matching_nodes
-                             if node.state == NodeState.RUNNING]
-            addresses = [filter_addresses(getattr(node, ssh_interface))
-                         for node in running_nodes]
+            for node in matching_nodes:
+                if node.state != NodeState.RUNNING:
+                    continue
 
-            if len(running_nodes) == len(uuids) == len(addresses):
-                return list(zip(running_nodes, addresses))
-            else:
-                time.sleep(wait_period)
-                continue
+                addresses = filter_addresses(getattr(node, ssh_interface))
+
+                if not addresses:
+                    continue
+
+                if ssh_port and not self._is_port_open(addresses[0], ssh_port):
+                    continue
+
+                running[node.uuid] = (node, addresses)
+
+            if len(running) == len(uuids):
+                return
+
+            # Exponential backoff with jitter so a large number of waiting
+            # clients doesn't poll the API in lockstep
+            remaining = end - time.time()
+            time.sleep(max(min(delay * random.uniform(0.5, 1), remaining), 0))
+            delay = min(delay * 2, max(max_wait_period, wait_period))
 
         raise LibcloudError(value='Timed out after %s seconds' % (timeout),
                             driver=self)
 
+    def _list_nodes_for_wait(self, nodes):
+        """
+        Return the current state of the provided nodes. Used by
+        :meth:`wait_until_running`.
+
+        By default all the nodes are listed. Drivers which support filtering
+        nodes on the server side should override this method so only the
+        provided nodes are retrieved.
+
+        :param nodes: Nodes to retrieve.
+        :type nodes: ``list`` of :class:`.Node`
+
+        :rtype: ``list`` of :class:`.Node`
+        """
+        return self.list_nodes()
+
+    def _is_port_open(self, address, port, timeout=5):
+        """
+        Return True if a TCP connection to the provided address and port
+        succeeds.
+        """
+        try:
+            sock = socket.create_connection((address, port), timeout)
+        except (socket.error, socket.timeout):
+            return False
+
+        sock.close()
+        return True
+
+    def _check_deploy_kwargs(self, kwargs):
+        """
+        Validate that the node can be deployed with the provided keyword
+        arguments.
+        """
+        if not libcloud.compute.ssh.have_paramiko:
+            raise RuntimeError('paramiko is not installed. You can install ' +
+                               'it using pip: pip install paramiko')
+
+        if 'auth' in kwargs:
+            auth = kwargs['auth']
+            if not isinstance(auth, (NodeAuthSSHKey, NodeAuthPassword)):
+                raise NotImplementedError(
+                    'If providing auth, only NodeAuthSSHKey or'
+                    'NodeAuthPassword is supported')
+        elif 'ssh_key' in kwargs:
+            # If an ssh_key is provided we can try deploy_node
+            pass
+        elif 'create_node' in self.features:
+            f = self.features['create_node']
+            if not 'generates_password' in f and not "password" in f:
+                raise NotImplementedError(
+                    'deploy_node not implemented for this driver')
+        else:
+            raise NotImplementedError(
+                'deploy_node not implemented for this driver')
+
+    def _deploy_running_node(self, node, ip_addresses, kwargs):
+        """
+        Connect to a running node and run the deployment task which is
+        specified in the deploy_node keyword arguments.
+
+        :rtype: :class:`.Node`
+        """
+        max_tries = kwargs.get('max_tries', 3)
+
+        password = None
+        if 'auth' in kwargs:
+            if isinstance(kwargs['auth'], NodeAuthPassword):
+                password = kwargs['auth'].password
+        elif 'password' in node.extra:
+            password = node.extra['password']
+
+        ssh_username = kwargs.get('ssh_username', 'root')
+        ssh_alternate_usernames = kwargs.get('ssh_alternate_usernames', [])
+        ssh_port = kwargs.get('ssh_port', 22)
+        ssh_timeout = kwargs.get('ssh_timeout', 10)
+        ssh_key_file = kwargs.get('ssh_key', None)
+        timeout = kwargs.get('timeout', SSH_CONNECT_TIMEOUT)
+
+        deploy_error = None
+
+        for username in ([ssh_username] + ssh_alternate_usernames):
+            try:
+                self._connect_and_run_deployment_script(
+                    task=kwargs['deploy'], node=node,
+                    ssh_hostname=ip_addresses[0], ssh_port=ssh_port,
+                    ssh_username=username, ssh_password=password,
+                    ssh_key_file=ssh_key_file, ssh_timeout=ssh_timeout,
+                    timeout=timeout, max_tries=max_tries)
+            except Exception:
+                # Try alternate username
+                # Todo: Need to fix paramiko so we can catch a more specific
+                # exception
+                e = sys.exc_info()[1]
+                deploy_error = e
+            else:
+                # Script sucesfully executed, don't try alternate username
+                deploy_error = None
+                break
+
+        if deploy_error is not None:
+            raise DeploymentError(node=node, original_exception=deploy_error,
+                                  driver=self)
+
+        return node
+
+    def _get_batch_kwargs(self, nodes, kwargs):
+        """
+        Merge shared keyword arguments with the per node ones.
+
+        :rtype: ``list`` of ``dict``
+        """
+        nodes_kwargs = []
+
+        for node_kwargs in nodes:
+            merged = kwargs.copy()
+            merged.update(node_kwargs or {})
+            nodes_kwargs.append(merged)
+
+        return nodes_kwargs
+
+    def _create_nodes(self, nodes_kwargs, max_workers=None):
+        results = [None] * len(nodes_kwargs)
+
+        def create(index):
+            return self.create_node(**nodes_kwargs[index])
+
+        indexes = range(len(nodes_kwargs))
+        for index, result, error in self._run_batch(create, indexes,
+                                                    max_workers):
+            if error is not None:
+                result = FailedNode(name=nodes_kwargs[index].get('name'),
+                                    error=error)
+
+            results[index] = result
+
+        return results
+
+    def _run_batch(self, func, items, max_workers=None):
+        """
+        Call func for each item using up to max_workers (defaults to
+        ``batch_concurrency``) threads.
+
+        Driver connections keep per request state in thread local storage so
+        a single driver instance can be used by multiple threads.
+
+        :return: Generator which yields (item, result, error) tuples as the
+                 calls finish.
+        """
+        max_workers = max_workers or self.batch_concurrency
+
+        for item, future in run_concurrently(func, items, max_workers):
+            error = future.exception()
+
+            if error is not None:
+                yield item, None, error
+            else:
+                yield item, future.result(), None
+
     def _get_and_check_auth(self, auth):
         """
         Helper function for providers supporting :class:`.NodeAuthPassword` or
@@ -28,6 +28,9 @@ from libcloud.compute.types import Provider, LibcloudError
 from libcloud.common.abiquo import (AbiquoConnection, get_href,
                                     AbiquoResponse)
 from libcloud.compute.base import NodeLocation, NodeImage, Node
+from libcloud.utils.concurrency import WorkerPool
+from libcloud.utils.py3 import httplib
+from libcloud.utils.py3 import queue
 from libcloud.utils.py3 import tostring
 
 
@@ -51,6 +54,14 @@ class AbiquoNodeDriver(NodeDriver):
     # Others constants
     GIGABYTE = 1073741824
 
+    # Maximum number of requests which are made at the same time when
+    # listing groups and nodes
+    list_concurrency = 10
+
+    # Listed groups (ETag of the virtual machines listing and the nodes) per
+    # virtual datacenter link and virtual appliance href
+    _group_cache = None
+
     def __init__(self, user_id, secret, endpoint, **kwargs):
         """
         Initializes Abiquo Driver
@@ -354,34 +365,58 @@ class AbiquoNodeDriver(NodeDriver):
         else:
             return False
 
-    def ex_list_groups(self, location=None):
+    def ex_list_groups(self, location=None, max_workers=None):
         """
         List all groups.
 
         :param location: filter the groups by location (optional)
         :type  location: a :class:`NodeLocation` instance.
 
+        :param max_workers: Maximum number of requests which are made at the
+                            same time (defaults to ``list_concurrency``).
+        :type max_workers: ``int``
+
         :return:         the list of :class:`NodeGroup`
         """
-        groups = []
-        for vdc in self._get_locations(location):
-            link_vdc = self.connection.cache['locations'][vdc]
-            e_vdc = self.connection.request(link_vdc).object
-            apps_link = get_href(e_vdc, 'virtualappliances')
-            vapps = self.connection.request(apps_link).object
-            for vapp in vapps.findall('virtualAppliance'):
-                nodes = []
-                vms_link = get_href(vapp, 'virtualmachines')
-                headers = {'Accept': self.NODES_MIME_TYPE}
-                vms = self.connection.request(vms_link, headers=headers).object
-                for vm in vms.findall('virtualmachinewithnode'):
-                    nodes.append(self._to_node(vm, self))
-
-                group = NodeGroup(self, vapp.findtext('name'),
-                                  nodes, get_href(vapp, 'edit'))
-                groups.append(group)
-
-        return groups
+        groups = list(self._iterate_groups(location=location,
+                                           max_workers=max_workers))
+
+        # Groups are returned in the same order as they are listed in the
+        # virtual datacenters
+        groups.sort(key=lambda item: item[0])
+        return [group for _, group in groups]
+
+    def ex_iterate_groups(self, location=None, max_workers=None):
+        """
+        Return a generator which yields groups as soon as all their nodes
+        have been retrieved.
+
+        Virtual datacenters, virtual appliances and virtual machines are
+        retrieved concurrently. Nodes of virtual appliances whose virtual
+        machines haven't changed since the previous listing (based on their
+        ETag) are not retrieved again.
+
+        @inherits: :class:`AbiquoNodeDriver.ex_list_groups`
+
+        :rtype: ``generator`` of :class:`NodeGroup`
+        """
+        for _, group in self._iterate_groups(location=location,
+                                             max_workers=max_workers):
+            yield group
+
+    def ex_iterate_nodes(self, location=None, max_workers=None):
+        """
+        Return a generator which yields nodes as soon as their groups have
+        been retrieved.
+
+        @inherits: :class:`AbiquoNodeDriver.ex_iterate_groups`
+
+        :rtype: ``generator`` of :class:`Node`
+        """
+        for group in self.ex_iterate_groups(location=location,
+                                            max_workers=max_workers):
+            for node in group.nodes:
+                yield node
 
     def list_images(self, location=None):
         """
@@ -616,6 +651,131 @@ class AbiquoNodeDriver(NodeDriver):
             for loc in self.list_locations():
                 yield loc
 
+    def _iterate_groups(self, location=None, max_workers=None):
+        """
+        Yield ((vdc index, vapp index), group) tuples as the groups are
+        completed.
+
+        All the levels of the walk (virtual datacenters, their virtual
+        appliances and the virtual machines of each appliance) share a single
+        pool of workers, so requests of the next level are made as soon as
+        the previous level returns and no worker waits for another one.
+        """
+        if self._group_cache is None:
+            self._group_cache = {}
+
+        vdc_links = [self.connection.cache['locations'][vdc]
+                     for vdc in self._get_locations(location)]
+
+        if not vdc_links:
+            return
+
+        pool = WorkerPool(max_workers=max_workers or self.list_concurrency)
+        finished = queue.Queue()
+
+        def submit(tag, func, *args):
+            future = pool.submit(func, *args)
+            future.add_done_callback(
+                lambda future: finished.put((tag, future)))
+
+        try:
+            pending = 0
+
+            for vdc_index, vdc_link in enumerate(vdc_links):
+                submit(('vdc', vdc_index, vdc_link),
+                       self._get_vdc_appliances, vdc_link)
+                pending += 1
+
+            while pending:
+                tag, future = finished.get()
+                pending -= 1
+                result = future.result()
+
+                if tag[0] == 'vdc':
+                    _, vdc_index, vdc_link = tag
+
+                    # Appliances which are not in the virtual datacenter
+                    # anymore are removed from the cache
+                    old_cache = self._group_cache.get(vdc_link, {})
+                    cache = {}
+                    self._group_cache[vdc_link] = cache
+
+                    for vapp_index, vapp in enumerate(result):
+                        group = NodeGroup(self, vapp.findtext('name'), [],
+                                          get_href(vapp, 'edit'))
+                        cached = old_cache.get(group.uri, None)
+
+                        if cached:
+                            cache[group.uri] = cached
+
+                        pending_group = _PendingGroup(
+                            key=(vdc_index, vapp_index), group=group,
+                            cache=cache)
+                        submit(('vapp', pending_group),
+                               self._get_appliance_vms, vapp, cached)
+                        pending += 1
+
+                    continue
+
+                if tag[0] == 'vapp':
+                    pending_group = tag[1]
+                    etag, vms = result
+
+                    if vms is None:
+                        # Virtual machines haven't changed, use cached nodes
+                        nodes = pending_group.cache[pending_group.group.uri][1]
+                        pending_group.nodes = list(nodes)
+                    else:
+                        pending_group.changed = True
+                        pending_group.etag = etag
+                        pending_group.nodes = [None] * len(vms)
+                        pending_group.remaining = len(vms)
+
+                        for vm_index, vm in enumerate(vms):
+                            submit(('vm', pending_group, vm_index),
+                                   self._to_node, vm, self)
+                            pending += 1
+                else:
+                    _, pending_group, vm_index = tag
+                    pending_group.nodes[vm_index] = result
+                    pending_group.remaining -= 1
+
+                if pending_group.done():
+                    yield pending_group.key, pending_group.finish()
+        finally:
+            # Requests which haven't been started are dropped if a request
+            # fails or the caller stops early
+            pool.shutdown(wait=False, cancel_pending=True)
+
+    def _get_vdc_appliances(self, vdc_link):
+        """
+        Return the virtual appliance elements of a virtual datacenter.
+        """
+        e_vdc = self.connection.request(vdc_link).object
+        apps_link = get_href(e_vdc, 'virtualappliances')
+        vapps = self.connection.request(apps_link).object
+        return vapps.findall('virtualAppliance')
+
+    def _get_appliance_vms(self, vapp, cached=None):
+        """
+        Return (ETag, virtual machine elements) of a virtual appliance. If the
+        virtual machines haven't changed since they have been cached, the
+        elements are ``None``.
+        """
+        vms_link = get_href(vapp, 'virtualmachines')
+        headers = {'Accept': self.NODES_MIME_TYPE}
+
+        if cached:
+            headers['If-None-Match'] = cached[0]
+
+        res = self.connection.request(vms_link, headers=headers)
+
+        if res.status == httplib.NOT_MODIFIED and cached:
+            return cached[0], None
+
+        return (res.headers.get('etag', None),
+                res.object.findall('virtualmachinewithnode'))
+
     def _get_enterprise_id(self):
         """
         Returns the identifier of the logged user's enterprise.
@@ -723,6 +883,39 @@ class AbiquoNodeDriver(NodeDriver):
         return self.connection.request(edit_vm, headers=headers).object
 
 
+class _PendingGroup(object):
+    """
+    Group whose nodes are being retrieved by
+    :meth:`AbiquoNodeDriver._iterate_groups`.
+    """
+
+    def __init__(self, key, group, cache):
+        self.key = key
+        self.group = group
+        self.cache = cache
+        self.nodes = None
+        self.changed = False
+        self.etag = None
+        self.remaining = 0
+
+    def done(self):
+        return self.nodes is not None and self.remaining == 0
+
+    def finish(self):
+        """
+        Store the retrieved nodes in the group (and the cache) and return it.
+        """
+        self.group.nodes = self.nodes
+
+        if self.changed:
+            if self.etag:
+                self.cache[self.group.uri] = (self.etag, list(self.nodes))
+            else:
+                self.cache.pop(self.group.uri, None)
+
+        return self.group
+
+
 class NodeGroup(object):
     """
     Group of virtual machines that can be managed together
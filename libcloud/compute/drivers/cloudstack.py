@@ -609,66 +609,90 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
         args = {}
         if project:
             args['projectid'] = project.id
-        vms = self._sync_request('listVirtualMachines', params=args)
-        addrs = self._sync_request('listPublicIpAddresses', params=args)
 
+        # Every list is retrieved once and joined in memory so the number of
+        # API calls doesn't depend on the number of nodes and addresses
+        vms = self._paginated_request('listVirtualMachines', 'virtualmachine',
+                                      params=args)
+        addrs = self._paginated_request('listPublicIpAddresses',
+                                        'publicipaddress', params=args)
+        ip_rules = self._paginated_request('listIpForwardingRules',
+                                           'ipforwardingrule', params=args)
+        port_rules = self._paginated_request('listPortForwardingRules',
+                                             'portforwardingrule',
+                                             params=args)
+
+        addresses_map = {}
         public_ips_map = {}
-        for addr in addrs.get('publicipaddress', []):
+        for addr in addrs:
+            address = CloudStackAddress(addr['id'], addr['ipaddress'], self)
+            addresses_map[addr['ipaddress']] = address
+
             if 'virtualmachineid' not in addr:
                 continue
             vm_id = str(addr['virtualmachineid'])
-            if vm_id not in public_ips_map:
-                public_ips_map[vm_id] = {}
-            public_ips_map[vm_id][addr['ipaddress']] = addr['id']
+            public_ips_map.setdefault(vm_id, []).append(address)
+
+        ip_rules_map = {}
+        for r in ip_rules:
+            vm_id = str(r['virtualmachineid'])
+            ip_rules_map.setdefault(vm_id, []).append(r)
+
+        port_rules_map = {}
+        for r in port_rules:
+            vm_id = str(r['virtualmachineid'])
+            port_rules_map.setdefault(vm_id, []).append(r)
 
         nodes = []
 
-        for vm in vms.get('virtualmachine', []):
-            public_ips = public_ips_map.get(str(vm['id']), {}).keys()
-            public_ips = list(public_ips)
+        for vm in vms:
+            addresses = public_ips_map.get(str(vm['id']), [])
+            public_ips = [addr.address for addr in addresses]
             node = self._to_node(data=vm, public_ips=public_ips)
-
-            addresses = public_ips_map.get(vm['id'], {}).items()
-            addresses = [CloudStackAddress(node, v, k) for k, v in addresses]
             node.extra['ip_addresses'] = addresses
 
             rules = []
-            for addr in addresses:
-                result = self._sync_request('listIpForwardingRules')
-                for r in result.get('ipforwardingrule', []):
-                    if str(r['virtualmachineid']) == node.id:
-                        rule = CloudStackIPForwardingRule(node, r['id'],
-                                                          addr,
-                                                          r['protocol']
-                                                          .upper(),
-                                                          r['startport'],
-                                                          r['endport'])
-                        rules.append(rule)
+            for r in ip_rules_map.get(node.id, []):
+                addr = self._get_rule_address(r, addresses_map)
+                rule = CloudStackIPForwardingRule(node, r['id'], addr,
+                                                  r['protocol'].upper(),
+                                                  r['startport'],
+                                                  r['endport'])
+                rules.append(rule)
             node.extra['ip_forwarding_rules'] = rules
 
             rules = []
-            public_ips = self.ex_list_public_ips()
-            result = self._sync_request('listPortForwardingRules')
-            for r in result.get('portforwardingrule', []):
-                if str(r['virtualmachineid']) == node.id:
-                    addr = [a for a in public_ips if
-                            a.address == r['ipaddress']]
-                    rule = CloudStackPortForwardingRule(node, r['id'],
-                                                        addr[0],
-                                                        r['protocol'].upper(),
-                                                        r['publicport'],
-                                                        r['privateport'],
-                                                        r['publicendport'],
-                                                        r['privateendport'])
-                    if not addr[0].address in node.public_ips:
-                        node.public_ips.append(addr[0].address)
-                    rules.append(rule)
+            for r in port_rules_map.get(node.id, []):
+                addr = self._get_rule_address(r, addresses_map)
+                rule = CloudStackPortForwardingRule(node, r['id'],
+                                                    addr,
+                                                    r['protocol'].upper(),
+                                                    r['publicport'],
+                                                    r['privateport'],
+                                                    r['publicendport'],
+                                                    r['privateendport'])
+                if addr.address not in node.public_ips:
+                    node.public_ips.append(addr.address)
+                rules.append(rule)
             node.extra['port_forwarding_rules'] = rules
 
             nodes.append(node)
 
         return nodes
 
+    def _get_rule_address(self, rule, addresses_map):
+        """
+        Return the address a forwarding rule is attached to.
+        """
+        address = addresses_map.get(rule['ipaddress'], None)
+
+        if address is None:
+            address = CloudStackAddress(rule['ipaddressid'], rule['ipaddress'],
+                                        self)
+            addresses_map[rule['ipaddress']] = address
+
+        return address
+
     def list_sizes(self, location=None):
         """
         :rtype ``list`` of :class:`NodeSize`
@@ -1912,7 +1936,7 @@ class CloudStackNodeDriver(CloudStackDriverMixIn, NodeDriver):
         for nic in data['nic']:
             if is_private_subnet(nic['ipaddress']):
                 private_ips.append(nic['ipaddress'])
-            else:
+            elif nic['ipaddress'] not in public_ips:
                 public_ips.append(nic['ipaddress'])
 
         security_groups = data.get('securitygroup', [])
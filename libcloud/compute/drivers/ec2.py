@@ -31,6 +31,7 @@ except ImportError:
 from libcloud.utils.py3 import b, basestring
 
 from libcloud.utils.xml import fixxpath, findtext, findattr, findall
+from libcloud.utils.xml import findtexts
 from libcloud.utils.publickey import get_pubkey_ssh2_fingerprint
 from libcloud.utils.publickey import get_pubkey_comment
 from libcloud.utils.iso8601 import parse_date
@@ -1210,6 +1211,14 @@ class BaseEC2NodeDriver(NodeDriver):
         'terminated': NodeState.TERMINATED
     }
 
+    # Number of nodes for which Elastic IP addresses are retrieved at once by
+    # iterate_nodes
+    iterate_nodes_batch_size = 100
+
+    # Maximum number of results (MaxResults) which are requested at once by
+    # the list_* and iterate_* methods. None means no limit.
+    list_page_size = None
+
     def list_nodes(self, ex_node_ids=None):
         """
         List all nodes
@@ -1226,17 +1235,28 @@ class BaseEC2NodeDriver(NodeDriver):
         params = {'Action': 'DescribeInstances'}
         if ex_node_ids:
             params.update(self._pathlist('InstanceId', ex_node_ids))
-        elem = self.connection.request(self.path, params=params).object
+
         nodes = []
-        for rs in findall(element=elem, xpath='reservationSet/item',
-                          namespace=NAMESPACE):
-            nodes += self._to_nodes(rs, 'instancesSet/item')
+        for page in self._get_pages(params=params,
+                                    xpath='reservationSet/item',
+                                    page_size=self._get_page_size(
+                                        ids=ex_node_ids)):
+            for rs in page:
+                nodes += self._to_nodes(rs, 'instancesSet/item')
 
-        nodes_elastic_ips_mappings = self.ex_describe_addresses(nodes)
-        for node in nodes:
-            ips = nodes_elastic_ips_mappings[node.id]
-            node.public_ips.extend(ips)
-        return nodes
+        return self._add_elastic_ips(nodes)
+
+    def _list_nodes_for_wait(self, nodes):
+        try:
+            return self.list_nodes(ex_node_ids=[node.id for node in nodes])
+        except Exception:
+            e = sys.exc_info()[1]
+
+            # Newly created instances are not always visible right away
+            if 'InvalidInstanceID.NotFound' in str(e):
+                return []
+
+            raise
 
     def list_sizes(self, location=None):
         available_types = REGION_DETAILS[self.region_name]['instance_types']
@@ -1283,24 +1303,79 @@ class BaseEC2NodeDriver(NodeDriver):
 
         :rtype: ``list`` of :class:`NodeImage`
         """
-        params = {'Action': 'DescribeImages'}
-
-        if ex_owner:
-            params.update({'Owner.1': ex_owner})
-
-        if ex_executableby:
-            params.update({'ExecutableBy.1': ex_executableby})
-
-        if ex_image_ids:
-            for index, image_id in enumerate(ex_image_ids):
-                index += 1
-                params.update({'ImageId.%s' % (index): image_id})
+        params = self._get_describe_images_params(
+            ex_image_ids=ex_image_ids, ex_owner=ex_owner,
+            ex_executableby=ex_executableby)
 
         images = self._to_images(
             self.connection.request(self.path, params=params).object
         )
         return images
 
+    def iterate_images(self, location=None, ex_image_ids=None, ex_owner=None,
+                       ex_executableby=None):
+        """
+        Return a generator which yields images as they are parsed from the
+        response instead of reading and parsing the whole (potentially
+        multiple megabytes big) response upfront.
+
+        @inherits: :class:`BaseEC2NodeDriver.list_images`
+
+        :rtype: ``generator`` of :class:`NodeImage`
+        """
+        params = self._get_describe_images_params(
+            ex_image_ids=ex_image_ids, ex_owner=ex_owner,
+            ex_executableby=ex_executableby)
+        response = self.connection.request(self.path, params=params,
+                                           stream=True)
+
+        for element in response.iterfindall(xpath='imagesSet/item',
+                                            namespace=NAMESPACE):
+            yield self._to_image(element)
+
+    def iterate_nodes(self, ex_node_ids=None, ex_page_size=None):
+        """
+        Return a generator which yields nodes as they are parsed from the
+        response instead of reading and parsing the whole (potentially
+        multiple megabytes big) response upfront.
+
+        Nodes are requested in pages of ``ex_page_size`` nodes and Elastic IP
+        addresses are retrieved for each page in batches of (at most)
+        ``iterate_nodes_batch_size`` nodes.
+
+        @inherits: :class:`BaseEC2NodeDriver.list_nodes`
+
+        :param      ex_page_size: Maximum number of nodes which are
+                                  requested at once (defaults to
+                                  ``list_page_size``). Ignored if
+                                  ``ex_node_ids`` is provided.
+        :type       ex_page_size: ``int``
+
+        :rtype: ``generator`` of :class:`Node`
+        """
+        params = {'Action': 'DescribeInstances'}
+        if ex_node_ids:
+            params.update(self._pathlist('InstanceId', ex_node_ids))
+
+        page_size = self._get_page_size(page_size=ex_page_size,
+                                        ids=ex_node_ids)
+
+        for page in self._get_pages(params=params,
+                                    xpath='reservationSet/item',
+                                    page_size=page_size, stream=True):
+            nodes = []
+            for rs in page:
+                nodes += self._to_nodes(rs, 'instancesSet/item')
+
+                if len(nodes) >= self.iterate_nodes_batch_size:
+                    for node in self._add_elastic_ips(nodes):
+                        yield node
+                    nodes = []
+
+            if nodes:
+                for node in self._add_elastic_ips(nodes):
+                    yield node
+
     def list_locations(self):
         locations = []
         for index, availability_zone in \
@@ -1312,20 +1387,38 @@ class BaseEC2NodeDriver(NodeDriver):
         return locations
 
     def list_volumes(self, node=None):
-        params = {
-            'Action': 'DescribeVolumes',
-        }
-        if node:
-            params.update({
-                'Filter.1.Name': 'attachment.instance-id',
-                'Filter.1.Value': node.id,
-            })
-        response = self.connection.request(self.path, params=params).object
-        volumes = [self._to_volume(el) for el in response.findall(
-            fixxpath(xpath='volumeSet/item', namespace=NAMESPACE))
-        ]
+        params = self._get_describe_volumes_params(node=node)
+
+        volumes = []
+        for page in self._get_pages(params=params, xpath='volumeSet/item',
+                                    page_size=self._get_page_size()):
+            volumes += [self._to_volume(el) for el in page]
+
         return volumes
 
+    def iterate_volumes(self, node=None, ex_page_size=None):
+        """
+        Return a generator which yields volumes as they are parsed from the
+        response. Volumes are requested in pages of ``ex_page_size`` volumes.
+
+        @inherits: :class:`NodeDriver.list_volumes`
+
+        :param      ex_page_size: Maximum number of volumes which are
+                                  requested at once (defaults to
+                                  ``list_page_size``).
+        :type       ex_page_size: ``int``
+
+        :rtype: ``generator`` of :class:`StorageVolume`
+        """
+        params = self._get_describe_volumes_params(node=node)
+
+        for page in self._get_pages(params=params, xpath='volumeSet/item',
+                                    page_size=self._get_page_size(
+                                        page_size=ex_page_size),
+                                    stream=True):
+            for element in page:
+                yield self._to_volume(element)
+
     def create_node(self, **kwargs):
         """
         Create a new EC2 node.
@@ -1363,6 +1456,43 @@ class BaseEC2NodeDriver(NodeDriver):
         :keyword    ex_iamprofile: Name or ARN of IAM profile
         :type       ex_iamprofile: ``str``
         """
+        params = self._get_create_node_params(**kwargs)
+
+        if 'auth' in kwargs:
+            auth = self._get_and_check_auth(kwargs['auth'])
+            params['KeyName'] = \
+                self.ex_find_or_import_keypair_by_key_material(auth.pubkey)
+
+        object = self.connection.request(self.path, params=params).object
+        nodes = self._to_nodes(object, 'instancesSet/item')
+
+        for node in nodes:
+            tags = {'Name': kwargs['name']}
+            if 'ex_metadata' in kwargs:
+                tags.update(kwargs['ex_metadata'])
+
+            try:
+                self.ex_create_tags(resource=node, tags=tags)
+            except Exception:
+                continue
+
+            node.name = kwargs['name']
+            node.extra.update({'tags': tags})
+
+        if len(nodes) == 1:
+            return nodes[0]
+        else:
+            return nodes
+
+    def _get_create_node_params(self, **kwargs):
+        """
+        Return RunInstances parameters for the provided create_node arguments
+        (except for ``auth`` which needs to make requests).
+
+        @inherits: :class:`EC2NodeDriver.create_node`
+
+        :rtype: ``dict``
+        """
         image = kwargs["image"]
         size = kwargs["size"]
         params = {
@@ -1402,11 +1532,6 @@ class BaseEC2NodeDriver(NodeDriver):
         if 'auth' in kwargs and 'ex_keyname' in kwargs:
             raise AttributeError('Cannot specify auth and ex_keyname together')
 
-        if 'auth' in kwargs:
-            auth = self._get_and_check_auth(kwargs['auth'])
-            params['KeyName'] = \
-                self.ex_find_or_import_keypair_by_key_material(auth.pubkey)
-
         if 'ex_keyname' in kwargs:
             params['KeyName'] = kwargs['ex_keyname']
 
@@ -1430,26 +1555,7 @@ class BaseEC2NodeDriver(NodeDriver):
             else:
                 params['IamInstanceProfile.Name'] = kwargs['ex_iamprofile']
 
-        object = self.connection.request(self.path, params=params).object
-        nodes = self._to_nodes(object, 'instancesSet/item')
-
-        for node in nodes:
-            tags = {'Name': kwargs['name']}
-            if 'ex_metadata' in kwargs:
-                tags.update(kwargs['ex_metadata'])
-
-            try:
-                self.ex_create_tags(resource=node, tags=tags)
-            except Exception:
-                continue
-
-            node.name = kwargs['name']
-            node.extra.update({'tags': tags})
-
-        if len(nodes) == 1:
-            return nodes[0]
-        else:
-            return nodes
+        return params
 
     def reboot_node(self, node):
         params = {'Action': 'RebootInstances'}
@@ -1550,21 +1656,42 @@ class BaseEC2NodeDriver(NodeDriver):
 
         :rtype: ``list`` of :class:`VolumeSnapshot`
         """
-        params = {
-            'Action': 'DescribeSnapshots',
-        }
-        if snapshot:
-            params.update({
-                'SnapshotId.1': snapshot.id,
-            })
-        if owner:
-            params.update({
-                'Owner.1': owner,
-            })
-        response = self.connection.request(self.path, params=params).object
-        snapshots = self._to_snapshots(response)
+        params = self._get_describe_snapshots_params(snapshot=snapshot,
+                                                     owner=owner)
+        page_size = self._get_page_size(ids=snapshot and [snapshot.id])
+
+        snapshots = []
+        for page in self._get_pages(params=params, xpath='snapshotSet/item',
+                                    page_size=page_size):
+            snapshots += [self._to_snapshot(el) for el in page]
+
         return snapshots
 
+    def iterate_snapshots(self, owner=None, ex_page_size=None):
+        """
+        Return a generator which yields snapshots as they are parsed from
+        the response. Snapshots are requested in pages of ``ex_page_size``
+        snapshots.
+
+        :param owner: Owner for snapshot: self|amazon|ID
+        :type owner: ``str``
+
+        :param      ex_page_size: Maximum number of snapshots which are
+                                  requested at once (defaults to
+                                  ``list_page_size``).
+        :type       ex_page_size: ``int``
+
+        :rtype: ``generator`` of :class:`VolumeSnapshot`
+        """
+        params = self._get_describe_snapshots_params(owner=owner)
+
+        for page in self._get_pages(params=params, xpath='snapshotSet/item',
+                                    page_size=self._get_page_size(
+                                        page_size=ex_page_size),
+                                    stream=True):
+            for element in page:
+                yield self._to_snapshot(element)
+
     def destroy_volume_snapshot(self, snapshot):
         params = {
             'Action': 'DeleteSnapshot',
@@ -2423,12 +2550,7 @@ class BaseEC2NodeDriver(NodeDriver):
         if not tags:
             return
 
-        params = {'Action': 'CreateTags',
-                  'ResourceId.0': resource.id}
-        for i, key in enumerate(tags):
-            params['Tag.%d.Key' % i] = key
-            params['Tag.%d.Value' % i] = tags[key]
-
+        params = self._get_create_tags_params(resource=resource, tags=tags)
         result = self.connection.request(self.path,
                                          params=params.copy()).object
         element = findtext(element=result, xpath='return',
@@ -2630,13 +2752,15 @@ class BaseEC2NodeDriver(NodeDriver):
         if not nodes:
             return {}
 
-        params = {'Action': 'DescribeAddresses'}
-
-        if len(nodes) == 1:
-            self._add_instance_filter(params, nodes[0])
-
+        params = self._get_describe_addresses_params(nodes=nodes)
         result = self.connection.request(self.path, params=params).object
+        return self._to_elastic_ip_mappings(nodes=nodes, result=result)
 
+    def _to_elastic_ip_mappings(self, nodes, result):
+        """
+        Return a dictionary which maps node IDs to the Elastic IP addresses in
+        a DescribeAddresses response.
+        """
         node_instance_ids = [node.id for node in nodes]
         nodes_elastic_ip_mappings = {}
 
@@ -3291,6 +3415,122 @@ class BaseEC2NodeDriver(NodeDriver):
 
         return element == 'true'
 
+    def _add_elastic_ips(self, nodes):
+        nodes_elastic_ips_mappings = self.ex_describe_addresses(nodes)
+        for node in nodes:
+            ips = nodes_elastic_ips_mappings[node.id]
+            node.public_ips.extend(ips)
+        return nodes
+
+    def _get_page_size(self, page_size=None, ids=None):
+        # MaxResults can't be combined with explicit resource ids
+        if ids:
+            return None
+
+        return page_size or self.list_page_size
+
+    def _get_pages(self, params, xpath, page_size=None, stream=False):
+        """
+        Return a generator which yields elements matching the provided xpath
+        for each page of a Describe* response. Next page is requested (using
+        ``nextToken`` from the previous page) once the previous one has been
+        consumed.
+
+        :param page_size: Value for the MaxResults parameter.
+        :type page_size: ``int``
+
+        :param stream: True to parse the pages incrementally.
+        :type stream: ``bool``
+
+        :rtype: ``generator`` of ``list`` (or ``generator`` if stream is
+                True) of :class:`Element`
+        """
+        params = params.copy()
+
+        if page_size:
+            params['MaxResults'] = page_size
+
+        while True:
+            response = self.connection.request(self.path, params=params,
+                                               stream=stream)
+
+            if stream:
+                yield response.iterfindall(xpath=xpath, namespace=NAMESPACE)
+            else:
+                yield findall(element=response.object, xpath=xpath,
+                              namespace=NAMESPACE)
+
+            if response.object is None:
+                # Streamed page hasn't been consumed
+                break
+
+            next_token = findtext(element=response.object,
+                                  xpath='nextToken', namespace=NAMESPACE)
+
+            if not next_token:
+                break
+
+            params['NextToken'] = next_token
+
+    def _get_create_tags_params(self, resource, tags):
+        params = {'Action': 'CreateTags',
+                  'ResourceId.0': resource.id}
+        for i, key in enumerate(tags):
+            params['Tag.%d.Key' % i] = key
+            params['Tag.%d.Value' % i] = tags[key]
+
+        return params
+
+    def _get_describe_addresses_params(self, nodes):
+        params = {'Action': 'DescribeAddresses'}
+
+        if len(nodes) == 1:
+            self._add_instance_filter(params, nodes[0])
+
+        return params
+
+    def _get_describe_volumes_params(self, node=None):
+        params = {
+            'Action': 'DescribeVolumes',
+        }
+        if node:
+            params.update({
+                'Filter.1.Name': 'attachment.instance-id',
+                'Filter.1.Value': node.id,
+            })
+        return params
+
+    def _get_describe_snapshots_params(self, snapshot=None, owner=None):
+        params = {
+            'Action': 'DescribeSnapshots',
+        }
+        if snapshot:
+            params.update({
+                'SnapshotId.1': snapshot.id,
+            })
+        if owner:
+            params.update({
+                'Owner.1': owner,
+            })
+        return params
+
+    def _get_describe_images_params(self, ex_image_ids=None, ex_owner=None,
+                                    ex_executableby=None):
+        params = {'Action': 'DescribeImages'}
+
+        if ex_owner:
+            params.update({'Owner.1': ex_owner})
+
+        if ex_executableby:
+            params.update({'ExecutableBy.1': ex_executableby})
+
+        if ex_image_ids:
+            for index, image_id in enumerate(ex_image_ids):
+                index += 1
+                params.update({'ImageId.%s' % (index): image_id})
+
+        return params
+
     def _to_nodes(self, object, xpath):
         return [self._to_node(el)
                 for el in object.findall(fixxpath(xpath=xpath,
@@ -3768,12 +4008,15 @@ class BaseEC2NodeDriver(NodeDriver):
 
         :rtype: ``dict``
         """
+        # Extract all the values with a single pass over the element
+        xpaths = [values['xpath'] for values in mapping.values()]
+        element_values = findtexts(element=element, xpaths=xpaths,
+                                   namespace=NAMESPACE)
+
         extra = {}
         for attribute, values in mapping.items():
             transform_func = values['transform_func']
-            value = findattr(element=element,
-                             xpath=values['xpath'],
-                             namespace=NAMESPACE)
+            value = element_values[values['xpath']]
             if value is not None:
                 extra[attribute] = transform_func(value)
             else:
@@ -3929,6 +4172,8 @@ class EC2NodeDriver(BaseEC2NodeDriver):
         'stopped': NodeState.STOPPED
     }
 
+    list_page_size = 500
+
     def __init__(self, key, secret=None, secure=True, host=None, port=None,
                  region='us-east-1', **kwargs):
         if hasattr(self, '_region'):
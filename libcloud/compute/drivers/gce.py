@@ -676,14 +676,19 @@ class GCENodeDriver(NodeDriver):
             # The aggregated result returns dictionaries for each region
             if region is None:
                 for v in response['items'].values():
-                    region_forwarding_rules = [self._to_forwarding_rule(f) for
-                                               f in v.get('forwardingRules',
-                                                          [])]
-                    list_forwarding_rules.extend(region_forwarding_rules)
+                    list_forwarding_rules.extend(v.get('forwardingRules', []))
             else:
-                list_forwarding_rules = [self._to_forwarding_rule(f) for f in
-                                         response['items']]
-        return list_forwarding_rules
+                list_forwarding_rules = response['items']
+
+        if not list_forwarding_rules:
+            return []
+
+        # Retrieve all the target pools at once instead of one by one
+        targetpools = self._index_by_self_link(
+            self.ex_list_targetpools(region=region or 'all'))
+
+        return [self._to_forwarding_rule(f, targetpools=targetpools)
+                for f in list_forwarding_rules]
 
     def list_images(self, ex_project=None):
         """
@@ -742,18 +747,26 @@ class GCENodeDriver(NodeDriver):
                          response.get('items', [])]
         return list_networks
 
-    def list_nodes(self, ex_zone=None):
+    def list_nodes(self, ex_zone=None, ex_lazy_boot_disk=False):
         """
         Return a list of nodes in the current zone or all zones.
 
+        Boot disks of all the nodes are retrieved with a single request. If
+        ``ex_lazy_boot_disk`` is True, boot disks are not retrieved and
+        ``extra['boot_disk']`` is None. Boot disk of such node can be
+        retrieved using :meth:`ex_get_node_boot_disk`.
+
         :keyword  ex_zone:  Optional zone name or 'all'
         :type     ex_zone:  ``str`` or :class:`GCEZone` or
                             :class:`NodeLocation` or ``None``
 
+        :keyword  ex_lazy_boot_disk: Don't retrieve boot disks.
+        :type     ex_lazy_boot_disk: ``bool``
+
         :return:  List of Node objects
         :rtype:   ``list`` of :class:`Node`
         """
-        list_nodes = []
+        instances = []
         zone = self._set_zone(ex_zone)
         if zone is None:
             request = '/aggregated/instances'
@@ -766,12 +779,22 @@ class GCENodeDriver(NodeDriver):
             # The aggregated response returns a dict for each zone
             if zone is None:
                 for v in response['items'].values():
-                    zone_nodes = [self._to_node(i) for i in
-                                  v.get('instances', [])]
-                    list_nodes.extend(zone_nodes)
+                    instances.extend(v.get('instances', []))
             else:
-                list_nodes = [self._to_node(i) for i in response['items']]
-        return list_nodes
+                instances = response['items']
+
+        if not instances:
+            return []
+
+        self._update_zone_cache([i['zone'] for i in instances])
+
+        volumes = None
+        if not ex_lazy_boot_disk:
+            volumes = self._get_boot_volumes(instances=instances, zone=zone)
+
+        return [self._to_node(i, volumes=volumes,
+                              lazy_boot_disk=ex_lazy_boot_disk)
+                for i in instances]
 
     def ex_list_regions(self):
         """
@@ -850,13 +873,25 @@ class GCENodeDriver(NodeDriver):
             # The aggregated result returns dictionaries for each region
             if region is None:
                 for v in response['items'].values():
-                    region_targetpools = [self._to_targetpool(t) for t in
-                                          v.get('targetPools', [])]
-                    list_targetpools.extend(region_targetpools)
+                    list_targetpools.extend(v.get('targetPools', []))
             else:
-                list_targetpools = [self._to_targetpool(t) for t in
-                                    response['items']]
-        return list_targetpools
+                list_targetpools = response['items']
+
+        # Retrieve all the referenced nodes and health checks with a single
+        # request per resource type
+        nodes = None
+        healthchecks = None
+
+        if [t for t in list_targetpools if t.get('instances')]:
+            nodes = self._index_by_self_link(
+                self.list_nodes(ex_zone='all', ex_lazy_boot_disk=True))
+
+        if [t for t in list_targetpools if t.get('healthChecks')]:
+            healthchecks = self._index_by_self_link(
+                self.ex_list_healthchecks())
+
+        return [self._to_targetpool(t, nodes=nodes, healthchecks=healthchecks)
+                for t in list_targetpools]
 
     def list_volumes(self, ex_zone=None):
         """
@@ -2020,8 +2055,10 @@ class GCENodeDriver(NodeDriver):
         request = '/zones/%s/instances/%s' % (node.extra['zone'].name,
                                               node.name)
         self.connection.async_request(request, method='DELETE')
-        if destroy_boot_disk and node.extra['boot_disk']:
-            node.extra['boot_disk'].destroy()
+        if destroy_boot_disk:
+            boot_disk = self.ex_get_node_boot_disk(node)
+            if boot_disk:
+                boot_disk.destroy()
         return True
 
     def ex_destroy_multiple_nodes(self, node_list, ignore_errors=True,
@@ -2104,7 +2141,7 @@ class GCENodeDriver(NodeDriver):
                 # If we are destroying disks, and the node has been deleted,
                 # destroy the disk.
                 if delete_disk and destroy_boot_disk:
-                    boot_disk = status['node'].extra['boot_disk']
+                    boot_disk = self.ex_get_node_boot_disk(status['node'])
                     if boot_disk:
                         request = '/zones/%s/disks/%s' % (
                             boot_disk.extra['zone'].name, boot_disk.name)
@@ -2301,6 +2338,30 @@ class GCENodeDriver(NodeDriver):
         response = self.connection.request(request, method='GET').object
         return self._to_node(response)
 
+    def ex_get_node_boot_disk(self, node):
+        """
+        Return the persistent boot disk of a node.
+
+        The boot disk is retrieved (and stored in ``extra['boot_disk']``) if
+        the node has been listed with ``ex_lazy_boot_disk=True``.
+
+        :param  node: The node
+        :type   node: :class:`Node`
+
+        :return:  Boot disk or ``None`` if the node has no persistent boot
+                  disk.
+        :rtype:   :class:`StorageVolume` or ``None``
+        """
+        if node.extra.get('boot_disk'):
+            return node.extra['boot_disk']
+
+        for path in self._get_boot_disk_paths(node.extra):
+            bd = self._get_components_from_path(path)
+            node.extra['boot_disk'] = self.ex_get_volume(bd['name'],
+                                                         bd['zone'])
+
+        return node.extra.get('boot_disk')
+
     def ex_get_project(self):
         """
         Return a Project object with project-wide information.
@@ -2518,6 +2579,70 @@ class GCENodeDriver(NodeDriver):
 
         return {'name': name, 'region': region, 'zone': zone, 'global': glob}
 
+    def _get_boot_disk_paths(self, instance):
+        """
+        Return source paths of the persistent boot disks of an instance.
+
+        :rtype: ``list`` of ``str``
+        """
+        return [disk['source'] for disk in instance.get('disks', [])
+                if disk.get('boot') and disk.get('type') == 'PERSISTENT']
+
+    def _get_boot_volumes(self, instances, zone=None):
+        """
+        Retrieve disks from the provided zone (or from all zones) with a
+        single request if any of the instances has a persistent boot disk.
+
+        :return: Dictionary which maps (zone name, disk name) tuples to
+                 volumes.
+        :rtype:  ``dict``
+        """
+        volumes = {}
+
+        for instance in instances:
+            if self._get_boot_disk_paths(instance):
+                break
+        else:
+            return volumes
+
+        for volume in self.list_volumes(ex_zone=zone or 'all'):
+            volumes[(volume.extra['zone'].name, volume.name)] = volume
+
+        return volumes
+
+    def _index_by_self_link(self, resources):
+        """
+        Return a dictionary which maps selfLink of each resource to the
+        resource.
+
+        :rtype: ``dict``
+        """
+        index = {}
+        for resource in resources:
+            index[resource.extra['selfLink']] = resource
+        return index
+
+    def _update_zone_cache(self, zones):
+        """
+        Refresh the zone cache (with a single request) if any of the
+        provided zones is not cached yet.
+
+        :param  zones: Zone names or URLs.
+        :type   zones: ``list`` of ``str``
+        """
+        for zone in zones:
+            if zone.startswith('https://'):
+                zone = self._get_components_from_path(zone)['name']
+
+            if zone not in self.zone_dict:
+                break
+        else:
+            return
+
+        self.zone_list = self.ex_list_zones()
+        for zone in self.zone_list:
+            self.zone_dict[zone.name] = zone
+
     def _get_region_from_zone(self, zone):
         """
         Return the Region object that contains the given Zone object.
@@ -2988,13 +3113,17 @@ class GCENodeDriver(NodeDriver):
                            source_tags=source_tags,
                            driver=self, extra=extra)
 
-    def _to_forwarding_rule(self, forwarding_rule):
+    def _to_forwarding_rule(self, forwarding_rule, targetpools=None):
         """
         Return a Forwarding Rule object from the json-response dictionary.
 
         :param  forwarding_rule: The dictionary describing the rule.
         :type   forwarding_rule: ``dict``
 
+        :keyword  targetpools: Already retrieved target pools keyed by
+                               selfLink.
+        :type     targetpools: ``dict``
+
         :return: ForwardingRule object
         :rtype: :class:`GCEForwardingRule`
         """
@@ -3005,8 +3134,13 @@ class GCENodeDriver(NodeDriver):
         extra['description'] = forwarding_rule.get('description')
 
         region = self.ex_get_region(forwarding_rule['region'])
-        targetpool = self.ex_get_targetpool(
-            self._get_components_from_path(forwarding_rule['target'])['name'])
+        target = forwarding_rule['target']
+
+        if targetpools and target in targetpools:
+            targetpool = targetpools[target]
+        else:
+            targetpool = self.ex_get_targetpool(
+                self._get_components_from_path(target)['name'])
 
         return GCEForwardingRule(id=forwarding_rule['id'],
                                  name=forwarding_rule['name'], region=region,
@@ -3070,13 +3204,21 @@ class GCENodeDriver(NodeDriver):
                             country=location['name'].split('-')[0],
                             driver=self)
 
-    def _to_node(self, node):
+    def _to_node(self, node, volumes=None, lazy_boot_disk=False):
         """
         Return a Node object from the json-response dictionary.
 
         :param  node: The dictionary describing the node.
         :type   node: ``dict``
 
+        :keyword  volumes: Already retrieved volumes keyed by (zone name,
+                           disk name) tuples.
+        :type     volumes: ``dict``
+
+        :keyword  lazy_boot_disk: Don't retrieve the boot disk if it's not
+                                  in ``volumes``.
+        :type     lazy_boot_disk: ``bool``
+
         :return: Node object
         :rtype: :class:`Node`
         """
@@ -3099,9 +3241,13 @@ class GCENodeDriver(NodeDriver):
         extra['scheduling'] = node.get('scheduling', {})
 
         extra['boot_disk'] = None
-        for disk in extra['disks']:
-            if disk.get('boot') and disk.get('type') == 'PERSISTENT':
-                bd = self._get_components_from_path(disk['source'])
+        for path in self._get_boot_disk_paths(node):
+            bd = self._get_components_from_path(path)
+            key = (bd['zone'], bd['name'])
+
+            if volumes and key in volumes:
+                extra['boot_disk'] = volumes[key]
+            elif not lazy_boot_disk:
                 extra['boot_disk'] = self.ex_get_volume(bd['name'], bd['zone'])
 
         if 'items' in node['tags']:
@@ -3241,13 +3387,20 @@ class GCENodeDriver(NodeDriver):
         return StorageVolume(id=volume['id'], name=volume['name'],
                              size=volume['sizeGb'], driver=self, extra=extra)
 
-    def _to_targetpool(self, targetpool):
+    def _to_targetpool(self, targetpool, nodes=None, healthchecks=None):
         """
         Return a Target Pool object from the json-response dictionary.
 
         :param  targetpool: The dictionary describing the volume.
         :type   targetpool: ``dict``
 
+        :keyword  nodes: Already retrieved nodes keyed by selfLink.
+        :type     nodes: ``dict``
+
+        :keyword  healthchecks: Already retrieved health checks keyed by
+                                selfLink.
+        :type     healthchecks: ``dict``
+
         :return: Target Pool object
         :rtype:  :class:`GCETargetPool`
         """
@@ -3255,10 +3408,21 @@ class GCENodeDriver(NodeDriver):
         extra['selfLink'] = targetpool.get('selfLink')
         extra['description'] = targetpool.get('description')
         region = self.ex_get_region(targetpool['region'])
-        healthcheck_list = [self.ex_get_healthcheck(h.split('/')[-1]) for h
-                            in targetpool.get('healthChecks', [])]
+
+        healthcheck_list = []
+        for h in targetpool.get('healthChecks', []):
+            if healthchecks and h in healthchecks:
+                healthcheck_list.append(healthchecks[h])
+            else:
+                healthcheck_list.append(
+                    self.ex_get_healthcheck(h.split('/')[-1]))
+
         node_list = []
         for n in targetpool.get('instances', []):
+            if nodes and n in nodes:
+                node_list.append(nodes[n])
+                continue
+
             # Nodes that do not exist can be part of a target pool.  If the
             # node does not exist, use the URL of the node instead of the node
             # object.
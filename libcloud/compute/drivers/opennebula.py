@@ -39,6 +39,7 @@ from libcloud.common.base import ConnectionUserAndKey, XmlResponse
 from libcloud.compute.base import NodeImage, NodeSize, StorageVolume
 from libcloud.common.types import InvalidCredsError
 from libcloud.compute.providers import Provider
+from libcloud.utils.concurrency import run_concurrently
 
 __all__ = [
     'ACTION',
@@ -294,6 +295,14 @@ class OpenNebulaNodeDriver(NodeDriver):
         'DONE': NodeState.TERMINATED,
         'FAILED': NodeState.TERMINATED}
 
+    # Maximum number of resources which are retrieved at the same time when
+    # listing a collection which entries only contain links to resources
+    list_concurrency = 10
+
+    # True if the server includes complete resources in collections when
+    # they are requested with the "verbose" parameter
+    expanded_listing = False
+
     def __new__(cls, key, secret=None, api_version=DEFAULT_API_VERSION,
                 **kwargs):
         if cls is OpenNebulaNodeDriver:
@@ -370,10 +379,10 @@ class OpenNebulaNodeDriver(NodeDriver):
         return resp.status == httplib.OK
 
     def list_nodes(self):
-        return self._to_nodes(self.connection.request('/compute').object)
+        return self._to_nodes(self._get_collection('/compute'))
 
     def list_images(self, location=None):
-        return self._to_images(self.connection.request('/storage').object)
+        return self._to_images(self._get_collection('/storage'))
 
     def list_sizes(self, location=None):
         """
@@ -423,7 +432,7 @@ class OpenNebulaNodeDriver(NodeDriver):
                  compute node.
         :rtype:  ``list`` of :class:`OpenNebulaNetwork`
         """
-        return self._to_networks(self.connection.request('/network').object)
+        return self._to_networks(self._get_collection('/network'))
 
     def ex_node_action(self, node, action):
         """
@@ -476,14 +485,8 @@ class OpenNebulaNodeDriver(NodeDriver):
         :rtype:  ``list`` of :class:`NodeImage`
         :return: List of images.
         """
-        images = []
-        for element in object.findall('DISK'):
-            image_id = element.attrib['href'].partition('/storage/')[2]
-            image = self.connection.request(
-                ('/storage/%s' % (image_id))).object
-            images.append(self._to_image(image))
-
-        return images
+        return [self._to_image(image) for image in
+                self._get_collection_elements(object, 'DISK', 'storage')]
 
     def _to_image(self, image):
         """
@@ -514,14 +517,8 @@ class OpenNebulaNodeDriver(NodeDriver):
         :rtype:  ``list`` of :class:`OpenNebulaNetwork`
         :return: List of virtual networks.
         """
-        networks = []
-        for element in object.findall('NETWORK'):
-            network_id = element.attrib['href'].partition('/network/')[2]
-            network_element = self.connection.request(
-                ('/network/%s' % (network_id))).object
-            networks.append(self._to_network(network_element))
-
-        return networks
+        return [self._to_network(element) for element in
+                self._get_collection_elements(object, 'NETWORK', 'network')]
 
     def _to_network(self, element):
         """
@@ -552,14 +549,65 @@ class OpenNebulaNodeDriver(NodeDriver):
         :rtype:  ``list`` of :class:`Node`
         :return: A list of compute nodes.
         """
-        computes = []
-        for element in object.findall('COMPUTE'):
-            compute_id = element.attrib['href'].partition('/compute/')[2]
-            compute = self.connection.request(
-                ('/compute/%s' % (compute_id))).object
-            computes.append(self._to_node(compute))
+        return [self._to_node(compute) for compute in
+                self._get_collection_elements(object, 'COMPUTE', 'compute')]
+
+    def _get_collection(self, path):
+        """
+        Request a collection of resources.
+
+        If the server supports it, complete resources are requested so they
+        don't need to be retrieved one by one.
+
+        :type  path: ``str``
+        :param path: Path of the collection (e.g. ``/compute``).
+
+        :rtype:  :class:`ElementTree`
+        :return: XML representation of the collection.
+        """
+        params = {}
+
+        if self.expanded_listing:
+            params['verbose'] = 'true'
+
+        return self.connection.request(path, params=params).object
+
+    def _get_collection_elements(self, object, tag, path):
+        """
+        Return complete XML representations of the resources in a
+        collection (in the same order).
+
+        Entries of expanded collections are used as they are. Resources of
+        other entries are retrieved concurrently (up to ``list_concurrency``
+        at a time).
+
+        :type  object: :class:`ElementTree`
+        :param object: XML representation of the collection.
+
+        :type  tag: ``str``
+        :param tag: Tag of the collection entries (e.g. ``COMPUTE``).
+
+        :type  path: ``str``
+        :param path: Resource path (e.g. ``compute``).
+
+        :rtype:  ``list`` of :class:`ElementTree`
+        :return: XML representations of the resources.
+        """
+        elements = object.findall(tag)
+        indexes = [index for index, element in enumerate(elements)
+                   if element.find('ID') is None]
+
+        def get_element(index):
+            resource_id = elements[index].attrib['href'].partition(
+                '/%s/' % (path))[2]
+            return self.connection.request(
+                '/%s/%s' % (path, resource_id)).object
+
+        for index, future in run_concurrently(get_element, indexes,
+                                              self.list_concurrency):
+            elements[index] = future.result()
 
-        return computes
+        return elements
 
     def _to_node(self, compute):
         """
@@ -780,14 +828,8 @@ class OpenNebula_2_0_NodeDriver(OpenNebulaNodeDriver):
         :rtype:  ``list`` of :class:`NodeImage`
         :return: List of images.
         """
-        images = []
-        for element in object.findall('STORAGE'):
-            image_id = element.attrib["href"].partition("/storage/")[2]
-            image = self.connection.request(
-                ("/storage/%s" % (image_id))).object
-            images.append(self._to_image(image))
-
-        return images
+        return [self._to_image(image) for image in
+                self._get_collection_elements(object, 'STORAGE', 'storage')]
 
     def _to_image(self, image):
         """
@@ -1029,6 +1071,7 @@ class OpenNebula_3_2_NodeDriver(OpenNebula_3_0_NodeDriver):
     """
 
     name = 'OpenNebula (v3.2)'
+    expanded_listing = True
 
     def reboot_node(self, node):
         return self.ex_node_action(node, ACTION.REBOOT)
@@ -1193,7 +1236,7 @@ class OpenNebula_3_6_NodeDriver(OpenNebula_3_2_NodeDriver):
         return False
 
     def list_volumes(self):
-        return self._to_volumes(self.connection.request('/storage').object)
+        return self._to_volumes(self._get_collection('/storage'))
 
     def _to_volume(self, storage):
         return StorageVolume(id=storage.findtext('ID'),
@@ -1202,14 +1245,8 @@ class OpenNebula_3_6_NodeDriver(OpenNebula_3_2_NodeDriver):
                              driver=self.connection.driver)
 
     def _to_volumes(self, object):
-        volumes = []
-        for storage in object.findall('STORAGE'):
-            storage_id = storage.attrib['href'].partition('/storage/')[2]
-
-            volumes.append(self._to_volume(
-                self.connection.request('/storage/%s' % storage_id).object))
-
-        return volumes
+        return [self._to_volume(storage) for storage in
+                self._get_collection_elements(object, 'STORAGE', 'storage')]
 
 
 class OpenNebula_3_8_NodeDriver(OpenNebula_3_6_NodeDriver):
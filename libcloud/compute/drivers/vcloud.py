@@ -20,6 +20,7 @@ import sys
 import re
 import base64
 import os
+import threading
 from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import urlencode
 from libcloud.utils.py3 import urlparse
@@ -43,6 +44,8 @@ from libcloud.compute.providers import Provider
 from libcloud.compute.types import NodeState
 from libcloud.compute.base import Node, NodeDriver, NodeLocation
 from libcloud.compute.base import NodeSize, NodeImage
+from libcloud.utils.concurrency import Future, WorkerPool
+from libcloud.utils.concurrency import run_concurrently
 
 """
 From vcloud api "The VirtualQuantity element defines the number of MB
@@ -53,6 +56,13 @@ VIRTUAL_MEMORY_VALS = [512] + [1024 * i for i in range(1, 9)]
 # Default timeout (in seconds) for long running tasks
 DEFAULT_TASK_COMPLETION_TIMEOUT = 600
 
+# Initial and maximum number of seconds between two polls of a running task
+TASK_POLL_INTERVAL = 1
+TASK_MAX_POLL_INTERVAL = 20
+
+# Maximum number of tasks which are polled at the same time
+TASK_POLL_CONCURRENCY = 10
+
 DEFAULT_API_VERSION = '0.8'
 
 """
@@ -303,7 +313,8 @@ class VCloudResponse(XmlResponse):
 
     def success(self):
         return self.status in (httplib.OK, httplib.CREATED,
-                               httplib.NO_CONTENT, httplib.ACCEPTED)
+                               httplib.NO_CONTENT, httplib.ACCEPTED,
+                               httplib.NOT_MODIFIED)
 
 
 class VCloudConnection(ConnectionUserAndKey):
@@ -359,6 +370,196 @@ class VCloudConnection(ConnectionUserAndKey):
         return headers
 
 
+_task_tracker_lock = threading.Lock()
+
+
+class VCloudTaskTracker(object):
+
+    """
+    Waits for vCloud tasks to finish.
+
+    All the tracked tasks are scheduled by a single background thread (which
+    only runs while there are tasks to track) and polled by a pool of worker
+    threads. Each task is rescheduled as soon as its poll has finished and
+    is polled with its own interval which starts at ``poll_interval`` and
+    doubles after each poll up to ``max_poll_interval`` so short tasks are
+    noticed quickly and long running ones don't keep hammering the API.
+    """
+
+    def __init__(self, driver, poll_interval=TASK_POLL_INTERVAL,
+                 max_poll_interval=TASK_MAX_POLL_INTERVAL,
+                 max_workers=TASK_POLL_CONCURRENCY):
+        """
+        :param driver: Driver which is used to retrieve the tasks.
+        :type driver: :class:`VCloudNodeDriver`
+
+        :param poll_interval: Initial number of seconds between polls.
+        :type poll_interval: ``float``
+
+        :param max_poll_interval: Maximum number of seconds between polls.
+        :type max_poll_interval: ``float``
+
+        :param max_workers: Maximum number of tasks which are polled at the
+                            same time.
+        :type max_workers: ``int``
+        """
+        self.driver = driver
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_workers = max_workers
+        self._tasks = []
+        self._polling = 0
+        self._thread = None
+        self._condition = threading.Condition()
+
+    def track(self, task_href, timeout=DEFAULT_TASK_COMPLETION_TIMEOUT):
+        """
+        Start tracking a task.
+
+        :param task_href: Task href.
+        :type task_href: ``str``
+
+        :param timeout: Number of seconds after which the task is considered
+                        failed.
+        :type timeout: ``int``
+
+        :return: Future which result is the task element once the task has
+                 succeeded. If the task fails, is canceled or times out, the
+                 future raises an exception.
+        :rtype: :class:`libcloud.utils.concurrency.Future`
+        """
+        task = _TrackedTask(href=task_href, timeout=timeout,
+                            poll_interval=self.poll_interval)
+        self._add(task)
+        return task.future
+
+    def _add(self, task):
+        self._condition.acquire()
+        try:
+            self._tasks.append(task)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+
+            self._condition.notify()
+        finally:
+            self._condition.release()
+
+    def _run(self):
+        pool = WorkerPool(max_workers=self.max_workers)
+
+        try:
+            while True:
+                self._condition.acquire()
+                try:
+                    while True:
+                        if not self._tasks and not self._polling:
+                            self._thread = None
+                            return
+
+                        now = time.time()
+                        due = [task for task in self._tasks
+                               if task.next_poll <= now]
+
+                        if due:
+                            break
+
+                        timeout = None
+
+                        if self._tasks:
+                            next_poll = min([task.next_poll
+                                             for task in self._tasks])
+                            timeout = next_poll - now
+
+                        self._condition.wait(timeout)
+
+                    # Tasks which are still running are added back once
+                    # their poll has finished
+                    self._tasks = [task for task in self._tasks
+                                   if task not in due]
+                    self._polling += len(due)
+                finally:
+                    self._condition.release()
+
+                for task in due:
+                    pool.submit(self._poll, task)
+        finally:
+            # Workers might still be finishing their last poll, wait for them
+            # so no thread of the tracker outlives the scheduler
+            pool.shutdown(wait=True)
+
+    def _poll(self, task):
+        try:
+            self._update(task)
+        finally:
+            self._condition.acquire()
+            try:
+                self._polling -= 1
+                self._condition.notify()
+            finally:
+                self._condition.release()
+
+    def _update(self, task):
+        try:
+            element = self._get_finished_task(task)
+        except Exception:
+            task.future.set_exception(sys.exc_info())
+            return
+
+        if element is not None:
+            task.future.set_result(element)
+            return
+
+        task.next_poll = min(time.time() + task.poll_interval, task.deadline)
+        task.poll_interval = min(task.poll_interval * 2,
+                                 max(self.max_poll_interval,
+                                     self.poll_interval))
+        self._add(task)
+
+    def _get_finished_task(self, task):
+        """
+        Return the task element if the task has succeeded or None if it's
+        still running.
+        """
+        res = self.driver.connection.request(get_url_path(task.href))
+        status = res.object.get('status')
+
+        if status == 'success':
+            return res.object
+
+        if status == 'error':
+            # Get error reason from the response body
+            error_elem = res.object.find(fixxpath(res.object, 'Error'))
+            error_msg = "Unknown error"
+            if error_elem is not None:
+                error_msg = error_elem.get('message')
+            raise Exception("Error status returned by task %s.: %s"
+                            % (task.href, error_msg))
+
+        if status == 'canceled':
+            raise Exception("Canceled status returned by task %s."
+                            % task.href)
+
+        if time.time() >= task.deadline:
+            raise Exception("Timeout (%s sec) while waiting for task %s."
+                            % (task.timeout, task.href))
+
+        return None
+
+
+class _TrackedTask(object):
+
+    def __init__(self, href, timeout, poll_interval):
+        self.href = href
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.deadline = time.time() + timeout
+        self.next_poll = 0
+        self.future = Future()
+
+
 class VCloudNodeDriver(NodeDriver):
 
     """
@@ -372,6 +573,14 @@ class VCloudNodeDriver(NodeDriver):
     org = None
     _vdcs = None
 
+    # Maximum number of vApps which are retrieved at the same time
+    vapp_concurrency = 10
+
+    # Retrieved vApps (ETag and XML element) per vDC and vApp href
+    _vapp_cache = None
+
+    _task_tracker = None
+
     NODE_STATE_MAP = {'0': NodeState.PENDING,
                       '1': NodeState.PENDING,
                       '2': NodeState.PENDING,
@@ -498,29 +707,101 @@ class VCloudNodeDriver(NodeDriver):
 
         return catalogs
 
+    @property
+    def task_tracker(self):
+        """
+        Tracker which polls all the tasks this driver is waiting for.
+
+        :rtype: :class:`VCloudTaskTracker`
+        """
+        if self._task_tracker is None:
+            _task_tracker_lock.acquire()
+            try:
+                if self._task_tracker is None:
+                    self._task_tracker = VCloudTaskTracker(driver=self)
+            finally:
+                _task_tracker_lock.release()
+
+        return self._task_tracker
+
+    def ex_track_task(self, task_href,
+                      timeout=DEFAULT_TASK_COMPLETION_TIMEOUT):
+        """
+        Start waiting for a task without blocking.
+
+        :param task_href: Task href (e.g. ``res.object.get('href')`` of a
+                          response to an operation).
+        :type task_href: ``str``
+
+        :param timeout: Number of seconds to wait for the task.
+        :type timeout: ``int``
+
+        :return: Future which result is the task element once the task has
+                 succeeded.
+        :rtype: :class:`libcloud.utils.concurrency.Future`
+        """
+        return self.task_tracker.track(task_href=task_href, timeout=timeout)
+
+    def ex_wait_for_tasks(self, task_hrefs,
+                          timeout=DEFAULT_TASK_COMPLETION_TIMEOUT):
+        """
+        Block until all the provided tasks have succeeded. Tasks are polled
+        together.
+
+        :param task_hrefs: Task hrefs.
+        :type task_hrefs: ``list`` of ``str``
+
+        :param timeout: Number of seconds to wait for each task.
+        :type timeout: ``int``
+        """
+        futures = [self.ex_track_task(task_href=task_href, timeout=timeout)
+                   for task_href in task_hrefs]
+        self._wait_for_futures(futures)
+
+    def _wait_for_futures(self, futures):
+        # All the tasks are waited for (even if one of them fails) so they
+        # are not left running in the background unnoticed
+        errors = [future.exception() for future in futures]
+        errors = [error for error in errors if error is not None]
+
+        if errors:
+            raise errors[0]
+
     def _wait_for_task_completion(self, task_href,
                                   timeout=DEFAULT_TASK_COMPLETION_TIMEOUT):
-        start_time = time.time()
-        res = self.connection.request(get_url_path(task_href))
-        status = res.object.get('status')
-        while status != 'success':
-            if status == 'error':
-                # Get error reason from the response body
-                error_elem = res.object.find(fixxpath(res.object, 'Error'))
-                error_msg = "Unknown error"
-                if error_elem is not None:
-                    error_msg = error_elem.get('message')
-                raise Exception("Error status returned by task %s.: %s"
-                                % (task_href, error_msg))
-            if status == 'canceled':
-                raise Exception("Canceled status returned by task %s."
-                                % task_href)
-            if (time.time() - start_time >= timeout):
-                raise Exception("Timeout (%s sec) while waiting for task %s."
-                                % (timeout, task_href))
-            time.sleep(5)
-            res = self.connection.request(get_url_path(task_href))
-            status = res.object.get('status')
+        self.ex_track_task(task_href=task_href, timeout=timeout).result()
+
+    def ex_destroy_nodes(self, nodes, max_workers=None):
+        """
+        Destroy multiple nodes at the same time.
+
+        Tasks started for all the nodes are polled together by
+        :attr:`task_tracker`.
+
+        :param nodes: Nodes to destroy.
+        :type nodes: ``list`` of :class:`Node`
+
+        :param max_workers: Maximum number of nodes which are destroyed at
+                            the same time (defaults to
+                            ``batch_concurrency``).
+        :type max_workers: ``int``
+
+        :return: List of results of :meth:`destroy_node` (or exceptions
+                 which have been thrown) in the same order as ``nodes``.
+        :rtype: ``list``
+        """
+        results = [None] * len(nodes)
+
+        def destroy(index):
+            return self.destroy_node(nodes[index])
+
+        indexes = range(len(nodes))
+
+        for index, result, error in self._run_batch(destroy, indexes,
+                                                    max_workers):
+            results[index] = error if error is not None else result
+
+        return results
 
     def destroy_node(self, node):
         node_path = get_url_path(node.id)
@@ -558,7 +839,7 @@ class VCloudNodeDriver(NodeDriver):
     def list_nodes(self):
         return self.ex_list_nodes()
 
-    def ex_list_nodes(self, vdcs=None):
+    def ex_list_nodes(self, vdcs=None, max_workers=None):
         """
         List all nodes across all vDCs. Using 'vdcs' you can specify which vDCs
         should be queried.
@@ -567,43 +848,123 @@ class VCloudNodeDriver(NodeDriver):
                      will be queried.
         :type vdcs: :class:`Vdc`
 
+        :param max_workers: Maximum number of vApps which are retrieved at
+                            the same time (defaults to ``vapp_concurrency``).
+        :type max_workers: ``int``
+
         :rtype: ``list`` of :class:`Node`
         """
+        nodes = list(self._iterate_vapp_nodes(vdcs=vdcs,
+                                              max_workers=max_workers))
+
+        # Nodes are returned in the same order as vApps are listed in vDCs
+        nodes.sort(key=lambda item: item[0])
+        return [node for _, node in nodes]
+
+    def ex_iterate_nodes(self, vdcs=None, max_workers=None):
+        """
+        Return a generator which yields nodes as soon as their vApps have
+        been retrieved.
+
+        vApps are retrieved concurrently. vApps which haven't changed since
+        the previous listing (based on their ETag) are not transferred again.
+
+        @inherits: :class:`VCloudNodeDriver.ex_list_nodes`
+
+        :rtype: ``generator`` of :class:`Node`
+        """
+        for _, node in self._iterate_vapp_nodes(vdcs=vdcs,
+                                                max_workers=max_workers):
+            yield node
+
+    def _iterate_vapp_nodes(self, vdcs=None, max_workers=None):
+        """
+        Yield (index, node) tuples in the order the vApps are retrieved.
+        """
         if not vdcs:
             vdcs = self.vdcs
         if not isinstance(vdcs, (list, tuple)):
             vdcs = [vdcs]
-        nodes = []
+
+        if self._vapp_cache is None:
+            self._vapp_cache = {}
+
+        items = []
         for vdc in vdcs:
             res = self.connection.request(get_url_path(vdc.id))
             elms = res.object.findall(fixxpath(
                 res.object, "ResourceEntities/ResourceEntity")
             )
-            vapps = [
-                (i.get('name'), i.get('href'))
+            vapp_hrefs = [
+                i.get('href')
                 for i in elms
                 if i.get('type') == 'application/vnd.vmware.vcloud.vApp+xml'
                 and i.get('name')
             ]
 
-            for vapp_name, vapp_href in vapps:
-                try:
-                    res = self.connection.request(
-                        get_url_path(vapp_href),
-                        headers={'Content-Type':
-                                 'application/vnd.vmware.vcloud.vApp+xml'}
-                    )
-                    nodes.append(self._to_node(res.object))
-                except Exception:
-                    # The vApp was probably removed since the previous vDC
-                    # query, ignore
-                    e = sys.exc_info()[1]
-                    if not (e.args[0].tag.endswith('Error') and
-                            e.args[0].get('minorErrorCode') ==
-                            'ACCESS_TO_RESOURCE_IS_FORBIDDEN'):
-                        raise
+            # vApps which are not in the vDC anymore are removed from the
+            # cache
+            old_cache = self._vapp_cache.get(vdc.id, {})
+            cache = dict([(href, old_cache[href]) for href in vapp_hrefs
+                          if href in old_cache])
+            self._vapp_cache[vdc.id] = cache
+
+            for vapp_href in vapp_hrefs:
+                items.append((len(items), vapp_href, cache))
+
+        def get_node(item):
+            _, vapp_href, cache = item
+            return self._get_vapp_node(vapp_href=vapp_href, cache=cache)
+
+        max_workers = max_workers or self.vapp_concurrency
 
-        return nodes
+        for item, future in run_concurrently(get_node, items, max_workers):
+            node = future.result()
+
+            if node is not None:
+                yield item[0], node
+
+    def _get_vapp_node(self, vapp_href, cache):
+        """
+        Retrieve a vApp (unless it hasn't changed since it has been cached)
+        and return it as a node.
+
+        :return: Node or ``None`` if the vApp is not accessible anymore.
+        :rtype: :class:`Node`
+        """
+        headers = {'Content-Type': 'application/vnd.vmware.vcloud.vApp+xml'}
+        cached = cache.get(vapp_href, None)
+
+        if cached:
+            headers['If-None-Match'] = cached[0]
+
+        try:
+            res = self.connection.request(get_url_path(vapp_href),
+                                          headers=headers)
+        except Exception:
+            # The vApp was probably removed since the previous vDC
+            # query, ignore
+            e = sys.exc_info()[1]
+            if not (e.args[0].tag.endswith('Error') and
+                    e.args[0].get('minorErrorCode') ==
+                    'ACCESS_TO_RESOURCE_IS_FORBIDDEN'):
+                raise
+
+            cache.pop(vapp_href, None)
+            return None
+
+        if res.status == httplib.NOT_MODIFIED and cached:
+            elm = cached[1]
+        else:
+            elm = res.object
+            etag = res.headers.get('etag', None)
+
+            if etag:
+                cache[vapp_href] = (etag, elm)
+            else:
+                cache.pop(vapp_href, None)
+
+        return self._to_node(elm)
 
     def _to_size(self, ram):
         ns = NodeSize(
@@ -1778,6 +2139,8 @@ class VCloud_1_5_NodeDriver(VCloudNodeDriver):
             return
 
         vms = self._get_vm_elements(vapp_or_vm_id)
+        # Changes of all the VMs are started first and waited for together
+        futures = []
         for vm in vms:
             # Get virtualHardwareSection/cpu section
             res = self.connection.request(
@@ -1797,13 +2160,16 @@ class VCloud_1_5_NodeDriver(VCloudNodeDriver):
                 method='PUT',
                 headers=headers
             )
-            self._wait_for_task_completion(res.object.get('href'))
+            futures.append(self.ex_track_task(res.object.get('href')))
+
+        self._wait_for_futures(futures)
 
     def _change_vm_memory(self, vapp_or_vm_id, vm_memory):
         if vm_memory is None:
             return
 
         vms = self._get_vm_elements(vapp_or_vm_id)
+        futures = []
         for vm in vms:
             # Get virtualHardwareSection/memory section
             res = self.connection.request(
@@ -1825,7 +2191,9 @@ class VCloud_1_5_NodeDriver(VCloudNodeDriver):
                 method='PUT',
                 headers=headers
             )
-            self._wait_for_task_completion(res.object.get('href'))
+            futures.append(self.ex_track_task(res.object.get('href')))
+
+        self._wait_for_futures(futures)
 
     def _add_vm_disk(self, vapp_or_vm_id, vm_disk):
         if vm_disk is None:
@@ -1835,6 +2203,7 @@ class VCloud_1_5_NodeDriver(VCloudNodeDriver):
                    'CIM_ResourceAllocationSettingData}')
 
         vms = self._get_vm_elements(vapp_or_vm_id)
+        futures = []
         for vm in vms:
             # Get virtualHardwareSection/disks section
             res = self.connection.request(
@@ -1874,7 +2243,9 @@ class VCloud_1_5_NodeDriver(VCloudNodeDriver):
                 method='PUT',
                 headers=headers
             )
-            self._wait_for_task_completion(res.object.get('href'))
+            futures.append(self.ex_track_task(res.object.get('href')))
+
+        self._wait_for_futures(futures)
 
     def _change_vm_script(self, vapp_or_vm_id, vm_script):
         if vm_script is None:
@@ -1936,6 +2307,7 @@ class VCloud_1_5_NodeDriver(VCloudNodeDriver):
 
         vms = self._get_vm_elements(vapp_or_vm_id)
 
+        futures = []
         for vm in vms:
             res = self.connection.request(
                 '%s/networkConnectionSection' % get_url_path(vm.get('href')))
@@ -1955,7 +2327,9 @@ class VCloud_1_5_NodeDriver(VCloudNodeDriver):
                 method='PUT',
                 headers=headers
             )
-            self._wait_for_task_completion(res.object.get('href'))
+            futures.append(self.ex_track_task(res.object.get('href')))
+
+        self._wait_for_futures(futures)
 
     def _get_network_href(self, network_name):
         network_href = None
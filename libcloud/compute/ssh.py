@@ -29,7 +29,8 @@ except ImportError:
 # Ref: https://bugs.launchpad.net/paramiko/+bug/392973
 
 import os
-import time
+import codecs
+import select
 import subprocess
 import logging
 
@@ -37,12 +38,18 @@ from os.path import split as psplit
 from os.path import join as pjoin
 
 from libcloud.utils.logging import ExtraLogFormatter
+from libcloud.utils.py3 import PY3
+from libcloud.utils.py3 import b
 from libcloud.utils.py3 import StringIO
 
 
 # Maximum number of bytes to read at once from a socket
 CHUNK_SIZE = 1024
 
+# Maximum number of seconds to wait for a channel to become readable before
+# exit status is checked again
+SELECT_TIMEOUT = 0.5
+
 
 class BaseSSHClient(object):
     """
@@ -259,10 +266,20 @@ class ParamikoSSHClient(BaseSSHClient):
         sftp.close()
         return True
 
-    def run(self, cmd):
+    def run(self, cmd, stdout_callback=None, stderr_callback=None):
         """
         Note: This function is based on paramiko's exec_command()
         method.
+
+        :param stdout_callback: Optional function which is called with each
+                                chunk of the standard output as it arrives.
+                                If provided, standard output is not buffered
+                                and an empty string is returned instead.
+        :type stdout_callback: ``callable``
+
+        :param stderr_callback: Same as ``stdout_callback``, but for the
+                                standard error.
+        :type stderr_callback: ``callable``
         """
         extra = {'_cmd': cmd}
         self.logger.debug('Executing command', extra=extra)
@@ -278,6 +295,11 @@ class ParamikoSSHClient(BaseSSHClient):
         stdout = StringIO()
         stderr = StringIO()
 
+        stdout_write = stdout_callback or stdout.write
+        stderr_write = stderr_callback or stderr.write
+        stdout_decoder = self._get_decoder()
+        stderr_decoder = self._get_decoder()
+
         # Create a stdin file and immediately close it to prevent any
         # interactive script from hanging the process.
         stdin = chan.makefile('wb', bufsize)
@@ -291,53 +313,71 @@ class ParamikoSSHClient(BaseSSHClient):
         # Note #2: If you are going to remove "ready" checks inside the loop
         # you are going to have a bad time. Trying to consume from a channel
         # which is not ready will block for indefinitely.
-        exit_status_ready = chan.exit_status_ready()
+        while True:
+            # Exit status and EOF need to be checked before the output is
+            # consumed, otherwise output which arrives in between could be
+            # lost.
+            finished = chan.exit_status_ready() or chan.eof_received
+
+            self._consume_output(chan.recv_ready, chan.recv,
+                                 stdout_decoder, stdout_write)
+            self._consume_output(chan.recv_stderr_ready, chan.recv_stderr,
+                                 stderr_decoder, stderr_write)
+
+            if finished:
+                break
 
-        while not exit_status_ready:
-            if chan.recv_ready():
-                data = chan.recv(CHUNK_SIZE)
+            # Wait until more output is available or the channel is closed
+            # instead of sleeping for a fixed interval
+            select.select([chan], [], [], SELECT_TIMEOUT)
 
-                while data:
-                    stdout.write(data)
-                    ready = chan.recv_ready()
+        # Flush incomplete multi-byte sequences left at the end of the output
+        self._flush_decoder(stdout_decoder, stdout_write)
+        self._flush_decoder(stderr_decoder, stderr_write)
 
-                    if not ready:
-                        break
+        # Receive the exit status code of the command we ran.
+        status = chan.recv_exit_status()
 
-                    data = chan.recv(CHUNK_SIZE)
+        stdout = stdout.getvalue()
+        stderr = stderr.getvalue()
 
-            if chan.recv_stderr_ready():
-                data = chan.recv_stderr(CHUNK_SIZE)
+        extra = {'_status': status, '_stdout': stdout, '_stderr': stderr}
+        self.logger.debug('Command finished', extra=extra)
 
-                while data:
-                    stderr.write(data)
-                    ready = chan.recv_stderr_ready()
+        return [stdout, stderr, status]
 
-                    if not ready:
-                        break
+    def _consume_output(self, ready_func, recv_func, decoder, write_func):
+        """
+        Read all the data which is currently available on a channel stream
+        and pass it to write_func.
+        """
+        while ready_func():
+            data = recv_func(CHUNK_SIZE)
 
-                    data = chan.recv_stderr(CHUNK_SIZE)
+            if not data:
+                break
 
-            # We need to check the exist status here, because the command could
-            # print some output and exit during this sleep bellow.
-            exit_status_ready = chan.exit_status_ready()
+            if decoder:
+                data = decoder.decode(data)
 
-            if exit_status_ready:
-                break
+            write_func(data)
 
-            # Short sleep to prevent busy waiting
-            time.sleep(1.5)
+    def _flush_decoder(self, decoder, write_func):
+        if not decoder:
+            return
 
-        # Receive the exit status code of the command we ran.
-        status = chan.recv_exit_status()
+        data = decoder.decode(b(''), final=True)
 
-        stdout = stdout.getvalue()
-        stderr = stderr.getvalue()
+        if data:
+            write_func(data)
 
-        extra = {'_status': status, '_stdout': stdout, '_stderr': stderr}
-        self.logger.debug('Command finished', extra=extra)
+    def _get_decoder(self):
+        if not PY3:
+            return None
 
-        return [stdout, stderr, status]
+        # Incremental decoder handles multi-byte characters which are split
+        # across multiple chunks
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
 
     def close(self):
         self.logger.debug('Closing server connection')
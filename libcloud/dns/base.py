@@ -20,10 +20,13 @@ import datetime
 from libcloud import __version__
 from libcloud.common.base import ConnectionUserAndKey, BaseDriver
 from libcloud.dns.types import RecordType
+from libcloud.dns.bind import iterate_bind_records
+from libcloud.utils.concurrency import WorkerPool, run_concurrently
 
 __all__ = [
     'Zone',
     'Record',
+    'ZoneDiff',
     'DNSDriver'
 ]
 
@@ -77,10 +80,18 @@ class Zone(object):
     def export_to_bind_format(self):
         return self.driver.export_zone_to_bind_format(zone=self)
 
+    def reconcile(self, records, dry_run=False, **kwargs):
+        return self.driver.reconcile_zone(zone=self, records=records,
+                                          dry_run=dry_run, **kwargs)
+
     def export_to_bind_zone_file(self, file_path):
         self.driver.export_zone_to_bind_zone_file(zone=self,
                                                   file_path=file_path)
 
+    def import_from_bind_zone_file(self, file_path, **kwargs):
+        return self.driver.import_zone_from_bind_zone_file(
+            zone=self, file_path=file_path, **kwargs)
+
     def __repr__(self):
         return ('<Zone: domain=%s, ttl=%s, provider=%s ...>' %
                 (self.domain, self.ttl, self.driver.name))
@@ -144,6 +155,46 @@ class Record(object):
                  self.driver.name))
 
 
+class ZoneDiff(object):
+    """
+    Changes which are needed to turn records of a zone into a desired set of
+    records.
+
+    Desired records are represented as (name, type, data, extra) tuples.
+    """
+
+    def __init__(self, zone, create, update, delete, unchanged):
+        """
+        :param create: Desired records which need to be created.
+        :type create: ``list`` of ``tuple``
+
+        :param update: (existing record, desired record) tuples of records
+                       which need to be updated.
+        :type update: ``list`` of ``tuple``
+
+        :param delete: Existing records which need to be deleted.
+        :type delete: ``list`` of :class:`Record`
+
+        :param unchanged: Existing records which already match the desired
+                          records.
+        :type unchanged: ``list`` of :class:`Record`
+        """
+        self.zone = zone
+        self.create = create
+        self.update = update
+        self.delete = delete
+        self.unchanged = unchanged
+
+    def __len__(self):
+        return len(self.create) + len(self.update) + len(self.delete)
+
+    def __repr__(self):
+        return ('<ZoneDiff: zone=%s, create=%s, update=%s, delete=%s, '
+                'unchanged=%s>' %
+                (self.zone.domain, len(self.create), len(self.update),
+                 len(self.delete), len(self.unchanged)))
+
+
 class DNSDriver(BaseDriver):
     """
     A base DNSDriver class to derive from
@@ -154,6 +205,11 @@ class DNSDriver(BaseDriver):
     name = None
     website = None
 
+    # Maximum number of record changes which are applied at the same time by
+    # reconcile_zone and import_zone_from_bind_* on drivers which don't
+    # support batch changes
+    record_change_concurrency = 8
+
     def __init__(self, key, secret=None, secure=True, host=None, port=None,
                  **kwargs):
         """
@@ -378,6 +434,53 @@ class DNSDriver(BaseDriver):
         raise NotImplementedError(
             'delete_record not implemented for this driver')
 
+    def reconcile_zone(self, zone, records, dry_run=False,
+                       ignore_types=None, max_workers=None):
+        """
+        Make records of the provided zone match the desired records by
+        applying only the changes which are needed.
+
+        Existing and desired records are matched on (name, type, data). A
+        matched record is updated if any of the extra attributes of the
+        desired record (e.g. ``ttl``) differ. Remaining desired and existing
+        records with the same name and type are paired into updates, the
+        rest is created or deleted.
+
+        :param zone: Zone to reconcile.
+        :type  zone: :class:`Zone`
+
+        :param records: Desired records - :class:`Record` like objects or
+                        (name, type, data[, extra]) tuples.
+        :type  records: ``list``
+
+        :param dry_run: True to only compute the changes without applying
+                        them.
+        :type  dry_run: ``bool``
+
+        :param ignore_types: Existing records of these types are never
+                             deleted or updated unless they match a desired
+                             record (defaults to NS and SOA).
+        :type  ignore_types: ``list`` of :class:`RecordType`
+
+        :param max_workers: Maximum number of changes which are applied at
+                            the same time (defaults to
+                            ``record_change_concurrency``).
+        :type  max_workers: ``int``
+
+        :return: Changes which have been (or would be) applied.
+        :rtype: :class:`ZoneDiff`
+        """
+        if ignore_types is None:
+            ignore_types = [RecordType.NS, RecordType.SOA]
+
+        diff = self._get_zone_diff(zone=zone, records=records,
+                                   ignore_types=ignore_types)
+
+        if not dry_run and len(diff):
+            self._apply_zone_diff(diff=diff, max_workers=max_workers)
+
+        return diff
+
     def export_zone_to_bind_format(self, zone):
         """
         Export Zone object to the BIND compatible format.
@@ -391,20 +494,12 @@ class DNSDriver(BaseDriver):
         if zone.type != 'master':
             raise ValueError('You can only generate BIND out for master zones')
 
-        lines = []
+        lines = self._get_bind_header_lines(zone=zone)
 
         # For consistent output, records are sorted based on the id
         records = zone.list_records()
         records = sorted(records, key=Record._get_numeric_id)
 
-        date = datetime.datetime.now().strftime('%Y-%m-%d %H:%m:%S')
-        values = {'version': __version__, 'date': date}
-
-        lines.append('; Generated by Libcloud v%(version)s on %(date)s' %
-                     values)
-        lines.append('$ORIGIN %(domain)s.' % {'domain': zone.domain})
-        lines.append('$TTL %(domain_ttl)s\n' % {'domain_ttl': zone.ttl})
-
         for record in records:
             line = self._get_bind_record_line(record=record)
             lines.append(line)
@@ -423,10 +518,171 @@ class DNSDriver(BaseDriver):
         :param file_path: File path where the output will be saved.
         :type  file_path: ``str``
         """
-        result = self.export_zone_to_bind_format(zone=zone)
-
         with open(file_path, 'w') as fp:
-            fp.write(result)
+            self.export_zone_to_bind_stream(zone=zone, stream=fp)
+
+    def export_zone_to_bind_stream(self, zone, stream):
+        """
+        Export Zone object to the BIND compatible format and write result to a
+        file-like object.
+
+        Records are written as they are retrieved from the provider (in the
+        order in which the provider returns them) so the whole zone is never
+        held in memory.
+
+        :param zone: Zone to export.
+        :type  zone: :class:`Zone`
+
+        :param stream: File-like object opened for writing.
+        :type  stream: ``file``
+        """
+        if zone.type != 'master':
+            raise ValueError('You can only generate BIND out for master zones')
+
+        stream.write('\n'.join(self._get_bind_header_lines(zone=zone)))
+
+        for record in self._iterate_zone_records(zone=zone):
+            stream.write('\n' + self._get_bind_record_line(record=record))
+
+    def import_zone_from_bind_zone_file(self, zone, file_path,
+                                        ignore_types=None, max_workers=None):
+        """
+        Create records from a zone file in the BIND format.
+
+        :param zone: Zone to create the records in.
+        :type  zone: :class:`Zone`
+
+        :param file_path: Path to the zone file.
+        :type  file_path: ``str``
+
+        :return: Number of created records.
+        :rtype: ``int``
+        """
+        with open(file_path, 'r') as fp:
+            return self.import_zone_from_bind_stream(
+                zone=zone, stream=fp, ignore_types=ignore_types,
+                max_workers=max_workers)
+
+    def import_zone_from_bind_stream(self, zone, stream, ignore_types=None,
+                                     max_workers=None):
+        """
+        Create records from a zone file in the BIND format which is read from
+        a file-like object.
+
+        The zone file is parsed incrementally and records are created while
+        it's being parsed so zones of any size can be imported. Drivers which
+        support batch changes create records in batches, other drivers create
+        up to ``max_workers`` records at the same time.
+
+        :param zone: Zone to create the records in.
+        :type  zone: :class:`Zone`
+
+        :param stream: File-like object (or any iterable of lines).
+        :type  stream: ``file``
+
+        :param ignore_types: Records of these types are skipped (defaults to
+                             NS and SOA which are managed by the provider).
+        :type  ignore_types: ``list`` of :class:`RecordType`
+
+        :param max_workers: Maximum number of records which are created at
+                            the same time (defaults to
+                            ``record_change_concurrency``).
+        :type  max_workers: ``int``
+
+        :return: Number of created records.
+        :rtype: ``int``
+        """
+        if ignore_types is None:
+            ignore_types = [RecordType.NS, RecordType.SOA]
+
+        records = self._iterate_bind_zone_records(zone=zone, lines=stream,
+                                                  ignore_types=ignore_types)
+        return self._create_records(zone=zone, records=records,
+                                    max_workers=max_workers)
+
+    def _get_bind_header_lines(self, zone):
+        date = datetime.datetime.now().strftime('%Y-%m-%d %H:%m:%S')
+        values = {'version': __version__, 'date': date}
+
+        lines = []
+        lines.append('; Generated by Libcloud v%(version)s on %(date)s' %
+                     values)
+        lines.append('$ORIGIN %(domain)s.' % {'domain': zone.domain})
+        lines.append('$TTL %(domain_ttl)s\n' % {'domain_ttl': zone.ttl})
+        return lines
+
+    def _iterate_zone_records(self, zone):
+        """
+        Return an iterator over the zone records which uses iterate_records
+        if the driver implements it.
+        """
+        if getattr(self.iterate_records, '__func__', None) is \
+                getattr(DNSDriver.iterate_records, '__func__',
+                        DNSDriver.iterate_records):
+            return iter(zone.list_records())
+
+        return self.iterate_records(zone)
+
+    def _iterate_bind_zone_records(self, zone, lines, ignore_types):
+        """
+        Yield (name, type, data, extra) tuples for records of a zone file with
+        names relative to the zone domain.
+        """
+        domain = zone.domain.rstrip('.')
+        suffix = '.' + domain
+
+        for name, type, data, extra in iterate_bind_records(
+                lines=lines, origin=domain, default_ttl=zone.ttl):
+            if type in ignore_types:
+                continue
+
+            if name == domain:
+                name = ''
+            elif name.endswith(suffix):
+                name = name[:-len(suffix)]
+            else:
+                raise ValueError('Record %s doesn\'t belong to zone %s' %
+                                 (name, domain))
+
+            yield name, type, data, extra
+
+    def _create_records(self, zone, records, max_workers=None):
+        """
+        Create records which are yielded by the provided iterable, up to
+        max_workers at the same time.
+
+        Drivers which support batch changes should override this method.
+
+        :return: Number of created records.
+        :rtype: ``int``
+        """
+        max_workers = max_workers or self.record_change_concurrency
+        pool = WorkerPool(max_workers=max_workers, max_pending=max_workers)
+        failed = []
+        count = 0
+
+        def on_done(future):
+            if future.exception() is not None:
+                failed.append(future)
+
+        try:
+            for name, type, data, extra in records:
+                # Stop as soon as one of the records couldn't be created
+                if failed:
+                    break
+
+                future = pool.submit(self.create_record, name=name,
+                                     zone=zone, type=type, data=data,
+                                     extra=extra)
+                future.add_done_callback(on_done)
+                count += 1
+        finally:
+            pool.shutdown(wait=True)
+
+        if failed:
+            raise failed[0].exception()
+
+        return count
 
     def _get_bind_record_line(self, record):
         """
@@ -465,7 +721,14 @@ class DNSDriver(BaseDriver):
             # Quote the string
             data = '"%s"' % (data)
 
-        if record.type in [RecordType.MX, RecordType.SRV]:
+        if record.type == RecordType.SRV and 'weight' in record.extra and \
+                'port' in record.extra:
+            # Driver stores weight and port separately from the target
+            priority = str(record.extra['priority'])
+            parts = [name, ttl, 'IN', record.type, priority,
+                     str(record.extra['weight']), str(record.extra['port']),
+                     data]
+        elif record.type in [RecordType.MX, RecordType.SRV]:
             priority = str(record.extra['priority'])
             parts = [name, ttl, 'IN', record.type, priority, data]
         else:
@@ -474,6 +737,129 @@ class DNSDriver(BaseDriver):
         line = '\t'.join(parts)
         return line
 
+    def _get_zone_diff(self, zone, records, ignore_types):
+        desired = [self._to_desired_record(record) for record in records]
+
+        # Index of the existing records which haven't been matched yet
+        existing = {}
+
+        for record in self.list_records(zone):
+            key = (record.name, record.type, record.data)
+            existing.setdefault(key, []).append(record)
+
+        create, update, unchanged = [], [], []
+
+        for item in desired:
+            name, type, data, extra = item
+            matches = existing.get((name, type, data))
+
+            if not matches:
+                create.append(item)
+                continue
+
+            record = matches.pop(0)
+
+            if self._is_record_modified(record=record, extra=extra):
+                update.append((record, item))
+            else:
+                unchanged.append(record)
+
+        # Pair records which need to be created with the left over existing
+        # records of the same name and type so they can be updated in place
+        remaining = {}
+
+        for matches in existing.values():
+            for record in matches:
+                if record.type in ignore_types:
+                    # Records which are ignored are left as they are
+                    unchanged.append(record)
+                    continue
+
+                key = (record.name, record.type)
+                remaining.setdefault(key, []).append(record)
+
+        created = []
+
+        for item in create:
+            candidates = remaining.get((item[0], item[1]))
+
+            if candidates:
+                update.append((candidates.pop(0), item))
+            else:
+                created.append(item)
+
+        delete = []
+
+        for matches in remaining.values():
+            delete.extend(matches)
+
+        return ZoneDiff(zone=zone, create=created, update=update,
+                        delete=delete, unchanged=unchanged)
+
+    def _apply_zone_diff(self, diff, max_workers=None):
+        """
+        Apply changes using bounded concurrency.
+
+        Deletions are applied first and creations last so a record can be
+        replaced by a record of a conflicting type (e.g. CNAME by A).
+
+        Drivers which support batch changes should override this method.
+        """
+        max_workers = max_workers or self.record_change_concurrency
+        zone = diff.zone
+
+        deletions = [(self.delete_record, {'record': record})
+                     for record in diff.delete]
+        updates = [(self.update_record,
+                    {'record': record, 'name': name, 'type': type,
+                     'data': data, 'extra': extra})
+                   for record, (name, type, data, extra) in diff.update]
+        creations = [(self.create_record,
+                      {'name': name, 'zone': zone, 'type': type,
+                       'data': data, 'extra': extra})
+                     for name, type, data, extra in diff.create]
+
+        def apply_change(item):
+            func, kwargs = item[1]
+            return func(**kwargs)
+
+        for changes in [deletions, updates, creations]:
+            errors = []
+
+            for item, future in run_concurrently(apply_change,
+                                                 enumerate(changes),
+                                                 max_workers=max_workers):
+                if future.exception() is not None:
+                    errors.append((item[0], future.exception()))
+
+            if errors:
+                # Raise the error of the first failed change
+                raise min(errors, key=lambda error: error[0])[1]
+
+    def _to_desired_record(self, record):
+        """
+        Return (name, type, data, extra) tuple for the provided Record like
+        object or tuple.
+        """
+        if hasattr(record, 'name') and hasattr(record, 'data'):
+            return (record.name, record.type, record.data,
+                    record.extra or {})
+
+        if len(record) == 3:
+            name, type, data = record
+            extra = None
+        else:
+            name, type, data, extra = record
+
+        return (name, type, data, extra or {})
+
+    def _is_record_modified(self, record, extra):
+        for key, value in extra.items():
+            if record.extra.get(key) != value:
+                return True
+
+        return False
+
     def _string_to_record_type(self, string):
         """
         Return a string representation of a DNS record type to a
@@ -0,0 +1,285 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Streaming parser for zone files in the BIND (RFC 1035 master file) format.
+"""
+
+from libcloud.dns.types import RecordType
+
+__all__ = [
+    'BindParseError',
+    'iterate_bind_records'
+]
+
+RECORD_CLASSES = ['IN', 'CH', 'HS', 'CS']
+
+# Types of records whose data is a single domain name
+NAME_RECORD_TYPES = ['CNAME', 'DNAME', 'MX', 'NS', 'PTR', 'SRV']
+
+TTL_UNITS = {
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60,
+    'w': 7 * 24 * 60 * 60
+}
+
+
+class BindParseError(ValueError):
+    def __init__(self, value, line_number):
+        self.value = value
+        self.line_number = line_number
+        super(BindParseError, self).__init__(value, line_number)
+
+    def __str__(self):
+        return 'Line %s: %s' % (self.line_number, self.value)
+
+
+def iterate_bind_records(lines, origin, default_ttl=None):
+    """
+    Parse a zone file and yield its records one by one so a zone file of any
+    size can be processed without loading it into memory.
+
+    Supported are ``$ORIGIN`` and ``$TTL`` directives, comments, multi-line
+    records in parentheses, quoted strings, ``@`` and relative names and
+    records without an owner (which use the owner of the previous record).
+
+    Priority (and weight and port for SRV records) is removed from the record
+    data and stored in the extra attributes the same way drivers do it.
+
+    :param lines: Iterable which yields lines of the zone file (e.g. a file
+                  object).
+
+    :param origin: Initial origin used for relative names (usually the zone
+                   domain).
+    :type origin: ``str``
+
+    :param default_ttl: TTL of records which don't specify one.
+    :type default_ttl: ``int``
+
+    :return: Generator of (fully qualified name without the trailing dot,
+             record type, data, extra) tuples.
+    :rtype: ``generator``
+    """
+    origin = _get_absolute_name(origin, '.')
+    owner = None
+    last_ttl = None
+
+    for line_number, tokens, has_owner in _iterate_entries(lines):
+        if tokens[0][0] == '$ORIGIN':
+            origin = _get_absolute_name(tokens[1][0], origin)
+            continue
+        elif tokens[0][0] == '$TTL':
+            default_ttl = _parse_ttl(tokens[1][0], line_number)
+            continue
+        elif tokens[0][0].startswith('$'):
+            raise BindParseError('Unsupported directive: %s' %
+                                 (tokens[0][0]), line_number)
+
+        if has_owner:
+            owner = _get_absolute_name(tokens.pop(0)[0], origin)
+        elif owner is None:
+            raise BindParseError('Record without an owner', line_number)
+
+        ttl = None
+        record_type = None
+
+        while tokens:
+            value = tokens.pop(0)[0]
+
+            if value.upper() in RECORD_CLASSES:
+                continue
+            elif value[0].isdigit():
+                ttl = _parse_ttl(value, line_number)
+            else:
+                record_type = value.upper()
+                break
+
+        if not record_type or not hasattr(RecordType, record_type):
+            raise BindParseError('Invalid or unsupported record type: %s' %
+                                 (record_type), line_number)
+
+        if not tokens:
+            raise BindParseError('Record without data', line_number)
+
+        if ttl is None:
+            # A record without TTL uses $TTL or the TTL of the previous record
+            ttl = default_ttl if default_ttl is not None else last_ttl
+
+        last_ttl = ttl
+        extra = {}
+
+        if ttl is not None:
+            extra['ttl'] = ttl
+
+        data = _get_record_data(record_type, tokens, extra, origin,
+                                line_number)
+        yield (owner.rstrip('.'), getattr(RecordType, record_type), data,
+               extra)
+
+
+def _get_record_data(record_type, tokens, extra, origin, line_number):
+    values = [value for value, _ in tokens]
+
+    try:
+        if record_type == 'MX':
+            extra['priority'] = int(values[0])
+            values = values[1:]
+        elif record_type == 'SRV':
+            extra['priority'] = int(values[0])
+            extra['weight'] = int(values[1])
+            extra['port'] = int(values[2])
+            values = values[3:]
+    except (ValueError, IndexError):
+        raise BindParseError('Invalid %s record data: %s' %
+                             (record_type, ' '.join(values)), line_number)
+
+    if record_type in ['TXT', 'SPF']:
+        return ''.join(values)
+
+    if record_type in NAME_RECORD_TYPES:
+        if len(values) != 1:
+            raise BindParseError('Invalid %s record data: %s' %
+                                 (record_type, ' '.join(values)),
+                                 line_number)
+
+        # Relative target names are relative to the origin
+        return _get_absolute_name(values[0], origin)
+
+    return ' '.join(values)
+
+
+def _iterate_entries(lines):
+    """
+    Yield (line number, tokens, has owner) tuples for logical lines of the
+    zone file. Tokens are (value, quoted) tuples.
+    """
+    tokens = []
+    has_owner = False
+    depth = 0
+    start = 0
+    line_number = 0
+
+    for line in lines:
+        line_number += 1
+
+        if isinstance(line, bytes) and not isinstance(line, str):
+            line = line.decode('utf-8')
+
+        if depth == 0:
+            start = line_number
+            has_owner = bool(line) and not line[0].isspace()
+
+        line_tokens, depth = _tokenize(line, depth, line_number)
+        tokens.extend(line_tokens)
+
+        if depth == 0 and tokens:
+            yield start, tokens, has_owner
+            tokens = []
+
+    if depth != 0:
+        raise BindParseError('Unbalanced parentheses', start)
+
+
+def _tokenize(line, depth, line_number):
+    if '"' not in line and '(' not in line and ')' not in line:
+        # Fast path for the most common lines
+        return [(value, False) for value in line.split(';', 1)[0].split()], \
+            depth
+
+    tokens = []
+    index = 0
+    length = len(line)
+
+    while index < length:
+        char = line[index]
+
+        if char == ';':
+            break
+        elif char.isspace():
+            index += 1
+        elif char == '(':
+            depth += 1
+            index += 1
+        elif char == ')':
+            depth -= 1
+            index += 1
+
+            if depth < 0:
+                raise BindParseError('Unbalanced parentheses', line_number)
+        elif char == '"':
+            value = []
+            index += 1
+
+            while index < length and line[index] != '"':
+                if line[index] == '\\' and index + 1 < length:
+                    index += 1
+
+                value.append(line[index])
+                index += 1
+
+            if index >= length:
+                raise BindParseError('Unterminated quoted string',
+                                     line_number)
+
+            tokens.append((''.join(value), True))
+            index += 1
+        else:
+            end = index
+
+            while end < length and not line[end].isspace() and \
+                    line[end] not in ';()"':
+                end += 1
+
+            tokens.append((line[index:end], False))
+            index = end
+
+    return tokens, depth
+
+
+def _get_absolute_name(name, origin):
+    if name == '@':
+        return origin
+
+    if name.endswith('.'):
+        return name
+
+    if origin == '.':
+        return name + '.'
+
+    return '%s.%s' % (name, origin)
+
+
+def _parse_ttl(value, line_number):
+    if value.isdigit():
+        return int(value)
+
+    ttl = 0
+    number = ''
+
+    for char in value.lower():
+        if char.isdigit():
+            number += char
+        elif char in TTL_UNITS and number:
+            ttl += int(number) * TTL_UNITS[char]
+            number = ''
+        else:
+            raise BindParseError('Invalid TTL: %s' % (value), line_number)
+
+    if number:
+        ttl += int(number)
+
+    return ttl
@@ -13,8 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import with_statement
+
 __all__ = [
-    'Route53DNSDriver'
+    'Route53DNSDriver',
+    'Route53ChangeBatch'
 ]
 
 import base64
@@ -41,17 +44,245 @@ from libcloud.common.aws import AWSGenericResponse
 from libcloud.common.base import ConnectionUserAndKey
 
 
-API_VERSION = '2012-02-29'
+API_VERSION = '2013-04-01'
 API_HOST = 'route53.amazonaws.com'
 API_ROOT = '/%s/' % (API_VERSION)
 
 NAMESPACE = 'https://%s/doc%s' % (API_HOST, API_ROOT)
 
+# Limits of a single ChangeResourceRecordSets request
+MAX_CHANGES_PER_BATCH = 100
+MAX_RECORDS_PER_BATCH = 1000
+MAX_VALUE_CHARS_PER_BATCH = 32000
+
 
 class InvalidChangeBatch(LibcloudError):
     pass
 
 
+class RecordSetChange(object):
+    """
+    Change of a single resource record set (all the records with the same
+    name and type).
+    """
+
+    def __init__(self, action, name, type, ttl, values):
+        self.action = action
+        self.name = name
+        self.type = type
+        self.ttl = ttl
+        self.values = values
+
+    def __repr__(self):
+        return ('<RecordSetChange: action=%s, name=%s, type=%s, values=%s>' %
+                (self.action, self.name, self.type, self.values))
+
+
+class Route53ChangeBatch(object):
+    """
+    Queue of changes to the records of a single zone which are coalesced and
+    submitted using as few ChangeResourceRecordSets requests as possible.
+
+    Changes are coalesced per record set (name and type):
+
+    * multiple CREATE or DELETE changes are merged into a single change
+      with all the values (Route53 requires all the values of a record set to
+      be deleted at once)
+    * a DELETE of a value which is created by a pending CREATE cancels out
+    * an UPSERT supersedes all the pending changes of the record set
+
+    Coalesced changes are split into requests which fit the service limits.
+    Changes of the same record set are always submitted in the same request.
+
+    When used as a context manager, queued changes are submitted on exit
+    unless an exception has been raised::
+
+        with driver.ex_batch(zone) as batch:
+            batch.create_record(name='www', type=RecordType.A,
+                                data='127.0.0.1', extra={'ttl': 300})
+            batch.delete_record(record)
+    """
+
+    def __init__(self, driver, zone):
+        self.driver = driver
+        self.zone = zone
+
+        # (name, type) -> list of pending changes
+        self._changes = {}
+        self._keys = []
+
+    def create_record(self, name, type, data, extra=None):
+        self.add_change('CREATE', name, type, data, extra)
+
+    def upsert_record(self, name, type, data, extra=None):
+        self.add_change('UPSERT', name, type, data, extra)
+
+    def delete_record(self, record):
+        self.add_change('DELETE', record.name, record.type, record.data,
+                        record.extra)
+
+    def update_record(self, record, name, type, data, extra=None):
+        self.delete_record(record)
+        self.create_record(name, type, data, extra)
+
+    def add_change(self, action, name, type, data, extra=None):
+        """
+        Queue a change of a single record.
+
+        :param action: CREATE, DELETE or UPSERT.
+        :type  action: ``str``
+        """
+        if action not in ['CREATE', 'DELETE', 'UPSERT']:
+            raise ValueError('Invalid action: %s' % (action))
+
+        extra = extra or {}
+        key = (name, type)
+        value = self.driver._get_record_value(type=type, data=data,
+                                              extra=extra)
+        change = RecordSetChange(action=action, name=name, type=type,
+                                 ttl=extra.get('ttl', 0), values=[value])
+
+        if key not in self._changes:
+            self._keys.append(key)
+            self._changes[key] = []
+
+        self._coalesce(self._changes[key], change)
+
+    def get_batches(self):
+        """
+        Return coalesced changes split into batches which fit into a single
+        request.
+
+        :rtype: ``list`` of ``list`` of :class:`RecordSetChange`
+        """
+        batches = []
+        batch, changes, records, chars = [], 0, 0, 0
+
+        for key in self._keys:
+            group = self._changes[key]
+
+            if not group:
+                continue
+
+            # UPSERT values count twice towards the limits
+            group_changes = len(group)
+            group_records = 0
+            group_chars = 0
+
+            for change in group:
+                multiplier = 2 if change.action == 'UPSERT' else 1
+                group_records += len(change.values) * multiplier
+                group_chars += sum([len(value) for value in
+                                    change.values]) * multiplier
+
+            if batch and (
+                    changes + group_changes > MAX_CHANGES_PER_BATCH or
+                    records + group_records > MAX_RECORDS_PER_BATCH or
+                    chars + group_chars > MAX_VALUE_CHARS_PER_BATCH):
+                batches.append(batch)
+                batch, changes, records, chars = [], 0, 0, 0
+
+            batch.extend(group)
+            changes += group_changes
+            records += group_records
+            chars += group_chars
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def submit(self):
+        """
+        Submit all the queued changes and clear the queue.
+
+        :return: Number of requests which have been made.
+        :rtype: ``int``
+        """
+        batches = self.get_batches()
+        self.clear()
+
+        for batch in batches:
+            self.driver._post_change_batch(zone=self.zone, changes=batch)
+
+        return len(batches)
+
+    def clear(self):
+        self._changes = {}
+        self._keys = []
+
+    def __len__(self):
+        return sum([len(group) for group in self._changes.values()])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if type is None:
+            self.submit()
+        else:
+            self.clear()
+
+        return False
+
+    def _coalesce(self, group, change):
+        last = group and group[-1] or None
+
+        if change.action == 'UPSERT':
+            del group[:]
+            group.append(change)
+            return
+
+        if last is None:
+            group.append(change)
+            return
+
+        if change.action == last.action:
+            # Merge values of the same kind of changes
+            for value in change.values:
+                if value not in last.values:
+                    last.values.append(value)
+
+            if change.action == 'CREATE':
+                last.ttl = change.ttl
+
+            return
+
+        if change.action == 'CREATE' and last.action == 'UPSERT':
+            for value in change.values:
+                if value not in last.values:
+                    last.values.append(value)
+            return
+
+        if change.action == 'DELETE' and last.action == 'CREATE':
+            # Deleting a value which is still only queued for creation
+            remaining = []
+
+            for value in change.values:
+                if value in last.values:
+                    last.values.remove(value)
+                else:
+                    remaining.append(value)
+
+            if not remaining:
+                if not last.values:
+                    group.pop()
+                return
+
+            change.values = remaining
+
+            if last.values:
+                # Other values are deleted after the pending CREATE
+                group.append(change)
+                return
+
+            group.pop()
+            self._coalesce(group, change)
+            return
+
+        group.append(change)
+
+
 class Route53DNSResponse(AWSGenericResponse):
     """
     Amazon Route53 response class.
@@ -216,39 +447,199 @@ class Route53DNSDriver(DNSDriver):
         :param zone: Zone to delete records for.
         :type  zone: :class:`Zone`
         """
-        deletions = []
+        batch = self.ex_batch(zone=zone)
+
         for r in zone.list_records():
             if r.type in (RecordType.NS, RecordType.SOA):
                 continue
-            deletions.append(('DELETE', r.name, r.type, r.data, r.extra))
+            batch.delete_record(r)
+
+        batch.submit()
+
+    def ex_batch(self, zone):
+        """
+        Return a batch which queues changes to the records of the provided
+        zone and submits them using as few requests as possible.
+
+        :param zone: Zone to change records for.
+        :type  zone: :class:`Zone`
 
-        if deletions:
-            self._post_changeset(zone, deletions)
+        :rtype: :class:`Route53ChangeBatch`
+        """
+        return Route53ChangeBatch(driver=self, zone=zone)
+
+    def _apply_zone_diff(self, diff, max_workers=None):
+        # Route53 changes whole record sets, so every changed record set is
+        # deleted with all of its current values and created again with all
+        # of its desired values (if any value remains). Both changes of a
+        # record set are submitted in the same request, so the record set is
+        # replaced atomically. All the changes are submitted in as few
+        # requests as possible.
+        keys = []
+        existing = {}
+        desired = {}
+
+        def add_key(name, type):
+            key = (name, type)
+
+            if key not in existing:
+                keys.append(key)
+                existing[key] = []
+                desired[key] = []
+
+        for record in diff.delete:
+            add_key(record.name, record.type)
+            existing[(record.name, record.type)].append(record)
+
+        for record, item in diff.update:
+            add_key(record.name, record.type)
+            add_key(item[0], item[1])
+            existing[(record.name, record.type)].append(record)
+            desired[(item[0], item[1])].append(item)
+
+        for item in diff.create:
+            add_key(item[0], item[1])
+            desired[(item[0], item[1])].append(item)
+
+        for record in diff.unchanged:
+            key = (record.name, record.type)
+
+            if key in existing:
+                existing[key].append(record)
+                desired[key].append((record.name, record.type, record.data,
+                                     record.extra))
+
+        # Record sets are changed in a stable order
+        keys.sort()
+
+        with self.ex_batch(zone=diff.zone) as batch:
+            for key in keys:
+                # DELETE has to match the current values and TTL exactly
+                for record in existing[key]:
+                    batch.delete_record(record)
+
+                # Keep TTL of the existing record set unless a new one is
+                # provided
+                ttl = {}
+                if existing[key] and 'ttl' in existing[key][0].extra:
+                    ttl['ttl'] = existing[key][0].extra['ttl']
+
+                for name, type, data, extra in desired[key]:
+                    values = ttl.copy()
+                    values.update(extra)
+                    batch.create_record(name, type, data, values)
+
+    def _create_records(self, zone, records, max_workers=None):
+        # Records are queued and submitted in batches. A batch is only
+        # submitted between record sets so all the values of a record set
+        # which are next to each other (as they usually are in a zone file)
+        # are created with a single change. Only the names and types of the
+        # submitted record sets are kept. If another value of a record set
+        # which has already been created follows, the record set is
+        # retrieved and replaced with all of its values.
+        batch = self.ex_batch(zone=zone)
+        batch_keys = set()
+        submitted_keys = set()
+        count = 0
+
+        for name, type, data, extra in records:
+            key = (name, type)
+
+            if key not in batch_keys and len(batch) >= MAX_CHANGES_PER_BATCH:
+                batch.submit()
+                submitted_keys.update(batch_keys)
+                batch_keys = set()
+
+            if key in submitted_keys and key not in batch_keys:
+                existing = self._get_record_set(zone=zone, name=name,
+                                                type=type)
+
+                for record in existing:
+                    batch.delete_record(record)
+
+                for record in existing:
+                    batch.create_record(name, type, record.data,
+                                        record.extra)
+
+            batch.create_record(name, type, data, extra)
+            batch_keys.add(key)
+            count += 1
+
+        batch.submit()
+        return count
+
+    def _get_record_set(self, zone, name, type):
+        """
+        Return all the records of a single record set (or an empty list if
+        the record set doesn't exist).
+        """
+        if name:
+            full_name = '.'.join((name, zone.domain))
+        else:
+            full_name = zone.domain
+
+        params = {'name': full_name, 'type': self.RECORD_TYPE_MAP[type],
+                  'maxitems': '1'}
+        uri = API_ROOT + 'hostedzone/' + zone.id + '/rrset'
+        self.connection.set_context({'zone_id': zone.id})
+        data = self.connection.request(uri, params=params).object
+
+        # Listing starts at the provided record set even if it doesn't exist
+        return [record for record in self._to_records(data=data, zone=zone)
+                if record.name == name and record.type == type]
 
     def _post_changeset(self, zone, changes_list):
+        batch = self.ex_batch(zone=zone)
+
+        for action, name, type_, data, extra in changes_list:
+            batch.add_change(action, name, type_, data, extra)
+
+        batch.submit()
+
+    def _post_change_batch(self, zone, changes):
         attrs = {'xmlns': NAMESPACE}
         changeset = ET.Element('ChangeResourceRecordSetsRequest', attrs)
         batch = ET.SubElement(changeset, 'ChangeBatch')
-        changes = ET.SubElement(batch, 'Changes')
+        changes_elem = ET.SubElement(batch, 'Changes')
 
-        for action, name, type_, data, extra in changes_list:
-            change = ET.SubElement(changes, 'Change')
-            ET.SubElement(change, 'Action').text = action
+        for change in changes:
+            if change.name:
+                name = change.name + "." + zone.domain
+            else:
+                name = zone.domain
+
+            change_elem = ET.SubElement(changes_elem, 'Change')
+            ET.SubElement(change_elem, 'Action').text = change.action
 
-            rrs = ET.SubElement(change, 'ResourceRecordSet')
-            ET.SubElement(rrs, 'Name').text = name + "." + zone.domain
-            ET.SubElement(rrs, 'Type').text = self.RECORD_TYPE_MAP[type_]
-            ET.SubElement(rrs, 'TTL').text = str(extra.get('ttl', '0'))
+            rrs = ET.SubElement(change_elem, 'ResourceRecordSet')
+            ET.SubElement(rrs, 'Name').text = name
+            ET.SubElement(rrs, 'Type').text = self.RECORD_TYPE_MAP[change.type]
+            ET.SubElement(rrs, 'TTL').text = str(change.ttl)
 
             rrecs = ET.SubElement(rrs, 'ResourceRecords')
-            rrec = ET.SubElement(rrecs, 'ResourceRecord')
-            ET.SubElement(rrec, 'Value').text = data
+
+            for value in change.values:
+                rrec = ET.SubElement(rrecs, 'ResourceRecord')
+                ET.SubElement(rrec, 'Value').text = value
 
         uri = API_ROOT + 'hostedzone/' + zone.id + '/rrset'
         data = ET.tostring(changeset)
         self.connection.set_context({'zone_id': zone.id})
         self.connection.request(uri, method='POST', data=data)
 
+    def _get_record_value(self, type, data, extra):
+        """
+        Return value of a record as it's sent to Route53 (priority, weight
+        and port are stored separately in the record extra attributes).
+        """
+        if type == RecordType.MX and 'priority' in extra:
+            return '%s %s' % (extra['priority'], data)
+        elif type == RecordType.SRV and 'priority' in extra:
+            return '%s %s %s %s' % (extra['priority'], extra.get('weight', 0),
+                                    extra.get('port', 0), data)
+
+        return data
+
     def _to_zones(self, data):
         zones = []
         for element in data.findall(fixxpath(xpath='HostedZones/HostedZone',
@@ -331,14 +722,19 @@ class Route53DNSDriver(DNSDriver):
 
     def _get_data(self, rtype, last_key, **kwargs):
         params = {}
-        if last_key:
-            params['name'] = last_key
         path = API_ROOT + 'hostedzone'
 
         if rtype == 'zones':
+            if last_key:
+                params['marker'] = last_key
+
             response = self.connection.request(path, params=params)
             transform_func = self._to_zones
         elif rtype == 'records':
+            # Record sets are listed starting with the provided name and type
+            if last_key:
+                params['name'], params['type'] = last_key
+
             zone = kwargs['zone']
             path += '/%s/rrset' % (zone.id)
             self.connection.set_context({'zone_id': zone.id})
@@ -350,9 +746,18 @@ class Route53DNSDriver(DNSDriver):
                                     xpath='IsTruncated',
                                     namespace=NAMESPACE)
             exhausted = is_truncated != 'true'
-            last_key = findtext(element=response.object,
-                                xpath='NextRecordName',
-                                namespace=NAMESPACE)
+
+            if rtype == 'zones':
+                last_key = findtext(element=response.object,
+                                    xpath='NextMarker', namespace=NAMESPACE)
+            else:
+                last_key = (findtext(element=response.object,
+                                     xpath='NextRecordName',
+                                     namespace=NAMESPACE),
+                            findtext(element=response.object,
+                                     xpath='NextRecordType',
+                                     namespace=NAMESPACE))
+
             items = transform_func(data=response.object, **kwargs)
             return items, last_key, exhausted
         else:
@@ -46,21 +46,36 @@ class GCELBDriver(Driver):
 
         self.connection = self.gce.connection
 
-    def _get_node_from_ip(self, ip):
+    def _get_node_from_ip(self, ip, nodes_by_ip=None):
         """
         Return the node object that matches a given public IP address.
 
         :param  ip: Public IP address to search for
         :type   ip: ``str``
 
+        :keyword  nodes_by_ip: Index returned by :meth:`_get_nodes_by_ip`.
+                               Retrieved if not provided.
+        :type     nodes_by_ip: ``dict``
+
         :return:  Node object that has the given IP, or None if not found.
         :rtype:   :class:`Node` or None
         """
-        all_nodes = self.gce.list_nodes(ex_zone='all')
-        for node in all_nodes:
-            if ip in node.public_ips:
-                return node
-        return None
+        if nodes_by_ip is None:
+            nodes_by_ip = self._get_nodes_by_ip()
+        return nodes_by_ip.get(ip)
+
+    def _get_nodes_by_ip(self):
+        """
+        Return a dictionary which maps public IP addresses to nodes.
+
+        :rtype: ``dict``
+        """
+        nodes_by_ip = {}
+        for node in self.gce.list_nodes(ex_zone='all',
+                                        ex_lazy_boot_disk=True):
+            for ip in node.public_ips:
+                nodes_by_ip.setdefault(ip, node)
+        return nodes_by_ip
 
     def list_protocols(self):
         """
@@ -136,13 +151,18 @@ class GCELBDriver(Driver):
         :rtype:   :class:`LoadBalancer`
         """
         node_list = []
+        nodes_by_ip = None
         for member in members:
             # Member object
             if hasattr(member, 'ip'):
                 if member.extra.get('node'):
                     node_list.append(member.extra['node'])
                 else:
-                    node_list.append(self._get_node_from_ip(member.ip))
+                    # Nodes are only listed once for all the members
+                    if nodes_by_ip is None:
+                        nodes_by_ip = self._get_nodes_by_ip()
+                    node_list.append(self._get_node_from_ip(
+                        member.ip, nodes_by_ip=nodes_by_ip))
             # Node object
             elif hasattr(member, 'name'):
                 node_list.append(member)
@@ -0,0 +1,233 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Coroutine versions of the core :class:`StorageDriver` methods.
+
+Usage:
+    from libcloud.storage.aio import get_async_driver
+
+    async_driver = get_async_driver(driver)
+    obj = await async_driver.upload_object('/tmp/file', container, 'file')
+
+This module requires Python 3.5 or later.
+"""
+
+import asyncio
+import hashlib
+import os
+
+from libcloud.common.aio import AsyncConnection
+from libcloud.common.types import LibcloudError
+from libcloud.storage.base import Object
+from libcloud.storage.drivers.s3 import BaseS3StorageDriver
+from libcloud.storage.types import ObjectDoesNotExistError
+from libcloud.storage.types import ObjectHashMismatchError
+from libcloud.utils.py3 import httplib
+
+__all__ = [
+    'AsyncStorageDriver',
+    'AsyncS3StorageDriver',
+
+    'get_async_driver'
+]
+
+# Size of the chunks in which uploaded files are read
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class AsyncStorageDriver(object):
+    """
+    Wrapper around a :class:`StorageDriver` instance which provides coroutine
+    versions of its methods.
+
+    Methods which are not supported by a driver raise
+    ``NotImplementedError``.
+    """
+
+    def __init__(self, driver, max_concurrency=None):
+        """
+        :param driver: Driver which builds requests and parses responses.
+        :type driver: :class:`StorageDriver`
+
+        :param max_concurrency: Maximum number of requests which are in
+                                flight at the same time (defaults to
+                                unlimited).
+        :type max_concurrency: ``int``
+        """
+        self.driver = driver
+        self.connection = AsyncConnection(driver.connection,
+                                          max_concurrency=max_concurrency)
+
+    async def upload_object(self, file_path, container, object_name,
+                            extra=None, verify_hash=True):
+        """
+        @inherits: :class:`StorageDriver.upload_object`
+        """
+        raise NotImplementedError(
+            'upload_object not implemented for this driver')
+
+    async def delete_object(self, obj):
+        """
+        @inherits: :class:`StorageDriver.delete_object`
+        """
+        raise NotImplementedError(
+            'delete_object not implemented for this driver')
+
+
+class AsyncS3StorageDriver(AsyncStorageDriver):
+    """
+    Coroutine versions of :class:`BaseS3StorageDriver` methods.
+    """
+
+    async def upload_object(self, file_path, container, object_name,
+                            extra=None, verify_hash=True,
+                            ex_storage_class=None):
+        """
+        File is streamed to the server in chunks.
+
+        @inherits: :class:`BaseS3StorageDriver.upload_object`
+        """
+        driver = self.driver
+        extra = extra or {}
+        headers = driver._get_put_object_headers(
+            extra=extra, storage_class=ex_storage_class)
+
+        if not os.path.exists(file_path):
+            raise OSError('File %s does not exist' % (file_path))
+
+        content_type = extra.get('content_type', None)
+        if not content_type:
+            content_type = driver._guess_content_type(object_name=object_name,
+                                                      file_path=file_path)
+
+        file_size = os.path.getsize(file_path)
+        headers['Content-Type'] = content_type
+        headers['Content-Length'] = file_size
+        data_hash = hashlib.md5()
+        iterator = _FileReader(file_path=file_path, data_hash=data_hash)
+        request_path = driver._get_object_path(container, object_name)
+
+        try:
+            response = await self.connection.request(
+                request_path, method='PUT', headers=headers,
+                iterator=iterator)
+        finally:
+            iterator.close()
+
+        if not response.success():
+            raise LibcloudError(
+                'Unexpected status code, status_code=%s' % (response.status),
+                driver=driver)
+
+        server_hash = response.headers['etag'].replace('"', '')
+
+        if verify_hash and data_hash.hexdigest() != server_hash:
+            raise ObjectHashMismatchError(
+                value='MD5 hash checksum does not match',
+                object_name=object_name, driver=driver)
+
+        return Object(name=object_name, size=file_size, hash=server_hash,
+                      extra={'acl': extra.get('acl', None)},
+                      meta_data=extra.get('meta_data', None),
+                      container=container, driver=driver)
+
+    async def delete_object(self, obj):
+        """
+        @inherits: :class:`BaseS3StorageDriver.delete_object`
+        """
+        object_path = self.driver._get_object_path(obj.container, obj.name)
+        response = await self.connection.request(object_path,
+                                                 method='DELETE')
+        if response.status == httplib.NO_CONTENT:
+            return True
+        elif response.status == httplib.NOT_FOUND:
+            raise ObjectDoesNotExistError(value=None, driver=self.driver,
+                                          object_name=obj.name)
+
+        return False
+
+
+class _FileReader(object):
+    """
+    Async iterator which yields chunks of a file.
+
+    The file is opened, read and hashed in the default executor so big
+    uploads don't block the event loop.
+    """
+
+    def __init__(self, file_path, data_hash, chunk_size=UPLOAD_CHUNK_SIZE):
+        self.file_path = file_path
+        self.data_hash = data_hash
+        self.chunk_size = chunk_size
+        self._fp = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        loop = asyncio.get_event_loop()
+        chunk = await loop.run_in_executor(None, self._read)
+
+        if not chunk:
+            raise StopAsyncIteration
+
+        return chunk
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+    def _read(self):
+        if self._fp is None:
+            self._fp = open(self.file_path, 'rb')
+
+        chunk = self._fp.read(self.chunk_size)
+
+        if chunk:
+            self.data_hash.update(chunk)
+        else:
+            self.close()
+
+        return chunk
+
+
+# Driver classes (and their subclasses) with a coroutine wrapper
+ASYNC_DRIVERS = [
+    (BaseS3StorageDriver, AsyncS3StorageDriver)
+]
+
+
+def get_async_driver(driver, max_concurrency=None):
+    """
+    Return a wrapper with coroutine versions of the provided driver's
+    methods.
+
+    :param driver: Driver instance.
+    :type driver: :class:`StorageDriver`
+
+    :param max_concurrency: Maximum number of requests which are in flight
+                            at the same time (defaults to unlimited).
+    :type max_concurrency: ``int``
+
+    :rtype: :class:`AsyncStorageDriver`
+    """
+    for driver_cls, async_driver_cls in ASYNC_DRIVERS:
+        if isinstance(driver, driver_cls):
+            return async_driver_cls(driver, max_concurrency=max_concurrency)
+
+    raise NotImplementedError('%s driver doesn\'t support asyncio' %
+                              (driver.name))
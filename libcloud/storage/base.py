@@ -20,15 +20,25 @@ Provides base classes for working with storage
 # Backward compatibility for Python 2.5
 from __future__ import with_statement
 
+import os
 import os.path                          # pylint: disable-msg=W0404
+import ssl
 import hashlib
+import threading
 from os.path import join as pjoin
 
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
 from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import next
 from libcloud.utils.py3 import b
 
 import libcloud.utils.files
+from libcloud.utils.concurrency import BackgroundHasher, WorkerPool
+from libcloud.utils.concurrency import prefetch, run_concurrently
 from libcloud.common.types import LibcloudError
 from libcloud.common.base import ConnectionUserAndKey, BaseDriver
 from libcloud.storage.types import ObjectDoesNotExistError
@@ -39,11 +49,16 @@ __all__ = [
     'StorageDriver',
 
     'CHUNK_SIZE',
-    'DEFAULT_CONTENT_TYPE'
+    'DEFAULT_CONTENT_TYPE',
+    'DOWNLOAD_CHECKPOINT_SUFFIX'
 ]
 
 CHUNK_SIZE = 8096
 
+# Suffix of the file which holds progress of a download which is performed
+# using StorageDriver.download_object_in_parts
+DOWNLOAD_CHECKPOINT_SUFFIX = '.libcloud-download'
+
 # Default Content-Type which is sent when uploading an object if one is not
 # supplied and can't be detected when using non-strict mode.
 DEFAULT_CONTENT_TYPE = 'application/octet-stream'
@@ -190,6 +205,27 @@ class StorageDriver(BaseDriver):
     # provided and none can be detected when uploading an object
     strict_mode = False
 
+    # Minimum size of a local file which is uploaded using zero-copy
+    # socket.sendfile() when the connection is not encrypted and chunked
+    # encoding is not used. Set to None to disable sendfile.
+    sendfile_min_size = 8 * 1024 * 1024
+
+    # Maximum number of parts which are uploaded at the same time by drivers
+    # which support uploading parts of an object concurrently
+    upload_concurrency = 4
+
+    # Size of a part and maximum number of parts which are downloaded at the
+    # same time by download_object_in_parts
+    download_part_size = 16 * 1024 * 1024
+    download_concurrency = 4
+
+    # Maximum amount of data which is buffered between reading, hashing and
+    # sending the data when uploading an object. These stages then run in
+    # separate threads (e.g. 4 * 1024 * 1024). Pipelining is disabled by
+    # default because provided iterators are then consumed by another thread
+    # and they might not be thread-safe.
+    upload_pipeline_size = None
+
     def __init__(self, key, secret=None, secure=True, host=None, port=None,
                  **kwargs):
         super(StorageDriver, self).__init__(key=key, secret=secret,
@@ -347,6 +383,118 @@ class StorageDriver(BaseDriver):
         raise NotImplementedError(
             'download_object not implemented for this driver')
 
+    def download_object_in_parts(self, obj, destination_path,
+                                 overwrite_existing=False, part_size=None,
+                                 max_workers=None):
+        """
+        Download an object to the specified destination path using multiple
+        concurrent HTTP range requests.
+
+        Progress is stored in a checkpoint file next to the destination file
+        (with ``DOWNLOAD_CHECKPOINT_SUFFIX`` suffix). If the download fails,
+        calling this method again only downloads the parts which are missing.
+
+        :param obj: Object instance.
+        :type obj: :class:`Object`
+
+        :param destination_path: Full path to a file or a directory where the
+                                 incoming file will be saved.
+        :type destination_path: ``str``
+
+        :param overwrite_existing: True to overwrite an existing file,
+                                   defaults to False.
+        :type overwrite_existing: ``bool``
+
+        :param part_size: Size of a single part in bytes (defaults to
+                          ``download_part_size``).
+        :type part_size: ``int``
+
+        :param max_workers: Maximum number of parts which are downloaded at
+                            the same time (defaults to
+                            ``download_concurrency``).
+        :type max_workers: ``int``
+
+        :return: True if an object has been successfully downloaded.
+        :rtype: ``bool``
+        """
+        part_size = part_size or self.download_part_size
+        max_workers = max_workers or self.download_concurrency
+        size = int(obj.size)
+
+        file_path = self._get_destination_file_path(
+            obj=obj, destination_path=destination_path)
+        checkpoint_path = file_path + DOWNLOAD_CHECKPOINT_SUFFIX
+        checkpoint = {'size': size, 'hash': obj.hash, 'part_size': part_size,
+                      'completed': []}
+
+        completed = self._load_download_checkpoint(
+            file_path=file_path, checkpoint_path=checkpoint_path,
+            checkpoint=checkpoint)
+
+        if completed is None:
+            # File with a (stale) checkpoint is a partial download which can
+            # always be overwritten
+            partial = os.path.exists(checkpoint_path)
+
+            if os.path.exists(file_path) and not overwrite_existing and \
+                    not partial:
+                raise LibcloudError(
+                    value='File %s already exists, but ' % (file_path) +
+                    'overwrite_existing=False',
+                    driver=self)
+
+            # Preallocate the file so parts can be written at their offsets
+            with open(file_path, 'wb') as file_handle:
+                file_handle.truncate(size)
+
+            # Preallocated file is marked as a partial download right away so
+            # it can be resumed even if no part is downloaded
+            completed = set()
+            self._save_download_checkpoint(checkpoint_path, checkpoint)
+
+        parts_count = (size + part_size - 1) // part_size
+        pending = [index for index in range(parts_count)
+                   if index not in completed]
+        writer = _PositionalWriter(file_path)
+
+        def download_part(index):
+            start_bytes = index * part_size
+            end_bytes = min(start_bytes + part_size, size) - 1
+            self._download_object_range(obj=obj, writer=writer,
+                                        start_bytes=start_bytes,
+                                        end_bytes=end_bytes)
+
+        errors = []
+        results = run_concurrently(download_part, pending,
+                                   max_workers=max_workers)
+
+        try:
+            for index, future in results:
+                error = future.exception()
+
+                if error is not None:
+                    errors.append((index, error))
+                    continue
+
+                completed.add(index)
+                checkpoint['completed'] = sorted(completed)
+                self._save_download_checkpoint(checkpoint_path, checkpoint)
+        finally:
+            # Wait for the parts which are still being downloaded so the
+            # file is not closed while they are written
+            results.close()
+            writer.close()
+
+        if errors:
+            # Checkpoint is kept so the download can be resumed
+            errors.sort(key=lambda error: error[0])
+            raise errors[0][1]
+
+        if os.path.exists(checkpoint_path):
+            os.unlink(checkpoint_path)
+
+        return True
+
     def download_object_as_stream(self, obj, chunk_size=None):
         """
         Return a generator which yields object data.
@@ -534,17 +682,8 @@ class StorageDriver(BaseDriver):
 
         chunk_size = chunk_size or CHUNK_SIZE
 
-        base_name = os.path.basename(destination_path)
-
-        if not base_name and not os.path.exists(destination_path):
-            raise LibcloudError(
-                value='Path %s does not exist' % (destination_path),
-                driver=self)
-
-        if not base_name:
-            file_path = pjoin(destination_path, obj.name)
-        else:
-            file_path = destination_path
+        file_path = self._get_destination_file_path(
+            obj=obj, destination_path=destination_path)
 
         if os.path.exists(file_path) and not overwrite_existing:
             raise LibcloudError(
@@ -584,6 +723,104 @@ class StorageDriver(BaseDriver):
 
         return True
 
+    def _get_destination_file_path(self, obj, destination_path):
+        """
+        Return path of the file to which an object is downloaded.
+
+        :type destination_path: ``str``
+        :param destination_path: Full path to a file or a directory.
+
+        :rtype: ``str``
+        """
+        base_name = os.path.basename(destination_path)
+
+        if not base_name and not os.path.exists(destination_path):
+            raise LibcloudError(
+                value='Path %s does not exist' % (destination_path),
+                driver=self)
+
+        if not base_name:
+            return pjoin(destination_path, obj.name)
+
+        return destination_path
+
+    def _get_object_range(self, obj, start_bytes, end_bytes):
+        """
+        Send a request for a byte range of the object. Drivers which support
+        ranged downloads need to implement this method.
+
+        :type start_bytes: ``int``
+        :param start_bytes: Offset of the first byte.
+
+        :type end_bytes: ``int``
+        :param end_bytes: Offset of the last byte (inclusive).
+
+        :return: Raw response.
+        :rtype: :class:`RawResponse`
+        """
+        raise NotImplementedError(
+            'download_object_in_parts not implemented for this driver')
+
+    def _download_object_range(self, obj, writer, start_bytes, end_bytes):
+        response = self._get_object_range(obj=obj, start_bytes=start_bytes,
+                                          end_bytes=end_bytes)
+
+        # Server can ignore the range header if the whole object is requested
+        whole_object = (start_bytes == 0 and
+                        end_bytes == int(obj.size) - 1)
+
+        if response.status == httplib.NOT_FOUND:
+            raise ObjectDoesNotExistError(object_name=obj.name,
+                                          value='', driver=self)
+        elif response.status != httplib.PARTIAL_CONTENT and \
+                not (whole_object and response.status == httplib.OK):
+            raise LibcloudError(value='Unexpected status code: %s' %
+                                      (response.status),
+                                driver=self)
+
+        offset = start_bytes
+        for data in libcloud.utils.files.read_in_chunks(response.response,
+                                                        CHUNK_SIZE * 8):
+            writer.write(b(data), offset)
+            offset += len(data)
+
+        if offset != end_bytes + 1:
+            raise LibcloudError(value='Incomplete range %s-%s of object %s, '
+                                      'received %s bytes' %
+                                      (start_bytes, end_bytes, obj.name,
+                                       offset - start_bytes),
+                                driver=self)
+
+    def _load_download_checkpoint(self, file_path, checkpoint_path,
+                                  checkpoint):
+        """
+        Return a set of already downloaded parts or None if there is no valid
+        checkpoint for the provided download.
+        """
+        if not os.path.exists(checkpoint_path):
+            return None
+
+        try:
+            with open(checkpoint_path, 'r') as file_handle:
+                saved = json.loads(file_handle.read())
+        except Exception:
+            return None
+
+        # Remote object or the part size have changed, download starts over
+        for key in ['size', 'hash', 'part_size']:
+            if saved.get(key) != checkpoint[key]:
+                return None
+
+        if not os.path.exists(file_path) or \
+                os.path.getsize(file_path) != checkpoint['size']:
+            return None
+
+        return set(saved.get('completed', []))
+
+    def _save_download_checkpoint(self, checkpoint_path, checkpoint):
+        with open(checkpoint_path, 'w') as file_handle:
+            file_handle.write(json.dumps(checkpoint))
+
     def _upload_object(self, object_name, content_type, upload_func,
                        upload_func_kwargs, request_path, request_method='PUT',
                        headers=None, file_path=None, iterator=None):
@@ -602,20 +839,8 @@ class StorageDriver(BaseDriver):
                                  'method.')
 
         if not content_type:
-            if file_path:
-                name = file_path
-            else:
-                name = object_name
-            content_type, _ = libcloud.utils.files.guess_file_mime_type(name)
-
-            if not content_type:
-                if self.strict_mode:
-                    raise AttributeError('File content-type could not be '
-                                         'guessed and no content_type value '
-                                         'is provided')
-                else:
-                    # Fallback to a content-type
-                    content_type = DEFAULT_CONTENT_TYPE
+            content_type = self._guess_content_type(object_name=object_name,
+                                                    file_path=file_path)
 
         file_size = None
 
@@ -656,6 +881,28 @@ class StorageDriver(BaseDriver):
                        'bytes_transferred': bytes_transferred}
         return result_dict
 
+    def _guess_content_type(self, object_name, file_path=None):
+        """
+        Guess content type of an uploaded object from the file path (or the
+        object name).
+        """
+        if file_path:
+            name = file_path
+        else:
+            name = object_name
+        content_type, _ = libcloud.utils.files.guess_file_mime_type(name)
+
+        if not content_type:
+            if self.strict_mode:
+                raise AttributeError('File content-type could not be '
+                                     'guessed and no content_type value '
+                                     'is provided')
+            else:
+                # Fallback to a content-type
+                content_type = DEFAULT_CONTENT_TYPE
+
+        return content_type
+
     def _upload_data(self, response, data, calculate_hash=True):
         """
         Upload data stored in a string.
@@ -726,12 +973,15 @@ class StorageDriver(BaseDriver):
         """
 
         chunk_size = chunk_size or CHUNK_SIZE
+        connection = response.connection.connection
 
         data_hash = None
         if calculate_hash:
             data_hash = self._get_hash_function()
 
         generator = libcloud.utils.files.read_in_chunks(iterator, chunk_size)
+        generator = self._get_upload_pipeline(generator=generator,
+                                              chunk_size=chunk_size)
 
         bytes_transferred = 0
         try:
@@ -741,43 +991,53 @@ class StorageDriver(BaseDriver):
             # create a 0-byte long object
             chunk = ''
             if chunked:
-                response.connection.connection.send(b('%X\r\n' %
-                                                   (len(chunk))))
-                response.connection.connection.send(chunk)
-                response.connection.connection.send(b('\r\n'))
-                response.connection.connection.send(b('0\r\n\r\n'))
+                connection.send(b('%X\r\n' % (len(chunk))))
+                connection.send(chunk)
+                connection.send(b('\r\n'))
+                connection.send(b('0\r\n\r\n'))
             else:
-                response.connection.connection.send(chunk)
+                connection.send(chunk)
             return True, data_hash.hexdigest(), bytes_transferred
 
-        while len(chunk) > 0:
-            try:
-                if chunked:
-                    response.connection.connection.send(b('%X\r\n' %
-                                                       (len(chunk))))
-                    response.connection.connection.send(b(chunk))
-                    response.connection.connection.send(b('\r\n'))
-                else:
-                    response.connection.connection.send(b(chunk))
-            except Exception:
-                # TODO: let this exception propagate
-                # Timeout, etc.
-                return False, None, bytes_transferred
+        hasher = None
+        if calculate_hash:
+            hasher = self._get_upload_hasher(data_hash)
 
-            bytes_transferred += len(chunk)
-            if calculate_hash:
-                data_hash.update(b(chunk))
+        try:
+            while len(chunk) > 0:
+                chunk = b(chunk)
 
-            try:
-                chunk = next(generator)
-            except StopIteration:
-                chunk = ''
+                try:
+                    if chunked:
+                        connection.send(b('%X\r\n' % (len(chunk))))
+                        connection.send(chunk)
+                        connection.send(b('\r\n'))
+                    else:
+                        connection.send(chunk)
+                except Exception:
+                    # TODO: let this exception propagate
+                    # Timeout, etc.
+                    return False, None, bytes_transferred
 
-        if chunked:
-            response.connection.connection.send(b('0\r\n\r\n'))
+                bytes_transferred += len(chunk)
+                if calculate_hash:
+                    hasher.update(chunk)
 
-        if calculate_hash:
-            data_hash = data_hash.hexdigest()
+                try:
+                    chunk = next(generator)
+                except StopIteration:
+                    chunk = ''
+
+            if chunked:
+                connection.send(b('0\r\n\r\n'))
+
+            if calculate_hash:
+                data_hash = hasher.wait()[0].hexdigest()
+        finally:
+            if hasher is not None:
+                hasher.close()
+
+            generator.close()
 
         return True, data_hash, bytes_transferred
 
@@ -803,14 +1063,211 @@ class StorageDriver(BaseDriver):
         """
         with open(file_path, 'rb') as file_handle:
             success, data_hash, bytes_transferred = (
-                self._stream_data(
+                self._stream_file(
                     response=response,
-                    iterator=iter(file_handle),
+                    file_handle=file_handle,
                     chunked=chunked,
                     calculate_hash=calculate_hash))
 
         return success, data_hash, bytes_transferred
 
+    def _stream_file(self, response, file_handle, chunked=False,
+                     calculate_hash=True, chunk_size=None, data=None):
+        """
+        Stream a local file over an http connection.
+
+        File is read in big fixed size blocks into a reused buffer. Big files
+        are sent using socket.sendfile() if the connection is not encrypted
+        and chunked encoding is not used.
+
+        :type response: :class:`RawResponse`
+        :param response: RawResponse object.
+
+        :type file_handle: ``file``
+        :param file_handle: File object opened in binary mode.
+
+        :type chunked: ``bool``
+        :param chunked: True if the chunked transfer encoding should be used
+                        (defauls to False).
+
+        :type calculate_hash: ``bool``
+        :param calculate_hash: True to calculate hash of the transfered data.
+                               (defauls to True).
+
+        :type chunk_size: ``int``
+        :param chunk_size: Optional block size (defaults to
+                           ``libcloud.utils.files.FILE_CHUNK_SIZE``)
+
+        :rtype: ``tuple``
+        :return: First item is a boolean indicator of success, second
+                 one is the uploaded data MD5 hash and the third one
+                 is the number of transferred bytes.
+        """
+        connection = response.connection.connection
+
+        data_hash = None
+        if calculate_hash:
+            data_hash = self._get_hash_function()
+
+        bytes_transferred = 0
+        sock = None
+
+        if not chunked:
+            sock = self._get_sendfile_socket(connection=connection,
+                                             file_handle=file_handle)
+
+        if sock is not None:
+            hash_future = None
+
+            if calculate_hash and self.upload_pipeline_size and \
+                    hasattr(os, 'pread'):
+                # Hash the file while it's being sent
+                pool = WorkerPool(max_workers=1)
+                hash_future = pool.submit(self._hash_file_range,
+                                          file_handle=file_handle,
+                                          offset=file_handle.tell(),
+                                          data_hash=data_hash,
+                                          chunk_size=chunk_size)
+                pool.shutdown(wait=False)
+
+            try:
+                bytes_transferred = sock.sendfile(file_handle)
+            except Exception:
+                if hash_future is not None:
+                    # Don't let the file be closed while it's being read
+                    hash_future.exception()
+
+                # TODO: let this exception propagate
+                # Timeout, etc.
+                return False, None, bytes_transferred
+
+            if hash_future is not None:
+                hash_future.result()
+            elif calculate_hash:
+                file_handle.seek(0)
+
+                for chunk in libcloud.utils.files.read_file_in_chunks(
+                        file_handle, chunk_size):
+                    data_hash.update(chunk)
+        else:
+            # Chunks are only valid until the next one is read unless they
+            # are read ahead by a separate thread
+            chunks = libcloud.utils.files.read_file_in_chunks(
+                file_handle, chunk_size,
+                reuse_buffer=not self.upload_pipeline_size)
+            chunks = self._get_upload_pipeline(
+                generator=chunks,
+                chunk_size=chunk_size or libcloud.utils.files.FILE_CHUNK_SIZE)
+
+            hasher = None
+            if calculate_hash:
+                hasher = self._get_upload_hasher(data_hash)
+
+            try:
+                for chunk in chunks:
+                    try:
+                        if chunked:
+                            connection.send(b('%X\r\n' % (len(chunk))))
+                            connection.send(chunk)
+                            connection.send(b('\r\n'))
+                        else:
+                            connection.send(chunk)
+                    except Exception:
+                        # TODO: let this exception propagate
+                        # Timeout, etc.
+                        return False, None, bytes_transferred
+
+                    bytes_transferred += len(chunk)
+                    if calculate_hash:
+                        hasher.update(chunk)
+
+                if chunked:
+                    connection.send(b('0\r\n\r\n'))
+
+                if calculate_hash:
+                    hasher.wait()
+            finally:
+                if hasher is not None:
+                    hasher.close()
+
+                chunks.close()
+
+        if calculate_hash:
+            data_hash = data_hash.hexdigest()
+
+        return True, data_hash, bytes_transferred
+
+    def _hash_file_range(self, file_handle, offset, data_hash,
+                         chunk_size=None):
+        """
+        Update the hash object with the content of a file starting at the
+        provided offset.
+
+        Data is read using positional reads so the position of the file
+        handle (which may be used by a different thread at the same time)
+        is not modified.
+        """
+        chunk_size = chunk_size or libcloud.utils.files.FILE_CHUNK_SIZE
+        fd = file_handle.fileno()
+
+        while True:
+            chunk = os.pread(fd, chunk_size, offset)
+
+            if not chunk:
+                return data_hash
+
+            data_hash.update(chunk)
+            offset += len(chunk)
+
+    def _get_upload_pipeline(self, generator, chunk_size):
+        """
+        Return a generator which yields items of the provided generator which
+        are read ahead by a separate thread (up to ``upload_pipeline_size``
+        bytes) so reading overlaps with sending the data.
+        """
+        if not self.upload_pipeline_size:
+            return generator
+
+        max_pending = max(1, self.upload_pipeline_size // chunk_size)
+        return prefetch(generator, max_pending=max_pending)
+
+    def _get_upload_hasher(self, *hashes):
+        """
+        Return :class:`BackgroundHasher` which updates the provided hash
+        objects in a separate thread (unless pipelining is disabled).
+        """
+        return BackgroundHasher(
+            hashes=hashes,
+            max_pending_size=self.upload_pipeline_size or 0,
+            background=bool(self.upload_pipeline_size))
+
+    def _get_sendfile_socket(self, connection, file_handle):
+        """
+        Return a socket which can be used to send the provided file using
+        socket.sendfile() or None if sendfile can't or shouldn't be used.
+        """
+        if self.sendfile_min_size is None:
+            return None
+
+        sock = getattr(connection, 'sock', None)
+
+        if sock is None or isinstance(sock, ssl.SSLSocket):
+            return None
+
+        if not hasattr(sock, 'sendfile'):
+            # Python < 3.5
+            return None
+
+        try:
+            file_size = os.fstat(file_handle.fileno()).st_size
+        except Exception:
+            return None
+
+        if file_size < self.sendfile_min_size:
+            return None
+
+        return sock
+
     def _get_hash_function(self):
         """
         Return instantiated hash function for the hash type supported by
@@ -823,3 +1280,33 @@ class StorageDriver(BaseDriver):
                                (self.hash_type))
 
         return func
+
+
+class _PositionalWriter(object):
+    """
+    Writes data at arbitrary offsets of a file from multiple threads.
+    """
+
+    def __init__(self, file_path):
+        self._fd = os.open(file_path, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+        self._lock = threading.Lock()
+
+    def write(self, data, offset):
+        if hasattr(os, 'pwrite'):
+            while data:
+                written = os.pwrite(self._fd, data, offset)
+                data = data[written:]
+                offset += written
+            return
+
+        self._lock.acquire()
+        try:
+            os.lseek(self._fd, offset, os.SEEK_SET)
+            while data:
+                written = os.write(self._fd, data)
+                data = data[written:]
+        finally:
+            self._lock.release()
+
+    def close(self):
+        os.close(self._fd)
@@ -18,6 +18,7 @@ from __future__ import with_statement
 import base64
 import os
 import binascii
+import threading
 
 from xml.etree.ElementTree import Element, SubElement
 
@@ -29,6 +30,7 @@ from libcloud.utils.py3 import b
 
 from libcloud.utils.xml import fixxpath
 from libcloud.utils.files import read_in_chunks
+from libcloud.utils.concurrency import WorkerPool
 from libcloud.common.types import LibcloudError
 from libcloud.common.azure import AzureConnection
 
@@ -77,7 +79,15 @@ AZURE_STORAGE_HOST_SUFFIX = 'blob.core.windows.net'
 class AzureBlobLease(object):
     """
     A class to help in leasing an azure blob and renewing the lease
+
+    While the lease is held, it's renewed by a background thread every
+    ``renew_interval`` seconds.
     """
+
+    # Number of seconds between lease renewals (leases are acquired for
+    # 60 seconds)
+    renew_interval = 30
+
     def __init__(self, driver, object_path, use_lease):
         """
         :param driver: The Azure storage driver that is being used
@@ -94,10 +104,12 @@ class AzureBlobLease(object):
         self.use_lease = use_lease
         self.lease_id = None
         self.params = {'comp': 'lease'}
+        self._stopped = threading.Event()
+        self._renew_thread = None
 
     def renew(self):
         """
-        Renew the lease if it is older than a predefined time period
+        Renew the lease
         """
         if self.lease_id is None:
             return
@@ -139,12 +151,15 @@ class AzureBlobLease(object):
             raise LibcloudError('Unable to obtain lease', driver=self)
 
         self.lease_id = response.headers['x-ms-lease-id']
+        self._start_renewal()
         return self
 
     def __exit__(self, type, value, traceback):
         if self.lease_id is None:
             return
 
+        self._stop_renewal()
+
         headers = {'x-ms-lease-action': 'release',
                    'x-ms-lease-id': self.lease_id}
         response = self.driver.connection.request(self.object_path,
@@ -155,6 +170,33 @@ class AzureBlobLease(object):
         if response.status != httplib.OK:
             raise LibcloudError('Unable to release lease', driver=self)
 
+    def _start_renewal(self):
+        self._stopped.clear()
+        self._renew_thread = threading.Thread(target=self._renew_periodically)
+        self._renew_thread.daemon = True
+        self._renew_thread.start()
+
+    def _stop_renewal(self):
+        self._stopped.set()
+
+        if self._renew_thread is not None:
+            self._renew_thread.join()
+            self._renew_thread = None
+
+    def _renew_periodically(self):
+        while True:
+            self._stopped.wait(self.renew_interval)
+
+            if self._stopped.is_set():
+                return
+
+            try:
+                self.renew()
+            except Exception:
+                # Requests which use the lease fail once it has expired, so
+                # the error is reported by them
+                return
+
 
 class AzureBlobsConnection(AzureConnection):
     """
@@ -560,6 +602,12 @@ class AzureBlobsStorageDriver(StorageDriver):
                                     'delete_on_failure': delete_on_failure},
                                 success_status_code=httplib.OK)
 
+    def _get_object_range(self, obj, start_bytes, end_bytes):
+        obj_path = self._get_object_path(obj.container, obj.name)
+        headers = {'Range': 'bytes=%d-%d' % (start_bytes, end_bytes)}
+        return self.connection.request(obj_path, headers=headers, raw=True,
+                                       data=None)
+
     def download_object_as_stream(self, obj, chunk_size=None):
         """
         @inherits: :class:`StorageDriver.download_object_as_stream`
@@ -615,60 +663,62 @@ class AzureBlobsStorageDriver(StorageDriver):
         bytes_transferred = 0
         count = 1
         chunks = []
-        headers = {}
-
-        lease.update_headers(headers)
-
-        if blob_type == 'BlockBlob':
-            params = {'comp': 'block'}
-        else:
-            params = {'comp': 'page'}
-
-        # Read the input data in chunk sizes suitable for AWS
-        for data in read_in_chunks(iterator, AZURE_CHUNK_SIZE):
-            data = b(data)
-            content_length = len(data)
-            offset = bytes_transferred
-            bytes_transferred += content_length
-
-            if calculate_hash:
-                data_hash.update(data)
-
-            chunk_hash = self._get_hash_function()
-            chunk_hash.update(data)
-            chunk_hash = base64.b64encode(b(chunk_hash.digest()))
-
-            headers['Content-MD5'] = chunk_hash.decode('utf-8')
-            headers['Content-Length'] = content_length
-
-            if blob_type == 'BlockBlob':
-                # Block id can be any unique string that is base64 encoded
-                # A 10 digit number can hold the max value of 50000 blocks
-                # that are allowed for azure
-                block_id = base64.b64encode(b('%10d' % (count)))
-                block_id = block_id.decode('utf-8')
-                params['blockid'] = block_id
-
-                # Keep this data for a later commit
-                chunks.append(block_id)
-            else:
-                headers['x-ms-page-write'] = 'update'
-                headers['x-ms-range'] = 'bytes=%d-%d' % \
-                    (offset, bytes_transferred-1)
-
-            # Renew lease before updating
-            lease.renew()
-
-            resp = self.connection.request(object_path, method='PUT',
-                                           data=data, headers=headers,
-                                           params=params)
-
-            if resp.status != httplib.CREATED:
-                resp.parse_error()
-                raise LibcloudError('Error uploading chunk %d. Code: %d' %
-                                    (count, resp.status), driver=self)
-
-            count += 1
+        futures = []
+
+        # Chunks are uploaded concurrently, at most upload_concurrency chunks
+        # are waiting for a free worker so memory usage is bounded
+        pool = WorkerPool(max_workers=self.upload_concurrency,
+                          max_pending=self.upload_concurrency)
+
+        completed = False
+
+        try:
+            # Read the input data in chunk sizes suitable for Azure
+            for data in read_in_chunks(iterator, AZURE_CHUNK_SIZE):
+                data = b(data)
+                content_length = len(data)
+                offset = bytes_transferred
+                bytes_transferred += content_length
+
+                if calculate_hash:
+                    data_hash.update(data)
+
+                headers = {}
+                lease.update_headers(headers)
+
+                if blob_type == 'BlockBlob':
+                    # Block id can be any unique string that is base64
+                    # encoded. A 10 digit number can hold the max value of
+                    # 50000 blocks that are allowed for azure
+                    block_id = base64.b64encode(b('%10d' % (count)))
+                    block_id = block_id.decode('utf-8')
+                    params = {'comp': 'block', 'blockid': block_id}
+
+                    # Keep this data for a later commit
+                    chunks.append(block_id)
+                else:
+                    params = {'comp': 'page'}
+                    headers['x-ms-page-write'] = 'update'
+                    headers['x-ms-range'] = 'bytes=%d-%d' % \
+                        (offset, bytes_transferred - 1)
+
+                # Stop reading the data as soon as an upload has failed
+                for future in [f for f in futures if f.done()]:
+                    futures.remove(future)
+                    future.result()
+
+                futures.append(pool.submit(self._upload_chunk, object_path,
+                                           data, headers, params, count))
+                count += 1
+
+            completed = True
+        finally:
+            # Chunks which haven't been started yet are dropped if an upload
+            # has failed
+            pool.shutdown(wait=True, cancel_pending=not completed)
+
+        for future in futures:
+            future.result()
 
         if calculate_hash:
             data_hash = data_hash.hexdigest()
@@ -682,6 +732,23 @@ class AzureBlobsStorageDriver(StorageDriver):
 
         return (True, data_hash, bytes_transferred)
 
+    def _upload_chunk(self, object_path, data, headers, params, count):
+        chunk_hash = self._get_hash_function()
+        chunk_hash.update(data)
+        chunk_hash = base64.b64encode(b(chunk_hash.digest()))
+
+        headers['Content-MD5'] = chunk_hash.decode('utf-8')
+        headers['Content-Length'] = len(data)
+
+        resp = self.connection.request(object_path, method='PUT',
+                                       data=data, headers=headers,
+                                       params=params)
+
+        if resp.status != httplib.CREATED:
+            resp.parse_error()
+            raise LibcloudError('Error uploading chunk %d. Code: %d' %
+                                (count, resp.status), driver=self)
+
     def _commit_blocks(self, object_path, chunks, lease):
         """
         Makes a final commit of the data.
@@ -704,7 +771,6 @@ class AzureBlobsStorageDriver(StorageDriver):
         headers = {}
 
         lease.update_headers(headers)
-        lease.renew()
 
         response = self.connection.request(object_path, data=data,
                                            params=params, headers=headers,
@@ -762,8 +828,6 @@ class AzureBlobsStorageDriver(StorageDriver):
         self._check_values(ex_blob_type, file_size)
 
         with file(file_path, 'rb') as file_handle:
-            iterator = iter(file_handle)
-
             # If size is greater than 64MB or type is Page, upload in chunks
             if ex_blob_type == 'PageBlob' or file_size > AZURE_BLOCK_MAX_SIZE:
                 # For chunked upload of block blobs, the initial size must
@@ -773,14 +837,16 @@ class AzureBlobsStorageDriver(StorageDriver):
 
                 object_path = self._get_object_path(container, object_name)
 
+                # File object is passed directly so blocks are read using
+                # fixed size reads instead of iterating over lines
                 upload_func = self._upload_in_chunks
-                upload_func_kwargs = {'iterator': iterator,
+                upload_func_kwargs = {'iterator': file_handle,
                                       'object_path': object_path,
                                       'blob_type': ex_blob_type,
                                       'lease': None}
             else:
-                upload_func = self._stream_data
-                upload_func_kwargs = {'iterator': iterator,
+                upload_func = self._stream_file
+                upload_func_kwargs = {'file_handle': file_handle,
                                       'chunked': False,
                                       'calculate_hash': verify_hash}
 
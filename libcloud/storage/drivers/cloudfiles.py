@@ -34,6 +34,7 @@ if PY3:
     from io import FileIO as file
 
 from libcloud.utils.files import read_in_chunks
+from libcloud.utils.concurrency import run_concurrently
 from libcloud.common.types import MalformedResponseError, LibcloudError
 from libcloud.common.base import Response, RawResponse
 
@@ -371,6 +372,15 @@ class CloudFilesStorageDriver(StorageDriver, OpenStackDriverMixin):
                              'delete_on_failure': delete_on_failure},
             success_status_code=httplib.OK)
 
+    def _get_object_range(self, obj, start_bytes, end_bytes):
+        container_name = obj.container.name
+        object_name = obj.name
+        headers = {'Range': 'bytes=%d-%d' % (start_bytes, end_bytes)}
+        return self.connection.request('/%s/%s' % (container_name,
+                                                   object_name),
+                                       method='GET', headers=headers,
+                                       raw=True)
+
     def download_object_as_stream(self, obj, chunk_size=None):
         container_name = obj.container.name
         object_name = obj.name
@@ -475,7 +485,19 @@ class CloudFilesStorageDriver(StorageDriver, OpenStackDriverMixin):
 
     def ex_multipart_upload_object(self, file_path, container, object_name,
                                    chunk_size=33554432, extra=None,
-                                   verify_hash=True):
+                                   verify_hash=True, max_workers=None):
+        """
+        Upload a file as multiple segments and a manifest object which ties
+        them together.
+
+        Segments are uploaded concurrently and the manifest is created once
+        all of them have been uploaded.
+
+        :param max_workers: Maximum number of segments which are uploaded at
+                            the same time (defaults to
+                            ``upload_concurrency``).
+        :type max_workers: ``int``
+        """
         object_size = os.path.getsize(file_path)
         if object_size < chunk_size:
             return self.upload_object(file_path, container, object_name,
@@ -483,13 +505,29 @@ class CloudFilesStorageDriver(StorageDriver, OpenStackDriverMixin):
 
         iter_chunk_reader = FileChunkReader(file_path, chunk_size)
 
-        for index, iterator in enumerate(iter_chunk_reader):
+        def upload_part(item):
+            index, iterator = item
             self._upload_object_part(container=container,
                                      object_name=object_name,
                                      part_number=index,
                                      iterator=iterator,
                                      verify_hash=verify_hash)
 
+        results = run_concurrently(
+            upload_part, enumerate(iter_chunk_reader),
+            max_workers=max_workers or self.upload_concurrency)
+
+        try:
+            for item, future in results:
+                # Stop uploading the remaining segments as soon as one of
+                # them has failed
+                error = future.exception()
+
+                if error is not None:
+                    raise error
+        finally:
+            results.close()
+
         return self._upload_object_manifest(container=container,
                                             object_name=object_name,
                                             extra=extra,
@@ -915,8 +953,10 @@ class FileChunkReader(object):
 
 class ChunkStreamReader(object):
     def __init__(self, file_path, start_block, end_block, chunk_size):
-        self.fd = open(file_path, 'rb')
-        self.fd.seek(start_block)
+        # File is only opened once the data is read so readers for all the
+        # chunks can be created upfront
+        self.file_path = file_path
+        self.fd = None
         self.start_block = start_block
         self.end_block = end_block
         self.chunk_size = chunk_size
@@ -928,9 +968,14 @@ class ChunkStreamReader(object):
 
     def next(self):
         if self.stop_iteration:
-            self.fd.close()
+            if self.fd is not None:
+                self.fd.close()
             raise StopIteration
 
+        if self.fd is None:
+            self.fd = open(self.file_path, 'rb')
+            self.fd.seek(self.start_block)
+
         block_size = self.chunk_size
         if self.bytes_read + block_size > \
                 self.end_block - self.start_block:
@@ -34,6 +34,7 @@ from libcloud.utils.py3 import tostring
 
 from libcloud.utils.xml import fixxpath, findtext
 from libcloud.utils.files import read_in_chunks
+from libcloud.utils.concurrency import WorkerPool
 from libcloud.common.types import InvalidCredsError, LibcloudError
 from libcloud.common.base import ConnectionUserAndKey, RawResponse
 from libcloud.common.aws import AWSBaseResponse, AWSDriver, AWSTokenConnection
@@ -228,6 +229,18 @@ class BaseS3StorageDriver(StorageDriver):
     ex_location_name = ''
     namespace = NAMESPACE
 
+    # Size of a single part in multipart uploads (must be at least 5 MB)
+    multipart_part_size = CHUNK_SIZE
+
+    # Number of parts which are uploaded concurrently in multipart uploads
+    multipart_concurrency = 1
+
+    # Maximum number of parts which have already been read from the source
+    # iterator and are waiting for a free upload worker. Together with
+    # "multipart_concurrency" this puts a bound on the memory usage of
+    # concurrent multipart uploads (defaults to "multipart_concurrency").
+    multipart_max_pending_parts = None
+
     def iterate_containers(self):
         response = self.connection.request('/')
         if response.status == httplib.OK:
@@ -428,6 +441,12 @@ class BaseS3StorageDriver(StorageDriver):
                                                  'chunk_size': chunk_size},
                                 success_status_code=httplib.OK)
 
+    def _get_object_range(self, obj, start_bytes, end_bytes):
+        obj_path = self._get_object_path(obj.container, obj.name)
+        headers = {'Range': 'bytes=%d-%d' % (start_bytes, end_bytes)}
+        return self.connection.request(obj_path, method='GET',
+                                       headers=headers, raw=True)
+
     def upload_object(self, file_path, container, object_name, extra=None,
                       verify_hash=True, ex_storage_class=None):
         """
@@ -447,7 +466,8 @@ class BaseS3StorageDriver(StorageDriver):
                                 storage_class=ex_storage_class)
 
     def _upload_multipart(self, response, data, iterator, container,
-                          object_name, calculate_hash=True):
+                          object_name, calculate_hash=True, part_size=None,
+                          concurrency=None):
         """
         Callback invoked for uploading data to S3 using Amazon's
         multipart upload mechanism
@@ -471,6 +491,14 @@ class BaseS3StorageDriver(StorageDriver):
         :keyword calculate_hash: Indicates if we must calculate the data hash
         :type calculate_hash: ``bool``
 
+        :keyword part_size: Size of a single part (defaults to
+                            ``multipart_part_size``)
+        :type part_size: ``int``
+
+        :keyword concurrency: Number of parts which are uploaded concurrently
+                              (defaults to ``multipart_concurrency``)
+        :type concurrency: ``int``
+
         :return: A tuple of (status, checksum, bytes transferred)
         :rtype: ``tuple``
         """
@@ -486,7 +514,9 @@ class BaseS3StorageDriver(StorageDriver):
         try:
             # Upload the data through the iterator
             result = self._upload_from_iterator(iterator, object_path,
-                                                upload_id, calculate_hash)
+                                                upload_id, calculate_hash,
+                                                part_size=part_size,
+                                                concurrency=concurrency)
             (chunks, data_hash, bytes_transferred) = result
 
             # Commit the chunk info and complete the upload
@@ -504,7 +534,8 @@ class BaseS3StorageDriver(StorageDriver):
         return (True, data_hash, bytes_transferred)
 
     def _upload_from_iterator(self, iterator, object_path, upload_id,
-                              calculate_hash=True):
+                              calculate_hash=True, part_size=None,
+                              concurrency=None):
         """
         Uploads data from an interator in fixed sized chunks to S3
 
@@ -520,54 +551,123 @@ class BaseS3StorageDriver(StorageDriver):
         :keyword calculate_hash: Indicates if we must calculate the data hash
         :type calculate_hash: ``bool``
 
+        :keyword part_size: Size of a single part (defaults to
+                            ``multipart_part_size``)
+        :type part_size: ``int``
+
+        :keyword concurrency: Number of parts which are uploaded concurrently
+                              (defaults to ``multipart_concurrency``)
+        :type concurrency: ``int``
+
         :return: A tuple of (chunk info, checksum, bytes transferred)
         :rtype: ``tuple``
         """
+        part_size = part_size or self.multipart_part_size
+        concurrency = concurrency or self.multipart_concurrency
 
-        data_hash = None
+        if part_size < CHUNK_SIZE:
+            raise ValueError('Part size must be at least %s bytes' %
+                             (CHUNK_SIZE))
+
+        # Whole object hash is calculated in a separate thread while the
+        # part hashes are calculated by the threads which upload the parts
+        hasher = None
         if calculate_hash:
-            data_hash = self._get_hash_function()
+            hasher = self._get_upload_hasher(self._get_hash_function())
 
         bytes_transferred = 0
         count = 1
         chunks = []
-        params = {'uploadId': upload_id}
+
+        if concurrency > 1:
+            max_pending = self.multipart_max_pending_parts or concurrency
+            pool = WorkerPool(max_workers=concurrency,
+                              max_pending=max_pending)
+        else:
+            pool = None
+
+        futures = []
+        failed = []
+
+        def on_part_done(future):
+            if future.exception() is not None:
+                failed.append(future)
 
         # Read the input data in chunk sizes suitable for AWS
-        for data in read_in_chunks(iterator, chunk_size=CHUNK_SIZE,
-                                   fill_size=True, yield_empty=True):
-            bytes_transferred += len(data)
+        parts = read_in_chunks(iterator, chunk_size=part_size,
+                               fill_size=True, yield_empty=True)
+        parts = self._get_upload_pipeline(generator=parts,
+                                          chunk_size=part_size)
 
+        try:
+            for data in parts:
+                bytes_transferred += len(data)
+
+                if calculate_hash:
+                    hasher.update(data)
+
+                if pool is None:
+                    chunks.append(self._upload_part(object_path, upload_id,
+                                                    count, data))
+                else:
+                    # Stop reading as soon as one of the parts has failed
+                    if failed:
+                        raise failed[0].exception()
+
+                    future = pool.submit(self._upload_part, object_path,
+                                         upload_id, count, data)
+                    future.add_done_callback(on_part_done)
+                    futures.append(future)
+                count += 1
+
+            # Parts need to be committed in order
+            for future in futures:
+                chunks.append(future.result())
+
+            data_hash = None
             if calculate_hash:
-                data_hash.update(data)
+                data_hash = hasher.wait()[0].hexdigest()
+        finally:
+            parts.close()
 
-            chunk_hash = self._get_hash_function()
-            chunk_hash.update(data)
-            chunk_hash = base64.b64encode(chunk_hash.digest()).decode('utf-8')
+            if hasher is not None:
+                hasher.close()
 
-            # This provides an extra level of data check and is recommended
-            # by amazon
-            headers = {'Content-MD5': chunk_hash}
-            params['partNumber'] = count
+            if pool is not None:
+                # Wait for all the in-flight parts so the upload is not
+                # aborted while parts are still being uploaded
+                pool.shutdown(wait=True)
 
-            request_path = '?'.join((object_path, urlencode(params)))
+        return (chunks, data_hash, bytes_transferred)
 
-            resp = self.connection.request(request_path, method='PUT',
-                                           data=data, headers=headers)
+    def _upload_part(self, object_path, upload_id, part_number, data):
+        """
+        Upload a single part of a multipart upload.
+
+        :return: A tuple of (part number, server side etag)
+        :rtype: ``tuple``
+        """
+        chunk_hash = self._get_hash_function()
+        chunk_hash.update(data)
+        chunk_hash = base64.b64encode(chunk_hash.digest()).decode('utf-8')
 
-            if resp.status != httplib.OK:
-                raise LibcloudError('Error uploading chunk', driver=self)
+        # This provides an extra level of data check and is recommended
+        # by amazon
+        headers = {'Content-MD5': chunk_hash}
+        params = {'uploadId': upload_id, 'partNumber': part_number}
 
-            server_hash = resp.headers['etag']
+        request_path = '?'.join((object_path, urlencode(params)))
 
-            # Keep this data for a later commit
-            chunks.append((count, server_hash))
-            count += 1
+        resp = self.connection.request(request_path, method='PUT',
+                                       data=data, headers=headers)
 
-        if calculate_hash:
-            data_hash = data_hash.hexdigest()
+        if resp.status != httplib.OK:
+            raise LibcloudError('Error uploading chunk', driver=self)
 
-        return (chunks, data_hash, bytes_transferred)
+        server_hash = resp.headers['etag']
+
+        # Keep this data for a later commit
+        return (part_number, server_hash)
 
     def _commit_multipart(self, object_path, upload_id, chunks):
         """
@@ -632,12 +732,22 @@ class BaseS3StorageDriver(StorageDriver):
                                 (resp.status), driver=self)
 
     def upload_object_via_stream(self, iterator, container, object_name,
-                                 extra=None, ex_storage_class=None):
+                                 extra=None, ex_storage_class=None,
+                                 ex_part_size=None, ex_concurrency=None):
         """
         @inherits: :class:`StorageDriver.upload_object_via_stream`
 
         :param ex_storage_class: Storage class
         :type ex_storage_class: ``str``
+
+        :param ex_part_size: Size of a single part in a multipart upload
+                             (defaults to ``multipart_part_size``).
+        :type ex_part_size: ``int``
+
+        :param ex_concurrency: Number of parts which are uploaded concurrently
+                               in a multipart upload (defaults to
+                               ``multipart_concurrency``).
+        :type ex_concurrency: ``int``
         """
 
         method = 'PUT'
@@ -651,7 +761,9 @@ class BaseS3StorageDriver(StorageDriver):
             upload_func = self._upload_multipart
             upload_func_kwargs = {'iterator': iterator,
                                   'container': container,
-                                  'object_name': object_name}
+                                  'object_name': object_name,
+                                  'part_size': ex_part_size,
+                                  'concurrency': ex_concurrency}
             method = 'POST'
             iterator = iter('')
             params = 'uploads'
@@ -789,27 +901,13 @@ class BaseS3StorageDriver(StorageDriver):
                     upload_func_kwargs, method='PUT', query_args=None,
                     extra=None, file_path=None, iterator=None,
                     verify_hash=True, storage_class=None):
-        headers = {}
         extra = extra or {}
-        storage_class = storage_class or 'standard'
-        if storage_class not in ['standard', 'reduced_redundancy']:
-            raise ValueError(
-                'Invalid storage class value: %s' % (storage_class))
-
-        headers['x-amz-storage-class'] = storage_class.upper()
-
+        headers = self._get_put_object_headers(extra=extra,
+                                               storage_class=storage_class)
         content_type = extra.get('content_type', None)
         meta_data = extra.get('meta_data', None)
         acl = extra.get('acl', None)
 
-        if meta_data:
-            for key, value in list(meta_data.items()):
-                key = 'x-amz-meta-%s' % (key)
-                headers[key] = value
-
-        if acl:
-            headers['x-amz-acl'] = acl
-
         request_path = self._get_object_path(container, object_name)
 
         if query_args:
@@ -847,6 +945,32 @@ class BaseS3StorageDriver(StorageDriver):
                 'Unexpected status code, status_code=%s' % (response.status),
                 driver=self)
 
+    def _get_put_object_headers(self, extra, storage_class=None):
+        """
+        Return headers with the storage class, meta data and ACL of an
+        uploaded object.
+        """
+        headers = {}
+        storage_class = storage_class or 'standard'
+        if storage_class not in ['standard', 'reduced_redundancy']:
+            raise ValueError(
+                'Invalid storage class value: %s' % (storage_class))
+
+        headers['x-amz-storage-class'] = storage_class.upper()
+
+        meta_data = extra.get('meta_data', None)
+        acl = extra.get('acl', None)
+
+        if meta_data:
+            for key, value in list(meta_data.items()):
+                key = 'x-amz-meta-%s' % (key)
+                headers[key] = value
+
+        if acl:
+            headers['x-amz-acl'] = acl
+
+        return headers
+
     def _to_containers(self, obj, xpath):
         for element in obj.findall(fixxpath(xpath=xpath,
                                    namespace=self.namespace)):
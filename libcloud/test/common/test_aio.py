@@ -0,0 +1,376 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import json
+import hashlib
+import tempfile
+import threading
+
+from libcloud.test import unittest
+from libcloud.test.file_fixtures import ComputeFileFixtures
+from libcloud.utils.py3 import b, parse_qs, urlparse
+from libcloud.common.base import Connection, JsonResponse, PollingConnection
+
+HAS_ASYNCIO = sys.version_info >= (3, 5)
+
+if HAS_ASYNCIO:
+    import asyncio
+    import socketserver
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    from libcloud.common.aio import AsyncConnection
+    from libcloud.common.aio import DEFAULT_ASYNC_CONNECTION_POOL
+    from libcloud.common.types import LibcloudError
+    from libcloud.compute.aio import AsyncEC2NodeDriver, get_async_driver
+    from libcloud.compute.drivers.ec2 import EC2NodeDriver
+    from libcloud.storage.aio import get_async_driver as get_storage_driver
+    from libcloud.storage.base import Container
+    from libcloud.storage.drivers.s3 import S3StorageDriver
+
+    class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+    class RequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self._handle()
+
+        def do_PUT(self):
+            self._handle()
+
+        def do_POST(self):
+            self._handle()
+
+        def _handle(self):
+            self.server.requests.append((self.command, self.path,
+                                         self.client_address[1],
+                                         dict(self.headers.items())))
+            url = urlparse.urlparse(self.path)
+            params = dict([(key, values[0]) for key, values in
+                           parse_qs(url.query).items()])
+            body = self._read_body()
+
+            if url.path == '/chunked':
+                self.send_response(200)
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+                for chunk in ['{"a": ', '"b"}']:
+                    self.wfile.write(b('%x\r\n%s\r\n' % (len(chunk), chunk)))
+                self.wfile.write(b('0\r\n\r\n'))
+                return
+
+            if url.path == '/bucket/error':
+                self.send_response(500)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            if url.path.startswith('/bucket/'):
+                self.send_response(200)
+                self.send_header('ETag', '"%s"' % (hashlib.md5(body)
+                                                   .hexdigest()))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            if url.path == '/job':
+                self.server.polls += 1
+                data = {'done': self.server.polls >= 3}
+            elif 'Action' in params:
+                data = None
+                body = self.server.ec2_responses[params['Action']]
+            else:
+                data = {'path': url.path, 'params': params,
+                        'body_length': len(body)}
+
+            if data is not None:
+                body = json.dumps(data)
+
+            body = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_body(self):
+            if self.headers.get('Transfer-Encoding') == 'chunked':
+                chunks = []
+
+                while True:
+                    size = int(self.rfile.readline().strip(), 16)
+
+                    if size == 0:
+                        self.rfile.readline()
+                        return b('').join(chunks)
+
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+
+            length = int(self.headers.get('Content-Length', 0))
+            return self.rfile.read(length)
+
+
+class KeyConnection(Connection):
+    responseCls = JsonResponse
+    authenticated = True
+    authentications = 0
+
+    def add_default_params(self, params):
+        params['key'] = 'secret'
+        return params
+
+    def needs_authentication(self):
+        return not self.authenticated
+
+    def refresh_authentication(self):
+        self.authentications += 1
+        self.authenticated = True
+
+
+class JobConnection(KeyConnection, PollingConnection):
+    poll_interval = 0
+
+    def get_poll_request_kwargs(self, response, context, request_kwargs):
+        return {'action': '/job'}
+
+    def has_completed(self, response):
+        return response.object['done']
+
+
+@unittest.skipIf(not HAS_ASYNCIO, 'asyncio transport requires Python 3.5')
+class AsyncConnectionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.server.requests = []
+        self.server.polls = 0
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        self.port = self.server.server_address[1]
+        self.connection = KeyConnection(host='127.0.0.1', port=self.port,
+                                        secure=False)
+        self.async_connection = AsyncConnection(self.connection)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        DEFAULT_ASYNC_CONNECTION_POOL.clear()
+        asyncio.set_event_loop(None)
+        self.loop.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_request_uses_connection_hooks_and_response_class(self):
+        response = self.loop.run_until_complete(
+            self.async_connection.request('/test', params={'a': '1'}))
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.object['path'], '/test')
+        self.assertEqual(response.object['params'], {'a': '1',
+                                                     'key': 'secret'})
+
+        headers = self.server.requests[0][3]
+        self.assertTrue(headers['User-Agent'].startswith('libcloud/'))
+
+    def test_connection_is_reused_between_requests(self):
+        request = self.async_connection.request
+        self.loop.run_until_complete(request('/1'))
+        self.loop.run_until_complete(request('/2'))
+
+        ports = [item[2] for item in self.server.requests]
+        self.assertEqual(ports[0], ports[1])
+        self.assertEqual(self.async_connection.connection_pool.size(), 1)
+
+    def test_connections_are_pooled_per_event_loop(self):
+        request = self.async_connection.request
+        self.loop.run_until_complete(request('/1'))
+        self.loop.close()
+
+        # Connection of the closed loop isn't reused by the new loop
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(request('/2'))
+
+        ports = [item[2] for item in self.server.requests]
+        self.assertNotEqual(ports[0], ports[1])
+
+    def test_connection_of_closed_event_loop_is_discarded(self):
+        request = self.async_connection.request
+        endpoint = self.async_connection._get_endpoint()
+        old_key = (id(self.loop), endpoint)
+        self.loop.run_until_complete(request('/1'))
+        self.loop.close()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        # Pool the connection as if the closed loop's id had been reused
+        pool = DEFAULT_ASYNC_CONNECTION_POOL
+        connection, reused = pool.acquire(key=old_key, factory=None)
+        self.assertTrue(reused)
+        pool.release(key=(id(self.loop), endpoint), connection=connection)
+        self.assertTrue(connection.is_stale())
+
+        response = self.loop.run_until_complete(request('/2'))
+        self.assertEqual(response.object['path'], '/2')
+
+        ports = [item[2] for item in self.server.requests]
+        self.assertNotEqual(ports[0], ports[1])
+
+    def test_only_idempotent_requests_are_retried(self):
+        class StaleConnection(object):
+            def is_stale(self):
+                return False
+
+            def request(self, method, url, body=None, headers=None):
+                # Not a coroutine function so the module still compiles on
+                # the Python versions without async / await syntax
+                future = asyncio.Future()
+                future.set_exception(ConnectionResetError())
+                return future
+
+            def close(self):
+                pass
+
+        endpoint = self.async_connection._get_endpoint()
+        key = (id(self.loop), endpoint)
+        request = self.async_connection.request
+
+        DEFAULT_ASYNC_CONNECTION_POOL.release(key=key,
+                                              connection=StaleConnection())
+        response = self.loop.run_until_complete(request('/1'))
+        self.assertEqual(response.object['path'], '/1')
+
+        DEFAULT_ASYNC_CONNECTION_POOL.clear()
+        DEFAULT_ASYNC_CONNECTION_POOL.release(key=key,
+                                              connection=StaleConnection())
+        self.assertRaises(ConnectionResetError, self.loop.run_until_complete,
+                          request('/2', method='POST'))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_chunked_response_and_streamed_request_body(self):
+        response = self.loop.run_until_complete(
+            self.async_connection.request('/chunked'))
+        self.assertEqual(response.object, {'a': 'b'})
+
+        def iterator():
+            for _ in range(3):
+                yield b('x' * 1000)
+
+        response = self.loop.run_until_complete(
+            self.async_connection.request('/upload', method='PUT',
+                                          iterator=iterator()))
+        self.assertEqual(response.object['body_length'], 3000)
+        self.assertEqual(self.server.requests[1][3]['Transfer-Encoding'],
+                         'chunked')
+
+    def test_many_requests_in_flight(self):
+        self.async_connection.max_concurrency = 20
+        requests = [self.async_connection.request('/%s' % (index))
+                    for index in range(100)]
+        responses = self.loop.run_until_complete(asyncio.gather(*requests))
+
+        self.assertEqual([response.object['path'] for response in responses],
+                         ['/%s' % (index) for index in range(100)])
+
+    def test_authentication_is_refreshed_once(self):
+        self.connection.authenticated = False
+        requests = [self.async_connection.request('/') for _ in range(5)]
+        self.loop.run_until_complete(asyncio.gather(*requests))
+
+        self.assertEqual(self.connection.authentications, 1)
+
+    def test_async_request_polls_without_blocking(self):
+        connection = JobConnection(host='127.0.0.1', port=self.port,
+                                   secure=False)
+        async_connection = AsyncConnection(connection)
+        response = self.loop.run_until_complete(
+            async_connection.async_request('/start', method='PUT'))
+
+        self.assertTrue(response.object['done'])
+        self.assertEqual([item[1] for item in self.server.requests],
+                         ['/start?key=secret', '/job?key=secret',
+                          '/job?key=secret', '/job?key=secret'])
+
+    def test_ec2_list_nodes(self):
+        fixtures = ComputeFileFixtures('ec2')
+        self.server.ec2_responses = {
+            'DescribeInstances': fixtures.load('describe_instances.xml'),
+            'DescribeAddresses': fixtures.load('describe_addresses_multi.xml')
+        }
+        driver = EC2NodeDriver('foo', 'bar', host='127.0.0.1',
+                               port=self.port, secure=False)
+        async_driver = get_async_driver(driver)
+        self.assertTrue(isinstance(async_driver, AsyncEC2NodeDriver))
+
+        nodes = self.loop.run_until_complete(async_driver.list_nodes())
+
+        self.assertEqual(nodes[0].id, 'i-4382922a')
+        self.assertEqual(sorted(nodes[0].public_ips)[0], '1.2.3.4')
+        self.assertEqual(len(nodes[0].public_ips), 2)
+
+        # Requests are signed by the EC2 connection
+        self.assertTrue('Signature=' in self.server.requests[0][1])
+
+    def test_s3_upload_object(self):
+        driver = S3StorageDriver('foo', 'bar', host='127.0.0.1',
+                                 port=self.port, secure=False)
+        container = Container(name='bucket', extra={}, driver=driver)
+        fd, file_path = tempfile.mkstemp(suffix='.txt')
+        os.write(fd, b('a' * 100000))
+        os.close(fd)
+
+        try:
+            obj = self.loop.run_until_complete(
+                get_storage_driver(driver).upload_object(
+                    file_path, container, 'object'))
+        finally:
+            os.remove(file_path)
+
+        self.assertEqual(obj.size, 100000)
+        self.assertEqual(obj.hash, hashlib.md5(b('a' * 100000)).hexdigest())
+
+        method, path, _, headers = self.server.requests[0]
+        self.assertEqual(method, 'PUT')
+        self.assertTrue(path.startswith('/bucket/object?'))
+        self.assertTrue('Signature=' in path)
+        self.assertEqual(headers['Content-Type'], 'text/plain')
+        self.assertEqual(headers['Content-Length'], '100000')
+
+    def test_s3_upload_object_error(self):
+        driver = S3StorageDriver('foo', 'bar', host='127.0.0.1',
+                                 port=self.port, secure=False)
+        container = Container(name='bucket', extra={}, driver=driver)
+        fd, file_path = tempfile.mkstemp(suffix='.txt')
+        os.write(fd, b('a' * 100))
+        os.close(fd)
+
+        try:
+            self.assertRaises(LibcloudError, self.loop.run_until_complete,
+                              get_storage_driver(driver).upload_object(
+                                  file_path, container, 'error'))
+        finally:
+            os.remove(file_path)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
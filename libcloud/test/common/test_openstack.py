@@ -13,12 +13,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import sys
+import stat
+import time
+import shutil
+import datetime
+import tempfile
+import threading
 import unittest
 
 from mock import Mock
 
 from libcloud.common.openstack import OpenStackBaseConnection
+from libcloud.common.openstack import OpenStackAuthConnection
+from libcloud.common.openstack import OpenStackAuthTokenCache
+from libcloud.common.openstack import OpenStackFileAuthTokenCache
+from libcloud.utils.iso8601 import parse_date
 from libcloud.utils.py3 import PY25
 
 
@@ -45,5 +56,150 @@ class OpenStackBaseConnectionTest(unittest.TestCase):
                                                                timeout=10)
 
 
+class OpenStackAuthTokenCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = OpenStackAuthTokenCache()
+        self.auth_requests = []
+        self.expires = parse_date('2031-11-23T21:00:14.000-06:00')
+
+    def _get_connection(self, user_id='foo', key='bar', delay=0):
+        parent_conn = Mock()
+        osa = OpenStackAuthConnection(parent_conn, 'https://127.0.0.1',
+                                      '2.0', user_id, key)
+        osa.token_cache = self.cache
+
+        def authenticate():
+            time.sleep(delay)
+            self.auth_requests.append(osa)
+            osa.auth_token = 'token-%s' % (len(self.auth_requests))
+            osa.auth_token_expires = self.expires
+            osa.urls = {'compute': [{'publicURL': 'https://127.0.0.2'}]}
+            osa.auth_user_info = {'id': user_id}
+            return osa
+
+        osa._authenticate = authenticate
+        return osa
+
+    def test_token_is_shared_between_connections(self):
+        osa1 = self._get_connection()
+        osa2 = self._get_connection()
+
+        osa1.authenticate()
+        osa2.authenticate()
+
+        self.assertEqual(len(self.auth_requests), 1)
+        self.assertEqual(osa2.auth_token, 'token-1')
+        self.assertEqual(osa2.auth_token_expires, self.expires)
+        self.assertEqual(osa2.urls, osa1.urls)
+        self.assertEqual(osa2.auth_user_info, {'id': 'foo'})
+
+        # Different credentials use a different token
+        osa3 = self._get_connection(key='baz')
+        osa3.authenticate()
+        self.assertEqual(len(self.auth_requests), 2)
+        self.assertEqual(osa3.auth_token, 'token-2')
+
+    def test_expired_token_is_not_used(self):
+        self.expires = datetime.datetime.utcnow() + datetime.timedelta(
+            seconds=1)
+        self._get_connection().authenticate()
+
+        osa = self._get_connection()
+        osa.authenticate()
+        self.assertEqual(len(self.auth_requests), 2)
+        self.assertEqual(osa.auth_token, 'token-2')
+
+    def test_forced_refresh_uses_token_refreshed_by_other_connection(self):
+        osa1 = self._get_connection()
+        osa2 = self._get_connection()
+        osa1.authenticate()
+        osa2.authenticate()
+
+        # Token has been rejected, both connections ask for a new one
+        osa1.authenticate(force=True)
+        osa2.authenticate(force=True)
+
+        self.assertEqual(len(self.auth_requests), 2)
+        self.assertEqual(osa1.auth_token, 'token-2')
+        self.assertEqual(osa2.auth_token, 'token-2')
+
+    def test_concurrent_refreshes_are_collapsed(self):
+        connections = [self._get_connection(delay=0.1) for _ in range(5)]
+        threads = [threading.Thread(target=osa.authenticate)
+                   for osa in connections]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.auth_requests), 1)
+        self.assertEqual([osa.auth_token for osa in connections],
+                         ['token-1'] * 5)
+
+    def test_tokens_without_expiration_are_not_cached(self):
+        osa = self._get_connection()
+        osa.auth_version = '1.0'
+        osa.authenticate()
+        osa.authenticate()
+
+        self.assertEqual(len(self.auth_requests), 2)
+        self.assertEqual(self.cache._entries, {})
+
+
+class OpenStackFileAuthTokenCacheTest(OpenStackAuthTokenCacheTest):
+
+    def setUp(self):
+        super(OpenStackFileAuthTokenCacheTest, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.cache = OpenStackFileAuthTokenCache(path=self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_tokens_without_expiration_are_not_cached(self):
+        osa = self._get_connection()
+        osa.auth_version = '1.0'
+        osa.authenticate()
+
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_token_is_shared_between_cache_instances(self):
+        self._get_connection().authenticate()
+
+        self.cache = OpenStackFileAuthTokenCache(path=self.path)
+        osa = self._get_connection()
+        osa.authenticate()
+
+        self.assertEqual(len(self.auth_requests), 1)
+        self.assertEqual(osa.auth_token, 'token-1')
+        self.assertEqual(osa.auth_token_expires, self.expires)
+
+        # Only the current user can read the tokens
+        for name in os.listdir(self.path):
+            if name.endswith('.json'):
+                mode = os.stat(os.path.join(self.path, name)).st_mode
+                self.assertEqual(stat.S_IMODE(mode), int('600', 8))
+
+    def test_corrupted_entry_is_ignored(self):
+        self._get_connection().authenticate()
+
+        for name in os.listdir(self.path):
+            if name.endswith('.json'):
+                fp = open(os.path.join(self.path, name), 'w')
+                fp.write('{"auth_token": ')
+                fp.close()
+
+        osa = self._get_connection()
+        osa.authenticate()
+        self.assertEqual(osa.auth_token, 'token-2')
+
+        self.cache.clear()
+        self.assertEqual([name for name in os.listdir(self.path)
+                          if name.endswith('.json')], [])
+
+
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -0,0 +1,217 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import with_statement
+
+import sys
+
+from mock import Mock, patch
+
+from libcloud.utils.py3 import httplib
+from libcloud.test import unittest
+from libcloud.common.pool import ConnectionPool
+from libcloud.common.base import Connection, PollingConnection, Response
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.pool = ConnectionPool(max_size=2, idle_timeout=10)
+
+    def test_acquire_creates_new_connection_if_pool_is_empty(self):
+        factory = Mock()
+        connection, reused = self.pool.acquire(key='a', factory=factory)
+
+        self.assertFalse(reused)
+        self.assertEqual(connection, factory.return_value)
+        self.assertEqual(factory.call_count, 1)
+
+    def test_acquire_reuses_released_connection(self):
+        factory = Mock()
+        conn = Mock()
+        self.pool.release(key='a', connection=conn)
+        self.assertEqual(self.pool.size('a'), 1)
+
+        connection, reused = self.pool.acquire(key='a', factory=factory)
+        self.assertTrue(reused)
+        self.assertEqual(connection, conn)
+        self.assertEqual(factory.call_count, 0)
+        self.assertEqual(self.pool.size('a'), 0)
+
+        # Connections are not shared between different keys
+        self.pool.release(key='a', connection=conn)
+        connection, reused = self.pool.acquire(key='b', factory=factory)
+        self.assertFalse(reused)
+        self.assertEqual(factory.call_count, 1)
+
+    def test_release_closes_connection_if_pool_is_full(self):
+        conns = [Mock(), Mock(), Mock()]
+
+        for conn in conns:
+            self.pool.release(key='a', connection=conn)
+
+        self.assertEqual(self.pool.size('a'), 2)
+        self.assertFalse(conns[0].close.called)
+        self.assertFalse(conns[1].close.called)
+        self.assertTrue(conns[2].close.called)
+
+    def test_acquire_discards_expired_connections(self):
+        conn = Mock()
+
+        with patch('libcloud.common.pool.time') as mock_time:
+            mock_time.time.return_value = 100
+            self.pool.release(key='a', connection=conn)
+
+            mock_time.time.return_value = 111
+            connection, reused = self.pool.acquire(key='a', factory=Mock())
+
+        self.assertFalse(reused)
+        self.assertTrue(conn.close.called)
+        self.assertEqual(self.pool.size(), 0)
+
+    def test_clear(self):
+        conn1, conn2 = Mock(), Mock()
+        self.pool.release(key='a', connection=conn1)
+        self.pool.release(key='b', connection=conn2)
+        self.assertEqual(self.pool.size(), 2)
+
+        self.pool.clear()
+        self.assertEqual(self.pool.size(), 0)
+        self.assertTrue(conn1.close.called)
+        self.assertTrue(conn2.close.called)
+
+
+class KeepAliveResponse(object):
+    status = httplib.OK
+    reason = 'OK'
+    will_close = False
+
+    def __init__(self, body='{}'):
+        self.body = body
+        self.closed = False
+
+    def getheaders(self):
+        return []
+
+    def read(self, *args, **kwargs):
+        self.closed = True
+        return self.body
+
+    def isclosed(self):
+        return self.closed
+
+
+class PooledConnectionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.pool = ConnectionPool()
+        self.conn_cls = Mock()
+
+        self.connection = Connection(host='api.example.com')
+        self.connection.conn_classes = (None, self.conn_cls)
+        self.connection.connection_pool = self.pool
+        self.connection.responseCls = Response
+
+    def _mock_http_connection(self, side_effect=None):
+        http_connection = Mock()
+        http_connection.getresponse.side_effect = KeepAliveResponse
+
+        if side_effect:
+            http_connection.request.side_effect = side_effect
+
+        self.new_connection = Mock()
+        self.new_connection.getresponse.side_effect = KeepAliveResponse
+        self.conn_cls.side_effect = [http_connection, self.new_connection]
+        return http_connection
+
+    def test_connection_is_reused_between_requests(self):
+        http_connection = self._mock_http_connection()
+
+        self.connection.request('/')
+        self.assertFalse(self.connection.connection_reused)
+        self.assertEqual(self.pool.size(), 1)
+
+        self.connection.request('/')
+        self.assertTrue(self.connection.connection_reused)
+        self.assertEqual(self.connection.connection, http_connection)
+        self.assertEqual(self.conn_cls.call_count, 1)
+        self.assertEqual(http_connection.request.call_count, 2)
+
+    def test_connection_is_not_reused_if_server_closes_it(self):
+        http_connection = self._mock_http_connection()
+
+        def response():
+            response = KeepAliveResponse()
+            response.will_close = True
+            return response
+
+        http_connection.getresponse.side_effect = response
+
+        self.connection.request('/')
+        self.assertEqual(self.pool.size(), 0)
+
+    def test_stale_connection_is_transparently_replaced(self):
+        http_connection = self._mock_http_connection()
+
+        self.connection.request('/')
+        http_connection.request.side_effect = httplib.BadStatusLine('')
+
+        response = self.connection.request('/')
+        self.assertEqual(response.status, httplib.OK)
+        self.assertFalse(self.connection.connection_reused)
+        self.assertEqual(self.connection.connection, self.new_connection)
+        self.assertTrue(http_connection.close.called)
+
+    def test_non_idempotent_request_is_not_retried(self):
+        http_connection = self._mock_http_connection()
+
+        self.connection.request('/')
+        http_connection.request.side_effect = httplib.BadStatusLine('')
+
+        self.assertRaises(httplib.BadStatusLine, self.connection.request,
+                          '/', method='POST')
+        self.assertEqual(self.conn_cls.call_count, 1)
+
+    def test_error_on_new_connection_is_propagated(self):
+        self._mock_http_connection(side_effect=httplib.BadStatusLine(''))
+
+        self.assertRaises(httplib.BadStatusLine, self.connection.request, '/')
+
+    def test_pooling_can_be_disabled(self):
+        self.connection.connection_pool = None
+        self._mock_http_connection()
+
+        self.connection.request('/')
+        self.connection.request('/')
+        self.assertFalse(self.connection.connection_reused)
+        self.assertEqual(self.pool.size(), 0)
+
+    def test_polling_connection_reuses_connection(self):
+        connection = PollingConnection(host='api.example.com')
+        connection.conn_classes = (None, self.conn_cls)
+        connection.connection_pool = self.pool
+        connection.responseCls = Response
+        connection.poll_interval = 0
+        connection.get_poll_request_kwargs = Mock(return_value={
+            'action': '/job'})
+        connection.has_completed = Mock(side_effect=[False, False, True])
+        http_connection = self._mock_http_connection()
+
+        connection.async_request('/start')
+        self.assertTrue(connection.connection_reused)
+        self.assertEqual(connection.connection, http_connection)
+        self.assertEqual(http_connection.request.call_count, 4)
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
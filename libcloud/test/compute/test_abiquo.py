@@ -17,12 +17,15 @@ Abiquo Test Suite
 """
 import unittest
 import sys
+import time
 
 try:
     from lxml import etree as ET
 except ImportError:
     from xml.etree import ElementTree as ET
 
+from mock import Mock
+
 from libcloud.utils.py3 import httplib
 
 from libcloud.compute.drivers.abiquo import AbiquoNodeDriver
@@ -291,6 +294,74 @@ class AbiquoNodeDriverTest(unittest.TestCase, TestCaseMixin):
         href = get_href(element=elem, rel='edit3')
         self.assertEqual(href, '/admin/enterprises/1234')
 
+    def test_ex_list_groups_keeps_listing_order(self):
+        groups = self.driver.ex_list_groups(max_workers=3)
+
+        self.assertEqual([group.name for group in groups],
+                         ['libcloud', 'libcloud_test_group'])
+        self.assertEqual([len(group.nodes) for group in groups], [1, 1])
+        self.assertEqual(groups[0].uri,
+                         '/cloud/virtualdatacenters/4/virtualappliances/6')
+
+    def test_ex_iterate_nodes(self):
+        nodes = list(self.driver.ex_iterate_nodes())
+
+        self.assertEqual(len(nodes), 2)
+        self.assertEqual(sorted([node.extra['uri_id'] for node in nodes]),
+                         sorted([node.extra['uri_id'] for node in
+                                 self.driver.list_nodes()]))
+
+    def test_ex_iterate_nodes_drops_pending_requests_on_error(self):
+        def get_vdc_appliances(vdc_link):
+            if vdc_link == '/vdc/2':
+                raise LibcloudError('vdc failed')
+
+            vapps = []
+            for index in range(5):
+                vapp = ET.XML('<virtualAppliance><name>%s</name>'
+                              '<link rel="edit" href="/vapp/%s"/>'
+                              '<link rel="virtualmachines" '
+                              'href="/vapp/%s/vms"/></virtualAppliance>' %
+                              (index, index, index))
+                vapps.append(vapp)
+            return vapps
+
+        def get_appliance_vms(vapp, cached=None):
+            time.sleep(0.1)
+            return None, []
+
+        self.driver.connection.cache['locations'] = {'vdc1': '/vdc/1',
+                                                     'vdc2': '/vdc/2'}
+        self.driver._get_locations = Mock(return_value=['vdc1', 'vdc2'])
+        self.driver._get_vdc_appliances = Mock(side_effect=get_vdc_appliances)
+        self.driver._get_appliance_vms = Mock(side_effect=get_appliance_vms)
+
+        self.assertRaises(LibcloudError, list,
+                          self.driver.ex_iterate_nodes(max_workers=1))
+
+        # Appliances which were still queued are not retrieved
+        time.sleep(0.6)
+        self.assertTrue(self.driver._get_appliance_vms.call_count <= 1)
+
+    def test_list_nodes_uses_cached_groups(self):
+        AbiquoMockHttp.not_modified = []
+        AbiquoMockHttp.nics_requests = []
+
+        nodes = self.driver.list_nodes()
+        self.assertEqual(AbiquoMockHttp.not_modified, [])
+        self.assertEqual(len(AbiquoMockHttp.nics_requests), 2)
+
+        # Virtual machines of the first appliance haven't changed so its
+        # nodes are not retrieved again
+        cached_nodes = self.driver.list_nodes()
+        self.assertEqual(AbiquoMockHttp.not_modified, [
+            '/api/cloud/virtualdatacenters/4/virtualappliances/6/'
+            'virtualmachines'])
+        self.assertEqual(len(AbiquoMockHttp.nics_requests), 3)
+        self.assertEqual([node.id for node in cached_nodes],
+                         [node.id for node in nodes])
+        self.assertTrue(cached_nodes[0] is nodes[0])
+
 
 class AbiquoMockHttp(MockHttpTestCase):
 
@@ -300,6 +371,12 @@ class AbiquoMockHttp(MockHttpTestCase):
     fixtures = ComputeFileFixtures('abiquo')
     fixture_tag = 'default'
 
+    # Conditional requests which have been answered with '304 Not Modified'
+    not_modified = []
+
+    # Requests for network interfaces of virtual machines
+    nics_requests = []
+
     def _api_login(self, method, url, body, headers):
         if headers['Authorization'] == 'Basic c29uOmdvdGVu':
             expected_response = self.fixtures.load('unauthorized_user.html')
@@ -380,9 +457,12 @@ class AbiquoMockHttp(MockHttpTestCase):
         if method == 'GET':
             if headers['Authorization'] == 'Basic dmU6Z2V0YQ==':
                 response = self.fixtures.load('vdc_4_vapp_6_vms_allocated.xml')
+            elif headers.get('If-None-Match') == '"vapp-6-vms"':
+                self.not_modified.append(url)
+                return (httplib.NOT_MODIFIED, '', {}, '')
             else:
                 response = self.fixtures.load('vdc_4_vapp_6_vms.xml')
-            return (httplib.OK, response, {}, '')
+            return (httplib.OK, response, {'etag': '"vapp-6-vms"'}, '')
         else:
             # it must be a POST
             response = self.fixtures.load('vdc_4_vapp_6_vm_creation_ok.xml')
@@ -442,6 +522,7 @@ class AbiquoMockHttp(MockHttpTestCase):
 
     def _api_cloud_virtualdatacenters_4_virtualappliances_6_virtualmachines_3_network_nics(self, method, url,
                                                                                            body, headers):
+        self.nics_requests.append(url)
         response = self.fixtures.load('vdc_4_vapp_6_vm_3_nics.xml')
         return (httplib.OK, response, {}, '')
 
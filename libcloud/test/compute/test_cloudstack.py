@@ -16,6 +16,8 @@
 import sys
 import os
 
+from mock import patch
+
 from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import urlparse
 from libcloud.utils.py3 import parse_qsl
@@ -283,6 +285,72 @@ class CloudStackCommonTestCase(TestCaseMixin):
         self.assertEqual([], nodes[0].extra['security_group'])
         self.assertEqual(None, nodes[0].extra['key_name'])
 
+    def test_list_nodes_addresses_and_rules(self):
+        nodes = self.driver.list_nodes()
+        node = nodes[0]
+
+        self.assertEqual(['1.1.1.116'], node.public_ips)
+        self.assertEqual(1, len(node.extra['ip_addresses']))
+        self.assertEqual(34000, node.extra['ip_addresses'][0].id)
+        self.assertEqual('1.1.1.116', node.extra['ip_addresses'][0].address)
+
+        rules = node.extra['ip_forwarding_rules']
+        self.assertEqual(1, len(rules))
+        self.assertEqual('TCP', rules[0].protocol)
+        self.assertEqual('1.1.1.116', rules[0].address.address)
+
+        rules = node.extra['port_forwarding_rules']
+        self.assertEqual(1, len(rules))
+        self.assertEqual('1.1.1.116', rules[0].address.address)
+        self.assertEqual(34000, rules[0].address.id)
+
+        self.assertEqual([], nodes[1].extra['ip_forwarding_rules'])
+        self.assertEqual([], nodes[1].extra['port_forwarding_rules'])
+
+    def test_list_nodes_api_call_count_is_constant(self):
+        connection = self.driver.connection
+
+        with patch.object(connection, '_sync_request',
+                          wraps=connection._sync_request) as sync_request:
+            nodes = self.driver.list_nodes()
+
+        self.assertEqual(2, len(nodes))
+        commands = [call[1]['command'] for call in
+                    sync_request.call_args_list]
+        self.assertEqual(['listVirtualMachines', 'listPublicIpAddresses',
+                          'listIpForwardingRules', 'listPortForwardingRules'],
+                         commands)
+
+    def test_paginated_request(self):
+        connection = self.driver.connection
+        pages = [
+            {'count': 3, 'virtualmachine': [{'id': 1}, {'id': 2}]},
+            {'count': 3, 'virtualmachine': [{'id': 3}]}
+        ]
+
+        with patch.object(connection, '_sync_request',
+                          side_effect=pages) as sync_request:
+            items = connection._paginated_request('listVirtualMachines',
+                                                  'virtualmachine',
+                                                  params={'projectid': 'a'},
+                                                  page_size=2)
+
+        self.assertEqual([1, 2, 3], [item['id'] for item in items])
+        self.assertEqual(2, sync_request.call_count)
+        params = sync_request.call_args_list[1][1]['params']
+        self.assertEqual({'projectid': 'a', 'page': 2, 'pagesize': 2}, params)
+
+    def test_paginated_request_empty_response(self):
+        connection = self.driver.connection
+
+        with patch.object(connection, '_sync_request',
+                          return_value={}) as sync_request:
+            items = connection._paginated_request('listPublicIpAddresses',
+                                                  'publicipaddress')
+
+        self.assertEqual([], items)
+        self.assertEqual(1, sync_request.call_count)
+
     def test_list_locations(self):
         location = self.driver.list_locations()[0]
         self.assertEqual('1', location.id)
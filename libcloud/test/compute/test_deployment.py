@@ -19,6 +19,7 @@ from __future__ import with_statement
 import os
 import sys
 import time
+import socket
 import unittest
 
 from libcloud.utils.py3 import httplib
@@ -28,7 +29,7 @@ from libcloud.utils.py3 import PY3
 from libcloud.compute.deployment import MultiStepDeployment, Deployment
 from libcloud.compute.deployment import SSHKeyDeployment, ScriptDeployment
 from libcloud.compute.deployment import ScriptFileDeployment, FileDeployment
-from libcloud.compute.base import Node
+from libcloud.compute.base import Node, FailedNode
 from libcloud.compute.types import NodeState, DeploymentError, LibcloudError
 from libcloud.compute.ssh import BaseSSHClient
 from libcloud.compute.drivers.rackspace import RackspaceFirstGenNodeDriver as Rackspace
@@ -297,6 +298,69 @@ class DeploymentTests(unittest.TestCase):
         self.assertEqual(['67.23.21.33'], nodes[0][1])
         self.assertEqual(['67.23.21.34'], nodes[1][1])
 
+    @patch('libcloud.compute.base.time.sleep')
+    def test_wait_until_running_exponential_backoff(self, mock_sleep):
+        pending = Node(id=12345, name='test', state=NodeState.PENDING,
+                       public_ips=[], private_ips=[], driver=Rackspace)
+        self.driver._list_nodes_for_wait = Mock(
+            side_effect=[[pending]] * 5 + [[self.node]])
+
+        with patch('libcloud.compute.base.random.uniform', return_value=1):
+            node, ips = self.driver.wait_until_running(
+                nodes=[self.node], wait_period=1, max_wait_period=5)[0]
+
+        self.assertEqual(node.uuid, self.node.uuid)
+        delays = [call[0][0] for call in mock_sleep.call_args_list]
+        self.assertEqual(len(delays), 5)
+        for actual, expected in zip(delays, [1, 2, 4, 5, 5]):
+            self.assertAlmostEqual(actual, expected, places=1)
+
+    @patch('libcloud.compute.base.time.sleep')
+    def test_wait_until_running_only_polls_pending_nodes(self, _):
+        pending = Node(id=123456, name='test', state=NodeState.PENDING,
+                       public_ips=[], private_ips=[], driver=Rackspace)
+        self.driver._list_nodes_for_wait = Mock(
+            side_effect=[[self.node, pending], [self.node2]])
+
+        nodes = self.driver.wait_until_running(nodes=[self.node, self.node2])
+        self.assertEqual(nodes[0][0].uuid, self.node.uuid)
+        self.assertEqual(nodes[1][0].uuid, self.node2.uuid)
+
+        calls = self.driver._list_nodes_for_wait.call_args_list
+        self.assertEqual(calls[0][1]['nodes'], [self.node, self.node2])
+        self.assertEqual(calls[1][1]['nodes'], [self.node2])
+
+    @patch('libcloud.compute.base.time.sleep')
+    def test_wait_until_running_waits_for_ip_address(self, _):
+        no_ips = Node(id=12345, name='test', state=NodeState.RUNNING,
+                      public_ips=[], private_ips=[], driver=Rackspace)
+        self.driver._list_nodes_for_wait = Mock(
+            side_effect=[[no_ips], [self.node]])
+
+        node, ips = self.driver.wait_until_running(nodes=[self.node])[0]
+        self.assertEqual(ips, ['1.2.3.4'])
+        self.assertEqual(self.driver._list_nodes_for_wait.call_count, 2)
+
+    @patch('libcloud.compute.base.time.sleep')
+    def test_wait_until_running_ssh_port(self, _):
+        self.driver._list_nodes_for_wait = Mock(return_value=[self.node])
+        self.driver._is_port_open = Mock(side_effect=[False, True])
+
+        node, ips = self.driver.wait_until_running(nodes=[self.node],
+                                                   ssh_port=22)[0]
+        self.assertEqual(node.uuid, self.node.uuid)
+        self.driver._is_port_open.assert_called_with('1.2.3.4', 22)
+        self.assertEqual(self.driver._list_nodes_for_wait.call_count, 2)
+
+    @patch('libcloud.compute.base.socket.create_connection')
+    def test_is_port_open_supports_ipv6_addresses(self, mock_connect):
+        self.assertTrue(self.driver._is_port_open('::1', 22))
+        mock_connect.assert_called_once_with(('::1', 22), 5)
+        self.assertTrue(mock_connect.return_value.close.called)
+
+        mock_connect.side_effect = socket.error('refused')
+        self.assertFalse(self.driver._is_port_open('::1', 22))
+
     def test_ssh_client_connect_success(self):
         mock_ssh_client = Mock()
         mock_ssh_client.return_value = None
@@ -455,6 +519,114 @@ class DeploymentTests(unittest.TestCase):
         node = self.driver.deploy_node(deploy=Mock())
         self.assertEqual(self.node.id, node.id)
 
+    def test_create_nodes(self):
+        def create_node(name, size):
+            if name == 'fail':
+                raise Exception('create failed')
+            return Node(id=name, name=name, state=NodeState.RUNNING,
+                        public_ips=[], private_ips=[], driver=self.driver)
+
+        self.driver.create_node = Mock(side_effect=create_node)
+
+        nodes = self.driver.create_nodes([{'name': 'a'}, {'name': 'fail'},
+                                          {'name': 'c'}], size='small',
+                                         max_workers=2)
+
+        self.assertEqual(len(nodes), 3)
+        self.assertEqual(nodes[0].name, 'a')
+        self.assertTrue(isinstance(nodes[1], FailedNode))
+        self.assertEqual(nodes[1].name, 'fail')
+        self.assertEqual(str(nodes[1].error), 'create failed')
+        self.assertEqual(nodes[1].node, None)
+        self.assertEqual(nodes[2].name, 'c')
+        self.driver.create_node.assert_any_call(name='a', size='small')
+
+    def test_create_nodes_respects_max_workers(self):
+        state = {'running': 0, 'max_running': 0}
+
+        def create_node(**kwargs):
+            state['running'] += 1
+            state['max_running'] = max(state['running'],
+                                       state['max_running'])
+            time.sleep(0.05)
+            state['running'] -= 1
+            return self.node
+
+        self.driver.create_node = Mock(side_effect=create_node)
+        self.driver.batch_concurrency = 2
+
+        nodes = self.driver.create_nodes([{}] * 6)
+        self.assertEqual(len(nodes), 6)
+        self.assertTrue(state['max_running'] <= 2)
+
+    @patch('libcloud.compute.base.SSHClient')
+    @patch('libcloud.compute.ssh')
+    def test_deploy_nodes_success(self, mock_ssh_module, _):
+        RackspaceMockHttp.type = 'MULTIPLE_NODES'
+        mock_ssh_module.have_paramiko = True
+        self.driver.create_node = Mock(side_effect=[self.node, self.node2])
+        self.driver._wait_for_nodes = Mock(
+            wraps=self.driver._wait_for_nodes)
+
+        nodes = self.driver.deploy_nodes([{}, {}], deploy=Mock())
+        self.assertEqual(nodes[0].uuid, self.node.uuid)
+        self.assertEqual(nodes[1].uuid, self.node2.uuid)
+        self.assertEqual(self.driver._wait_for_nodes.call_count, 1)
+
+    @patch('libcloud.compute.base.SSHClient')
+    @patch('libcloud.compute.ssh')
+    def test_deploy_nodes_partial_failure(self, mock_ssh_module, _):
+        RackspaceMockHttp.type = 'MULTIPLE_NODES'
+        mock_ssh_module.have_paramiko = True
+        self.driver.create_node = Mock(side_effect=[self.node, self.node2])
+
+        deploy = Mock()
+        deploy.run.side_effect = Exception('deploy failed')
+
+        nodes = self.driver.deploy_nodes([{'deploy': Mock()},
+                                          {'deploy': deploy}], max_tries=1)
+        self.assertEqual(nodes[0].uuid, self.node.uuid)
+        self.assertTrue(isinstance(nodes[1], FailedNode))
+        self.assertTrue(isinstance(nodes[1].error, DeploymentError))
+        self.assertEqual(nodes[1].node.uuid, self.node2.uuid)
+
+    @patch('libcloud.compute.base.SSHClient')
+    @patch('libcloud.compute.ssh')
+    def test_deploy_nodes_deploys_running_nodes_on_timeout(self,
+                                                           mock_ssh_module,
+                                                           _):
+        mock_ssh_module.have_paramiko = True
+        pending_node = Node(id=123456, name='pending',
+                            state=NodeState.PENDING, public_ips=[],
+                            private_ips=[], driver=Rackspace)
+        self.driver.create_node = Mock(side_effect=[self.node, pending_node])
+        self.driver._list_nodes_for_wait = Mock(
+            return_value=[self.node, pending_node])
+
+        deploy = Mock()
+        nodes = self.driver.deploy_nodes([{}, {}], deploy=deploy,
+                                         timeout=0.1)
+        self.assertEqual(nodes[0].uuid, self.node.uuid)
+        self.assertEqual(deploy.run.call_count, 1)
+        self.assertTrue(isinstance(nodes[1], FailedNode))
+        self.assertTrue(isinstance(nodes[1].error, DeploymentError))
+        self.assertEqual(nodes[1].node, pending_node)
+
+    @patch('libcloud.compute.ssh')
+    def test_deploy_nodes_wait_until_running_timeout(self, mock_ssh_module):
+        RackspaceMockHttp.type = 'TIMEOUT'
+        mock_ssh_module.have_paramiko = True
+        self.driver.create_node = Mock(side_effect=[self.node,
+                                                    Exception('foo')])
+
+        nodes = self.driver.deploy_nodes([{}, {}], deploy=Mock(),
+                                         timeout=0.1)
+        self.assertTrue(isinstance(nodes[0], FailedNode))
+        self.assertTrue(isinstance(nodes[0].error, DeploymentError))
+        self.assertEqual(nodes[0].node, self.node)
+        self.assertTrue(isinstance(nodes[1], FailedNode))
+        self.assertEqual(str(nodes[1].error), 'foo')
+
 
 class RackspaceMockHttp(MockHttp):
     fixtures = ComputeFileFixtures('openstack')
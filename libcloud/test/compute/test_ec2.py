@@ -17,6 +17,8 @@ from __future__ import with_statement
 
 import os
 import sys
+
+from mock import Mock
 from datetime import datetime
 
 from libcloud.utils.py3 import httplib
@@ -35,7 +37,7 @@ from libcloud.compute.drivers.ec2 import REGION_DETAILS
 from libcloud.compute.drivers.ec2 import ExEC2AvailabilityZone
 from libcloud.compute.base import Node, NodeImage, NodeSize, NodeLocation
 from libcloud.compute.base import StorageVolume, VolumeSnapshot
-from libcloud.compute.types import KeyPairDoesNotExistError
+from libcloud.compute.types import KeyPairDoesNotExistError, NodeState
 
 from libcloud.test import MockHttpTestCase, LibcloudTestCase
 from libcloud.test.compute import TestCaseMixin
@@ -207,6 +209,80 @@ class EC2Tests(LibcloudTestCase, TestCaseMixin):
                          '2013-12-02T15:58:29.000Z')
         self.assertTrue('instance_type' in ret_node2.extra)
 
+    def test_iterate_nodes(self):
+        nodes = list(self.driver.iterate_nodes())
+        expected = self.driver.list_nodes()
+
+        self.assertEqual([node.id for node in nodes],
+                         [node.id for node in expected])
+        self.assertEqual([node.public_ips for node in nodes],
+                         [node.public_ips for node in expected])
+        self.assertEqual(nodes[1].extra['tags'], expected[1].extra['tags'])
+
+    def test_iterate_nodes_elastic_ips_batches(self):
+        self.driver.iterate_nodes_batch_size = 1
+        self.driver.ex_describe_addresses = Mock(
+            wraps=self.driver.ex_describe_addresses)
+
+        nodes = list(self.driver.iterate_nodes())
+        self.assertEqual(len(nodes), 2)
+        self.assertEqual(self.driver.ex_describe_addresses.call_count, 2)
+
+    def test_list_nodes_follows_next_token(self):
+        EC2MockHttp.type = 'paginated'
+        self.driver.ex_describe_addresses = Mock(
+            wraps=self.driver.ex_describe_addresses)
+
+        nodes = self.driver.list_nodes()
+        self.assertEqual(len(nodes), 4)
+        self.assertEqual(nodes[0].id, nodes[2].id)
+        self.assertEqual(self.driver.ex_describe_addresses.call_count, 1)
+
+    def test_iterate_nodes_pages(self):
+        EC2MockHttp.type = 'paginated'
+        self.driver.ex_describe_addresses = Mock(
+            wraps=self.driver.ex_describe_addresses)
+
+        self.driver.connection.request = Mock(
+            wraps=self.driver.connection.request)
+
+        nodes = self.driver.iterate_nodes(ex_page_size=2)
+        node = next(nodes)
+        self.assertEqual(node.id, 'i-4382922a')
+
+        params = self.driver.connection.request.call_args_list[0][1]['params']
+        self.assertEqual(params['MaxResults'], 2)
+
+        # Elastic IPs are retrieved for each page and the next page is only
+        # requested once the previous one has been consumed
+        self.assertEqual(self.driver.ex_describe_addresses.call_count, 1)
+
+        self.assertEqual(len(list(nodes)), 3)
+        self.assertEqual(self.driver.ex_describe_addresses.call_count, 2)
+
+    def test_list_nodes_with_node_ids_is_not_paginated(self):
+        EC2MockHttp.type = 'ex_node_ids'
+        self.driver.list_nodes(ex_node_ids=['i-4382922a'])
+
+    def test_wait_until_running_only_lists_pending_nodes(self):
+        node = Node('i-4382922a', None, NodeState.RUNNING, ['1.2.3.4'], [],
+                    self.driver)
+        self.driver.list_nodes = Mock(return_value=[node])
+
+        node2, ips = self.driver.wait_until_running(nodes=[node])[0]
+        self.assertEqual(node2.id, node.id)
+        self.driver.list_nodes.assert_called_once_with(
+            ex_node_ids=['i-4382922a'])
+
+    def test_list_nodes_for_wait_instance_not_visible_yet(self):
+        node = Node('i-4382922a', None, None, None, None, self.driver)
+        self.driver.list_nodes = Mock(side_effect=Exception(
+            'InvalidInstanceID.NotFound: The instance ID does not exist'))
+        self.assertEqual(self.driver._list_nodes_for_wait([node]), [])
+
+        self.driver.list_nodes.side_effect = Exception('InternalError: foo')
+        self.assertRaises(Exception, self.driver._list_nodes_for_wait, [node])
+
     def test_ex_list_reserved_nodes(self):
         node = self.driver.ex_list_reserved_nodes()[0]
         self.assertEqual(node.id, '93bbbca2-c500-49d0-9ede-9d8737400498')
@@ -436,6 +512,17 @@ class EC2Tests(LibcloudTestCase, TestCaseMixin):
         size = images[1].extra['block_device_mapping'][0]['ebs']['volume_size']
         self.assertEqual(size, 20)
 
+    def test_iterate_images(self):
+        images = self.driver.iterate_images()
+        self.assertFalse(isinstance(images, list))
+
+        images = list(images)
+        expected = self.driver.list_images()
+        self.assertEqual([image.id for image in images],
+                         [image.id for image in expected])
+        self.assertEqual([image.extra for image in images],
+                         [image.extra for image in expected])
+
     def test_list_images_with_image_ids(self):
         EC2MockHttp.type = 'ex_imageids'
         images = self.driver.list_images(ex_image_ids=['ami-57ba933a'])
@@ -802,6 +889,22 @@ class EC2Tests(LibcloudTestCase, TestCaseMixin):
         self.assertEqual(vol.id, snap.extra['volume_id'])
         self.assertEqual('pending', snap.extra['state'])
 
+    def test_list_volumes_follows_next_token(self):
+        EC2MockHttp.type = 'paginated'
+        volumes = self.driver.list_volumes()
+        self.assertEqual(len(volumes), 6)
+
+        volumes = list(self.driver.iterate_volumes(ex_page_size=2))
+        self.assertEqual(len(volumes), 6)
+        self.assertEqual([volume.id for volume in volumes[:3]],
+                         [volume.id for volume in volumes[3:]])
+
+    def test_iterate_snapshots(self):
+        snapshots = list(self.driver.iterate_snapshots())
+        expected = self.driver.list_snapshots()
+        self.assertEqual([snapshot.id for snapshot in snapshots],
+                         [snapshot.id for snapshot in expected])
+
     def test_list_snapshots(self):
         snaps = self.driver.list_snapshots()
 
@@ -1104,6 +1207,25 @@ class EC2MockHttp(MockHttpTestCase):
         body = self.fixtures.load('describe_instances.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
 
+    def _paginated_DescribeInstances(self, method, url, body, headers):
+        body = self.fixtures.load('describe_instances.xml')
+        body = self._paginate(url, body, '</DescribeInstancesResponse>')
+        return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
+    def _ex_node_ids_DescribeInstances(self, method, url, body, headers):
+        # MaxResults can't be combined with instance ids
+        self.test.assertTrue('MaxResults' not in url)
+        self.assertUrlContainsQueryParams(url, {'InstanceId.1': 'i-4382922a'})
+        body = self.fixtures.load('describe_instances.xml')
+        return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
+    def _paginate(self, url, body, end_tag):
+        if 'NextToken' in url:
+            self.assertUrlContainsQueryParams(url, {'NextToken': 'page2'})
+            return body
+
+        return body.replace(end_tag, '<nextToken>page2</nextToken>' + end_tag)
+
     def _DescribeReservedInstances(self, method, url, body, headers):
         body = self.fixtures.load('describe_reserved_instances.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
@@ -1252,6 +1374,12 @@ class EC2MockHttp(MockHttpTestCase):
         body = self.fixtures.load('release_address.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
 
+    def _paginated_DescribeAddresses(self, method, url, body, headers):
+        return self._DescribeAddresses(method, url, body, headers)
+
+    def _ex_node_ids_DescribeAddresses(self, method, url, body, headers):
+        return self._DescribeAddresses(method, url, body, headers)
+
     def _all_addresses_DescribeAddresses(self, method, url, body, headers):
         body = self.fixtures.load('describe_addresses_all.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
@@ -1288,6 +1416,11 @@ class EC2MockHttp(MockHttpTestCase):
         body = self.fixtures.load('describe_volumes.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
 
+    def _paginated_DescribeVolumes(self, method, url, body, headers):
+        body = self.fixtures.load('describe_volumes.xml')
+        body = self._paginate(url, body, '</DescribeVolumesResponse>')
+        return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
     def _CreateSnapshot(self, method, url, body, headers):
         body = self.fixtures.load('create_snapshot.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
@@ -19,6 +19,8 @@ import sys
 import unittest
 import datetime
 
+from mock import Mock
+
 from libcloud.utils.py3 import httplib
 from libcloud.compute.drivers.gce import (GCENodeDriver, API_VERSION,
                                           timestamp_to_datetime,
@@ -163,6 +165,55 @@ class GCENodeDriverTest(LibcloudTestCase, TestCaseMixin):
         names = [n.name for n in nodes_all]
         self.assertTrue('node-name' in names)
 
+    def test_list_nodes_batch_resolves_boot_disks(self):
+        self.driver.connection.request = Mock(
+            wraps=self.driver.connection.request)
+        nodes = self.driver.list_nodes(ex_zone='all')
+
+        requests = [call[0][0] for call in
+                    self.driver.connection.request.call_args_list]
+        # Boot disks are retrieved with a single request, the only extra
+        # request is for a disk which is missing in the aggregated fixture
+        self.assertEqual(requests, ['/aggregated/instances',
+                                    '/aggregated/disks',
+                                    '/zones/us-central1-a/disks/node-name'])
+
+        boot_disks = dict([(n.name, n.extra['boot_disk']) for n in nodes])
+        self.assertEqual(
+            boot_disks['libcloud-demo-europe-persist-node'].name,
+            'libcloud-demo-europe-boot-disk')
+        self.assertEqual(
+            boot_disks['libcloud-demo-europe-persist-node'].extra['zone'].name,
+            'europe-west1-a')
+
+    def test_list_nodes_lazy_boot_disk(self):
+        self.driver.connection.request = Mock(
+            wraps=self.driver.connection.request)
+        nodes = self.driver.list_nodes(ex_lazy_boot_disk=True)
+        self.assertEqual(self.driver.connection.request.call_count, 1)
+        self.assertEqual(nodes[0].extra['boot_disk'], None)
+
+        boot_disk = self.driver.ex_get_node_boot_disk(nodes[0])
+        self.assertEqual(boot_disk.name, 'genericdisk')
+        self.assertEqual(self.driver.connection.request.call_count, 2)
+        self.assertEqual(nodes[0].extra['boot_disk'], boot_disk)
+
+        self.assertEqual(self.driver.ex_get_node_boot_disk(nodes[0]),
+                         boot_disk)
+        self.assertEqual(self.driver.connection.request.call_count, 2)
+
+    def test_list_nodes_refreshes_zone_cache(self):
+        del self.driver.zone_dict['europe-west1-a']
+        self.driver.ex_list_zones = Mock(wraps=self.driver.ex_list_zones)
+
+        nodes = self.driver.list_nodes(ex_zone='all')
+        self.assertEqual(self.driver.ex_list_zones.call_count, 1)
+        self.assertTrue('europe-west1-a' in self.driver.zone_dict)
+
+        zones = dict([(n.name, n.extra['zone'].name) for n in nodes])
+        self.assertEqual(zones['libcloud-demo-europe-persist-node'],
+                         'europe-west1-a')
+
     def test_ex_list_regions(self):
         regions = self.driver.ex_list_regions()
         self.assertEqual(len(regions), 3)
@@ -185,6 +236,16 @@ class GCENodeDriverTest(LibcloudTestCase, TestCaseMixin):
         names = [t.name for t in target_pools_all]
         self.assertTrue('www-pool' in names)
 
+    def test_ex_list_targetpools_does_not_retrieve_boot_disks(self):
+        self.driver.connection.request = Mock(
+            wraps=self.driver.connection.request)
+        self.driver.ex_list_targetpools()
+
+        requests = [call[0][0] for call in
+                    self.driver.connection.request.call_args_list]
+        self.assertTrue('/aggregated/instances' in requests)
+        self.assertFalse('/aggregated/disks' in requests)
+
     def test_list_sizes(self):
         sizes = self.driver.list_sizes()
         sizes_all = self.driver.list_sizes('all')
@@ -25,6 +25,8 @@ __docformat__ = 'epytext'
 import unittest
 import sys
 
+from mock import Mock
+
 from libcloud.utils.py3 import httplib
 
 from libcloud.compute.base import Node, NodeImage, NodeSize, NodeState
@@ -599,6 +601,27 @@ class OpenNebula_3_2_Tests(unittest.TestCase, OpenNebulaCaseMixin):
         ret = self.driver.reboot_node(node)
         self.assertTrue(ret)
 
+    def test_list_nodes_uses_expanded_collection(self):
+        """
+        Test list_nodes functionality without requests for each node.
+        """
+        OpenNebulaNodeDriver.connectionCls.conn_classes = (
+            OpenNebula_3_2_VerboseMockHttp, OpenNebula_3_2_VerboseMockHttp)
+        self.driver = OpenNebulaNodeDriver(*OPENNEBULA_PARAMS + ('3.2',))
+        request = Mock(wraps=self.driver.connection.request)
+        self.driver.connection.request = request
+
+        nodes = self.driver.list_nodes()
+
+        paths = [call[0][0] for call in request.call_args_list]
+        self.assertEqual([path for path in paths
+                          if path.startswith('/compute')], ['/compute'])
+        self.assertEqual(request.call_args_list[0][1]['params'],
+                         {'verbose': 'true'})
+        self.assertEqual([node.id for node in nodes], ['5', '15', '25'])
+        self.assertEqual(nodes[1].name, 'Compute 15')
+        self.assertEqual(nodes[1].public_ips[0].address, '192.168.0.2')
+
     def test_list_sizes(self):
         """
         Test ex_list_networks functionality.
@@ -1155,6 +1178,24 @@ class OpenNebula_3_2_MockHttp(OpenNebula_3_0_MockHttp):
             return (httplib.OK, body, {}, httplib.responses[httplib.OK])
 
 
+class OpenNebula_3_2_VerboseMockHttp(OpenNebula_3_2_MockHttp):
+
+    """
+    Mock HTTP server which returns complete resources in collections.
+    """
+
+    def _compute(self, method, url, body, headers):
+        """
+        Compute pool resources.
+        """
+        if method == 'GET' and 'verbose=true' in url:
+            body = self.fixtures_3_2.load('compute_collection_verbose.xml')
+            return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
+        return super(OpenNebula_3_2_VerboseMockHttp, self)._compute(
+            method, url, body, headers)
+
+
 class OpenNebula_3_6_MockHttp(OpenNebula_3_2_MockHttp):
 
     """
@@ -26,6 +26,9 @@ from libcloud import _init_once
 from libcloud.compute.ssh import ParamikoSSHClient
 from libcloud.compute.ssh import ShellOutSSHClient
 from libcloud.compute.ssh import have_paramiko
+from libcloud.compute.ssh import SELECT_TIMEOUT
+from libcloud.utils.py3 import PY3
+from libcloud.utils.py3 import b
 
 from mock import patch, Mock
 
@@ -149,6 +152,9 @@ class ParamikoSSHClientTests(unittest.TestCase):
         mock_cli.open_sftp().file.assert_called_once_with('random_script.sh',
                                                           mode='w')
 
+        chan = mock_cli.get_transport().open_session()
+        chan.recv_ready.return_value = False
+        chan.recv_stderr_ready.return_value = False
         mock.run(sd)
 
         # Make assertions over 'run' method
@@ -159,6 +165,76 @@ class ParamikoSSHClientTests(unittest.TestCase):
 
         mock.close()
 
+    def _mock_channel(self, stdout, stderr):
+        chan = self.ssh_cli.client.get_transport().open_session()
+        chan.eof_received = False
+        chan.exit_status_ready.side_effect = [False, True]
+        chan.recv_exit_status.return_value = 0
+
+        # First iteration only stdout is available, on the second (after the
+        # command has exited) only stderr
+        chan.recv_ready.side_effect = [True, False, False]
+        chan.recv.return_value = stdout
+        chan.recv_stderr_ready.side_effect = [False, True, False]
+        chan.recv_stderr.return_value = stderr
+        return chan
+
+    @patch('libcloud.compute.ssh.select')
+    def test_run_waits_on_channel_instead_of_sleeping(self, mock_select):
+        self.ssh_cli.connect()
+        chan = self._mock_channel(stdout=b('out'), stderr=b('err'))
+
+        stdout, stderr, status = self.ssh_cli.run('/root/script.sh')
+
+        self.assertEqual(stdout, 'out')
+        self.assertEqual(stderr, 'err')
+        self.assertEqual(status, 0)
+        mock_select.select.assert_called_once_with([chan], [], [],
+                                                   SELECT_TIMEOUT)
+
+    @patch('libcloud.compute.ssh.select')
+    def test_run_stops_on_eof(self, mock_select):
+        self.ssh_cli.connect()
+        chan = self._mock_channel(stdout=b('out'), stderr=b('err'))
+        chan.exit_status_ready.side_effect = None
+        chan.exit_status_ready.return_value = False
+        chan.eof_received = True
+        chan.recv_ready.side_effect = [True, False]
+        chan.recv_stderr_ready.side_effect = [False]
+
+        stdout, stderr, status = self.ssh_cli.run('/root/script.sh')
+
+        self.assertEqual(stdout, 'out')
+        self.assertEqual(stderr, '')
+        self.assertFalse(mock_select.select.called)
+
+    @patch('libcloud.compute.ssh.select')
+    def test_run_with_output_callbacks(self, mock_select):
+        self.ssh_cli.connect()
+        self._mock_channel(stdout=b('out'), stderr=b('err'))
+        stdout_chunks = []
+        stderr_chunks = []
+
+        stdout, stderr, status = self.ssh_cli.run(
+            '/root/script.sh', stdout_callback=stdout_chunks.append,
+            stderr_callback=stderr_chunks.append)
+
+        self.assertEqual(stdout, '')
+        self.assertEqual(stderr, '')
+        self.assertEqual(stdout_chunks, ['out'])
+        self.assertEqual(stderr_chunks, ['err'])
+
+    @unittest.skipIf(not PY3, 'output is only decoded on Python 3')
+    @patch('libcloud.compute.ssh.select')
+    def test_run_flushes_incomplete_multibyte_output(self, mock_select):
+        self.ssh_cli.connect()
+        self._mock_channel(stdout=b('out\u20ac')[:-1], stderr=b('err'))
+
+        stdout, stderr, status = self.ssh_cli.run('/root/script.sh')
+
+        self.assertEqual(stdout, 'out\ufffd')
+        self.assertEqual(stderr, 'err')
+
     def test_delete_script(self):
         """
         Provide a basic test with 'delete' action.
@@ -14,8 +14,12 @@
 # limitations under the License.
 
 import sys
+import time
+import threading
 import unittest
 
+from mock import Mock
+
 try:
     from lxml import etree as ET
 except ImportError:
@@ -26,7 +30,7 @@ from libcloud.utils.py3 import httplib, b
 from libcloud.compute.drivers.vcloud import TerremarkDriver, VCloudNodeDriver, Subject
 from libcloud.compute.drivers.vcloud import VCloud_1_5_NodeDriver, ControlAccess
 from libcloud.compute.drivers.vcloud import VCloud_5_1_NodeDriver
-from libcloud.compute.drivers.vcloud import Vdc
+from libcloud.compute.drivers.vcloud import Vdc, VCloudTaskTracker
 from libcloud.compute.base import Node, NodeImage
 from libcloud.compute.types import NodeState
 
@@ -37,7 +41,23 @@ from libcloud.test.file_fixtures import ComputeFileFixtures
 from libcloud.test.secrets import VCLOUD_PARAMS
 
 
-class TerremarkTests(unittest.TestCase, TestCaseMixin):
+class TaskTrackerTestCase(unittest.TestCase):
+    """
+    Test case which waits for the threads started by a test (such as the
+    task tracker threads) so they don't outlive the test.
+    """
+
+    def run(self, result=None):
+        threads = set(threading.enumerate())
+
+        try:
+            return super(TaskTrackerTestCase, self).run(result)
+        finally:
+            for thread in set(threading.enumerate()) - threads:
+                thread.join(5)
+
+
+class TerremarkTests(TaskTrackerTestCase, TestCaseMixin):
 
     def setUp(self):
         VCloudNodeDriver.connectionCls.host = "test"
@@ -91,7 +111,7 @@ class TerremarkTests(unittest.TestCase, TestCaseMixin):
         self.assertTrue(ret)
 
 
-class VCloud_1_5_Tests(unittest.TestCase, TestCaseMixin):
+class VCloud_1_5_Tests(TaskTrackerTestCase, TestCaseMixin):
 
     def setUp(self):
         VCloudNodeDriver.connectionCls.host = 'test'
@@ -183,6 +203,18 @@ class VCloud_1_5_Tests(unittest.TestCase, TestCaseMixin):
         ret = self.driver.destroy_node(node)
         self.assertTrue(ret)
 
+    def test_ex_destroy_nodes(self):
+        node = self.driver.list_nodes()[0]
+        results = self.driver.ex_destroy_nodes([node, node, node])
+        self.assertEqual(results, [True, True, True])
+
+    def test_ex_wait_for_tasks(self):
+        task_href = 'https://vm-vcloud/api/task/b034df55-fe81-4798-bc81-1f0fd0ead450'
+        self.driver.ex_wait_for_tasks([task_href, task_href])
+
+        future = self.driver.ex_track_task(task_href)
+        self.assertEqual(future.result(timeout=5).get('status'), 'success')
+
     def test_validate_vm_names(self):
         # valid inputs
         self.driver._validate_vm_names(['host-n-ame-name'])
@@ -274,6 +306,29 @@ class VCloud_1_5_Tests(unittest.TestCase, TestCaseMixin):
         self.assertEqual(
             len(self.driver.ex_list_nodes()), len(self.driver.list_nodes()))
 
+    def test_ex_list_nodes_does_not_transfer_unchanged_vapps(self):
+        VCloud_1_5_MockHttp.not_modified = []
+
+        nodes = self.driver.ex_list_nodes()
+        self.assertEqual(VCloud_1_5_MockHttp.not_modified, [])
+
+        cached_nodes = self.driver.ex_list_nodes()
+        self.assertEqual(VCloud_1_5_MockHttp.not_modified,
+                         ['/api/vApp/vapp-8c57a5b6-e61b-48ca-8a78-3b70ee65ef6b'])
+        self.assertEqual(len(cached_nodes), 3)
+
+        for node, cached_node in zip(nodes, cached_nodes):
+            self.assertEqual(cached_node.id, node.id)
+            self.assertEqual(cached_node.name, node.name)
+            self.assertEqual(cached_node.public_ips, node.public_ips)
+            self.assertEqual(cached_node.extra, node.extra)
+
+    def test_ex_iterate_nodes(self):
+        nodes = list(self.driver.ex_iterate_nodes(max_workers=2))
+        self.assertEqual(sorted([node.id for node in nodes]),
+                         sorted([node.id for node in
+                                 self.driver.ex_list_nodes()]))
+
     def test_ex_list_nodes__masked_exception(self):
         """
         Test that we don't mask other exceptions.
@@ -334,7 +389,7 @@ class VCloud_1_5_Tests(unittest.TestCase, TestCaseMixin):
         self.driver.ex_set_metadata_entry(node, 'foo', 'bar')
 
 
-class VCloud_5_1_Tests(unittest.TestCase, TestCaseMixin):
+class VCloud_5_1_Tests(TaskTrackerTestCase, TestCaseMixin):
 
     def setUp(self):
         VCloudNodeDriver.connectionCls.host = 'test'
@@ -392,6 +447,84 @@ class VCloud_5_1_Tests(unittest.TestCase, TestCaseMixin):
             'https://vm-vcloud/api/vAppTemplate/vappTemplate-ac1bc027-bf8c-4050-8643-4971f691c158', ret[0].id)
 
 
+class VCloudTaskTrackerTests(TaskTrackerTestCase):
+
+    def setUp(self):
+        self.polls = {}
+        self.statuses = {}
+        self.delays = {}
+        self.driver = Mock()
+        self.driver.connection.request.side_effect = self._request
+        self.tracker = VCloudTaskTracker(driver=self.driver,
+                                         poll_interval=0.01,
+                                         max_poll_interval=0.04)
+
+    def _request(self, path):
+        self.polls.setdefault(path, []).append(time.time())
+        time.sleep(self.delays.get(path, 0))
+        statuses = self.statuses[path]
+        status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        task = ET.XML('<Task xmlns="http://www.vmware.com/vcloud/v1.5" '
+                      'status="%s"><Error message="failed"/></Task>' %
+                      (status))
+        return Mock(object=task)
+
+    def test_tasks_are_polled_until_they_finish(self):
+        self.statuses = {
+            '/api/task/1': ['success'],
+            '/api/task/2': ['running'] * 5 + ['success'],
+            '/api/task/3': ['queued', 'running', 'error'],
+            '/api/task/4': ['running', 'canceled']}
+        futures = [self.tracker.track('https://vm-vcloud/api/task/%s' % (i))
+                   for i in range(1, 5)]
+
+        self.assertEqual(futures[0].result(timeout=5).get('status'),
+                         'success')
+        self.assertEqual(futures[1].result(timeout=5).get('status'),
+                         'success')
+        self.assertTrue('failed' in str(futures[2].exception(timeout=5)))
+        self.assertTrue('Canceled' in str(futures[3].exception(timeout=5)))
+
+        self.assertEqual([len(self.polls['/api/task/%s' % (i)])
+                          for i in range(1, 5)], [1, 6, 3, 2])
+
+        # Interval between polls grows up to max_poll_interval
+        times = self.polls['/api/task/2']
+        intervals = [end - start for start, end in zip(times, times[1:])]
+        self.assertTrue(min(intervals) >= 0.01)
+        self.assertTrue(intervals[-1] >= 0.04)
+
+        # Poller thread stops once there are no tasks to track
+        for _ in range(100):
+            if self.tracker._thread is None:
+                break
+            time.sleep(0.01)
+
+        self.assertTrue(self.tracker._thread is None)
+
+    def test_tasks_are_rescheduled_as_their_polls_finish(self):
+        # A slow poll doesn't hold back the polls of other tasks
+        self.statuses = {
+            '/api/task/1': ['success'],
+            '/api/task/2': ['running'] * 3 + ['success']}
+        self.delays = {'/api/task/1': 0.5}
+        futures = [self.tracker.track('https://vm-vcloud/api/task/%s' % (i))
+                   for i in range(1, 3)]
+
+        futures[1].result(timeout=5)
+        self.assertFalse(futures[0].done())
+        self.assertEqual(len(self.polls['/api/task/2']), 4)
+
+        futures[0].result(timeout=5)
+
+    def test_task_times_out(self):
+        self.statuses = {'/api/task/1': ['running']}
+        future = self.tracker.track('https://vm-vcloud/api/task/1',
+                                    timeout=0.05)
+
+        self.assertTrue('Timeout' in str(future.exception(timeout=5)))
+
+
 class TerremarkMockHttp(MockHttp):
 
     fixtures = ComputeFileFixtures('terremark')
@@ -476,6 +609,7 @@ class AnotherError(Exception):
 class VCloud_1_5_MockHttp(MockHttp, unittest.TestCase):
 
     fixtures = ComputeFileFixtures('vcloud_1_5')
+    not_modified = []
 
     def request(self, method, url, body=None, headers=None, raw=False):
         self.assertTrue(url.startswith('/api/'), ('"%s" is invalid. Needs to '
@@ -548,9 +682,16 @@ class VCloud_1_5_MockHttp(MockHttp, unittest.TestCase):
         return status, body, headers, httplib.responses[status]
 
     def _api_vApp_vapp_8c57a5b6_e61b_48ca_8a78_3b70ee65ef6b(self, method, url, body, headers):
+        # vApp which supports conditional requests
+        etag = '"8c57a5b6-e61b-48ca-8a78-3b70ee65ef6b-1"'
+        if headers.get('If-None-Match') == etag:
+            self.not_modified.append(url)
+            return (httplib.NOT_MODIFIED, '', {'ETag': etag},
+                    httplib.responses[httplib.NOT_MODIFIED])
+
         body = self.fixtures.load(
             'api_vApp_vapp_8c57a5b6_e61b_48ca_8a78_3b70ee65ef6b.xml')
-        return httplib.OK, body, headers, httplib.responses[httplib.OK]
+        return httplib.OK, body, {'ETag': etag}, httplib.responses[httplib.OK]
 
     def _api_vApp_vapp_8c57a5b6_e61b_48ca_8a78_3b70ee65ef6c(self, method, url, body, headers):
         body = self.fixtures.load(
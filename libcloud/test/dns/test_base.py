@@ -19,6 +19,7 @@ import tempfile
 
 from mock import Mock
 
+from libcloud.utils.py3 import StringIO
 from libcloud.test import unittest
 from libcloud.dns.base import DNSDriver, Zone, Record
 from libcloud.dns.types import RecordType
@@ -103,6 +104,172 @@ class BaseTestCase(unittest.TestCase):
             self.assertRegexpMatches(lines[10], r'example.com\.\s+900\s+IN\s+MX\s+10\s+mx.example.com')
             self.assertRegexpMatches(lines[11], r'example.com\.\s+900\s+IN\s+SRV\s+20\s+10 3333 example.com')
 
+    def test_export_zone_to_bind_stream_writes_records_as_they_arrive(self):
+        zone = Zone(id=1, domain='example.com', type='master', ttl=900,
+                    driver=self.driver)
+        stream = StringIO()
+        written = []
+
+        def iterate_records(zone):
+            for index in range(3):
+                # Previous records have already been written
+                written.append(stream.getvalue().count('IN\tA'))
+                yield Record(id=index, name='host%s' % (index),
+                             type=RecordType.A, data='127.0.0.1', zone=zone,
+                             driver=self.driver)
+
+        self.driver.iterate_records = iterate_records
+        self.driver.export_zone_to_bind_stream(zone=zone, stream=stream)
+
+        self.assertEqual(written, [0, 1, 2])
+        lines = stream.getvalue().split('\n')
+        self.assertEqual(len(lines), 4 + 3)
+        self.assertRegexpMatches(lines[6], r'host2.example.com\.\s+900\s+IN')
+
+    def test_import_zone_from_bind_zone_file(self):
+        zone = Zone(id=1, domain='example.com', type='master', ttl=900,
+                    driver=self.driver)
+        values = MOCK_RECORDS_VALUES + [
+            {'id': 6, 'name': '_sip._tcp', 'type': RecordType.SRV,
+             'data': 'sip.example.com.',
+             'extra': {'priority': 1, 'weight': 10, 'port': 5060}}]
+        records = []
+
+        for value in values:
+            value = value.copy()
+            value.update({'driver': self.driver, 'zone': zone})
+            records.append(Record(**value))
+
+        self.driver.list_records = Mock(return_value=records)
+        self.driver.export_zone_to_bind_zone_file(zone=zone,
+                                                  file_path=self.tmp_path)
+
+        self.driver.create_record = Mock()
+        count = zone.import_from_bind_zone_file(file_path=self.tmp_path,
+                                                max_workers=2)
+
+        self.assertEqual(count, len(records))
+        calls = self.driver.create_record.call_args_list
+        created = sorted([(c[1]['name'], c[1]['type'], c[1]['data'],
+                           c[1]['extra'].get('ttl'),
+                           c[1]['extra'].get('priority')) for c in calls])
+        self.assertEqual(created, sorted([
+            ('www', RecordType.A, '127.0.0.1', 900, None),
+            ('www', RecordType.AAAA, '2a01:4f8:121:3121::2', 900, None),
+            ('www', RecordType.A, '127.0.0.1', 123, None),
+            ('', RecordType.A, '127.0.0.1', 900, None),
+            ('test1', RecordType.TXT, 'test foo bar', 900, None),
+            ('test2', RecordType.TXT, 'test "foo" "bar"', 900, None),
+            ('', RecordType.MX, 'mx.example.com.', 900, 10),
+            ('', RecordType.SRV, 'example.com.', 900, 20),
+            ('_sip._tcp', RecordType.SRV, 'sip.example.com.', 900, 1)]))
+
+    def test_import_zone_from_bind_stream_stops_on_error(self):
+        zone = Zone(id=1, domain='example.com', type='master', ttl=900,
+                    driver=self.driver)
+        self.driver.create_record = Mock(side_effect=ValueError('fail'))
+        lines = ['host%s A 127.0.0.1' % (index) for index in range(100)]
+
+        self.assertRaises(ValueError,
+                          self.driver.import_zone_from_bind_stream,
+                          zone=zone, stream=lines, max_workers=2)
+        self.assertTrue(self.driver.create_record.call_count < 100)
+
+        # Records from other zones are rejected
+        self.driver.create_record = Mock()
+        self.assertRaises(ValueError,
+                          self.driver.import_zone_from_bind_stream,
+                          zone=zone, stream=['www.other.com. A 127.0.0.1'])
+
+    def _get_reconcile_zone(self):
+        zone = Zone(id=1, domain='example.com', type='master', ttl=900,
+                    driver=self.driver)
+        values = [
+            ('1', '', RecordType.NS, 'ns1.example.com.', {}),
+            ('2', 'www', RecordType.A, '127.0.0.1', {'ttl': 300}),
+            ('3', 'www', RecordType.A, '127.0.0.2', {'ttl': 300}),
+            ('4', 'mail', RecordType.A, '127.0.0.3', {'ttl': 300}),
+            ('5', 'old', RecordType.CNAME, 'www.example.com.', {}),
+            ('6', 'ftp', RecordType.A, '127.0.0.4', {'ttl': 300})]
+        records = [Record(id=id, name=name, type=type, data=data, zone=zone,
+                          driver=self.driver, extra=extra)
+                   for id, name, type, data, extra in values]
+
+        self.driver.list_records = Mock(return_value=records)
+        return zone, records
+
+    def test_reconcile_zone_dry_run(self):
+        zone, records = self._get_reconcile_zone()
+        self.driver.create_record = Mock()
+
+        desired = [
+            # Unchanged
+            records[1],
+            ('www', RecordType.A, '127.0.0.2'),
+            # TTL change
+            ('mail', RecordType.A, '127.0.0.3', {'ttl': 60}),
+            # Data change of a record with the same name and type
+            ('ftp', RecordType.A, '127.0.0.5'),
+            # New record
+            ('new', RecordType.TXT, 'foo')]
+
+        diff = zone.reconcile(records=desired, dry_run=True)
+
+        self.assertFalse(self.driver.create_record.called)
+        self.assertEqual(len(diff), 4)
+        self.assertEqual(diff.create,
+                         [('new', RecordType.TXT, 'foo', {})])
+        self.assertEqual(diff.update, [
+            (records[3], ('mail', RecordType.A, '127.0.0.3', {'ttl': 60})),
+            (records[5], ('ftp', RecordType.A, '127.0.0.5', {}))])
+        self.assertEqual(diff.delete, [records[4]])
+
+        # NS records are left alone
+        self.assertEqual(sorted([r.id for r in diff.unchanged]),
+                         ['1', '2', '3'])
+
+    def test_reconcile_zone_applies_changes(self):
+        zone, records = self._get_reconcile_zone()
+        calls = []
+
+        def record_call(name):
+            def func(**kwargs):
+                calls.append(name)
+            return func
+
+        self.driver.create_record = Mock(side_effect=record_call('create'))
+        self.driver.update_record = Mock(side_effect=record_call('update'))
+        self.driver.delete_record = Mock(side_effect=record_call('delete'))
+
+        desired = [('old', RecordType.A, '127.0.0.9')] + \
+            [('host%s' % (index), RecordType.A, '10.0.0.1')
+             for index in range(20)]
+
+        diff = self.driver.reconcile_zone(zone=zone, records=desired,
+                                          max_workers=4)
+
+        # CNAME is deleted before A record with the same name is created
+        self.assertEqual(len(diff.create), 21)
+        self.assertEqual(len(diff.delete), 5)
+        self.assertEqual(calls, ['delete'] * 5 + ['create'] * 21)
+        self.driver.create_record.assert_any_call(
+            name='old', zone=zone, type=RecordType.A, data='127.0.0.9',
+            extra={})
+
+        # Nothing to do
+        self.driver.list_records.return_value = records[:1]
+        diff = self.driver.reconcile_zone(zone=zone, records=[])
+        self.assertEqual(len(diff), 0)
+
+    def test_reconcile_zone_raises_first_error(self):
+        zone, records = self._get_reconcile_zone()
+        self.driver.delete_record = Mock(side_effect=ValueError('fail'))
+        self.driver.create_record = Mock()
+
+        self.assertRaises(ValueError, self.driver.reconcile_zone, zone=zone,
+                          records=[('new', RecordType.A, '127.0.0.1')])
+        self.assertFalse(self.driver.create_record.called)
+
 
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -0,0 +1,110 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+
+from libcloud.test import unittest
+from libcloud.dns.bind import iterate_bind_records, BindParseError
+from libcloud.dns.types import RecordType
+
+ZONE_FILE = """
+$ORIGIN example.com.
+$TTL 3600
+; Comment
+@   IN  SOA ns1.example.com. admin.example.com. (
+            2014010101 ; serial
+            7200       ; refresh
+            3600 1209600 3600 )
+    IN  NS  ns1.example.com.
+    IN  MX  10 mx1.example.com.
+        MX  20 mx2
+www 300 IN  A   127.0.0.1
+    IN 1h   A   127.0.0.2 ; second address
+ftp     CNAME www.example.com.
+txt     TXT "v=spf1 include:example.net ~all" "and \\"more\\""
+_sip._tcp   SRV 1 10 5060 sip.example.com.
+$ORIGIN sub.example.com.
+host    AAAA ::1
+"""
+
+
+class BindParserTestCase(unittest.TestCase):
+    def test_iterate_bind_records(self):
+        records = list(iterate_bind_records(ZONE_FILE.splitlines(True),
+                                            origin='other.com'))
+
+        self.assertEqual(records, [
+            ('example.com', RecordType.SOA,
+             'ns1.example.com. admin.example.com. 2014010101 7200 3600 '
+             '1209600 3600', {'ttl': 3600}),
+            ('example.com', RecordType.NS, 'ns1.example.com.',
+             {'ttl': 3600}),
+            ('example.com', RecordType.MX, 'mx1.example.com.',
+             {'ttl': 3600, 'priority': 10}),
+            ('example.com', RecordType.MX, 'mx2.example.com.',
+             {'ttl': 3600, 'priority': 20}),
+            ('www.example.com', RecordType.A, '127.0.0.1', {'ttl': 300}),
+            ('www.example.com', RecordType.A, '127.0.0.2', {'ttl': 3600}),
+            ('ftp.example.com', RecordType.CNAME, 'www.example.com.',
+             {'ttl': 3600}),
+            ('txt.example.com', RecordType.TXT,
+             'v=spf1 include:example.net ~alland "more"', {'ttl': 3600}),
+            ('_sip._tcp.example.com', RecordType.SRV, 'sip.example.com.',
+             {'ttl': 3600, 'priority': 1, 'weight': 10, 'port': 5060}),
+            ('host.sub.example.com', RecordType.AAAA, '::1', {'ttl': 3600})])
+
+    def test_records_without_ttl_use_previous_ttl(self):
+        lines = ['a 60 A 127.0.0.1', 'b A 127.0.0.2', 'c 1d2h A 127.0.0.3']
+        records = list(iterate_bind_records(lines, origin='example.com'))
+
+        self.assertEqual([r[3]['ttl'] for r in records], [60, 60, 93600])
+        self.assertEqual([r[0] for r in records],
+                         ['a.example.com', 'b.example.com', 'c.example.com'])
+
+    def test_records_are_parsed_lazily(self):
+        def lines():
+            yield 'a A 127.0.0.1\n'
+            raise ValueError('not reached')
+
+        records = iterate_bind_records(lines(), origin='example.com')
+        self.assertEqual(next(records)[0], 'a.example.com')
+
+    def test_invalid_zone_files(self):
+        invalid = [
+            ['    A 127.0.0.1'],
+            ['a 60 IN FOO bar'],
+            ['a 60 IN A'],
+            ['a MX foo bar'],
+            ['a CNAME foo bar'],
+            ['a TXT "unterminated'],
+            ['a SOA ns1 admin (', '1 2 3 4 5'],
+            ['$INCLUDE other.zone']]
+
+        for lines in invalid:
+            self.assertRaises(BindParseError, list,
+                              iterate_bind_records(lines, origin='t.com'))
+
+        try:
+            list(iterate_bind_records(['a A 1.1.1.1', 'b BAR 1'],
+                                      origin='t.com'))
+        except BindParseError:
+            e = sys.exc_info()[1]
+            self.assertEqual(e.line_number, 2)
+        else:
+            self.fail('Exception was not thrown')
+
+
+if __name__ == '__main__':
+    sys.exit(unittest.main())
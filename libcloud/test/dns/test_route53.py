@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import with_statement
+
 import sys
 import unittest
 
@@ -20,7 +22,7 @@ from libcloud.utils.py3 import httplib
 
 from libcloud.dns.types import RecordType, ZoneDoesNotExistError
 from libcloud.dns.types import RecordDoesNotExistError
-from libcloud.dns.drivers.route53 import Route53DNSDriver
+from libcloud.dns.drivers.route53 import Route53DNSDriver, API_VERSION
 from libcloud.test import MockHttp
 from libcloud.test.file_fixtures import DNSFileFixtures
 from libcloud.test.secrets import DNS_PARAMS_ROUTE53
@@ -211,15 +213,266 @@ class Route53Tests(unittest.TestCase):
         else:
             self.fail('Exception was not thrown')
 
+    def test_batch_coalesces_changes(self):
+        zone = self.driver.list_zones()[0]
+        batch = self.driver.ex_batch(zone=zone)
+
+        # Values of the same record set are merged into a single change
+        batch.create_record('mail', RecordType.MX, 'mx1.t.com.',
+                            {'ttl': 300, 'priority': 10})
+        batch.create_record('mail', RecordType.MX, 'mx2.t.com.',
+                            {'ttl': 300, 'priority': 20})
+
+        # Create followed by a delete cancels out
+        batch.create_record('tmp', RecordType.A, '127.0.0.1', {'ttl': 60})
+        batch.create_record('tmp', RecordType.A, '127.0.0.2', {'ttl': 60})
+        batch.add_change('DELETE', 'tmp', RecordType.A, '127.0.0.1',
+                         {'ttl': 60})
+
+        # Upsert supersedes previous changes
+        batch.create_record('www', RecordType.A, '127.0.0.3')
+        batch.upsert_record('www', RecordType.A, '127.0.0.4', {'ttl': 30})
+
+        # Delete followed by a create (update) is preserved
+        batch.add_change('DELETE', 'old', RecordType.A, '127.0.0.5')
+        batch.create_record('old', RecordType.A, '127.0.0.6')
+
+        batches = batch.get_batches()
+        self.assertEqual(len(batches), 1)
+        changes = [(c.action, c.name, c.values, c.ttl) for c in batches[0]]
+        self.assertEqual(changes, [
+            ('CREATE', 'mail', ['10 mx1.t.com.', '20 mx2.t.com.'], 300),
+            ('CREATE', 'tmp', ['127.0.0.2'], 60),
+            ('UPSERT', 'www', ['127.0.0.4'], 30),
+            ('DELETE', 'old', ['127.0.0.5'], 0),
+            ('CREATE', 'old', ['127.0.0.6'], 0)])
+
+        batch.add_change('DELETE', 'tmp', RecordType.A, '127.0.0.2')
+        self.assertEqual(len(batch), 4)
+
+    def test_batch_keeps_delete_of_values_which_are_not_created(self):
+        zone = self.driver.list_zones()[0]
+        batch = self.driver.ex_batch(zone=zone)
+
+        batch.create_record('www', RecordType.A, '127.0.0.1', {'ttl': 60})
+        batch.create_record('www', RecordType.A, '127.0.0.2', {'ttl': 60})
+        batch.add_change('DELETE', 'www', RecordType.A, '127.0.0.2',
+                         {'ttl': 60})
+        batch.add_change('DELETE', 'www', RecordType.A, '127.0.0.3',
+                         {'ttl': 60})
+
+        changes = [(c.action, c.values) for c in batch.get_batches()[0]]
+        self.assertEqual(changes, [('CREATE', ['127.0.0.1']),
+                                   ('DELETE', ['127.0.0.3'])])
+
+    def test_batch_is_split_into_requests(self):
+        zone = self.driver.list_zones()[0]
+        Route53MockHttp.type = 'BATCH'
+        Route53MockHttp.posted = []
+
+        with self.driver.ex_batch(zone=zone) as batch:
+            for index in range(250):
+                batch.create_record('host%s' % (index), RecordType.A,
+                                    '10.0.0.%s' % (index % 250))
+            batch.update_record(self.driver.list_records(zone=zone)[1],
+                                name='host0', type=RecordType.A,
+                                data='10.0.1.1')
+
+            # Nothing is submitted until the block exits
+            self.assertEqual(Route53MockHttp.posted, [])
+
+        self.assertEqual(len(Route53MockHttp.posted), 3)
+        self.assertEqual([body.count('<Change>') for body in
+                          Route53MockHttp.posted], [100, 100, 51])
+
+    def test_batch_is_posted_to_api_version_which_supports_upsert(self):
+        zone = self.driver.list_zones()[0]
+        Route53MockHttp.type = 'BATCH'
+        Route53MockHttp.posted = []
+        Route53MockHttp.posted_urls = []
+
+        with self.driver.ex_batch(zone=zone) as batch:
+            batch.upsert_record('www', RecordType.A, '127.0.0.1',
+                                {'ttl': 300})
+
+        # UPSERT is only accepted by API version 2013-04-01 and later
+        self.assertEqual(API_VERSION, '2013-04-01')
+        self.assertEqual(Route53MockHttp.posted_urls,
+                         ['/2013-04-01/hostedzone/47234/rrset'])
+        self.assertEqual(Route53MockHttp.posted, [
+            '<ChangeResourceRecordSetsRequest '
+            'xmlns="https://route53.amazonaws.com/doc/2013-04-01/">'
+            '<ChangeBatch><Changes><Change><Action>UPSERT</Action>'
+            '<ResourceRecordSet><Name>www.t.com</Name><Type>A</Type>'
+            '<TTL>300</TTL><ResourceRecords><ResourceRecord>'
+            '<Value>127.0.0.1</Value></ResourceRecord></ResourceRecords>'
+            '</ResourceRecordSet></Change></Changes></ChangeBatch>'
+            '</ChangeResourceRecordSetsRequest>'])
+
+    def test_list_zones_is_paginated_using_marker(self):
+        Route53MockHttp.type = 'PAGED'
+        zones = self.driver.list_zones()
+
+        self.assertEqual([zone.id for zone in zones][:2], ['47000', '47234'])
+        self.assertEqual(len(zones), 6)
+
+    def test_list_records_is_paginated_using_name_and_type(self):
+        zone = self.driver.list_zones()[0]
+        Route53MockHttp.type = 'PAGED'
+        records = self.driver.list_records(zone=zone)
+
+        self.assertEqual([record.name for record in records][:2],
+                         ['a', 'wibble'])
+        self.assertEqual(len(records), 11)
+
+    def test_batch_is_discarded_on_exception(self):
+        zone = self.driver.list_zones()[0]
+        Route53MockHttp.type = 'BATCH'
+        Route53MockHttp.posted = []
+
+        try:
+            with self.driver.ex_batch(zone=zone) as batch:
+                batch.create_record('www', RecordType.A, '127.0.0.1')
+                raise ValueError('fail')
+        except ValueError:
+            pass
+
+        self.assertEqual(Route53MockHttp.posted, [])
+        self.assertEqual(len(batch), 0)
+
+    def test_ex_delete_all_records_deletes_record_sets(self):
+        zone = self.driver.list_zones()[0]
+        Route53MockHttp.type = 'BATCH'
+        Route53MockHttp.posted = []
+
+        self.driver.ex_delete_all_records(zone=zone)
+
+        # All the values of the MX record set are deleted in one change
+        self.assertEqual(len(Route53MockHttp.posted), 1)
+        body = Route53MockHttp.posted[0]
+        self.assertEqual(body.count('<Change>'), 5)
+        self.assertEqual(body.count('<ResourceRecord>'), 10)
+        self.assertTrue('<Value>1 ASPMX.L.GOOGLE.COM.</Value>' in body)
+
+    def test_reconcile_zone_uses_single_change_batch(self):
+        zone = self.driver.list_zones()[0]
+        records = self.driver.list_records(zone=zone)
+        Route53MockHttp.type = 'BATCH'
+        Route53MockHttp.posted = []
+
+        # Keep everything except one of the MX values and the blahblah
+        # record, add a new record
+        desired = [r for r in records if r.name != 'blahblah' and
+                   r.data != 'ASPMX3.GOOGLEMAIL.COM.']
+        desired.append(('new', RecordType.A, '127.0.0.1', {'ttl': 60}))
+
+        diff = self.driver.reconcile_zone(zone=zone, records=desired)
+        self.assertEqual(len(diff), 3)
+
+        def change(action, name, type, ttl, values):
+            records = ''.join(['<ResourceRecord><Value>%s</Value>'
+                               '</ResourceRecord>' % (value)
+                               for value in values])
+            return ('<Change><Action>%s</Action><ResourceRecordSet>'
+                    '<Name>%s</Name><Type>%s</Type><TTL>%s</TTL>'
+                    '<ResourceRecords>%s</ResourceRecords>'
+                    '</ResourceRecordSet></Change>' %
+                    (action, name, type, ttl, records))
+
+        mx_values = ['1 ASPMX.L.GOOGLE.COM.', '5 ALT1.ASPMX.L.GOOGLE.COM.',
+                     '5 ALT2.ASPMX.L.GOOGLE.COM.',
+                     '10 ASPMX2.GOOGLEMAIL.COM.']
+
+        # MX record set is deleted with all of its current values and
+        # created again with the remaining ones in the same request
+        self.assertEqual(Route53MockHttp.posted, [
+            '<ChangeResourceRecordSetsRequest '
+            'xmlns="https://route53.amazonaws.com/doc/2013-04-01/">'
+            '<ChangeBatch><Changes>' +
+            change('DELETE', 'blahblah.t.com', 'A', 86400,
+                   ['208.111.35.173']) +
+            change('CREATE', 'new.t.com', 'A', 60, ['127.0.0.1']) +
+            change('DELETE', 'testdoma.t.com', 'MX', 3600,
+                   ['10 ASPMX3.GOOGLEMAIL.COM.'] + mx_values) +
+            change('CREATE', 'testdoma.t.com', 'MX', 3600, mx_values) +
+            '</Changes></ChangeBatch></ChangeResourceRecordSetsRequest>'])
+
+    def test_import_zone_from_bind_stream_uses_change_batches(self):
+        zone = self.driver.list_zones()[0]
+        Route53MockHttp.type = 'BATCH'
+        Route53MockHttp.posted = []
+
+        lines = ['$TTL 300', '@ IN NS ns1.example.com.',
+                 '@ IN MX 10 mx1', '  IN MX 20 mx2']
+        lines.extend(['host%s A 10.0.0.%s' % (index, index)
+                      for index in range(150)])
+
+        count = self.driver.import_zone_from_bind_stream(zone=zone,
+                                                         stream=lines)
+        self.assertEqual(count, 152)
+
+        # Both MX values are created with a single change
+        self.assertEqual(len(Route53MockHttp.posted), 2)
+        self.assertEqual([body.count('<Change>') for body in
+                          Route53MockHttp.posted], [100, 51])
+        self.assertFalse('<Type>NS</Type>' in Route53MockHttp.posted[0])
+        self.assertTrue('<Value>20 mx2.%s.</Value>' % (zone.domain) in
+                        Route53MockHttp.posted[0])
+
+    def test_import_zone_from_bind_stream_replaces_split_record_sets(self):
+        zone = self.driver.list_zones()[0]
+        Route53MockHttp.type = 'BATCH'
+        Route53MockHttp.posted = []
+
+        lines = ['$TTL 300', '@ IN MX 10 mx1']
+        lines.extend(['host%s A 10.0.0.%s' % (index, index)
+                      for index in range(100)])
+        lines.extend(['@ IN MX 20 mx2', '@ IN MX 30 mx3'])
+
+        count = self.driver.import_zone_from_bind_stream(zone=zone,
+                                                         stream=lines)
+        self.assertEqual(count, 103)
+        self.assertEqual(len(Route53MockHttp.posted), 2)
+
+        first, second = Route53MockHttp.posted
+        self.assertEqual(first.count('<Action>CREATE</Action>'), 100)
+        self.assertFalse('host99' in first)
+        self.assertEqual(first.count('<Value>10 mx1.%s.</Value>' %
+                                     (zone.domain)), 1)
+
+        # The MX record set already exists, so it's retrieved and replaced
+        # with all of its values instead of being created again
+        self.assertEqual(second.count('<Change>'), 3)
+        self.assertFalse('UPSERT' in second)
+        self.assertTrue('host99' in second)
+
+        def values(values):
+            return ''.join(['<ResourceRecord><Value>%s.t.com.</Value>'
+                            '</ResourceRecord>' % (value)
+                            for value in values])
+
+        self.assertTrue(
+            '<Change><Action>DELETE</Action><ResourceRecordSet>'
+            '<Name>t.com</Name><Type>MX</Type><TTL>300</TTL>'
+            '<ResourceRecords>%s</ResourceRecords></ResourceRecordSet>'
+            '</Change><Change><Action>CREATE</Action><ResourceRecordSet>'
+            '<Name>t.com</Name><Type>MX</Type><TTL>300</TTL>'
+            '<ResourceRecords>%s</ResourceRecords></ResourceRecordSet>'
+            '</Change>' % (values(['10 mx1']),
+                           values(['10 mx1', '20 mx2', '30 mx3']))
+            in second)
+
 
 class Route53MockHttp(MockHttp):
     fixtures = DNSFileFixtures('route53')
+    posted = []
+    posted_urls = []
 
-    def _2012_02_29_hostedzone_47234(self, method, url, body, headers):
+    def _2013_04_01_hostedzone_47234(self, method, url, body, headers):
         body = self.fixtures.load('get_zone.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
 
-    def _2012_02_29_hostedzone(self, method, url, body, headers):
+    def _2013_04_01_hostedzone(self, method, url, body, headers):
         #print method, url, body, headers
         if method == "POST":
             body = self.fixtures.load("create_zone.xml")
@@ -227,29 +480,61 @@ class Route53MockHttp(MockHttp):
         body = self.fixtures.load('list_zones.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
 
-    def _2012_02_29_hostedzone_47234_rrset(self, method, url, body, headers):
+    def _2013_04_01_hostedzone_47234_rrset(self, method, url, body, headers):
         body = self.fixtures.load('list_records.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
 
-    def _2012_02_29_hostedzone_47234_rrset_ZONE_DOES_NOT_EXIST(self, method,
+    def _2013_04_01_hostedzone_47234_rrset_BATCH(self, method, url, body,
+                                                 headers):
+        if method == 'POST':
+            self.posted.append(body.decode('utf-8'))
+            self.posted_urls.append(url)
+            return (httplib.OK, '', {}, httplib.responses[httplib.OK])
+
+        if 'name=t.com' in url and 'type=MX' in url:
+            body = self.fixtures.load('get_record_set_mx.xml')
+            return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
+        return self._2013_04_01_hostedzone_47234_rrset(method, url, body,
+                                                       headers)
+
+    def _2013_04_01_hostedzone_PAGED(self, method, url, body, headers):
+        if 'marker=47234' in url:
+            body = self.fixtures.load('list_zones.xml')
+        else:
+            body = self.fixtures.load('list_zones_truncated.xml')
+        return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
+    def _2013_04_01_hostedzone_47234_rrset_PAGED(self, method, url, body,
+                                                 headers):
+        if 'name=wibble.t.com' in url and 'type=CNAME' in url:
+            body = self.fixtures.load('list_records.xml')
+        else:
+            body = self.fixtures.load('list_records_truncated.xml')
+        return (httplib.OK, body, {}, httplib.responses[httplib.OK])
+
+    def _2013_04_01_hostedzone_BATCH(self, method, url, body, headers):
+        return self._2013_04_01_hostedzone(method, url, body, headers)
+
+    def _2013_04_01_hostedzone_47234_rrset_ZONE_DOES_NOT_EXIST(self, method,
                                                                url, body, headers):
         body = self.fixtures.load('zone_does_not_exist.xml')
         return (httplib.NOT_FOUND, body,
                 {}, httplib.responses[httplib.NOT_FOUND])
 
-    def _2012_02_29_hostedzone_4444_ZONE_DOES_NOT_EXIST(self, method,
+    def _2013_04_01_hostedzone_4444_ZONE_DOES_NOT_EXIST(self, method,
                                                         url, body, headers):
         body = self.fixtures.load('zone_does_not_exist.xml')
         return (httplib.NOT_FOUND, body,
                 {}, httplib.responses[httplib.NOT_FOUND])
 
-    def _2012_02_29_hostedzone_47234_ZONE_DOES_NOT_EXIST(self, method,
+    def _2013_04_01_hostedzone_47234_ZONE_DOES_NOT_EXIST(self, method,
                                                          url, body, headers):
         body = self.fixtures.load('zone_does_not_exist.xml')
         return (httplib.NOT_FOUND, body,
                 {}, httplib.responses[httplib.NOT_FOUND])
 
-    def _2012_02_29_hostedzone_47234_rrset_RECORD_DOES_NOT_EXIST(self, method,
+    def _2013_04_01_hostedzone_47234_rrset_RECORD_DOES_NOT_EXIST(self, method,
                                                                  url, body, headers):
         if method == "POST":
             body = self.fixtures.load('invalid_change_batch.xml')
@@ -257,7 +542,7 @@ class Route53MockHttp(MockHttp):
         body = self.fixtures.load('record_does_not_exist.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
 
-    def _2012_02_29_hostedzone_47234_RECORD_DOES_NOT_EXIST(self, method,
+    def _2013_04_01_hostedzone_47234_RECORD_DOES_NOT_EXIST(self, method,
                                                            url, body, headers):
         body = self.fixtures.load('get_zone.xml')
         return (httplib.OK, body, {}, httplib.responses[httplib.OK])
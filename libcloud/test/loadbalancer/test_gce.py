@@ -18,6 +18,8 @@ Tests for Google Compute Engine Load Balancer Driver
 import sys
 import unittest
 
+from mock import Mock
+
 from libcloud.common.google import (GoogleBaseAuthConnection,
                                     GoogleInstalledAppAuthConnection,
                                     GoogleBaseConnection)
@@ -59,6 +61,18 @@ class GCELoadBalancerTest(LibcloudTestCase):
         node = self.driver._get_node_from_ip(dummy_ip)
         self.assertTrue(node is None)
 
+    def test_get_node_from_ip_with_index(self):
+        self.driver.gce.list_nodes = Mock(
+            wraps=self.driver.gce.list_nodes)
+        nodes_by_ip = self.driver._get_nodes_by_ip()
+
+        for ip in ['23.236.58.15', '173.255.120.70', '8.8.8.8']:
+            node = self.driver._get_node_from_ip(ip, nodes_by_ip=nodes_by_ip)
+            if node:
+                self.assertTrue(ip in node.public_ips)
+
+        self.assertEqual(self.driver.gce.list_nodes.call_count, 1)
+
     def test_list_protocols(self):
         expected_protocols = ['TCP', 'UDP']
         protocols = self.driver.list_protocols()
@@ -72,6 +86,31 @@ class GCELoadBalancerTest(LibcloudTestCase):
         self.assertEqual(len(balancers_all), 2)
         self.assertEqual(balancers[0].name, balancer_name)
 
+    def test_list_balancers_bulk_hydration(self):
+        gce = self.driver.gce
+        gce.connection.request = Mock(wraps=gce.connection.request)
+        balancers = self.driver.list_balancers(ex_region='all')
+        self.assertEqual(len(balancers), 2)
+
+        requests = [call[0][0] for call in
+                    gce.connection.request.call_args_list]
+        # Each resource type is listed once, target pool members which are
+        # not returned by the aggregated instances request are looked up
+        # individually
+        self.assertEqual(requests.count('/aggregated/forwardingRules'), 1)
+        self.assertEqual(requests.count('/aggregated/targetPools'), 1)
+        self.assertEqual(requests.count('/aggregated/instances'), 1)
+        self.assertEqual(requests.count('/global/httpHealthChecks'), 1)
+        self.assertEqual(len([r for r in requests if
+                              r.startswith('/regions/')]), 0)
+        self.assertEqual(len([r for r in requests if
+                              r.startswith('/global/httpHealthChecks/')]), 0)
+
+        targetpool = balancers[0].extra['targetpool']
+        self.assertEqual(targetpool.name, 'libcloud-lb-demo-lb-tp')
+        self.assertEqual([h.name for h in targetpool.healthchecks],
+                         ['libcloud-lb-demo-healthcheck'])
+
     def test_create_balancer(self):
         balancer_name = 'libcloud-lb-demo-lb'
         tp_name = '%s-tp' % (balancer_name)
@@ -17,9 +17,14 @@ from __future__ import with_statement
 
 import os
 import sys
+import time
+import random
+import threading
 import unittest
 import tempfile
 
+from mock import Mock
+
 from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import urlparse
 from libcloud.utils.py3 import parse_qs
@@ -34,6 +39,7 @@ from libcloud.storage.types import InvalidContainerNameError
 from libcloud.storage.types import ObjectDoesNotExistError
 from libcloud.storage.types import ObjectHashMismatchError
 from libcloud.storage.drivers.azure_blobs import AzureBlobsStorageDriver
+from libcloud.storage.drivers.azure_blobs import AzureBlobLease
 from libcloud.storage.drivers.azure_blobs import AZURE_BLOCK_MAX_SIZE
 from libcloud.storage.drivers.azure_blobs import AZURE_PAGE_CHUNK_SIZE
 from libcloud.storage.drivers.dummy import DummyIterator
@@ -891,6 +897,79 @@ class AzureBlobsTests(unittest.TestCase):
         self.assertEqual(obj.size, blob_size)
         self.mock_response_klass.use_param = None
 
+    def test_upload_blocks_concurrently_and_commit_in_order(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'max_running': 0}
+
+        def upload_chunk(object_path, data, headers, params, count):
+            with lock:
+                state['running'] += 1
+                state['max_running'] = max(state['max_running'],
+                                           state['running'])
+            time.sleep(random.uniform(0, 0.02))
+            with lock:
+                state['running'] -= 1
+
+        self.driver._upload_chunk = Mock(side_effect=upload_chunk)
+        self.driver._commit_blocks = Mock()
+        response = Mock(status=httplib.CREATED, headers={})
+        lease = AzureBlobLease(self.driver, '/foo', use_lease=False)
+
+        self.driver.upload_concurrency = 4
+
+        # Multiple chunks are uploaded at the same time, but blocks are
+        # committed in the order in which they have been read
+        iterator = DummyIterator(data=['a' * 1024] * 10)
+        result = self.driver._upload_in_chunks(
+            response=response, data=None, iterator=iterator,
+            object_path='/foo', blob_type='BlockBlob', lease=lease,
+            calculate_hash=False)
+
+        self.assertEqual(result[2], 10 * 1024)
+        self.assertEqual(self.driver._upload_chunk.call_count, 10)
+        self.assertTrue(1 < state['max_running'] <= 4)
+        uploaded = dict([(call[0][4], call[0][3]['blockid']) for call in
+                         self.driver._upload_chunk.call_args_list])
+        block_ids = self.driver._commit_blocks.call_args[0][1]
+        self.assertEqual(block_ids, [uploaded[count] for count in
+                                     range(1, 11)])
+        self.assertEqual(len(set(block_ids)), 10)
+
+    def test_upload_in_chunks_error_is_raised(self):
+        def upload_chunk(object_path, data, headers, params, count):
+            if count == 2:
+                raise LibcloudError('Error uploading chunk 2')
+
+        self.driver._upload_chunk = Mock(side_effect=upload_chunk)
+        self.driver._commit_blocks = Mock()
+        response = Mock(status=httplib.CREATED, headers={})
+        lease = AzureBlobLease(self.driver, '/foo', use_lease=False)
+        iterator = DummyIterator(data=['a' * 1024] * 20)
+
+        self.assertRaises(LibcloudError, self.driver._upload_in_chunks,
+                          response=response, data=None, iterator=iterator,
+                          object_path='/foo', blob_type='BlockBlob',
+                          lease=lease, calculate_hash=False)
+        self.assertFalse(self.driver._commit_blocks.called)
+
+    def test_lease_is_renewed_by_timer(self):
+        self.mock_response_klass.use_param = 'comp'
+        lease = AzureBlobLease(self.driver,
+                               '/foo_bar_container/foo_test_upload',
+                               use_lease=True)
+        lease.renew_interval = 0.01
+        lease.renew = Mock(wraps=lease.renew)
+
+        with lease:
+            self.assertEqual(lease.lease_id, 'someleaseid')
+            time.sleep(0.2)
+
+        self.assertTrue(lease.renew.call_count > 1)
+        call_count = lease.renew.call_count
+        time.sleep(0.05)
+        self.assertEqual(lease.renew.call_count, call_count)
+        self.mock_response_klass.use_param = None
+
     def test_upload_page_object_via_stream_with_lease(self):
         self.mock_response_klass.use_param = 'comp'
         container = Container(name='foo_bar_container', extra={},
@@ -13,20 +13,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import sys
+import json
+import shutil
 import hashlib
+import tempfile
+import threading
+import time
 
-from mock import Mock
+from mock import Mock, patch
 
 from libcloud.utils.py3 import StringIO
+from libcloud.utils.py3 import BytesIO
+from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import PY3
 from libcloud.utils.py3 import b
 
 if PY3:
     from io import FileIO as file
 
-from libcloud.storage.base import StorageDriver
+from libcloud.common.types import LibcloudError
+from libcloud.storage.base import Object, StorageDriver
 from libcloud.storage.base import DEFAULT_CONTENT_TYPE
+from libcloud.storage.base import DOWNLOAD_CHECKPOINT_SUFFIX
+from libcloud.storage.base import _PositionalWriter
 
 from libcloud.test import unittest
 from libcloud.test import StorageMockHttp
@@ -121,6 +132,61 @@ class BaseStorageTests(unittest.TestCase):
         self.assertEqual(bytes_transferred, 0)
         self.assertEqual(self.send_called, 5)
 
+    def test__stream_data_pipelines_reading_hashing_and_sending(self):
+        threads = {'read': set(), 'hash': set(), 'send': set()}
+        sent = []
+
+        def iterator():
+            for index in range(50):
+                threads['read'].add(threading.current_thread())
+                yield b(str(index)) * 10000
+
+        class Hash(object):
+            def __init__(self):
+                self._hash = hashlib.md5()
+
+            def update(self, data):
+                threads['hash'].add(threading.current_thread())
+                self._hash.update(data)
+
+            def hexdigest(self):
+                return self._hash.hexdigest()
+
+        def mock_send(data):
+            threads['send'].add(threading.current_thread())
+            sent.append(data)
+
+        response = Mock()
+        response.connection.connection.send = mock_send
+        self.driver1._get_hash_function = Hash
+
+        data = b('').join(list(iterator()))
+        threads['read'] = set()
+
+        for pipeline_size in [4 * 1024 * 1024, None]:
+            self.driver1.upload_pipeline_size = pipeline_size
+            del sent[:]
+
+            success, data_hash, bytes_transferred = \
+                self.driver1._stream_data(response=response,
+                                          iterator=iterator(),
+                                          calculate_hash=True)
+
+            self.assertTrue(success)
+            self.assertEqual(data_hash, hashlib.md5(data).hexdigest())
+            self.assertEqual(bytes_transferred, len(data))
+            self.assertEqual(b('').join(sent), data)
+
+        # With pipelining each stage ran in its own thread, without it
+        # everything ran in the calling thread
+        current = threading.current_thread()
+        self.assertEqual(threads['send'], set([current]))
+        self.assertEqual(len(threads['read']), 2)
+        self.assertEqual(len(threads['hash']), 2)
+        self.assertTrue(current in threads['read'])
+        self.assertTrue(current in threads['hash'])
+        self.assertEqual(len(threads['read'] & threads['hash']), 1)
+
     def test__upload_data(self):
         def mock_send(data):
             self.send_called += 1
@@ -138,6 +204,93 @@ class BaseStorageTests(unittest.TestCase):
         self.assertEqual(bytes_transferred, (len(data)))
         self.assertEqual(self.send_called, 1)
 
+    def test__stream_file_reads_fixed_size_chunks(self):
+        sent = []
+
+        def mock_send(data):
+            sent.append(bytes(data))
+
+        response = Mock()
+        response.connection.connection.send = mock_send
+        response.connection.connection.sock = None
+
+        data = b('a\nb\n\nc\n' * 10)
+        file_handle = tempfile.TemporaryFile()
+        file_handle.write(data)
+        file_handle.seek(0)
+
+        success, data_hash, bytes_transferred = \
+            self.driver1._stream_file(response=response,
+                                      file_handle=file_handle,
+                                      calculate_hash=True, chunk_size=16)
+        file_handle.close()
+
+        self.assertTrue(success)
+        self.assertEqual(data_hash, hashlib.md5(data).hexdigest())
+        self.assertEqual(bytes_transferred, len(data))
+        self.assertEqual([len(chunk) for chunk in sent], [16, 16, 16, 16, 6])
+        self.assertEqual(b('').join(sent), data)
+
+    def test__stream_file_chunked(self):
+        sent = []
+
+        def mock_send(data):
+            sent.append(bytes(data))
+
+        response = Mock()
+        response.connection.connection.send = mock_send
+
+        data = b('0123456789')
+        file_handle = tempfile.TemporaryFile()
+        file_handle.write(data)
+        file_handle.seek(0)
+
+        success, data_hash, bytes_transferred = \
+            self.driver1._stream_file(response=response,
+                                      file_handle=file_handle, chunked=True,
+                                      calculate_hash=True, chunk_size=8)
+        file_handle.close()
+
+        self.assertTrue(success)
+        self.assertEqual(bytes_transferred, len(data))
+        self.assertEqual(b('').join(sent),
+                         b('8\r\n01234567\r\n2\r\n89\r\n0\r\n\r\n'))
+
+    def test__stream_file_uses_sendfile_for_big_files(self):
+        data = b('0123456789' * 100)
+        file_handle = tempfile.TemporaryFile()
+        file_handle.write(data)
+        file_handle.seek(0)
+
+        response = Mock()
+        sock = response.connection.connection.sock
+        sock.sendfile.return_value = len(data)
+
+        self.driver1.sendfile_min_size = len(data)
+        success, data_hash, bytes_transferred = \
+            self.driver1._stream_file(response=response,
+                                      file_handle=file_handle,
+                                      calculate_hash=True)
+        file_handle.close()
+
+        self.assertTrue(success)
+        self.assertEqual(data_hash, hashlib.md5(data).hexdigest())
+        self.assertEqual(bytes_transferred, len(data))
+        self.assertEqual(sock.sendfile.call_count, 1)
+        self.assertFalse(response.connection.connection.send.called)
+
+        # Files smaller than the threshold are sent using send()
+        file_handle = tempfile.TemporaryFile()
+        file_handle.write(data)
+        file_handle.seek(0)
+
+        self.driver1.sendfile_min_size = len(data) + 1
+        self.driver1._stream_file(response=response, file_handle=file_handle)
+        file_handle.close()
+
+        self.assertEqual(sock.sendfile.call_count, 1)
+        self.assertTrue(response.connection.connection.send.called)
+
     def test__get_hash_function(self):
         self.driver1.hash_type = 'md5'
         func = self.driver1._get_hash_function()
@@ -189,5 +342,158 @@ class BaseStorageTests(unittest.TestCase):
                                 iterator=iterator)
 
 
+class DownloadObjectInPartsTests(unittest.TestCase):
+    def setUp(self):
+        StorageDriver.connectionCls.conn_classes = (None, StorageMockHttp)
+        self.driver = StorageDriver('username', 'key', host='localhost')
+        self.data = os.urandom(1000)
+        self.obj = Object(name='foo', size=len(self.data), hash='abc',
+                          extra={}, meta_data={}, container=None,
+                          driver=self.driver)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, 'foo')
+        self.checkpoint_path = self.file_path + DOWNLOAD_CHECKPOINT_SUFFIX
+        self.failing_parts = []
+        self.driver._get_object_range = Mock(side_effect=self._get_range)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _get_range(self, obj, start_bytes, end_bytes):
+        if start_bytes // 100 in self.failing_parts:
+            # Connection is dropped in the middle of the part
+            end_bytes = start_bytes + 10
+
+        data = self.data[start_bytes:end_bytes + 1]
+        return Mock(status=httplib.PARTIAL_CONTENT, response=BytesIO(data))
+
+    def _read_file(self):
+        with open(self.file_path, 'rb') as fp:
+            return fp.read()
+
+    def _requested_ranges(self):
+        return sorted([(call[1]['start_bytes'], call[1]['end_bytes']) for
+                       call in self.driver._get_object_range.call_args_list])
+
+    def test_download_object_in_parts(self):
+        result = self.driver.download_object_in_parts(
+            self.obj, self.file_path, part_size=300, max_workers=3)
+
+        self.assertTrue(result)
+        self.assertEqual(self._read_file(), self.data)
+        self.assertEqual(self._requested_ranges(),
+                         [(0, 299), (300, 599), (600, 899), (900, 999)])
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_download_object_in_parts_to_directory(self):
+        self.driver.download_object_in_parts(self.obj, self.tmp_dir + '/',
+                                             part_size=300)
+        self.assertEqual(self._read_file(), self.data)
+
+    def test_download_object_in_parts_file_exists(self):
+        with open(self.file_path, 'wb') as fp:
+            fp.write(b('existing'))
+
+        self.assertRaises(LibcloudError, self.driver.download_object_in_parts,
+                          self.obj, self.file_path)
+        self.assertEqual(self._read_file(), b('existing'))
+
+        self.driver.download_object_in_parts(self.obj, self.file_path,
+                                             overwrite_existing=True)
+        self.assertEqual(self._read_file(), self.data)
+
+    def test_download_object_in_parts_resume(self):
+        self.failing_parts = [3, 7]
+
+        self.assertRaises(LibcloudError, self.driver.download_object_in_parts,
+                          self.obj, self.file_path, part_size=100)
+
+        with open(self.checkpoint_path, 'r') as fp:
+            checkpoint = json.loads(fp.read())
+        self.assertEqual(checkpoint['completed'],
+                         [0, 1, 2, 4, 5, 6, 8, 9])
+
+        # Only the missing parts are downloaded when the download is resumed
+        self.failing_parts = []
+        self.driver._get_object_range.reset_mock()
+        self.driver.download_object_in_parts(self.obj, self.file_path,
+                                             part_size=100)
+
+        self.assertEqual(self._requested_ranges(), [(300, 399), (700, 799)])
+        self.assertEqual(self._read_file(), self.data)
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_download_object_in_parts_resume_without_completed_parts(self):
+        self.failing_parts = list(range(10))
+
+        self.assertRaises(LibcloudError, self.driver.download_object_in_parts,
+                          self.obj, self.file_path, part_size=100)
+
+        with open(self.checkpoint_path, 'r') as fp:
+            checkpoint = json.loads(fp.read())
+        self.assertEqual(checkpoint['completed'], [])
+
+        # Preallocated file doesn't prevent the download from being retried
+        self.failing_parts = []
+        self.driver.download_object_in_parts(self.obj, self.file_path,
+                                             part_size=100)
+
+        self.assertEqual(self._read_file(), self.data)
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_download_object_in_parts_invalid_checkpoint(self):
+        self.failing_parts = [3]
+        self.assertRaises(LibcloudError, self.driver.download_object_in_parts,
+                          self.obj, self.file_path, part_size=100)
+
+        # Object has changed, download starts over
+        self.failing_parts = []
+        self.obj.hash = 'def'
+        self.driver._get_object_range.reset_mock()
+        self.driver.download_object_in_parts(self.obj, self.file_path,
+                                             part_size=100)
+
+        self.assertEqual(len(self._requested_ranges()), 10)
+        self.assertEqual(self._read_file(), self.data)
+
+    def test_download_object_in_parts_waits_for_parts_on_error(self):
+        events = []
+        close = _PositionalWriter.close
+
+        def download_range(obj, writer, start_bytes, end_bytes):
+            time.sleep(0.05)
+            events.append('part')
+
+        def close_writer(writer):
+            events.append('close')
+            close(writer)
+
+        self.driver._download_object_range = Mock(side_effect=download_range)
+        self.driver._save_download_checkpoint = Mock(
+            side_effect=[None, IOError('disk full')])
+
+        with patch.object(_PositionalWriter, 'close', close_writer):
+            self.assertRaises(IOError, self.driver.download_object_in_parts,
+                              self.obj, self.file_path, part_size=100,
+                              max_workers=3)
+
+        # File is closed once all the started parts have been written
+        self.assertEqual(events[-1], 'close')
+        self.assertEqual(events.count('part'),
+                         self.driver._download_object_range.call_count)
+
+    def test_download_object_in_parts_range_ignored(self):
+        response = Mock(status=httplib.OK, response=BytesIO(self.data))
+        self.driver._get_object_range = Mock(return_value=response)
+
+        # Whole object can be returned if a single part is requested
+        self.driver.download_object_in_parts(self.obj, self.file_path)
+        self.assertEqual(self._read_file(), self.data)
+
+        os.unlink(self.file_path)
+        self.assertRaises(LibcloudError, self.driver.download_object_in_parts,
+                          self.obj, self.file_path, part_size=100)
+
+
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -13,6 +13,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from __future__ import with_statement
+
 from hashlib import sha1
 import hmac
 import os
@@ -20,6 +22,8 @@ import os.path                          # pylint: disable-msg=W0404
 import math
 import sys
 import copy
+import time
+import threading
 import unittest
 
 import mock
@@ -619,6 +623,77 @@ class CloudFilesTests(unittest.TestCase):
         self.assertEqual(mocked__upload_object_part.call_count, parts)
         self.assertTrue(mocked__upload_object_manifest.call_count, 1)
 
+    def test_ex_multipart_upload_object_uploads_parts_concurrently(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'max_running': 0, 'parts': []}
+
+        def upload_part(container, object_name, part_number, iterator,
+                        verify_hash=True):
+            data = b('').join(iterator)
+            with lock:
+                state['running'] += 1
+                state['max_running'] = max(state['max_running'],
+                                           state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+                state['parts'].append((part_number, data))
+
+        def upload_manifest(container, object_name, extra=None,
+                            verify_hash=True):
+            # Manifest is only created once all the parts have been uploaded
+            self.assertEqual(len(state['parts']), 5)
+            return 'test_manifest'
+
+        self.driver._upload_object_part = mock.Mock(side_effect=upload_part)
+        self.driver._upload_object_manifest = mock.Mock(
+            side_effect=upload_manifest)
+
+        file_path = os.path.abspath(__file__)
+        chunk_size = int(math.ceil(float(os.path.getsize(file_path)) / 5))
+        container = Container(name='foo_bar_container', extra={}, driver=self)
+        obj = self.driver.ex_multipart_upload_object(
+            file_path=file_path, container=container,
+            object_name='foo_test_upload', chunk_size=chunk_size,
+            max_workers=3)
+
+        self.assertEqual(obj, 'test_manifest')
+        self.assertTrue(1 < state['max_running'] <= 3)
+
+        with open(file_path, 'rb') as fp:
+            expected = fp.read()
+        parts = sorted(state['parts'])
+        self.assertEqual([part[0] for part in parts], list(range(5)))
+        self.assertEqual(b('').join([part[1] for part in parts]), expected)
+
+    def test_ex_multipart_upload_object_part_failure(self):
+        def upload_part(container, object_name, part_number, iterator,
+                        verify_hash=True):
+            if part_number in [1, 3]:
+                raise LibcloudError('part %d failed' % (part_number))
+
+        self.driver._upload_object_part = mock.Mock(side_effect=upload_part)
+        self.driver._upload_object_manifest = mock.Mock()
+
+        file_path = os.path.abspath(__file__)
+        chunk_size = int(math.ceil(float(os.path.getsize(file_path)) / 5))
+        container = Container(name='foo_bar_container', extra={}, driver=self)
+
+        try:
+            self.driver.ex_multipart_upload_object(
+                file_path=file_path, container=container,
+                object_name='foo_test_upload', chunk_size=chunk_size,
+                max_workers=1)
+        except LibcloudError:
+            e = sys.exc_info()[1]
+            self.assertTrue('part 1 failed' in str(e))
+        else:
+            self.fail('Exception was not thrown')
+
+        # Remaining segments are not uploaded after the first failure
+        self.assertEqual(self.driver._upload_object_part.call_count, 2)
+        self.assertFalse(self.driver._upload_object_manifest.called)
+
     def test__upload_object_part(self):
         _put_object = CloudFilesStorageDriver._put_object
         mocked__put_object = mock.Mock(return_value="test")
@@ -15,6 +15,8 @@
 
 import os
 import sys
+import time
+import hashlib
 import unittest
 
 try:
@@ -25,6 +27,7 @@ except ImportError:
 from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import urlparse
 from libcloud.utils.py3 import parse_qs
+from libcloud.utils.py3 import b
 
 from libcloud.common.types import InvalidCredsError
 from libcloud.common.types import LibcloudError, MalformedResponseError
@@ -879,6 +882,69 @@ class S3Tests(unittest.TestCase):
         self.assertEqual(obj.name, object_name)
         self.assertEqual(obj.size, CHUNK_SIZE * 2 + 1)
 
+    def test_upload_big_object_via_stream_concurrently(self):
+        if not self.driver.supports_s3_multipart_upload:
+            return
+
+        self.mock_raw_response_klass.type = 'MULTIPART'
+        self.mock_response_klass.type = 'MULTIPART'
+
+        container = Container(name='foo_bar_container', extra={},
+                              driver=self.driver)
+        object_name = 'foo_test_stream_data'
+        iterator = DummyIterator(
+            data=['2' * CHUNK_SIZE, '3' * CHUNK_SIZE, '4' * CHUNK_SIZE, '5'])
+        extra = {'content_type': 'text/plain'}
+        obj = self.driver.upload_object_via_stream(container=container,
+                                                   object_name=object_name,
+                                                   iterator=iterator,
+                                                   extra=extra,
+                                                   ex_concurrency=3)
+
+        self.assertEqual(obj.name, object_name)
+        self.assertEqual(obj.size, CHUNK_SIZE * 3 + 1)
+
+    def test_upload_from_iterator_concurrently_commits_parts_in_order(self):
+        uploaded = []
+
+        def upload_part(object_path, upload_id, part_number, data):
+            # Make sure parts finish out of order
+            time.sleep(0.01 * (4 - part_number))
+            uploaded.append(part_number)
+            return (part_number, 'etag%s' % (part_number))
+
+        self.driver._upload_part = upload_part
+        iterator = DummyIterator(data=['a' * CHUNK_SIZE, 'b' * CHUNK_SIZE,
+                                       'c'])
+        chunks, data_hash, bytes_transferred = \
+            self.driver._upload_from_iterator(iterator, '/foo/bar', 'id',
+                                              concurrency=3)
+
+        self.assertEqual(chunks, [(1, 'etag1'), (2, 'etag2'), (3, 'etag3')])
+        self.assertEqual(sorted(uploaded), [1, 2, 3])
+        self.assertEqual(bytes_transferred, CHUNK_SIZE * 2 + 1)
+
+        expected_hash = hashlib.md5(b('a' * CHUNK_SIZE + 'b' * CHUNK_SIZE +
+                                      'c')).hexdigest()
+        self.assertEqual(data_hash, expected_hash)
+
+    def test_upload_from_iterator_concurrently_part_failure(self):
+        def upload_part(object_path, upload_id, part_number, data):
+            if part_number == 1:
+                raise LibcloudError('Error uploading chunk')
+            return (part_number, 'etag')
+
+        self.driver._upload_part = upload_part
+        iterator = DummyIterator(data=['a' * CHUNK_SIZE] * 6)
+
+        self.assertRaises(LibcloudError, self.driver._upload_from_iterator,
+                          iterator, '/foo/bar', 'id', concurrency=2)
+
+    def test_upload_from_iterator_invalid_part_size(self):
+        iterator = DummyIterator(data=['a'])
+        self.assertRaises(ValueError, self.driver._upload_from_iterator,
+                          iterator, '/foo/bar', 'id', part_size=1024)
+
     def test_upload_object_via_stream_abort(self):
         if not self.driver.supports_s3_multipart_upload:
             return
@@ -16,6 +16,7 @@
 
 import sys
 import ssl
+import threading
 
 from mock import Mock, call
 
@@ -182,5 +183,24 @@ class ConnectionClassTestCase(unittest.TestCase):
 
         self.assertEqual(con.context, {})
 
+    def test_request_state_is_thread_local(self):
+        con = Connection()
+        con.set_context({'foo': 'bar'})
+        con.action = '/main'
+        seen = []
+
+        def worker():
+            seen.append((con.action, con.context))
+            con.action = '/worker'
+            con.set_context({'bar': 'baz'})
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(seen, [(None, {})])
+        self.assertEqual(con.action, '/main')
+        self.assertEqual(con.context, {'foo': 'bar'})
+
 if __name__ == '__main__':
     sys.exit(unittest.main())
@@ -20,8 +20,9 @@ import gzip
 
 from mock import Mock
 
-from libcloud.utils.py3 import httplib, b, StringIO, PY3
+from libcloud.utils.py3 import httplib, b, StringIO, BytesIO, PY3
 from libcloud.common.base import Response, XmlResponse, JsonResponse
+from libcloud.common.base import StreamingXmlResponse
 from libcloud.common.types import MalformedResponseError
 
 
@@ -146,6 +147,49 @@ class ResponseClassesTests(unittest.TestCase):
         body = response.parse_body()
         self.assertEqual(body, original_data)
 
+    def test_StreamingXmlResponse_class(self):
+        body = BytesIO(b('<foo><bar>1</bar><bar>2</bar></foo>'))
+        self._mock_response.read.side_effect = body.read
+
+        response = StreamingXmlResponse(response=self._mock_response,
+                                        connection=self._mock_connection)
+
+        # Body is not read until elements are requested
+        self.assertFalse(self._mock_response.read.called)
+
+        values = [element.text for element in response.iterfindall('bar')]
+        self.assertEqual(values, ['1', '2'])
+        self.assertTrue(self._mock_connection._release_connection.called)
+
+    def test_StreamingXmlResponse_class_gzip_encoding(self):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        data = compressor.compress(b('<foo><bar>1</bar></foo>'))
+        data += compressor.flush()
+
+        self._mock_response.read.side_effect = BytesIO(data).read
+        self._mock_response.getheaders.return_value = \
+            {'Content-Encoding': 'gzip'}
+
+        response = StreamingXmlResponse(response=self._mock_response,
+                                        connection=self._mock_connection)
+
+        values = [element.text for element in response.iterfindall('bar')]
+        self.assertEqual(values, ['1'])
+
+    def test_StreamingXmlResponse_class_error_is_parsed_by_responseCls(self):
+        self._mock_response.status = httplib.BAD_REQUEST
+        self._mock_response.read.return_value = '<error>foo</error>'
+        self._mock_connection.responseCls = XmlResponse
+
+        try:
+            StreamingXmlResponse(response=self._mock_response,
+                                 connection=self._mock_connection)
+        except Exception:
+            e = sys.exc_info()[1]
+            self.assertEqual(e.args[0].tag, 'error')
+        else:
+            self.fail('Exception was not thrown')
+
 
 if __name__ == '__main__':
     sys.exit(unittest.main())
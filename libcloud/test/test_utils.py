@@ -15,12 +15,20 @@
 # limitations under the License.
 
 import sys
+import time
+import hashlib
+import zlib
 import socket
+import threading
 import codecs
 import unittest
 import warnings
 import os.path
 
+from xml.etree import ElementTree as ET
+
+from mock import Mock, patch
+
 from itertools import chain
 
 # In Python > 2.7 DeprecationWarnings are disabled by default
@@ -32,6 +40,7 @@ from libcloud.utils.misc import get_driver, set_driver
 
 from libcloud.utils.py3 import PY3
 from libcloud.utils.py3 import StringIO
+from libcloud.utils.py3 import BytesIO
 from libcloud.utils.py3 import b
 from libcloud.utils.py3 import urlquote
 from libcloud.compute.types import Provider
@@ -40,6 +49,11 @@ from libcloud.utils.misc import get_secure_random_string
 from libcloud.utils.networking import is_public_subnet
 from libcloud.utils.networking import is_private_subnet
 from libcloud.utils.networking import is_valid_ip_address
+from libcloud.utils.concurrency import WorkerPool, run_concurrently
+from libcloud.utils.concurrency import BackgroundHasher, prefetch
+from libcloud.utils.compression import DecompressingReader
+from libcloud.utils.xml import iterfindall, findtexts, findattr, fixxpath
+from libcloud.utils.xml import _LRUCache
 from libcloud.storage.drivers.dummy import DummyIterator
 
 
@@ -214,6 +228,66 @@ class TestUtils(unittest.TestCase):
 
             self.assertEqual(index, 548)
 
+    def test_read_in_chunks_fill_size_uneven_pieces(self):
+        pieces = [b('a') * size for size in [1, 3, 25, 7, 64, 2, 0]]
+        data = b('').join(pieces)
+
+        for chunk_size in [1, 5, 10, 64, 200]:
+            result = list(libcloud.utils.files.read_in_chunks(
+                iter(pieces), chunk_size=chunk_size, fill_size=True))
+
+            self.assertEqual(b('').join(result), data)
+            self.assertTrue(all([isinstance(r, bytes) for r in result]))
+
+            for chunk in result[:-1]:
+                self.assertEqual(len(chunk), chunk_size)
+
+            self.assertTrue(0 < len(result[-1]) <= chunk_size)
+
+    def test_read_in_chunks_yield_empty_only_without_data(self):
+        # Data which is a multiple of the chunk size shouldn't result in an
+        # additional empty chunk
+        result = list(libcloud.utils.files.read_in_chunks(
+            iter([b('aaaaa'), b('aaaaa')]), chunk_size=5, fill_size=True,
+            yield_empty=True))
+        self.assertEqual(result, [b('aaaaa'), b('aaaaa')])
+
+        result = list(libcloud.utils.files.read_in_chunks(
+            iter([]), chunk_size=5, fill_size=True, yield_empty=True))
+        self.assertEqual(result, [b('')])
+
+    @patch('libcloud.utils.files._join_pieces',
+           wraps=libcloud.utils.files._join_pieces)
+    def test_read_in_chunks_and_exhaust_iterator_are_linear(self,
+                                                            join_pieces):
+        # 8 MB of data in 1 KB pieces. Each piece should be consumed once and
+        # each byte joined into an output chunk once instead of re-copying
+        # the whole buffer for every piece (data += chunk).
+        piece = b('a') * 1024
+        count = 8 * 1024
+        consumed = [0]
+
+        def pieces():
+            for _ in range(count):
+                consumed[0] += 1
+                yield piece
+
+        chunks = libcloud.utils.files.read_in_chunks(
+            pieces(), chunk_size=5 * 1024 * 1024 + 1, fill_size=True)
+        sizes = [len(chunk) for chunk in chunks]
+
+        self.assertEqual(sizes, [5 * 1024 * 1024 + 1,
+                                 3 * 1024 * 1024 - 1])
+        self.assertEqual(consumed[0], count)
+        self.assertEqual(join_pieces.call_count, 2)
+        self.assertEqual(sum([call[0][1] for call in
+                              join_pieces.call_args_list]), count * 1024)
+
+        consumed[0] = 0
+        data = libcloud.utils.files.exhaust_iterator(iterator=pieces())
+        self.assertEqual(len(data), count * 1024)
+        self.assertEqual(consumed[0], count)
+
     def test_exhaust_iterator(self):
         def iterator_func():
             for x in range(0, 1000):
@@ -263,6 +337,336 @@ class TestUtils(unittest.TestCase):
             self.assertEqual(len(value), i)
 
 
+class ConcurrencyUtilsTestCase(unittest.TestCase):
+    def test_worker_pool_map_preserves_order(self):
+        def func(value):
+            time.sleep(0.001 * (5 - value))
+            return value * 2
+
+        pool = WorkerPool(max_workers=3)
+        result = list(pool.map(func, range(5)))
+        pool.shutdown()
+
+        self.assertEqual(result, [0, 2, 4, 6, 8])
+
+    def test_worker_pool_limits_concurrency(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def func(value):
+            lock.acquire()
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            lock.release()
+            time.sleep(0.01)
+            lock.acquire()
+            running[0] -= 1
+            lock.release()
+
+        pool = WorkerPool(max_workers=2)
+        futures = [pool.submit(func, i) for i in range(6)]
+        pool.shutdown()
+
+        self.assertTrue(all([future.done() for future in futures]))
+        self.assertEqual(peak[0], 2)
+
+    def test_future_exception(self):
+        def func():
+            raise ValueError('fail')
+
+        pool = WorkerPool(max_workers=1)
+        future = pool.submit(func)
+        pool.shutdown()
+
+        self.assertTrue(isinstance(future.exception(), ValueError))
+        self.assertRaises(ValueError, future.result)
+
+    def test_run_concurrently(self):
+        def func(value):
+            if value == 3:
+                raise ValueError('fail')
+            return value * 2
+
+        result = {}
+        errors = []
+
+        for item, future in run_concurrently(func, range(5), max_workers=2):
+            if future.exception():
+                errors.append(item)
+            else:
+                result[item] = future.result()
+
+        self.assertEqual(result, {0: 0, 1: 2, 2: 4, 4: 8})
+        self.assertEqual(errors, [3])
+
+    def test_run_concurrently_retrieves_items_lazily(self):
+        consumed = []
+        calls = []
+
+        def items():
+            for value in range(100):
+                consumed.append(value)
+                yield value
+
+        def func(value):
+            time.sleep(0.01)
+            calls.append(value)
+
+        results = run_concurrently(func, items(), max_workers=2)
+        item, future = next(results)
+        results.close()
+
+        # At most one new call has been started after the first one finished
+        self.assertTrue(len(consumed) <= 3)
+        # Running calls have finished once the generator is closed
+        self.assertEqual(sorted(calls), sorted(consumed))
+
+    def test_worker_pool_shutdown_cancels_pending_functions(self):
+        started = threading.Event()
+        event = threading.Event()
+        calls = []
+
+        def func(value):
+            started.set()
+            event.wait()
+            calls.append(value)
+
+        pool = WorkerPool(max_workers=1)
+        futures = [pool.submit(func, i) for i in range(4)]
+        started.wait()
+        pool.shutdown(wait=False, cancel_pending=True)
+        event.set()
+        futures[0].result()
+
+        self.assertEqual(calls, [0])
+        self.assertEqual(futures[0].exception(), None)
+
+        for future in futures[1:]:
+            self.assertTrue(isinstance(future.exception(), RuntimeError))
+
+    def test_prefetch(self):
+        threads = set()
+
+        def items():
+            for value in range(100):
+                threads.add(threading.current_thread())
+                yield value
+
+        self.assertEqual(list(prefetch(items(), max_pending=3)),
+                         list(range(100)))
+        self.assertEqual(len(threads), 1)
+        self.assertFalse(threading.current_thread() in threads)
+
+    def test_prefetch_limits_read_ahead(self):
+        produced = []
+
+        def items():
+            for value in range(100):
+                produced.append(value)
+                yield value
+
+        generator = prefetch(items(), max_pending=2)
+        self.assertEqual(next(generator), 0)
+        time.sleep(0.05)
+
+        # One item has been consumed, two are pending and the producer may
+        # already hold the next one
+        self.assertTrue(len(produced) <= 4)
+        generator.close()
+
+    def test_prefetch_stops_producer_when_closed(self):
+        state = {'closed': False}
+
+        def items():
+            try:
+                for value in range(100):
+                    yield value
+            finally:
+                state['closed'] = True
+
+        generator = prefetch(items(), max_pending=2)
+        self.assertEqual(next(generator), 0)
+        generator.close()
+
+        # Producer has stopped using the iterable once close() returns
+        self.assertTrue(state['closed'])
+
+    def test_prefetch_propagates_exception(self):
+        def items():
+            yield 1
+            raise ValueError('fail')
+
+        generator = prefetch(items(), max_pending=5)
+        self.assertEqual(next(generator), 1)
+        self.assertRaises(ValueError, next, generator)
+
+    def test_background_hasher(self):
+        data = [b('a') * size for size in [10, 1000, 1, 300000, 5]]
+        md5, sha1 = hashlib.md5(), hashlib.sha1()
+
+        hasher = BackgroundHasher(hashes=[md5, sha1], max_pending_size=1024,
+                                  batch_size=512)
+
+        for chunk in data:
+            hasher.update(chunk)
+
+        self.assertEqual(hasher.wait(), [md5, sha1])
+        self.assertEqual(md5.hexdigest(),
+                         hashlib.md5(b('').join(data)).hexdigest())
+        self.assertEqual(sha1.hexdigest(),
+                         hashlib.sha1(b('').join(data)).hexdigest())
+
+        # Hashing in the calling thread
+        md5 = hashlib.md5()
+        hasher = BackgroundHasher(hashes=[md5], max_pending_size=0,
+                                  background=False)
+
+        for chunk in data:
+            hasher.update(chunk)
+
+        hasher.wait()
+        self.assertEqual(md5.hexdigest(),
+                         hashlib.md5(b('').join(data)).hexdigest())
+
+    def test_background_hasher_propagates_exception(self):
+        data_hash = Mock()
+        data_hash.update.side_effect = ValueError('fail')
+
+        hasher = BackgroundHasher(hashes=[data_hash], max_pending_size=10,
+                                  batch_size=1)
+        hasher.update(b('a'))
+        hasher.update(b('b'))
+        self.assertRaises(ValueError, hasher.wait)
+        self.assertEqual(data_hash.update.call_count, 1)
+
+
+class XmlUtilsTestCase(unittest.TestCase):
+    def test_fixxpath(self):
+        self.assertEqual(fixxpath('a/b'), 'a/b')
+        self.assertEqual(fixxpath('a/b', namespace='urn:test'),
+                         '{urn:test}a/{urn:test}b')
+
+        # Cached value is returned for the same xpath and namespace
+        self.assertTrue(fixxpath('a/b', namespace='urn:test') is
+                        fixxpath('a/b', namespace='urn:test'))
+        self.assertEqual(fixxpath('a/b', namespace='urn:other'),
+                         '{urn:other}a/{urn:other}b')
+
+    def test_lru_cache_discards_least_recently_used_item(self):
+        cache = _LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('c'), 3)
+
+        # Updating an existing key doesn't evict anything
+        cache.set('c', 4)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('c'), 4)
+
+    def test_lru_cache_concurrent_access(self):
+        cache = _LRUCache(max_size=10)
+        errors = []
+
+        def worker(offset):
+            try:
+                for index in range(2000):
+                    key = (index * 7 + offset) % 50
+
+                    if cache.get(key) is None:
+                        cache.set(key, key)
+            except Exception:
+                errors.append(sys.exc_info()[1])
+
+        threads = [threading.Thread(target=worker, args=(offset,))
+                   for offset in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(cache), 10)
+
+    def test_findtexts(self):
+        namespace = 'http://ec2.amazonaws.com/doc/2013-10-15/'
+        xml = ('<item xmlns="%s"><id>a</id><empty/>'
+               '<ebs><volumeId>vol-1</volumeId></ebs>'
+               '<ebs><volumeId>vol-2</volumeId><status>ok</status></ebs>'
+               '<nested><id>b</id></nested></item>' % (namespace))
+        element = ET.XML(xml)
+        xpaths = ['id', 'empty', 'missing', 'ebs/volumeId', 'ebs/status',
+                  'nested/id', 'nested/missing']
+
+        values = findtexts(element=element, xpaths=xpaths,
+                           namespace=namespace)
+        self.assertEqual(values, {
+            'id': 'a',
+            'empty': '',
+            'missing': None,
+            'ebs/volumeId': 'vol-1',
+            'ebs/status': 'ok',
+            'nested/id': 'b',
+            'nested/missing': None
+        })
+
+        for xpath in xpaths:
+            self.assertEqual(values[xpath],
+                             findattr(element=element, xpath=xpath,
+                                      namespace=namespace))
+
+
+class StreamingUtilsTestCase(unittest.TestCase):
+    def test_iterfindall(self):
+        xml = ('<root xmlns="urn:test"><requestId>1</requestId><set>'
+               '<item><id>a</id><set><item><id>nested</id></item></set>'
+               '</item><item><id>b</id></item></set></root>')
+        ids = []
+        nested_ids = []
+
+        for element in iterfindall(StringIO(xml), xpath='set/item',
+                                   namespace='urn:test'):
+            ids.append(element.findtext('{urn:test}id'))
+            nested_ids.extend([item.findtext('{urn:test}id') for item in
+                               element.findall('{urn:test}set/{urn:test}item')])
+
+        # Only top level items are yielded, nested ones are available on them
+        self.assertEqual(ids, ['a', 'b'])
+        self.assertEqual(nested_ids, ['nested'])
+
+    def test_iterfindall_without_namespace(self):
+        xml = '<root><item>1</item><other>2</other><item>3</item></root>'
+        values = [element.text for element in
+                  iterfindall(StringIO(xml), xpath='item')]
+        self.assertEqual(values, ['1', '3'])
+
+    def test_decompressing_reader(self):
+        data = b('foo bar ponies, wooo zlib') * 1000
+
+        for compression_type, wbits in [('zlib', zlib.MAX_WBITS),
+                                        ('gzip', 16 + zlib.MAX_WBITS)]:
+            compressor = zlib.compressobj(9, zlib.DEFLATED, wbits)
+            compressed = compressor.compress(data) + compressor.flush()
+            reader = DecompressingReader(BytesIO(compressed), compression_type)
+
+            chunks = []
+            chunk = reader.read(100)
+            while chunk:
+                self.assertTrue(len(chunk) <= 100)
+                chunks.append(chunk)
+                chunk = reader.read(100)
+
+            self.assertEqual(b('').join(chunks), data)
+
+
 class NetworkingUtilsTestCase(unittest.TestCase):
     def test_is_public_and_is_private_subnet(self):
         public_ips = [
@@ -18,12 +18,17 @@ import gzip
 
 from libcloud.utils.py3 import PY3
 from libcloud.utils.py3 import StringIO
+from libcloud.utils.py3 import b
 
 
 __all__ = [
-    'decompress_data'
+    'decompress_data',
+    'DecompressingReader'
 ]
 
+# Number of (compressed) bytes which are read at once by DecompressingReader
+CHUNK_SIZE = 8096
+
 
 def decompress_data(compression_type, data):
     if compression_type == 'zlib':
@@ -40,3 +45,48 @@ def decompress_data(compression_type, data):
     else:
         raise Exception('Invalid or onsupported compression type: %s' %
                         (compression_type))
+
+
+class DecompressingReader(object):
+    """
+    File-like object which decompresses data read from the wrapped file-like
+    object (e.g. HTTP response) on the fly.
+    """
+
+    def __init__(self, fileobj, compression_type):
+        """
+        :param fileobj: File-like object with compressed data.
+
+        :param compression_type: Compression type (zlib or gzip).
+        :type compression_type: ``str``
+        """
+        if compression_type == 'zlib':
+            wbits = zlib.MAX_WBITS
+        elif compression_type == 'gzip':
+            # Expect gzip header and trailer
+            wbits = 16 + zlib.MAX_WBITS
+        else:
+            raise Exception('Invalid or onsupported compression type: %s' %
+                            (compression_type))
+
+        self._fileobj = fileobj
+        self._decompressor = zlib.decompressobj(wbits)
+        self._buffer = b('')
+        self._eof = False
+
+    def read(self, size=-1):
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            data = self._fileobj.read(CHUNK_SIZE)
+
+            if not data:
+                self._buffer += self._decompressor.flush()
+                self._eof = True
+                break
+
+            self._buffer += self._decompressor.decompress(data)
+
+        if size < 0:
+            size = len(self._buffer)
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
@@ -0,0 +1,600 @@
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers for running blocking (I/O bound) functions in a bounded pool of
+worker threads.
+"""
+
+import sys
+import threading
+
+from libcloud.utils.py3 import next
+from libcloud.utils.py3 import queue
+
+__all__ = [
+    'Future',
+    'WorkerPool',
+    'BackgroundHasher',
+    'as_completed',
+    'run_concurrently',
+    'prefetch'
+]
+
+# Size of the batches of data which are handed over to the hashing thread
+HASH_BATCH_SIZE = 256 * 1024
+
+
+class Future(object):
+    """
+    Handle for the result of a function which is executed by a
+    :class:`WorkerPool`.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+
+    def done(self):
+        """
+        Return True if the function has finished executing.
+
+        :rtype: ``bool``
+        """
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """
+        Wait for the function to finish and return its result. If the function
+        has thrown, the exception is re-raised.
+
+        :param timeout: Number of seconds to wait for (defaults to forever).
+        :type timeout: ``float``
+        """
+        self._wait(timeout=timeout)
+
+        if self._exc_info:
+            raise self._exc_info[1]
+
+        return self._result
+
+    def exception(self, timeout=None):
+        """
+        Wait for the function to finish and return the exception it has
+        thrown or None if it has finished successfully.
+
+        :param timeout: Number of seconds to wait for (defaults to forever).
+        :type timeout: ``float``
+        """
+        self._wait(timeout=timeout)
+
+        if self._exc_info:
+            return self._exc_info[1]
+
+        return None
+
+    def add_done_callback(self, callback):
+        """
+        Register a function which is called with this future as the only
+        argument once the function has finished. If it has already finished,
+        callback is called immediately.
+        """
+        self._lock.acquire()
+        try:
+            if not self.done():
+                self._callbacks.append(callback)
+                return
+        finally:
+            self._lock.release()
+
+        callback(self)
+
+    def set_result(self, result):
+        self._result = result
+        self._finish()
+
+    def set_exception(self, exc_info):
+        self._exc_info = exc_info
+        self._finish()
+
+    def _wait(self, timeout=None):
+        self._event.wait(timeout)
+
+        if not self.done():
+            raise RuntimeError('Timed out while waiting for a result')
+
+    def _finish(self):
+        self._lock.acquire()
+        try:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        finally:
+            self._lock.release()
+
+        for callback in callbacks:
+            callback(self)
+
+
+class WorkerPool(object):
+    """
+    Pool of worker threads which execute submitted functions.
+
+    At most ``max_workers`` functions run at the same time. If
+    ``max_pending`` is provided, :meth:`submit` blocks while that many
+    functions are already waiting for a free worker which puts a bound on
+    the amount of data which is buffered by a producer.
+    """
+
+    def __init__(self, max_workers, max_pending=None):
+        """
+        :param max_workers: Maximum number of worker threads.
+        :type max_workers: ``int``
+
+        :param max_pending: Maximum number of submitted functions which are
+                            waiting for a free worker (defaults to unbounded).
+        :type max_pending: ``int``
+        """
+        if max_workers < 1:
+            raise ValueError('max_workers must be greater than 0')
+
+        self.max_workers = max_workers
+        self._tasks = queue.Queue(max_pending or 0)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedule func(*args, **kwargs) for execution.
+
+        :rtype: :class:`Future`
+        """
+        if self._shutdown:
+            raise RuntimeError('Cannot submit new work after shutdown')
+
+        future = Future()
+        self._start_worker()
+        self._tasks.put((future, func, args, kwargs))
+        return future
+
+    def map(self, func, iterable):
+        """
+        Call func for each item in the iterable and return a generator which
+        yields results in the same order as the items.
+        """
+        futures = [self.submit(func, item) for item in iterable]
+
+        for future in futures:
+            yield future.result()
+
+    def shutdown(self, wait=True, cancel_pending=False):
+        """
+        Stop the worker threads once all the submitted functions have
+        finished.
+
+        :param wait: True to block until worker threads have exited.
+        :type wait: ``bool``
+
+        :param cancel_pending: True to drop submitted functions which haven't
+                               been started yet instead of running them.
+                               Their futures fail with ``RuntimeError``.
+        :type cancel_pending: ``bool``
+        """
+        self._lock.acquire()
+        try:
+            self._shutdown = True
+            threads = list(self._threads)
+        finally:
+            self._lock.release()
+
+        if cancel_pending:
+            self._cancel_pending()
+
+        for _ in threads:
+            self._tasks.put(None)
+
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(wait=True)
+        return False
+
+    def _cancel_pending(self):
+        while True:
+            try:
+                task = self._tasks.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                raise RuntimeError('Cancelled because the pool has been '
+                                   'shut down')
+            except RuntimeError:
+                task[0].set_exception(sys.exc_info())
+
+    def _start_worker(self):
+        self._lock.acquire()
+        try:
+            if len(self._threads) >= self.max_workers:
+                return
+
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        finally:
+            self._lock.release()
+
+    def _work(self):
+        while True:
+            task = self._tasks.get()
+
+            if task is None:
+                return
+
+            future, func, args, kwargs = task
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                future.set_exception(sys.exc_info())
+            else:
+                future.set_result(result)
+
+            # Release references to (potentially big) arguments as soon as
+            # possible
+            task = future = args = kwargs = None
+
+
+def as_completed(futures):
+    """
+    Return a generator which yields the provided futures as they finish.
+
+    :param futures: Futures to wait for.
+    :type futures: ``list`` of :class:`Future`
+    """
+    futures = list(futures)
+    finished = queue.Queue()
+
+    for future in futures:
+        future.add_done_callback(finished.put)
+
+    for _ in range(len(futures)):
+        yield finished.get()
+
+
+def run_concurrently(func, items, max_workers):
+    """
+    Call func for each item using up to max_workers threads and return a
+    generator which yields (item, future) tuples as the calls finish.
+
+    Results (and exceptions) can be retrieved from the yielded future.
+
+    Items are retrieved lazily, a new call is only started once one of the
+    running calls has finished. If the consumer stops early (e.g. breaks out
+    of the loop), no more calls are started and closing the generator waits
+    for the running calls to finish.
+
+    :param func: Function which is called with a single item.
+    :type func: ``callable``
+
+    :param items: Items to process.
+    :type items: ``iterable``
+
+    :param max_workers: Maximum number of concurrent calls.
+    :type max_workers: ``int``
+    """
+    items = iter(items)
+    pool = WorkerPool(max_workers=max_workers)
+    running = {}
+    finished = queue.Queue()
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(running) < max_workers:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                future = pool.submit(func, item)
+                running[future] = item
+                future.add_done_callback(finished.put)
+
+            if not running:
+                break
+
+            future = finished.get()
+            yield running.pop(future), future
+    finally:
+        pool.shutdown(wait=True, cancel_pending=True)
+
+
+def prefetch(iterable, max_pending):
+    """
+    Return a generator which yields items of the provided iterable. Items are
+    retrieved by a background thread which runs up to ``max_pending`` items
+    ahead of the consumer so producing and consuming the items overlaps.
+
+    Exceptions thrown by the iterable are re-raised in the consumer.
+
+    :param iterable: Iterable to consume. It's only used by the background
+                     thread.
+
+    :param max_pending: Maximum number of items which have been retrieved, but
+                        not yet consumed.
+    :type max_pending: ``int``
+    """
+    prefetcher = _Prefetcher(iterable=iterable, max_pending=max_pending)
+    return prefetcher.items()
+
+
+class _Prefetcher(object):
+    def __init__(self, iterable, max_pending):
+        self._iterable = iterable
+        self._max_pending = max(1, max_pending)
+        self._pending = []
+        self._taken = 0
+        self._done = False
+        self._stopped = False
+        self._exc_info = None
+        self._condition = threading.Condition()
+
+    def items(self):
+        thread = threading.Thread(target=self._produce)
+        thread.daemon = True
+        thread.start()
+
+        try:
+            while True:
+                self._condition.acquire()
+                try:
+                    # All the previously taken items have been consumed
+                    self._taken = 0
+                    self._condition.notify_all()
+
+                    while not self._pending and not self._done:
+                        self._condition.wait()
+
+                    # Take all the available items at once so the lock is
+                    # not acquired for every consumed item. Items which have
+                    # been taken, but not yet consumed, still count as
+                    # pending.
+                    items, self._pending = self._pending, []
+                    self._taken = len(items)
+                    done = self._done
+                    self._condition.notify_all()
+                finally:
+                    self._condition.release()
+
+                for item in items:
+                    yield item
+
+                if done and not items:
+                    break
+
+            if self._exc_info:
+                raise self._exc_info[1]
+        finally:
+            # Consumer has finished (or stopped early), let the producer exit
+            self._condition.acquire()
+            try:
+                self._stopped = True
+                self._pending = []
+                self._condition.notify_all()
+            finally:
+                self._condition.release()
+
+            # Wait until the producer has stopped using the iterable (e.g.
+            # reading a file) so the caller can safely release it
+            thread.join()
+
+    def _produce(self):
+        try:
+            try:
+                for item in self._iterable:
+                    self._condition.acquire()
+                    try:
+                        while (len(self._pending) + self._taken >=
+                               self._max_pending) and not self._stopped:
+                            self._condition.wait()
+
+                        if self._stopped:
+                            return
+
+                        self._pending.append(item)
+                        self._condition.notify_all()
+                    finally:
+                        self._condition.release()
+            finally:
+                # Generators are closed from the thread which iterates them
+                close = getattr(self._iterable, 'close', None)
+
+                if close is not None:
+                    close()
+        except Exception:
+            self._exc_info = sys.exc_info()
+
+        self._condition.acquire()
+        try:
+            self._done = True
+            self._condition.notify_all()
+        finally:
+            self._condition.release()
+
+
+class BackgroundHasher(object):
+    """
+    Update hash objects with data in a background thread so hashing overlaps
+    with reading and sending the data.
+
+    Data is handed over to the thread in batches and without copying so it
+    must not be modified after it has been passed to :meth:`update`.
+    """
+
+    def __init__(self, hashes, max_pending_size, background=True,
+                 batch_size=HASH_BATCH_SIZE):
+        """
+        :param hashes: Hash objects (e.g. ``hashlib.md5()``) to update.
+        :type hashes: ``list``
+
+        :param max_pending_size: Maximum amount of data (in bytes) which has
+                                 been passed to :meth:`update`, but not yet
+                                 hashed. :meth:`update` blocks once this
+                                 limit has been reached.
+        :type max_pending_size: ``int``
+
+        :param background: False to update the hash objects directly in the
+                           calling thread.
+        :type background: ``bool``
+
+        :param batch_size: Minimum amount of data which is handed over to the
+                           background thread at once.
+        :type batch_size: ``int``
+        """
+        self.hashes = list(hashes)
+        self.max_pending_size = max_pending_size
+        self.background = background
+        self.batch_size = batch_size
+
+        self._batch = []
+        self._batch_size = 0
+        self._batches = []
+        self._pending_size = 0
+        self._closed = False
+        self._exc_info = None
+        self._thread = None
+        self._condition = threading.Condition()
+
+    def update(self, data):
+        """
+        Schedule data to be hashed.
+
+        :param data: Data to hash.
+        :type data: ``bytes``
+        """
+        if not self.background:
+            self._hash([data])
+            return
+
+        self._batch.append(data)
+        self._batch_size += len(data)
+
+        if self._batch_size >= self.batch_size:
+            self._flush()
+
+    def wait(self):
+        """
+        Wait until all the scheduled data has been hashed and return the hash
+        objects. If hashing has failed, the exception is re-raised.
+
+        :rtype: ``list``
+        """
+        self._flush()
+        self.close()
+
+        if self._exc_info:
+            raise self._exc_info[1]
+
+        return self.hashes
+
+    def close(self):
+        """
+        Stop the background thread once it has hashed already handed over
+        data. Data passed to :meth:`update` after the last batch has been
+        handed over is discarded.
+        """
+        self._condition.acquire()
+        try:
+            self._closed = True
+            thread = self._thread
+            self._condition.notify_all()
+        finally:
+            self._condition.release()
+
+        if thread is not None:
+            thread.join()
+
+    def _flush(self):
+        if not self._batch:
+            return
+
+        batch, size = self._batch, self._batch_size
+        self._batch, self._batch_size = [], 0
+
+        self._condition.acquire()
+        try:
+            if self._closed:
+                raise RuntimeError('Cannot hash data after close')
+
+            # Always allow a single batch so data which is bigger than the
+            # limit doesn't block forever
+            while self._pending_size and \
+                    self._pending_size + size > self.max_pending_size:
+                self._condition.wait()
+
+            self._batches.append(batch)
+            self._pending_size += size
+            self._condition.notify_all()
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work)
+                self._thread.daemon = True
+                self._thread.start()
+        finally:
+            self._condition.release()
+
+    def _work(self):
+        while True:
+            self._condition.acquire()
+            try:
+                while not self._batches and not self._closed:
+                    self._condition.wait()
+
+                if not self._batches:
+                    return
+
+                batch = self._batches[0]
+            finally:
+                self._condition.release()
+
+            if self._exc_info is None:
+                try:
+                    self._hash(batch)
+                except Exception:
+                    self._exc_info = sys.exc_info()
+
+            self._condition.acquire()
+            try:
+                del self._batches[0]
+                self._pending_size -= sum([len(data) for data in batch])
+                self._condition.notify_all()
+            finally:
+                self._condition.release()
+
+    def _hash(self, batch):
+        for data in batch:
+            for data_hash in self.hashes:
+                data_hash.update(data)
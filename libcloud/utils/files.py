@@ -16,6 +16,8 @@
 import os
 import mimetypes
 
+from collections import deque
+
 from libcloud.utils.py3 import PY3
 from libcloud.utils.py3 import httplib
 from libcloud.utils.py3 import next
@@ -24,10 +26,20 @@ from libcloud.utils.py3 import b
 if PY3:
     from io import FileIO as file
 
+try:
+    memoryview
+except NameError:
+    # Python < 2.7
+    memoryview = None
+
 CHUNK_SIZE = 8096
 
+# Size of the blocks in which local files are read by read_file_in_chunks
+FILE_CHUNK_SIZE = 1024 * 1024
+
 __all__ = [
     'read_in_chunks',
+    'read_file_in_chunks',
     'exhaust_iterator',
     'guess_file_mime_type'
 ]
@@ -52,9 +64,6 @@ def read_in_chunks(iterator, chunk_size=None, fill_size=False,
     :param yield_empty: If true and iterator returned no data, yield empty
                         bytes object before raising StopIteration.
     :type yield_empty: ``bool``
-
-    TODO: At some point in the future we could use byte arrays here if version
-    >= Python 3. This should speed things up a bit and reduce memory usage.
     """
     chunk_size = chunk_size or CHUNK_SIZE
 
@@ -65,33 +74,127 @@ def read_in_chunks(iterator, chunk_size=None, fill_size=False,
         get_data = next
         args = (iterator, )
 
-    data = b('')
-    empty = False
-
-    while not empty or len(data) > 0:
-        if not empty:
-            try:
-                chunk = b(get_data(*args))
-                if len(chunk) > 0:
-                    data += chunk
-                else:
-                    empty = True
-            except StopIteration:
-                empty = True
-
-        if len(data) == 0:
-            if empty and yield_empty:
-                yield b('')
-
-            raise StopIteration
-
-        if fill_size:
-            if empty or len(data) >= chunk_size:
-                yield data[:chunk_size]
-                data = data[chunk_size:]
+    # Pieces which haven't been yielded yet. Pieces are only copied once,
+    # when they are joined into an output chunk, so the amount of work is
+    # linear in the amount of data no matter how small the pieces are.
+    pieces = deque()
+    pending = 0
+    yielded = False
+
+    while True:
+        try:
+            chunk = b(get_data(*args))
+        except StopIteration:
+            break
+
+        if len(chunk) == 0:
+            break
+
+        if not fill_size:
+            yielded = True
+            yield chunk
+            continue
+
+        pieces.append(chunk)
+        pending += len(chunk)
+
+        while pending >= chunk_size:
+            yielded = True
+            yield _join_pieces(pieces, chunk_size)
+            pending -= chunk_size
+
+    if pending > 0:
+        yield _join_pieces(pieces, pending)
+    elif not yielded and yield_empty:
+        yield b('')
+
+
+def _view(data):
+    # Slicing a memoryview doesn't copy the data. On Python 2 str.join
+    # doesn't accept buffers so the data is sliced directly.
+    if PY3 and memoryview is not None:
+        return memoryview(data)
+
+    return data
+
+
+def _join_pieces(pieces, size):
+    """
+    Remove ``size`` bytes from the front of the provided deque of pieces and
+    return them as a single bytes object.
+    """
+    first = pieces[0]
+
+    if len(first) == size:
+        # Common case of a piece which is already the right size
+        pieces.popleft()
+
+        if isinstance(first, bytes):
+            return first
+
+        return bytes(first)
+
+    parts = []
+    remaining = size
+
+    while remaining > 0:
+        piece = pieces[0]
+
+        if len(piece) <= remaining:
+            parts.append(piece)
+            remaining -= len(piece)
+            pieces.popleft()
         else:
-            yield data
-            data = b('')
+            view = _view(piece)
+            parts.append(view[:remaining])
+            pieces[0] = view[remaining:]
+            remaining = 0
+
+    return b('').join(parts)
+
+
+def read_file_in_chunks(file_handle, chunk_size=None, reuse_buffer=True):
+    """
+    Return a generator which reads a binary file in fixed size chunks.
+
+    If the file object supports ``readinto``, data is read into a single
+    pre-allocated buffer and the generator yields ``memoryview`` slices of
+    that buffer. A slice is only valid until the next chunk is requested so
+    the consumer needs to send or copy it before advancing the generator.
+
+    :param file_handle: File object opened in binary mode.
+    :type file_handle: ``file``
+
+    :param chunk_size: Optional chunk size (defaults to FILE_CHUNK_SIZE)
+    :type chunk_size: ``int``
+
+    :param reuse_buffer: False to yield a new bytes object for each chunk
+                         which stays valid after the next chunk has been
+                         requested.
+    :type reuse_buffer: ``bool``
+    """
+    chunk_size = chunk_size or FILE_CHUNK_SIZE
+
+    if not reuse_buffer or not hasattr(file_handle, 'readinto') or \
+            memoryview is None:
+        while True:
+            chunk = file_handle.read(chunk_size)
+
+            if not chunk:
+                return
+
+            yield chunk
+
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+
+    while True:
+        read = file_handle.readinto(buf)
+
+        if not read:
+            return
+
+        yield view[:read]
 
 
 def exhaust_iterator(iterator):
@@ -105,22 +208,20 @@ def exhaust_iterator(iterator):
     :rtype ``str``
     :return Data returned by the iterator.
     """
-    data = b('')
-
-    try:
-        chunk = b(next(iterator))
-    except StopIteration:
-        chunk = b('')
-
-    while len(chunk) > 0:
-        data += chunk
+    pieces = []
 
+    while True:
         try:
             chunk = b(next(iterator))
         except StopIteration:
-            chunk = b('')
+            break
 
-    return data
+        if len(chunk) == 0:
+            break
+
+        pieces.append(chunk)
+
+    return b('').join(pieces)
 
 
 def guess_file_mime_type(file_path):
@@ -51,7 +51,9 @@ if sys.version_info >= (3, 2) and sys.version_info < (3, 3):
 
 if PY3:
     import http.client as httplib
+    import queue
     from io import StringIO
+    from io import BytesIO
     import urllib
     import urllib as urllib2
     import urllib.parse as urlparse
@@ -95,7 +97,9 @@ if PY3:
         return ET.tostring(node, encoding='unicode')
 else:
     import httplib  # NOQA
+    import Queue as queue  # NOQA
     from StringIO import StringIO  # NOQA
+    from StringIO import StringIO as BytesIO  # NOQA
     import urllib  # NOQA
     import urllib2  # NOQA
     import urlparse  # NOQA
@@ -13,20 +13,124 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import absolute_import
+
+import threading
+
+try:
+    from xml.etree import cElementTree as ET
+except ImportError:
+    from xml.etree import ElementTree as ET
+
 __all__ = [
     'fixxpath',
     'findtext',
     'findattr',
-    'findall'
+    'findall',
+    'findtexts',
+    'iterparse',
+    'iterfindall',
+    'iterfindall_events'
 ]
 
+# Maximum number of compiled xpaths which are cached
+XPATH_CACHE_SIZE = 1024
+
+
+class _LRUCache(object):
+    """
+    Thread-safe dictionary which holds at most ``max_size`` items and discards
+    the least recently used item when it's full.
+
+    Items are kept in a circular doubly linked list ordered by recency, so
+    lookups and evictions take constant time.
+    """
+
+    # Indexes of the fields of a linked list entry
+    PREV, NEXT, KEY, VALUE = 0, 1, 2, 3
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._values = {}
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None]
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        self._lock.acquire()
+        try:
+            link = self._values.get(key, None)
+
+            if link is None:
+                return default
+
+            self._unlink(link)
+            self._append(link)
+            return link[self.VALUE]
+        finally:
+            self._lock.release()
+
+    def set(self, key, value):
+        self._lock.acquire()
+        try:
+            link = self._values.get(key, None)
+
+            if link is not None:
+                self._unlink(link)
+            elif len(self._values) >= self.max_size:
+                oldest = self._root[self.NEXT]
+                self._unlink(oldest)
+                del self._values[oldest[self.KEY]]
+
+            link = [None, None, key, value]
+            self._append(link)
+            self._values[key] = link
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        self._lock.acquire()
+        try:
+            self._values.clear()
+            self._root[:] = [self._root, self._root, None, None]
+        finally:
+            self._lock.release()
+
+    def __len__(self):
+        return len(self._values)
+
+    def _unlink(self, link):
+        link[self.PREV][self.NEXT] = link[self.NEXT]
+        link[self.NEXT][self.PREV] = link[self.PREV]
+
+    def _append(self, link):
+        """
+        Insert the provided entry as the most recently used one.
+        """
+        last = self._root[self.PREV]
+        link[self.PREV] = last
+        link[self.NEXT] = self._root
+        last[self.NEXT] = link
+        self._root[self.PREV] = link
+
+
+_xpath_cache = _LRUCache(max_size=XPATH_CACHE_SIZE)
+
 
 def fixxpath(xpath, namespace=None):
     # ElementTree wants namespaces in its xpaths, so here we add them.
     if not namespace:
         return xpath
 
-    return '/'.join(['{%s}%s' % (namespace, e) for e in xpath.split('/')])
+    key = (xpath, namespace)
+    value = _xpath_cache.get(key)
+
+    if value is None:
+        value = '/'.join(['{%s}%s' % (namespace, e)
+                          for e in xpath.split('/')])
+        _xpath_cache.set(key, value)
+
+    return value
 
 
 def findtext(element, xpath, namespace=None, no_text_value=''):
@@ -48,3 +152,130 @@ def findattr(element, xpath, namespace=None):
 
 def findall(element, xpath, namespace=None):
     return element.findall(fixxpath(xpath=xpath, namespace=namespace))
+
+
+def findtexts(element, xpaths, namespace=None):
+    """
+    Return text values for multiple simple paths (e.g. ``ebs/volumeId``)
+    using a single pass over the children of the provided element instead of
+    searching the element once for each path.
+
+    Values are the same as the ones returned by :func:`findattr` - text of
+    the first matching element, ``''`` if this element has no text and
+    ``None`` if there is no matching element.
+
+    :param xpaths: Paths to extract.
+    :type xpaths: ``list`` of ``str``
+
+    :return: Dictionary which maps each path to its value.
+    :rtype: ``dict``
+    """
+    xpaths = tuple(xpaths)
+    key = (xpaths, namespace, 'tree')
+    tree = _xpath_cache.get(key)
+
+    if tree is None:
+        tree = _compile_paths(xpaths=xpaths, namespace=namespace)
+        _xpath_cache.set(key, tree)
+
+    values = dict([(xpath, None) for xpath in xpaths])
+    _find_paths(element=element, tree=tree, values=values)
+    return values
+
+
+def _compile_paths(xpaths, namespace=None):
+    # Build a tree (tag -> [paths ending with this tag, subtree]) which
+    # is used to match child elements against all the paths at once
+    tree = {}
+
+    for xpath in xpaths:
+        tags = [fixxpath(xpath=tag, namespace=namespace)
+                for tag in xpath.split('/')]
+        node = tree
+
+        for index, tag in enumerate(tags):
+            entry = node.setdefault(tag, ([], {}))
+
+            if index == len(tags) - 1:
+                entry[0].append(xpath)
+
+            node = entry[1]
+
+    return tree
+
+
+def _find_paths(element, tree, values):
+    for child in element:
+        entry = tree.get(child.tag)
+
+        if entry is None:
+            continue
+
+        xpaths, subtree = entry
+
+        for xpath in xpaths:
+            if values[xpath] is None:
+                values[xpath] = child.text or ''
+
+        if subtree:
+            _find_paths(element=child, tree=subtree, values=values)
+
+
+def iterfindall(source, xpath, namespace=None):
+    """
+    Incrementally parse XML document from a file-like object and yield
+    elements which match the provided xpath (relative to the root element)
+    as soon as they have been parsed.
+
+    Yielded elements are removed from the tree once the consumer asks for the
+    next one so memory usage doesn't depend on the size of the document.
+
+    :param source: File-like object with the XML document.
+
+    :param xpath: Simple path (e.g. ``reservationSet/item``) of the elements
+                  to yield.
+    :type xpath: ``str``
+    """
+    return iterfindall_events(events=iterparse(source), xpath=xpath,
+                              namespace=namespace)
+
+
+def iterparse(source):
+    """
+    Return an iterator over ``start`` and ``end`` parser events for the XML
+    document in the provided file-like object.
+
+    Once the iterator has been exhausted, the root element is available as
+    its ``root`` attribute.
+    """
+    return ET.iterparse(source, events=('start', 'end'))
+
+
+def iterfindall_events(events, xpath, namespace=None):
+    """
+    Same as :func:`iterfindall`, but works on parser events returned by
+    :func:`iterparse`.
+    """
+    if namespace:
+        tags = ['{%s}%s' % (namespace, tag) for tag in xpath.split('/')]
+    else:
+        tags = xpath.split('/')
+
+    depth = len(tags) + 1
+    stack = []
+    path = []
+
+    for event, element in events:
+        if event == 'start':
+            stack.append(element)
+            path.append(element.tag)
+            continue
+
+        if len(path) == depth and path[1:] == tags:
+            yield element
+
+            # Element has been processed, remove it from the tree
+            stack[-2].remove(element)
+
+        stack.pop()
+        path.pop()
@@ -17,6 +17,7 @@ import sys
 import doctest
 
 from setuptools import setup
+from setuptools.command.build_py import build_py
 from distutils.core import Command
 from unittest import TextTestRunner, TestLoader
 from glob import glob
@@ -56,6 +57,14 @@ if sys.version_info <= (2, 4):
 # pre-2.6 will need the ssl PyPI package
 pre_python26 = (sys.version_info[0] == 2 and sys.version_info[1] < 6)
 
+# The asyncio modules use "async" / "await" syntax which is only valid on
+# Python 3.5 and above. On older versions they can't be byte-compiled or
+# imported so they are left out of the build (and out of the lint run in
+# tox.ini).
+ASYNCIO_MODULES = ['libcloud.common.aio', 'libcloud.compute.aio',
+                   'libcloud.storage.aio']
+has_asyncio = sys.version_info >= (3, 5)
+
 
 def read_version_string():
     version = None
@@ -168,6 +177,17 @@ class TestCommand(Command):
         return not res.wasSuccessful()
 
 
+class BuildPyCommand(build_py):
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+
+        if has_asyncio:
+            return modules
+
+        return [(pkg, module, path) for (pkg, module, path) in modules
+                if '.'.join([pkg, module]) not in ASYNCIO_MODULES]
+
+
 class ApiDocsCommand(Command):
     description = "generate API documentation"
     user_options = []
@@ -234,6 +254,7 @@ setup(
     license='Apache License (2.0)',
     url='http://libcloud.apache.org/',
     cmdclass={
+        'build_py': BuildPyCommand,
         'test': TestCommand,
         'apidocs': ApiDocsCommand,
         'coverage': CoverageCommand